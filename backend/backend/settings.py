@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 import asyncio
 import os
 import sys
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 
@@ -441,6 +442,18 @@ ZANE_FLUENTD_HOST = os.environ.get(
 DEFAULT_HEALTHCHECK_TIMEOUT = 30  # seconds
 DEFAULT_HEALTHCHECK_INTERVAL = 30  # seconds
 DEFAULT_HEALTHCHECK_WAIT_INTERVAL = 5.0  # seconds
+# The status of the deployments is updated from the docker events by the schedule worker,
+# the monitor schedules of deployments without healthcheck then only run every
+# `DEPLOYMENT_MONITOR_RECONCILIATION_INTERVAL` seconds, in case an event has been missed
+DEPLOYMENT_EVENTS_WATCHER_ENABLED = (
+    os.environ.get("DEPLOYMENT_EVENTS_WATCHER_ENABLED", "true") == "true"
+)
+try:
+    DEPLOYMENT_MONITOR_RECONCILIATION_INTERVAL = int(
+        os.environ.get("DEPLOYMENT_MONITOR_RECONCILIATION_INTERVAL", 300)
+    )
+except Exception:
+    DEPLOYMENT_MONITOR_RECONCILIATION_INTERVAL = 300
 
 # temporalio config
 TEMPORALIO_WORKFLOW_EXECUTION_MAX_TIMEOUT = timedelta(minutes=30)
@@ -455,6 +468,47 @@ try:
     TEMPORALIO_MAX_CONCURRENT_DEPLOYS = int(os.environ.get("MAX_CONCURRENT_DEPLOYS", 5))
 except Exception:
     TEMPORALIO_MAX_CONCURRENT_DEPLOYS = 5
+# Lease of a slot of the deploy semaphore, renewed by the worker while the deployment runs,
+# a slot held by a worker that died is freed after this delay
+TEMPORALIO_DEPLOY_SEMAPHORE_LEASE = timedelta(minutes=1)
+# Build cache exported to the build registry by buildkit,
+# `min` only exports the layers of the final image, `max` exports the layers of all the build stages
+BUILDKIT_CACHE_MODE = os.environ.get("BUILDKIT_CACHE_MODE", "max")
+if BUILDKIT_CACHE_MODE not in ["min", "max"]:
+    BUILDKIT_CACHE_MODE = "max"
+# Max size of the local cache kept by each buildkit builder, in MB
+try:
+    BUILDKIT_CACHE_MAX_STORAGE_MB = int(
+        os.environ.get("BUILDKIT_CACHE_MAX_STORAGE_MB", 10_240)
+    )
+except Exception:
+    BUILDKIT_CACHE_MAX_STORAGE_MB = 10_240
+# Pool of buildkit builders shared by all the environments
+try:
+    BUILDKIT_BUILDER_POOL_SIZE = int(os.environ.get("BUILDKIT_BUILDER_POOL_SIZE", 2))
+except Exception:
+    BUILDKIT_BUILDER_POOL_SIZE = 2
+try:
+    BUILDKIT_BUILDER_MAX_CONCURRENT_BUILDS = int(
+        os.environ.get("BUILDKIT_BUILDER_MAX_CONCURRENT_BUILDS", 2)
+    )
+except Exception:
+    BUILDKIT_BUILDER_MAX_CONCURRENT_BUILDS = 2
+# builders unused for this long (in seconds) are stopped by the system cleanup
+try:
+    BUILDKIT_BUILDER_IDLE_TIMEOUT = int(
+        os.environ.get("BUILDKIT_BUILDER_IDLE_TIMEOUT", 1800)
+    )
+except Exception:
+    BUILDKIT_BUILDER_IDLE_TIMEOUT = 1800
+
+# max number of workflows started (or signaled) in parallel by bulk actions & webhooks
+try:
+    TEMPORALIO_MAX_CONCURRENT_WORKFLOW_STARTS = int(
+        os.environ.get("TEMPORALIO_MAX_CONCURRENT_WORKFLOW_STARTS", 10)
+    )
+except Exception:
+    TEMPORALIO_MAX_CONCURRENT_WORKFLOW_STARTS = 10
 
 if BACKEND_COMPONENT == "API" and not TESTING:
     register_zaneops_app_on_proxy(
@@ -466,6 +520,38 @@ if BACKEND_COMPONENT == "API" and not TESTING:
         cloudflare_api_token=CLOUDFLARE_API_TOKEN,
     )
 
+# Number of days of HTTP logs to keep, older days are dropped by the daily logs cleanup
+try:
+    HTTP_LOGS_RETENTION_DAYS = int(os.environ.get("HTTP_LOGS_RETENTION_DAYS", 30))
+except Exception:
+    HTTP_LOGS_RETENTION_DAYS = 30
+# Number of days in advance for which the daily HTTP logs partitions are created
+HTTP_LOGS_PARTITIONS_PREMAKE_DAYS = 7
+
+# Bare mirrors of the git repositories deployed on this node, reused between deployments
+GIT_MIRRORS_CACHE_DIR = os.environ.get(
+    "GIT_MIRRORS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "zaneops-git-mirrors")
+)
+try:
+    GIT_MIRRORS_CACHE_MAX_SIZE = int(
+        os.environ.get("GIT_MIRRORS_CACHE_MAX_SIZE", 10 * 1024**3)
+    )  # bytes
+except Exception:
+    GIT_MIRRORS_CACHE_MAX_SIZE = 10 * 1024**3
+
+# Max number of concurrent calls to the docker daemon from the activities of a worker
+try:
+    DOCKER_CLIENT_MAX_CONCURRENCY = int(
+        os.environ.get("DOCKER_CLIENT_MAX_CONCURRENCY", 16)
+    )
+except Exception:
+    DOCKER_CLIENT_MAX_CONCURRENCY = 16
+
+# Where the `/sys/fs/cgroup` and `/proc` of the host are mounted, they are used
+# to read the metrics of the containers without going through the docker API
+HOST_CGROUP_ROOT = os.environ.get("HOST_CGROUP_ROOT", "/sys/fs/cgroup")
+HOST_PROC_ROOT = os.environ.get("HOST_PROC_ROOT", "/proc")
+
 # Docker image version
 IMAGE_VERSION = os.environ.get("IMAGE_VERSION", "canary")
 COMMIT_SHA = os.environ.get("COMMIT_SHA", None)
@@ -473,6 +559,23 @@ COMMIT_SHA = os.environ.get("COMMIT_SHA", None)
 
 LOKI_HOST = os.environ.get("LOKI_HOST", "http://127.0.0.1:3100")
 LOKI_APP_NAME = "zaneops"
+# deployment logs are sent to loki in batches of up to `LOKI_LOG_SINK_MAX_BATCH_SIZE` lines,
+# or every `LOKI_LOG_SINK_FLUSH_INTERVAL` seconds
+LOKI_LOG_SINK_MAX_BATCH_SIZE = 500
+LOKI_LOG_SINK_FLUSH_INTERVAL = 0.2  # seconds
+# maximum number of log lines waiting to be sent before `deployment_log` starts waiting
+LOKI_LOG_SINK_MAX_PENDING = 10_000
+# new logs are sent to the viewers of a live tail in batches of up to `LOKI_TAIL_MAX_BATCH_SIZE` lines,
+# or every `LOKI_TAIL_FLUSH_INTERVAL` seconds
+LOKI_TAIL_MAX_BATCH_SIZE = 200
+LOKI_TAIL_FLUSH_INTERVAL = 0.25  # seconds
+# pages of logs that cannot change anymore are cached, up to `LOKI_QUERY_CACHE_MAX_ENTRIES` pages
+# of at most `LOKI_QUERY_CACHE_MAX_ENTRY_SIZE` bytes, the least recently used pages are evicted first
+LOKI_QUERY_CACHE_MAX_ENTRIES = 1_000
+LOKI_QUERY_CACHE_MAX_ENTRY_SIZE = 1024 * 1024  # bytes
+LOKI_QUERY_CACHE_TIMEOUT = 24 * 60 * 60  # seconds
+# logs more recent than this may still be being ingested, their time window is not closed yet
+LOKI_QUERY_CACHE_MIN_AGE = 60  # seconds
 
 CI = os.environ.get("CI", "false")
 
@@ -0,0 +1,84 @@
+# Generated by Django 5.2 on 2026-10-16 20:44
+
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+def populate_compose_stack_urls(apps, schema_editor):
+    ComposeStack = apps.get_model("compose", "ComposeStack")
+    ComposeStackURL = apps.get_model("compose", "ComposeStackURL")
+
+    ComposeStackURL.objects.bulk_create(
+        [
+            ComposeStackURL(
+                stack_id=stack_id,
+                service_name=service,
+                domain=route["domain"],
+                base_path=route["base_path"],
+                strip_prefix=route["strip_prefix"],
+                port=route["port"],
+            )
+            for stack_id, urls in ComposeStack.objects.filter(
+                urls__isnull=False
+            ).values_list("id", "urls")
+            for service, routes in urls.items()
+            for route in routes
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "compose",
+            "0028_composestackdeployment_compose_com_queued__233fc9_idx_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ComposeStackURL",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("service_name", models.CharField(max_length=255)),
+                ("domain", models.CharField(max_length=1000)),
+                ("base_path", models.CharField(default="/")),
+                ("strip_prefix", models.BooleanField(default=True)),
+                ("port", models.PositiveIntegerField()),
+                (
+                    "stack",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="url_routes",
+                        to="compose.composestack",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        django.db.models.functions.text.Lower("domain"),
+                        name="compose_stack_url_domain_idx",
+                    ),
+                    models.Index(
+                        fields=["domain", "base_path"],
+                        name="compose_com_domain_700ace_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(
+            populate_compose_stack_urls,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
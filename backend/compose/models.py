@@ -1,6 +1,7 @@
 import secrets
 from typing import TYPE_CHECKING, cast
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Lower
 
 from zane_api.models import TimestampedModel, Project, Environment, BaseEnvVariable
 from shortuuid.django_fields import ShortUUIDField
@@ -27,6 +28,7 @@ class ComposeStack(TimestampedModel):
         env_overrides: RelatedManager["ComposeStackEnvOverride"]
         deployments: RelatedManager["ComposeStackDeployment"]
         metrics: RelatedManager["ComposeStackMetrics"]
+        url_routes: RelatedManager["ComposeStackURL"]
 
     id = ShortUUIDField(
         length=8,
@@ -116,6 +118,54 @@ class ComposeStack(TimestampedModel):
             models.Index(fields=["deploy_token"]),
         ]
 
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            update_fields = kwargs.get("update_fields")
+            if update_fields is None or "urls" in update_fields:
+                self.sync_url_routes()
+
+    def sync_url_routes(self):
+        """
+        Keep the `ComposeStackURL` rows of the stack in sync with `urls`,
+        only writing to the table when the routes changed.
+        """
+        routes = {
+            (
+                service,
+                route["domain"],
+                route["base_path"],
+                route["strip_prefix"],
+                route["port"],
+            )
+            for service, service_routes in cast(
+                dict[str, list[dict]], self.urls or {}
+            ).items()
+            for route in service_routes
+        }
+        existing_routes = set(
+            self.url_routes.values_list(
+                "service_name", "domain", "base_path", "strip_prefix", "port"
+            )
+        )
+        if routes == existing_routes:
+            return
+
+        self.url_routes.all().delete()
+        ComposeStackURL.objects.bulk_create(
+            [
+                ComposeStackURL(
+                    stack=self,
+                    service_name=service,
+                    domain=domain,
+                    base_path=base_path,
+                    strip_prefix=strip_prefix,
+                    port=port,
+                )
+                for service, domain, base_path, strip_prefix, port in routes
+            ]
+        )
+
     @property
     def hash_prefix(self) -> str:
         return cast(str, self.id).replace(self.ID_PREFIX, "").lower()
@@ -333,6 +383,31 @@ class ComposeStack(TimestampedModel):
         return cloned_stack
 
 
+class ComposeStackURL(models.Model):
+    """
+    Denormalized copy of the routes in `ComposeStack.urls`, one row per route,
+    so that domains can be looked up with an index instead of unnesting the JSON of every stack.
+    Kept in sync by `ComposeStack.save()`.
+    """
+
+    stack = models.ForeignKey(
+        ComposeStack,
+        on_delete=models.CASCADE,
+        related_name="url_routes",
+    )
+    service_name = models.CharField(max_length=255)
+    domain = models.CharField(max_length=1000)
+    base_path = models.CharField(default="/")
+    strip_prefix = models.BooleanField(default=True)
+    port = models.PositiveIntegerField()
+
+    class Meta:  # type: ignore
+        indexes = [
+            models.Index(Lower("domain"), name="compose_stack_url_domain_idx"),
+            models.Index(fields=["domain", "base_path"]),
+        ]
+
+
 class ComposeStackDeployment(TimestampedModel):
     """Tracks deployments of compose stacks"""
 
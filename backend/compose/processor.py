@@ -15,7 +15,7 @@ from .dtos import (
 from temporal.helpers import get_env_network_resource_name
 import json
 from django.conf import settings
-from .models import ComposeStack, ComposeStackChange
+from .models import ComposeStack, ComposeStackChange, ComposeStackURL
 import secrets
 from zane_api.utils import (
     domain_to_wildcard,
@@ -34,7 +34,7 @@ from zane_api.models import URL
 from container_registry.models import BuildRegistry
 from django.db.models import Q
 import uuid
-from django.db import connection
+from django.db.models.functions import Lower
 import base64
 from zane_api.serializers import EnvVarDictField
 
@@ -142,46 +142,19 @@ class ComposeStackURLRouteSerializer(serializers.Serializer):
         domain_as_wildcard: str,
         exclude_stack_id: str | None = None,
     ):
-        """Check if the URL conflicts with any deployed compose stack URLs using raw SQL."""
-
-        # Build the exclusion clause
-        exclude_clause = ""
-        params = [domain.lower(), base_path.lower(), domain_as_wildcard.lower()]
-        if exclude_stack_id:
-            exclude_clause = "AND cs.id != %s"
-            params.append(exclude_stack_id)
-
-        # Use PostgreSQL's jsonb_each and jsonb_array_elements to search nested JSON
-        # The urls field structure is: {service_name: [{domain, base_path, ...}, ...]}
-        query = f"""
-            SELECT cs.id
-            FROM {ComposeStack._meta.db_table} cs,
-                 jsonb_each(cs.urls) AS services(service_name, routes),
-                 jsonb_array_elements(services.routes) AS route
-            WHERE cs.urls IS NOT NULL
-              AND (
-                  (lower(route->>'domain') = %s AND lower(route->>'base_path') = %s)
-                  OR (lower(route->>'domain') = %s AND lower(route->>'base_path') = %s)
-              )
-              {exclude_clause}
-            LIMIT 1
-        """
-
-        # Add base_path again for the wildcard check
-        params = [
-            domain.lower(),
-            base_path.lower(),
-            domain_as_wildcard.lower(),
-            base_path.lower(),
-        ]
+        """Check if the URL conflicts with any deployed compose stack URLs."""
+
+        # lookups on `lower(domain)` use the `compose_stack_url_domain_idx` index
+        conflicting_routes = ComposeStackURL.objects.alias(
+            lower_domain=Lower("domain"), lower_base_path=Lower("base_path")
+        ).filter(
+            Q(lower_domain=domain.lower()) | Q(lower_domain=domain_as_wildcard.lower()),
+            lower_base_path=base_path.lower(),
+        )
         if exclude_stack_id:
-            params.append(exclude_stack_id)
-
-        with connection.cursor() as cursor:
-            cursor.execute(query, params)
-            result = cursor.fetchone()
+            conflicting_routes = conflicting_routes.exclude(stack_id=exclude_stack_id)
 
-        if result:
+        if conflicting_routes.exists():
             raise serializers.ValidationError(
                 {
                     "domain": [
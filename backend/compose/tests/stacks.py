@@ -9,7 +9,7 @@ from zane_api.models import URL, Environment, Project
 from zane_api.tests.base import AuthAPITestCase
 from zane_api.utils import find_item_in_sequence, jprint
 
-from ..models import ComposeStack, ComposeStackChange
+from ..models import ComposeStack, ComposeStackChange, ComposeStackURL
 from ..processor import ComposeSpecProcessor
 from .fixtures import (
     DOCKER_COMPOSE_EMPTY_ENV_VARIABLES,
@@ -2500,6 +2500,48 @@ class ComposeStackURLConflictTests(ComposeStackAPITestBase):
         jprint(response.json())
         self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
 
+    def test_deployed_compose_stack_urls_are_synced_to_url_routes(self):
+        project = self.create_project()
+
+        response = self.client.post(
+            reverse(
+                "compose:stacks.create",
+                kwargs={
+                    "project_slug": project.slug,
+                    "env_slug": Environment.PRODUCTION_ENV_NAME,
+                },
+            ),
+            data={
+                "slug": "my-stack",
+                "user_content": compose_with_url("my-stack.example.com"),
+            },
+        )
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+
+        stack = ComposeStack.objects.get(slug="my-stack")
+        response = self.client.put(
+            reverse(
+                "compose:stacks.deploy",
+                kwargs={
+                    "project_slug": project.slug,
+                    "env_slug": Environment.PRODUCTION_ENV_NAME,
+                    "slug": stack.slug,
+                },
+            ),
+        )
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+        route = ComposeStackURL.objects.filter(stack=stack).first()
+        self.assertIsNotNone(route)
+        route = cast(ComposeStackURL, route)
+        self.assertEqual("my-stack.example.com", route.domain)
+        self.assertEqual("/", route.base_path)
+
+        stack.refresh_from_db()
+        stack.urls = {}
+        stack.save()
+        self.assertEqual(0, ComposeStackURL.objects.filter(stack=stack).count())
+
     def test_create_compose_stack_url_shadowed_by_wildcard_domain(self):
         """
         Creating a compose stack with a subdomain URL should fail if a wildcard
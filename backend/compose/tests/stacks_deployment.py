@@ -1,11 +1,12 @@
 from django.urls import reverse
 import os
+from datetime import timedelta
 import responses
 from rest_framework import status
 from unittest.mock import patch
 
 from zane_api.models import Environment
-from zane_api.tests.base import FakeDockerClient
+from zane_api.tests.base import FakeDockerClient, WorkflowScheduleHandle
 from ..models import (
     ComposeStack,
     ComposeStackChange,
@@ -1173,7 +1174,7 @@ class ArchiveComposeStackResourcesViewTests(ComposeStackAPITestBase):
 
         # Create and deploy a stack
         create_stack_payload = {
-            "slug": "monitor-stack",
+            "slug": "metrics-stack",
             "user_content": DOCKER_COMPOSE_MINIMAL,
         }
 
@@ -1191,7 +1192,7 @@ class ArchiveComposeStackResourcesViewTests(ComposeStackAPITestBase):
 
         stack = cast(
             ComposeStack,
-            await ComposeStack.objects.filter(slug="monitor-stack").afirst(),
+            await ComposeStack.objects.filter(slug="metrics-stack").afirst(),
         )
         self.assertIsNotNone(stack)
         stack_id = stack.id
@@ -1210,9 +1211,12 @@ class ArchiveComposeStackResourcesViewTests(ComposeStackAPITestBase):
         )
         self.assertEqual(status.HTTP_200_OK, response.status_code)
 
-        # Verify metrics schedule was created
-        schedule_handle = self.get_workflow_schedule_by_id(metrics_schedule_id)
-        self.assertIsNotNone(schedule_handle)
+        # per-stack metrics schedule created by a previous version of zaneops
+        self.workflow_schedules.append(
+            WorkflowScheduleHandle(
+                metrics_schedule_id, workflow=None, interval=timedelta(seconds=30)
+            )
+        )
 
         # Archive the stack
         response = await self.async_client.delete(
@@ -1230,7 +1234,7 @@ class ArchiveComposeStackResourcesViewTests(ComposeStackAPITestBase):
         # Verify stack is deleted
         self.assertIsNone(await ComposeStack.objects.filter(id=stack_id).afirst())
 
-        # Verify metrics schedule is deleted
+        # Verify the legacy metrics schedule is deleted
         self.assertIsNone(self.get_workflow_schedule_by_id(metrics_schedule_id))
 
     def test_archive_stack_without_deployment_deletes_stack(self):
@@ -14,6 +14,7 @@ import boto3
 from botocore.exceptions import ClientError, EndpointConnectionError
 from botocore.client import Config
 from zane_api.models import URL, DeploymentChange
+from zane_api.domain_index import invalidate_domain_index
 from django.conf import settings
 
 
@@ -418,6 +419,9 @@ class BuildRegistryUpdateDetailsSerializer(serializers.ModelSerializer):
             storage_backend=storage_backend,
             s3_credentials=s3_credentials,
         )
+        if registry_domain != instance.registry_domain:
+            # the queryset update doesn't send the `post_save` signal that invalidates the index
+            invalidate_domain_index()
 
         def get_storage_config(storage_backend: str, s3_credentials: dict | None):
             fs_config = None
@@ -860,3 +860,46 @@ class BuildRegistryProxyTests(AuthAPITestCase):
         )
         jprint(response.json())
         self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+    def test_certificate_follows_the_updated_registry_domain(self):
+        self.loginUser()
+        response = self.client.post(
+            reverse("container_registry:build_registries.list"),
+            data={
+                "name": "My registry",
+                "is_default": True,
+                "registry_domain": "registry.zaneops.io",
+                "registry_username": "fredkisss",
+            },
+        )
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        registry = cast(BuildRegistry, BuildRegistry.objects.first())
+
+        def check_certificate(domain: str):
+            return self.client.get(
+                reverse("zane_api:proxy.check_certificates", query={"domain": domain})
+            )
+
+        # load the domain index before the update
+        self.assertEqual(
+            status.HTTP_200_OK, check_certificate("registry.zaneops.io").status_code
+        )
+
+        response = self.client.patch(
+            reverse(
+                "container_registry:build_registries.details",
+                kwargs={"id": registry.id},
+            ),
+            data={"registry_domain": "new-registry.zaneops.io"},
+        )
+        jprint(response.json())
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+        self.assertEqual(
+            status.HTTP_200_OK,
+            check_certificate("new-registry.zaneops.io").status_code,
+        )
+        self.assertEqual(
+            status.HTTP_403_FORBIDDEN,
+            check_certificate("registry.zaneops.io").status_code,
+        )
@@ -487,14 +487,15 @@ class DeployGitServiceFromGithubAPIViewTests(AuthAPITestCase):
             )
             jprint(response.json())
             self.assertEqual(status.HTTP_200_OK, response.status_code)
-            called_with_authed_repo_url = all(
-                call.kwargs.get("url")
-                == gh_app.get_authenticated_repository_url(
-                    "https://github.com/Fredkiss3/private-ac.git"
+            clone_calls = mock_git_client.aclone_repository_from_mirror.call_args_list
+            self.assertNotEqual(0, len(clone_calls))
+            for call in clone_calls:
+                self.assertEqual(
+                    gh_app.get_authenticated_repository_url(
+                        "https://github.com/Fredkiss3/private-ac.git"
+                    ),
+                    call.kwargs.get("url"),
                 )
-                for call in mock_git_client.aclone_repository.call_args_list
-            )
-            self.assertTrue(called_with_authed_repo_url)
 
 
 class UpdateGitServiceFromGithubAPIViewTests(AuthAPITestCase):
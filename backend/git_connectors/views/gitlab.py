@@ -431,12 +431,16 @@ class GitlabWebhookAPIView(APIView):
                             environment.delete()
 
                         def on_commit():
-                            for details, workflow_id in environment_delete_payload:
-                                TemporalClient.start_workflow(
-                                    ArchiveEnvWorkflow.run,
-                                    details,
-                                    id=workflow_id,
-                                )
+                            TemporalClient.start_workflows(
+                                [
+                                    StartWorkflowArg(
+                                        workflow=ArchiveEnvWorkflow.run,
+                                        payload=details,
+                                        workflow_id=workflow_id,
+                                    )
+                                    for details, workflow_id in environment_delete_payload
+                                ]
+                            )
 
                         transaction.on_commit(on_commit)
                     else:
@@ -490,21 +494,29 @@ class GitlabWebhookAPIView(APIView):
                             )
 
                         def commit_callback():
-                            for dpl in deployments_to_cancel:
-                                TemporalClient.workflow_signal(
-                                    workflow=DeployGitServiceWorkflow.run,
-                                    input=CancelDeploymentSignalInput(
-                                        deployment_hash=dpl.hash
-                                    ),
-                                    signal=DeployGitServiceWorkflow.cancel_deployment,  # type: ignore
-                                    workflow_id=dpl.workflow_id,
-                                )
-                            for payload in payloads_for_workflows_to_run:
-                                TemporalClient.start_workflow(
-                                    workflow=DeployGitServiceWorkflow.run,
-                                    arg=payload,
-                                    id=payload.workflow_id,
-                                )
+                            TemporalClient.signal_workflows(
+                                [
+                                    SignalWorkflowArg(
+                                        workflow=DeployGitServiceWorkflow.run,
+                                        input=CancelDeploymentSignalInput(
+                                            deployment_hash=dpl.hash
+                                        ),
+                                        signal=DeployGitServiceWorkflow.cancel_deployment,  # type: ignore
+                                        workflow_id=dpl.workflow_id,
+                                    )
+                                    for dpl in deployments_to_cancel
+                                ]
+                            )
+                            TemporalClient.start_workflows(
+                                [
+                                    StartWorkflowArg(
+                                        workflow=DeployGitServiceWorkflow.run,
+                                        payload=payload,
+                                        workflow_id=payload.workflow_id,
+                                    )
+                                    for payload in payloads_for_workflows_to_run
+                                ]
+                            )
 
                         transaction.on_commit(commit_callback)
 
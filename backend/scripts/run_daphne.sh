@@ -5,4 +5,5 @@ source $VIRTUAL_ENV/bin/activate
 python manage.py migrate 
 python manage.py create_metrics_cleanup_schedule 
 python manage.py create_system_cleanup_schedule
+python manage.py create_metrics_collection_schedule
 daphne -u /app/daphne/daphne.sock backend.asgi:application
\ No newline at end of file
@@ -5,4 +5,5 @@ source /venv/bin/activate
 python manage.py migrate 
 python manage.py create_metrics_cleanup_schedule 
 python manage.py create_system_cleanup_schedule
+python manage.py create_metrics_collection_schedule
 gunicorn --config=/app/gunicorn.conf.py backend.wsgi:application
\ No newline at end of file
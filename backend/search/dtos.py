@@ -68,16 +68,29 @@ class RuntimeLogDto:
 
     @property
     def loki_labels(self):
+        """
+        Labels of the stream of the log, only values with a low cardinality are used
+        as each distinct set of labels creates a new stream in Loki.
+        """
         return {
             # for managed services
             "service_id": self.service_id or "unknown",
-            "deployment_id": self.deployment_id or "unknown",
             # for compose stacks
             "stack_id": self.stack_id or "unknown",
             "stack_service_name": self.stack_service_name or "unknown",
             # common args
             "level": self.level,
-            "container_id": self.container_id,
             "source": self.source,
             "app": f"{settings.LOKI_APP_NAME}",
         }
+
+    @property
+    def loki_structured_metadata(self):
+        """
+        Identifiers that change on each deployment or container restart,
+        they are attached to each log line instead of creating new streams.
+        """
+        metadata = {"deployment_id": self.deployment_id or "unknown"}
+        if self.container_id:
+            metadata["container_id"] = self.container_id
+        return metadata
@@ -1,26 +1,92 @@
 import base64
 import json
 import datetime
+import math
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
-from typing import Sequence
+from typing import Optional, Sequence
 from zane_api.utils import Colors
 from .serializers import (
     RuntimeLogsQuerySerializer,
     RuntimeLogsSearchSerializer,
     RuntimeLogsContextSerializer,
+    RuntimeLogsHistogramSerializer,
 )
 from .dtos import RuntimeLogDto, RuntimeLogSource
+from .query_cache import (
+    LogsQueryCacheStatus,
+    cache_logs,
+    get_cached_logs,
+    get_logs_query_cache_key,
+    is_closed_time_window,
+)
 from django.conf import settings
 from uuid import uuid4
 import re
 from rest_framework import status
 
 
+_session: requests.Session | None = None
+
+
+def get_loki_session() -> requests.Session:
+    """
+    HTTP session shared by all the clients, to reuse the connections to Loki
+    instead of opening a new one for each query.
+    """
+    global _session
+    if _session is None:
+        _session = requests.Session()
+    return _session
+
+
+def parse_loki_log(log_data: dict) -> dict:
+    """
+    Convert the labels of a log returned by Loki (stream labels, structured metadata
+    & fields extracted by `| json`) into a log, with the timestamp used for pagination.
+    """
+    return {
+        "id": log_data["id"],
+        "time": int(float(log_data["time"])),
+        "level": log_data["level"],
+        "source": log_data["source"],
+        "service_id": log_data.get("service_id"),
+        "deployment_id": log_data.get("deployment_id"),
+        "container_id": log_data.get("container_id"),
+        "stack_id": log_data.get("stack_id"),
+        "stack_service_name": log_data.get("stack_service_name"),
+        "content": log_data["content"],
+        "content_text": log_data["content_text"],
+        "created_at": log_data["created_at"],
+        "timestamp": int(float(log_data["time"])),  # timestamp for pagination
+    }
+
+
+def format_loki_log(hit: dict) -> dict:
+    return {
+        "id": hit["id"],
+        "time": datetime.datetime.fromtimestamp(
+            (hit["time"] // 1_000) / 1e6
+        ).isoformat(),  # remove nanoseconds, then divide by 1 million to get microseconds
+        "level": hit["level"],
+        "source": hit["source"],
+        "service_id": hit.get("service_id"),
+        "container_id": hit.get("container_id"),
+        "deployment_id": hit.get("deployment_id"),
+        "stack_id": hit.get("stack_id"),
+        "stack_service_name": hit.get("stack_service_name"),
+        "content": hit["content"],
+        "content_text": hit["content_text"],
+        "timestamp": hit["timestamp"],
+    }
+
+
 class LokiSearchClient:
     def __init__(self, host: str):
         # host should include the protocol and port, e.g., "http://localhost:3100"
         self.base_url = host.rstrip("/")
+        self.session = get_loki_session()
 
     def bulk_insert(self, docs: Sequence[RuntimeLogDto]):
         """
@@ -44,10 +110,12 @@ class LokiSearchClient:
             value = json.dumps(log_dict)
             if label_key not in streams:
                 streams[label_key] = {"stream": labels, "values": []}
-            streams[label_key]["values"].append([ts, value])
+            streams[label_key]["values"].append(
+                [ts, value, doc.loki_structured_metadata]
+            )
 
         payload = {"streams": list(streams.values())}
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/loki/api/v1/push",
             json=payload,
             stream=False,
@@ -65,9 +133,20 @@ class LokiSearchClient:
 
         ts = f"{log_dict.get('time'):.0f}"
         payload = {
-            "streams": [{"stream": labels, "values": [[ts, json.dumps(log_dict)]]}]
+            "streams": [
+                {
+                    "stream": labels,
+                    "values": [
+                        [
+                            ts,
+                            json.dumps(log_dict),
+                            document.loki_structured_metadata,
+                        ]
+                    ],
+                }
+            ]
         }
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/loki/api/v1/push",
             json=payload,
             stream=False,
@@ -75,8 +154,40 @@ class LokiSearchClient:
         response.raise_for_status()
 
     def search(self, query: dict | None = None):
-        print("\n====== LOGS SEARCH (Loki) ======")
+        return self._search(self._compute_filters(query))
+
+    def cached_search(
+        self,
+        query: dict | None = None,
+        is_final: bool = False,
+        bypass_cache: bool = False,
+    ) -> tuple[dict, Optional[str]]:
+        """
+        Same as `search`, but the page is cached if its logs cannot change anymore,
+        `is_final` is for when no new log can be added for the query (ex: the deployment was removed
+        long enough ago for its last logs to be ingested).
+        Returns the page with the status of the cache (`None` if the page cannot be cached).
+        """
         filters = self._compute_filters(query)
+        if not is_final and not is_closed_time_window(filters):
+            return self._search(filters), None
+
+        cache_key = get_logs_query_cache_key(filters)
+        if bypass_cache:
+            cache_status = LogsQueryCacheStatus.BYPASS
+        else:
+            data = get_cached_logs(cache_key)
+            if data is not None:
+                print(f"Logs found in the cache with {cache_key=}")
+                return data, LogsQueryCacheStatus.HIT
+            cache_status = LogsQueryCacheStatus.MISS
+
+        data = self._search(filters)
+        cache_logs(cache_key, data)
+        return data, cache_status
+
+    def _search(self, filters: dict):
+        print("\n====== LOGS SEARCH (Loki) ======")
         print(f"filters={Colors.GREY}{filters}{Colors.ENDC}")
         query_string = filters["query_string"]
         page_size = filters["page_size"]
@@ -84,20 +195,51 @@ class LokiSearchClient:
         end_ns = filters["end"]
         order = filters["order"]
 
+        # one more log than the page size is fetched to know if there is
+        # a page after this one in the same direction, without another query
         params = {
             "query": query_string,
-            "limit": page_size,
+            "limit": page_size + 1,
             "start": start_ns,
             "end": end_ns,
             "direction": "backward" if order == "desc" else "forward",
         }
 
+        # The logs in the other direction are outside of the range of the main query,
+        # they are probed concurrently with it:
+        # - for `desc` (older logs), the more recent logs are after the end of the range
+        # - for `asc` (more recent logs), the older logs are before the start of the range
+        if order == "desc":
+            reverse_params = {
+                "query": query_string,
+                "limit": 1,
+                "start": end_ns,
+                "direction": "forward",
+            }
+        else:
+            reverse_params = {
+                "query": query_string,
+                "limit": 1,
+                "start": int(
+                    (datetime.datetime.now() - timedelta(days=14)).timestamp() * 10**9
+                ),
+                "end": start_ns,  # end is not included in the range
+                "direction": "backward",
+            }
+
         print(f"params={Colors.GREY}{params}{Colors.ENDC}")
-        response = requests.get(
-            f"{self.base_url}/loki/api/v1/query_range",
-            params=params,
-            stream=False,
-        )
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            reverse_response_future = executor.submit(
+                self.session.get,
+                f"{self.base_url}/loki/api/v1/query_range",
+                params=reverse_params,
+            )
+            response = self.session.get(
+                f"{self.base_url}/loki/api/v1/query_range",
+                params=params,
+                stream=False,
+            )
+            reverse_response = reverse_response_future.result()
         response.raise_for_status()
 
         summary = (
@@ -112,110 +254,47 @@ class LokiSearchClient:
         hits: list[dict] = []
         # Loki returns streams; each stream contains a list of log entries.
         for stream in result.get("data", {}).get("result", []):
-            log_data = stream["stream"]
-            hit = {
-                "id": log_data["id"],
-                "time": int(float(log_data["time"])),
-                "level": log_data["level"],
-                "source": log_data["source"],
-                "service_id": log_data["service_id"],
-                "deployment_id": log_data["deployment_id"],
-                "content": log_data["content"],
-                "content_text": log_data["content_text"],
-                "created_at": log_data["created_at"],
-                "stack_service_name": log_data.get("stack_service_name"),
-                "stack_id": log_data.get("stack_id"),
-                "container_id": log_data.get("container_id"),
-                "timestamp": int(float(log_data["time"])),  # timestamp for pagination
-            }
-            hits.append(hit)
+            hits.append(parse_loki_log(stream["stream"]))
 
         hits = sorted(
             hits, key=lambda hit: (hit["timestamp"], hit["created_at"]), reverse=True
         )
 
-        # Generate next cursor if total equals page size.
-        next_cursor = None
-        if hits:
-            # the last log is the oldest log
-            last_timestamp = hits[-1]["timestamp"]
-            # Prepare parameters to check existence of older logs after this one
-            next_params = {
-                "query": query_string,
-                "limit": 1,
-                "end": last_timestamp,  # end is not included in the range, so it will not reference this timestamp
-                "direction": "backward",
-            }
-
-            next_response = requests.get(
-                f"{self.base_url}/loki/api/v1/query_range", params=next_params
-            )
-            if next_response.status_code == status.HTTP_200_OK:
-                next_result = next_response.json()
-                streams = next_result.get("data", {}).get("result", [])
-                if len(streams) > 0:
-                    log_data = streams[0].get("stream")
-                    if log_data:
-                        next_cursor_obj = {
-                            "sort": [str(int(float(log_data["time"])))],
-                            "order": "desc",
-                        }
-                        next_cursor = base64.b64encode(
-                            json.dumps(next_cursor_obj).encode()
-                        ).decode()
-
-        # Generate previous cursor only if there is at least one log in the inverse order.
-        previous_cursor = None
-        if hits:
-            # the first log is the most recent log
-            first_timestamp = hits[0]["timestamp"]
-            # Prepare parameters to check existence of more recent logs after this one
-            prev_params = {
-                "query": query_string,
-                "limit": 1,
-                "start": (
-                    first_timestamp + 1
-                ),  # we do not want to include the first timestamp in the results
-                "direction": "forward",
-            }
-
-            prev_response = requests.get(
-                f"{self.base_url}/loki/api/v1/query_range", params=prev_params
-            )
-            if prev_response.status_code == status.HTTP_200_OK:
-                prev_result = prev_response.json()
-                streams = prev_result.get("data", {}).get("result", [])
-                if len(streams) > 0:
-                    log_data = streams[0].get("stream")
-                    previous_cursor_obj = {
-                        "sort": [str(int(float(log_data["time"])))],
-                        "order": "asc",
-                    }
-                    previous_cursor = base64.b64encode(
-                        json.dumps(previous_cursor_obj).encode()
+        # the extra log is the first log of the following page
+        following_page_cursor = None
+        if len(hits) > page_size:
+            # the last log is the oldest log, the first log is the most recent log
+            extra_hit = hits.pop() if order == "desc" else hits.pop(0)
+            following_page_cursor = base64.b64encode(
+                json.dumps(
+                    {"sort": [str(extra_hit["timestamp"])], "order": order}
+                ).encode()
+            ).decode()
+
+        reverse_page_cursor = None
+        if hits and reverse_response.status_code == status.HTTP_200_OK:
+            streams = reverse_response.json().get("data", {}).get("result", [])
+            if len(streams) > 0:
+                log_data = streams[0].get("stream")
+                if log_data:
+                    reverse_page_cursor = base64.b64encode(
+                        json.dumps(
+                            {
+                                "sort": [str(int(float(log_data["time"])))],
+                                "order": "asc" if order == "desc" else "desc",
+                            }
+                        ).encode()
                     ).decode()
 
+        # `next` is for older logs, `previous` for more recent logs
+        if order == "desc":
+            next_cursor, previous_cursor = following_page_cursor, reverse_page_cursor
+        else:
+            next_cursor, previous_cursor = reverse_page_cursor, following_page_cursor
+
         data = {
             "query_time_ms": query_time_ms,
-            "results": [
-                {
-                    "id": hit["id"],
-                    "time": datetime.datetime.fromtimestamp(
-                        (hit["time"] // 1_000) / 1e6
-                    ).isoformat(),  # remove nanoseconds, then divide by 1 million to get microseconds
-                    "level": hit["level"],
-                    "source": hit["source"],
-                    "service_id": hit.get("service_id"),
-                    "container_id": hit.get("container_id"),
-                    "deployment_id": hit.get("deployment_id"),
-                    "stack_id": hit.get("stack_id"),
-                    "stack_service_name": hit.get("stack_service_name"),
-                    "content": hit["content"],
-                    "content_text": hit["content_text"],
-                    "timestamp": hit["timestamp"],
-                }
-                for hit in hits
-            ],
+            "results": [format_loki_log(hit) for hit in hits],
             "next": next_cursor,
             "previous": previous_cursor,
         }
@@ -228,36 +307,119 @@ class LokiSearchClient:
         print("====== END LOGS SEARCH (Loki) ======\n")
         return serializer.data
 
+    def get_tail_query(self, query: dict | None = None) -> str:
+        """
+        LogQL query to pass to the tail API, to receive the new logs matching the query.
+        """
+        return self._compute_filters(query)["query_string"]
+
+    @property
+    def tail_url(self) -> str:
+        # the tail API is a websocket endpoint
+        return re.sub(r"^http", "ws", f"{self.base_url}/loki/api/v1/tail")
+
+    def _get_metric_range(self, filters: dict) -> tuple[int, int]:
+        # the time filters are applied on the `time` field of the log, they are also used
+        # to narrow the range of the metric query so that Loki scans less chunks
+        start_ns, end_ns = filters["start"], filters["end"]
+        if filters["time_after"] is not None:
+            start_ns = max(start_ns, filters["time_after"])
+        if filters["time_before"] is not None:
+            end_ns = min(end_ns, filters["time_before"] + 1)
+        return start_ns, max(end_ns, start_ns + 1)
+
     def count(self, query: dict | None = None) -> int:
+        """
+        Count the logs matching the query, without fetching them.
+        """
         filters = self._compute_filters(query)
         print("====== LOGS COUNT (Loki) ======")
         print(f"{filters=}")
-        query_string = filters["query_string"]
+        start_ns, end_ns = self._get_metric_range(filters)
+        range_seconds = math.ceil((end_ns - start_ns) / 10**9)
         params = {
-            "query": query_string,
-            "limit": 5000,
-            "start": filters["start"],
-            "end": filters["end"],
+            "query": f"sum(count_over_time({filters['query_string']} [{range_seconds}s]))",
+            "time": end_ns,
         }
-        response = requests.get(
-            f"{self.base_url}/loki/api/v1/query_range", params=params
-        )
+        response = self.session.get(f"{self.base_url}/loki/api/v1/query", params=params)
         if response.status_code != status.HTTP_200_OK:
             raise Exception(f"Count failed: {response.text}")
         result = response.json()
         total = sum(
-            len(stream.get("values", []))
-            for stream in result.get("data", {}).get("result", [])
+            int(float(sample["value"][1]))
+            for sample in result.get("data", {}).get("result", [])
         )
         print("====== END LOGS COUNT (Loki) ======")
         return total
 
+    def histogram(self, query: dict | None = None, buckets: int = 60):
+        """
+        Count the logs matching the query per time bucket, to display the volume of logs over time.
+        The range of the query is split into `buckets` buckets ending at the end of the range,
+        each bucket contains the number of logs in `(timestamp - step, timestamp]`.
+        """
+        print("\n====== LOGS HISTOGRAM (Loki) ======")
+        filters = self._compute_filters(query)
+        print(f"filters={Colors.GREY}{filters}{Colors.ENDC}")
+        start_ns, end_ns = self._get_metric_range(filters)
+        step_seconds = max(math.ceil((end_ns - start_ns) / 10**9 / buckets), 1)
+        step_ns = step_seconds * 10**9
+        params = {
+            "query": f"sum(count_over_time({filters['query_string']} [{step_seconds}s]))",
+            "start": end_ns - (buckets - 1) * step_ns,
+            "end": end_ns,
+            "step": f"{step_seconds}s",
+        }
+        print(f"params={Colors.GREY}{params}{Colors.ENDC}")
+        response = self.session.get(
+            f"{self.base_url}/loki/api/v1/query_range", params=params
+        )
+        response.raise_for_status()
+        result = response.json()
+
+        summary = (
+            result.get("data", {})
+            .get("stats", {})
+            .get("summary", {"queueTime": 0, "execTime": 0})
+        )
+        query_time_ms = (summary["queueTime"] + summary["execTime"]) * 1000
+        query_time_ms = float(f"{query_time_ms:.2f}")
+
+        # Loki doesn't return the buckets without any log, they are filled with `0`
+        counts: dict[int, int] = {}
+        for series in result.get("data", {}).get("result", []):
+            for timestamp, value in series.get("values", []):
+                counts[round(float(timestamp) * 1000)] = int(float(value))
+
+        histogram = []
+        for index in reversed(range(buckets)):
+            timestamp_ns = end_ns - index * step_ns
+            histogram.append(
+                {
+                    "timestamp": timestamp_ns,
+                    "count": counts.get(round(timestamp_ns / 10**6), 0),
+                }
+            )
+
+        data = {
+            "query_time_ms": query_time_ms,
+            "step_seconds": step_seconds,
+            "results": histogram,
+        }
+        serializer = RuntimeLogsHistogramSerializer(data)
+        print(
+            f"Computed {Colors.BLUE}{len(histogram)}{Colors.ENDC} buckets in Loki in {Colors.GREEN}{query_time_ms}ms{Colors.ENDC}"
+        )
+        print("====== END LOGS HISTOGRAM (Loki) ======\n")
+        return serializer.data
+
     def get_context(
         self,
         timestamp_ns: int,
         lines: int = 10,
         stack_id: str | None = None,
         stack_service_name: list[str] | None = None,
+        service_id: str | None = None,
         deployment_id: str | None = None,
         container_id: str | None = None,
     ):
@@ -269,18 +431,23 @@ class LokiSearchClient:
         print(f"timestamp_ns={timestamp_ns}, lines={lines}")
 
         label_selectors: list[str] = []
+        metadata_filters: list[str] = []
         if stack_id:
             label_selectors.append(f'stack_id="{stack_id}"')
         if stack_service_name:
             label_selectors.append(f'stack_service_name="{stack_service_name}"')
+        if service_id:
+            label_selectors.append(f'service_id="{service_id}"')
         if deployment_id:
-            label_selectors.append(f'deployment_id="{deployment_id}"')
+            metadata_filters.append(f'deployment_id="{deployment_id}"')
         if container_id:
-            label_selectors.append(f'container_id="{container_id}"')
+            metadata_filters.append(f'container_id="{container_id}"')
         label_selectors.append(f'source="{RuntimeLogSource.SERVICE}"')
         label_selectors.append(f'app="{settings.LOKI_APP_NAME}"')
 
-        query_string = "{" + ",".join(label_selectors) + "} | json"
+        query_string = " | ".join(
+            ["{" + ",".join(label_selectors) + "}", *metadata_filters, "json"]
+        )
         print(f"query_string={Colors.GREY}{query_string}{Colors.ENDC}")
 
         # Fetch logs BEFORE the target (older logs, direction=backward)
@@ -290,7 +457,7 @@ class LokiSearchClient:
             "end": timestamp_ns,  # end is exclusive, so this won't include the target
             "direction": "backward",
         }
-        before_response = requests.get(
+        before_response = self.session.get(
             f"{self.base_url}/loki/api/v1/query_range",
             params=before_params,
         )
@@ -304,7 +471,7 @@ class LokiSearchClient:
             "start": timestamp_ns,
             "direction": "forward",
         }
-        after_response = requests.get(
+        after_response = self.session.get(
             f"{self.base_url}/loki/api/v1/query_range",
             params=after_params,
         )
@@ -331,46 +498,12 @@ class LokiSearchClient:
         # Collect all hits
         hits: list[dict] = []
         for stream in before_result.get("data", {}).get("result", []):
-            log_data = stream["stream"]
-            hits.append(
-                {
-                    "id": log_data["id"],
-                    "time": int(float(log_data["time"])),
-                    "level": log_data["level"],
-                    "source": log_data["source"],
-                    "container_id": log_data.get("container_id"),
-                    "service_id": log_data.get("service_id"),
-                    "deployment_id": log_data.get("deployment_id"),
-                    "stack_id": log_data.get("stack_id"),
-                    "stack_service_name": log_data.get("stack_service_name"),
-                    "content": log_data["content"],
-                    "content_text": log_data["content_text"],
-                    "created_at": log_data["created_at"],
-                    "timestamp": int(float(log_data["time"])),
-                }
-            )
+            hits.append(parse_loki_log(stream["stream"]))
 
         before_count = len(hits)
 
         for stream in after_result.get("data", {}).get("result", []):
-            log_data = stream["stream"]
-            hits.append(
-                {
-                    "id": log_data["id"],
-                    "time": int(float(log_data["time"])),
-                    "level": log_data["level"],
-                    "source": log_data["source"],
-                    "container_id": log_data.get("container_id"),
-                    "service_id": log_data.get("service_id"),
-                    "deployment_id": log_data.get("deployment_id"),
-                    "stack_id": log_data.get("stack_id"),
-                    "stack_service_name": log_data.get("stack_service_name"),
-                    "content": log_data["content"],
-                    "content_text": log_data["content_text"],
-                    "created_at": log_data["created_at"],
-                    "timestamp": int(float(log_data["time"])),
-                }
-            )
+            hits.append(parse_loki_log(stream["stream"]))
 
         after_count = len(hits) - before_count
 
@@ -385,25 +518,7 @@ class LokiSearchClient:
 
         data = {
             "query_time_ms": query_time_ms,
-            "results": [
-                {
-                    "id": hit["id"],
-                    "time": datetime.datetime.fromtimestamp(
-                        (hit["time"] // 1_000) / 1e6
-                    ).isoformat(),
-                    "level": hit["level"],
-                    "source": hit["source"],
-                    "container_id": hit.get("container_id"),
-                    "service_id": hit.get("service_id"),
-                    "deployment_id": hit.get("deployment_id"),
-                    "stack_id": hit.get("stack_id"),
-                    "stack_service_name": hit.get("stack_service_name"),
-                    "content": hit["content"],
-                    "content_text": hit["content_text"],
-                    "timestamp": hit["timestamp"],
-                }
-                for hit in hits
-            ],
+            "results": [format_loki_log(hit) for hit in hits],
             "before_count": before_count,
             "after_count": after_count,
         }
@@ -425,7 +540,9 @@ class LokiSearchClient:
         }
         print(f"{params=}")
 
-        response = requests.post(f"{self.base_url}/loki/api/v1/delete", params=params)
+        response = self.session.post(
+            f"{self.base_url}/loki/api/v1/delete", params=params
+        )
         response.raise_for_status()
         print("====== END LOGS DELETE (Loki) ======")
         return True
@@ -445,10 +562,14 @@ class LokiSearchClient:
             )
         if search_params.get("service_id"):
             label_selectors.append(f'service_id="{search_params["service_id"]}"')
+        # `deployment_id` & `container_id` are sent as structured metadata, they are filtered
+        # before parsing the logs. The filters also match the logs ingested when they were
+        # stream labels, until these logs are removed by the retention.
+        metadata_filters: list[str] = []
         if search_params.get("deployment_id"):
-            label_selectors.append(f'deployment_id="{search_params["deployment_id"]}"')
+            metadata_filters.append(f'deployment_id="{search_params["deployment_id"]}"')
         if search_params.get("container_id"):
-            label_selectors.append(f'container_id="{search_params["container_id"]}"')
+            metadata_filters.append(f'container_id="{search_params["container_id"]}"')
         if search_params.get("level"):
             levels = search_params["level"]
             if isinstance(levels, list):
@@ -463,18 +584,22 @@ class LokiSearchClient:
                 label_selectors.append(f'source="{sources}"')
 
         label_selectors.append(f'app="{settings.LOKI_APP_NAME}"')
-        base_selector = "{" + ",".join(label_selectors) + "} | json"
+        base_selector = " | ".join(
+            ["{" + ",".join(label_selectors) + "}", *metadata_filters, "json"]
+        )
 
+        time_after_ns = None
+        time_before_ns = None
         if search_params.get("time_after"):
             print(f"{search_params['time_after']=}")
             dt = search_params["time_after"]
-            dt = int(dt.timestamp() * 1e9)
-            base_selector = " ".join([base_selector, f"| time >= {dt}"])
+            time_after_ns = int(dt.timestamp() * 1e9)
+            base_selector = " ".join([base_selector, f"| time >= {time_after_ns}"])
         if search_params.get("time_before"):
             print(f"{search_params['time_before']=}")
             dt = search_params["time_before"]
-            dt = int(dt.timestamp() * 1e9)
-            base_selector = " ".join([base_selector, f"| time <= {dt}"])
+            time_before_ns = int(dt.timestamp() * 1e9)
+            base_selector = " ".join([base_selector, f"| time <= {time_before_ns}"])
 
         # Default time range: start=14 days ago, end=now.
         now = datetime.datetime.now()
@@ -522,4 +647,6 @@ class LokiSearchClient:
             "order": order,
             "cursor": cursor,
             "cursor_data": cursor_data,
+            "time_after": time_after_ns,
+            "time_before": time_before_ns,
         }
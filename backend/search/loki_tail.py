@@ -0,0 +1,117 @@
+"""
+Live tail of the logs stored in Loki.
+
+- the viewers of the same logs (same LogQL query) share a single connection to Loki's tail API,
+  instead of each polling the search endpoints or opening their own tail, Loki limits
+  the number of concurrent tail requests and each of them keeps a querier busy
+- the new logs are sent to the viewers in batches, either when the batch is full
+  or when the flush interval has elapsed, whichever comes first
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlencode
+
+from django.conf import settings
+from websockets.asyncio.client import connect
+
+from zane_api.utils import Colors
+from .loki_client import LokiSearchClient, format_loki_log, parse_loki_log
+
+# called with each batch of new logs, and with `None` when the tail is closed
+TailListener = Callable[[Optional[List[dict]]], Awaitable[Any]]
+
+
+@dataclass
+class LokiTail:
+    query_string: str
+    listeners: List[TailListener] = field(default_factory=list)
+    task: Optional["asyncio.Task[None]"] = None
+
+    async def notify(self, logs: Optional[List[dict]]):
+        for listener in list(self.listeners):
+            try:
+                await listener(logs)
+            except Exception as e:
+                print(f"{Colors.RED}Failed to send logs to a viewer: {e}{Colors.ENDC}")
+
+
+_tails: Dict[str, LokiTail] = {}
+
+
+async def _run_tail(tail: LokiTail):
+    client = LokiSearchClient(host=settings.LOKI_HOST)
+    params = urlencode(
+        {
+            "query": tail.query_string,
+            # only the new logs, the previous logs are loaded with the search
+            "start": time.time_ns(),
+            "limit": settings.LOKI_TAIL_MAX_BATCH_SIZE,
+        }
+    )
+    loop = asyncio.get_running_loop()
+    batch: List[dict] = []
+    flush_at: Optional[float] = None
+    try:
+        async with connect(f"{client.tail_url}?{params}") as websocket:
+            print(
+                f"Tailing logs with query={Colors.GREY}{tail.query_string}{Colors.ENDC}"
+            )
+            while True:
+                timeout = None if flush_at is None else max(flush_at - loop.time(), 0)
+                try:
+                    message = await asyncio.wait_for(websocket.recv(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    message = None
+
+                if message is not None:
+                    for stream in json.loads(message).get("streams", []):
+                        for _ in stream.get("values", []):
+                            batch.append(
+                                format_loki_log(parse_loki_log(stream["stream"]))
+                            )
+                    if len(batch) > 0 and flush_at is None:
+                        flush_at = loop.time() + settings.LOKI_TAIL_FLUSH_INTERVAL
+
+                if len(batch) > 0 and (
+                    message is None or len(batch) >= settings.LOKI_TAIL_MAX_BATCH_SIZE
+                ):
+                    batch.sort(key=lambda log: log["timestamp"])
+                    await tail.notify(batch)
+                    batch = []
+                    flush_at = None
+    except Exception as e:
+        print(
+            f"{Colors.RED}The tail of logs with query={tail.query_string} stopped: {e}{Colors.ENDC}"
+        )
+    finally:
+        if _tails.get(tail.query_string) is tail:
+            del _tails[tail.query_string]
+        await tail.notify(None)
+
+
+def subscribe(query_string: str, listener: TailListener) -> LokiTail:
+    """
+    Receive the new logs matching `query_string`, using the tail already opened
+    for the same query if there is one.
+    """
+    tail = _tails.get(query_string)
+    if tail is None:
+        tail = LokiTail(query_string=query_string)
+        tail.task = asyncio.create_task(_run_tail(tail))
+        _tails[query_string] = tail
+    tail.listeners.append(listener)
+    return tail
+
+
+def unsubscribe(tail: LokiTail, listener: TailListener):
+    """
+    Stop receiving the logs of the tail, the tail is closed when it has no viewer left.
+    """
+    if listener in tail.listeners:
+        tail.listeners.remove(listener)
+    if len(tail.listeners) == 0 and tail.task is not None:
+        tail.task.cancel()
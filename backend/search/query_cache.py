@@ -0,0 +1,103 @@
+"""
+Cache of the results of the logs searches that cannot change anymore.
+
+- a page of logs is cached only when its time window is closed: the deployment is in a final state,
+  or the window ends (with `time_before` or with the cursor of an older page) far enough in the past
+  for all its logs to have been ingested
+- the key is the hash of the LogQL query (with its filters), the time window, the cursor & the page size
+- the number of cached pages is bounded, the least recently used pages are evicted first,
+  and pages bigger than `LOKI_QUERY_CACHE_MAX_ENTRY_SIZE` are not cached
+"""
+
+import datetime
+import json
+import time
+from typing import Optional
+
+import redis
+from django.conf import settings
+from django.core.cache import cache
+
+from zane_api.utils import dict_sha256sum
+
+LOGS_QUERY_CACHE_KEY_PREFIX = "[zaneops::internal::logs-query]"
+# sorted set of the cached keys, scored by the time they were last used
+LOGS_QUERY_CACHE_INDEX_KEY = "[zaneops::internal::logs-query-index]"
+
+
+class LogsQueryCacheStatus:
+    HIT = "HIT"
+    MISS = "MISS"
+    BYPASS = "BYPASS"
+
+
+def get_logs_query_cache_key(filters: dict) -> str:
+    return f"{LOGS_QUERY_CACHE_KEY_PREFIX}:" + dict_sha256sum(
+        {
+            # the query is built from the validated filters, so the same filters
+            # always give the same query
+            "query_string": filters["query_string"],
+            "page_size": filters["page_size"],
+            "order": filters["order"],
+            "cursor": filters["cursor_data"],
+            "time_after": filters["time_after"],
+            "time_before": filters["time_before"],
+        }
+    )
+
+
+def is_closed_time_window(filters: dict) -> bool:
+    """
+    Whether no new log can be added in the time window of the query,
+    the logs newer than `LOKI_QUERY_CACHE_MIN_AGE` seconds may still be being ingested.
+    """
+    closed_before = (
+        datetime.datetime.now()
+        - datetime.timedelta(seconds=settings.LOKI_QUERY_CACHE_MIN_AGE)
+    ).timestamp() * 10**9
+
+    if filters["time_before"] is not None and filters["time_before"] < closed_before:
+        return True
+
+    # the pages of older logs end at the timestamp of the cursor
+    cursor_data = filters["cursor_data"]
+    return (
+        cursor_data is not None
+        and filters["order"] == "desc"
+        and filters["end"] < closed_before
+    )
+
+
+def _get_client():
+    return redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+
+def get_cached_logs(cache_key: str) -> Optional[dict]:
+    data: Optional[dict] = cache.get(cache_key)
+    if data is not None and not settings.TESTING:
+        _get_client().zadd(LOGS_QUERY_CACHE_INDEX_KEY, {cache_key: time.time()})
+    return data
+
+
+def cache_logs(cache_key: str, data: dict):
+    if len(json.dumps(data, default=str)) > settings.LOKI_QUERY_CACHE_MAX_ENTRY_SIZE:
+        return
+
+    cache.set(cache_key, data, timeout=settings.LOKI_QUERY_CACHE_TIMEOUT)
+    if settings.TESTING:
+        return  # the cache used in tests is bounded by itself
+
+    client = _get_client()
+    client.zadd(LOGS_QUERY_CACHE_INDEX_KEY, {cache_key: time.time()})
+    # forget the keys that have expired from the cache in the meantime
+    client.zremrangebyscore(
+        LOGS_QUERY_CACHE_INDEX_KEY,
+        "-inf",
+        time.time() - settings.LOKI_QUERY_CACHE_TIMEOUT,
+    )
+    overflow = client.zcard(LOGS_QUERY_CACHE_INDEX_KEY) - (
+        settings.LOKI_QUERY_CACHE_MAX_ENTRIES
+    )
+    if overflow > 0:
+        evicted = client.zpopmin(LOGS_QUERY_CACHE_INDEX_KEY, overflow)
+        cache.delete_many([key for key, _ in evicted])
@@ -47,6 +47,21 @@ class RuntimeLogsContextSerializer(serializers.Serializer):
     query_time_ms = serializers.FloatField(required=False)
 
 
+class RuntimeLogsHistogramParamsSerializer(serializers.Serializer):
+    buckets = serializers.IntegerField(min_value=1, max_value=200, default=60)
+
+
+class RuntimeLogsHistogramBucketSerializer(serializers.Serializer):
+    timestamp = serializers.IntegerField()
+    count = serializers.IntegerField()
+
+
+class RuntimeLogsHistogramSerializer(serializers.Serializer):
+    results = serializers.ListSerializer(child=RuntimeLogsHistogramBucketSerializer())
+    step_seconds = serializers.IntegerField()
+    query_time_ms = serializers.FloatField(required=False)
+
+
 class RuntimeLogsQuerySerializer(serializers.Serializer):
     container_id = serializers.CharField(required=False)
     deployment_id = serializers.CharField(required=False)
@@ -13,9 +13,10 @@ import requests
 from rest_framework import status
 
 with workflow.unsafe.imports_passed_through():
-    from zane_api.models import Deployment, Environment, GitApp
+    from zane_api.models import BuildArtifact, Deployment, Environment, GitApp
     from zane_api.constants import HEAD_COMMIT
     import shutil
+    import docker.errors
     from zane_api.git_client import (
         GitClient,
         GitCloneFailedError,
@@ -28,13 +29,23 @@ with workflow.unsafe.imports_passed_through():
         get_env_network_resource_name,
         generate_caddyfile_for_static_website,
         get_buildkit_builder_resource_name,
+        get_buildkit_registry_cache_args,
+        get_buildkit_output_args,
         get_build_environment_variables_for_deployment,
+        get_build_inputs_hash,
         get_swarm_service_aliases_ips_on_network,
         get_swarm_service_name_for_deployment,
         empty_folder,
         obfuscate_env_in_command,
         obfuscate_env_in_shell_command,
     )
+    from ..docker_client import run_in_docker_executor
+    from ..builder_pool import BuildkitBuilderPool, get_builders_by_affinity
+    from ..build_plan_cache import (
+        get_build_plan_cache_key,
+        aget_cached_build_plan,
+        acache_build_plan,
+    )
     from search.dtos import RuntimeLogSource
     from zane_api.utils import (
         Colors,
@@ -44,7 +55,7 @@ with workflow.unsafe.imports_passed_through():
         replace_placeholders,
     )
 
-    from zane_api.process import AyncSubProcessRunner
+    from zane_api.process import AyncSubProcessRunner, PROGRESS_FRAMES_INTERVAL
     from django.utils import timezone
     from django.db.models import OuterRef, Subquery
     from container_registry.models import BuildRegistry
@@ -479,8 +490,9 @@ class GitActivities:
                         )
 
                 clone_task = asyncio.create_task(
-                    self.git_client.aclone_repository(
+                    self.git_client.aclone_repository_from_mirror(
                         url=repo_url,
+                        repository_url=cast(str, service.repository_url),
                         dest_path=build_location,
                         branch=service.branch_name,  # type: ignore - this is defined in the case of git services
                         message_handler=message_handler,
@@ -598,123 +610,57 @@ class GitActivities:
 
     @activity.defn
     async def create_buildkit_builder_for_env(self, payload: DeploymentDetails):
+        builder_pool = BuildkitBuilderPool(self.docker_client)
+        builder_name = get_builders_by_affinity(payload.service.id)[0]
         await deployment_log(
             deployment=payload,
-            message="Creating Buildkit builder for the environment...",
+            message=f"Preparing Buildkit builder {Colors.ORANGE}{builder_name}{Colors.ENDC}...",
             source=RuntimeLogSource.BUILD,
         )
-        builder_name = get_buildkit_builder_resource_name(
-            payload.service.environment.id
-        )
-        process = await asyncio.create_subprocess_exec(
-            DOCKER_BINARY_PATH, "buildx", "inspect", builder_name
-        )
-        await process.communicate()
-
-        if process.returncode == 0:
-            await deployment_log(
-                deployment=payload,
-                message=f"Builder {Colors.ORANGE}{builder_name}{Colors.ENDC} already exists, skipping creation ✅",
-                source=RuntimeLogSource.BUILD,
-            )
-            return
 
-        network = get_env_network_resource_name(
-            payload.service.environment.id, project_id=payload.service.project_id
+        # environments used to have their own builder, it is replaced by the builders of the pool
+        legacy_builder_name = get_buildkit_builder_resource_name(
+            payload.service.environment.id
         )
-
-        cmd_args = [
-            DOCKER_BINARY_PATH,
-            "buildx",
-            "create",
-            "--name",
-            builder_name,
-            "--driver",
-            "docker-container",
-            "--driver-opt",
-            f"network={network}",
-        ]
-        cmd_string = multiline_command(shlex.join(cmd_args))
-        log_message = f"Running {Colors.YELLOW}{cmd_string}{Colors.ENDC}"
-        for index, msg in enumerate(log_message.splitlines()):
+        if await builder_pool.remove_builder(legacy_builder_name):
             await deployment_log(
                 deployment=payload,
-                message=f"{Colors.YELLOW}{msg}{Colors.ENDC}" if index > 0 else msg,
+                message=f"Removed the previous builder of the environment {Colors.ORANGE}{legacy_builder_name}{Colors.ENDC}",
                 source=RuntimeLogSource.BUILD,
             )
 
-        process = await asyncio.create_subprocess_shell(
-            shlex.join(cmd_args),
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await process.communicate()
-        info_lines = stdout.decode().splitlines()
-        error_lines = stderr.decode().splitlines()
-        if len(info_lines) > 0:
-            await deployment_log(
-                deployment=payload,
-                message=info_lines,
-                source=RuntimeLogSource.BUILD,
-            )
-        if len(error_lines) > 0:
-            await deployment_log(
-                deployment=payload,
-                message=error_lines,
-                source=RuntimeLogSource.BUILD,
-                error=True,
-            )
-        if process.returncode != 0:
+        try:
+            await builder_pool.ensure_builder(builder_name)
+        except Exception as e:
             await deployment_log(
                 deployment=payload,
-                message="Error creating builder for the app",
+                message=f"Error creating builder for the app: {Colors.GREY}{e}{Colors.ENDC}",
                 source=RuntimeLogSource.BUILD,
                 error=True,
             )
-            raise Exception("Error when crating the builder for the app")
+            raise
         await deployment_log(
             deployment=payload,
-            message=f"Builder {Colors.ORANGE}{builder_name}{Colors.ENDC} created sucessfully ✅",
+            message=f"Builder {Colors.ORANGE}{builder_name}{Colors.ENDC} is ready ✅",
             source=RuntimeLogSource.BUILD,
         )
 
     @activity.defn
     async def delete_buildkit_builder_for_env(self, payload: EnvironmentDetails):
+        builder_pool = BuildkitBuilderPool(self.docker_client)
+        await builder_pool.disconnect_network(
+            get_env_network_resource_name(payload.id, project_id=payload.project_id)
+        )
+
         builder_name = get_buildkit_builder_resource_name(payload.id)
         print(
             f"Deleting buildkit builder {Colors.ORANGE}{builder_name}{Colors.ENDC}..."
         )
-        process = await asyncio.create_subprocess_exec(
-            DOCKER_BINARY_PATH, "buildx", "inspect", builder_name
-        )
-        await process.communicate()
-
-        if process.returncode != 0:
+        if not await builder_pool.remove_builder(builder_name):
             print(
                 f"Buildkit builder {Colors.ORANGE}{builder_name}{Colors.ENDC} has already been deleted, skipping deletion ✅"
             )
             return None
-
-        process = await asyncio.create_subprocess_exec(
-            DOCKER_BINARY_PATH,
-            "buildx",
-            "rm",
-            "--force",
-            builder_name,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.STDOUT,
-        )
-        stdout, stderr = await process.communicate()
-        info_lines = (stdout or b"").decode()
-        error_lines = (stderr or b"").decode()
-        if info_lines:
-            print(info_lines)
-        if error_lines:
-            print(error_lines)
-        if process.returncode != 0:
-            raise Exception(
-                f"Error when deleting the builder for the environment {payload.name}"
-            )
         print(
             f"Builder {Colors.ORANGE}{builder_name}{Colors.ENDC} deleted sucessfully ✅"
         )
@@ -764,6 +710,22 @@ class GitActivities:
                 is_default=True
             ).afirst()
 
+            builder_pool = BuildkitBuilderPool(self.docker_client)
+            builder_network = get_env_network_resource_name(
+                deployment.service.environment.id, deployment.service.project_id
+            )
+            builder_name = await builder_pool.acquire(
+                service_id=deployment.service.id,
+                holder=activity.info().workflow_id,
+                network=builder_network,
+                project_id=deployment.service.project_id,
+            )
+            await deployment_log(
+                deployment=deployment,
+                message=f"Building with the Buildkit builder {Colors.ORANGE}{builder_name}{Colors.ENDC}",
+                source=RuntimeLogSource.BUILD,
+            )
+
             try:
                 # Get build env variables
                 if details.default_env_variables is not None:
@@ -778,11 +740,6 @@ class GitActivities:
                 # Always force color
                 build_envs["FORCE_COLOR"] = "true"
 
-                # construct arguments
-                builder_name = get_buildkit_builder_resource_name(
-                    service.environment.id
-                )
-
                 # Construct each line of the build command as a separate string
                 docker_build_command = [DOCKER_BINARY_PATH, "buildx", "build"]
                 docker_build_command.extend(["--builder", builder_name])
@@ -800,6 +757,18 @@ class GitActivities:
                 if deployment.ignore_build_cache:
                     docker_build_command.append("--no-cache")
 
+                if build_registry is not None:
+                    docker_build_command.extend(
+                        get_buildkit_registry_cache_args(
+                            registry_domain=build_registry.registry_domain,
+                            project_id=service.project_id,
+                            service_slug=service.slug,
+                            env_name=service.environment.name,
+                            base_env_name=Environment.PRODUCTION_ENV_NAME,
+                            insecure_registry=not build_registry.is_secure,
+                        )
+                    )
+
                 # Append build arguments, each on its own line
                 for key, value in build_envs.items():
                     docker_build_command.extend(["--build-arg", f"{key}={value}"])
@@ -823,7 +792,13 @@ class GitActivities:
 
                 docker_build_command.extend(["-t", image_name])
                 docker_build_command.extend(
-                    ["--output", f"type=docker,name={image_name}"]
+                    get_buildkit_output_args(
+                        image_name,
+                        push_to_registry=build_registry is not None,
+                        insecure_registry=(
+                            build_registry is not None and not build_registry.is_secure
+                        ),
+                    )
                 )
 
                 # Finally, add the build context directory
@@ -875,6 +850,7 @@ class GitActivities:
                     cancel_event=cancel_event,
                     operation_name="docker build",
                     output_handler=message_handler,
+                    progress_interval=PROGRESS_FRAMES_INTERVAL,
                 )
                 image_id = None
                 build_image_task = asyncio.create_task(docker_build_process.run())
@@ -924,6 +900,11 @@ class GitActivities:
                 await git_deployment.asave(
                     update_fields=["build_finished_at", "updated_at"]
                 )
+                await builder_pool.release(
+                    builder_name,
+                    holder=activity.info().workflow_id,
+                    network=builder_network,
+                )
         except asyncio.CancelledError:
             cancel_event.set()
             raise
@@ -1091,41 +1072,122 @@ class GitActivities:
         # Include build directory
         nixpacks_plan_command_args.append(build_directory)
 
-        # Log executed command with all args (obfuscated)
-        obfuscated_cmd = obfuscate_env_in_command(nixpacks_plan_command_args)
-        cmd_string = multiline_command(obfuscated_cmd)
-        log_message = f"Running {Colors.YELLOW}{cmd_string}{Colors.ENDC}"
-        for index, msg in enumerate(log_message.splitlines()):
+        nixpacks_directory = os.path.dirname(nixpacks_plan_path)
+        plan_cache_key = get_build_plan_cache_key(
+            "nixpacks",
+            NIXPACKS_BINARY_PATH,
+            build_directory,
+            nixpacks_plan_command_args,
+        )
+        use_cached_plan = not deployment.ignore_build_cache and (
+            await aget_cached_build_plan(
+                plan_cache_key, nixpacks_directory, build_directory
+            )
+        )
+        if use_cached_plan:
             await deployment_log(
                 deployment=deployment,
-                message=(f"{Colors.YELLOW}{msg}{Colors.ENDC}" if index > 0 else msg),
+                message=f"Manifests & build options unchanged, reusing the generated files in {Colors.ORANGE}{nixpacks_directory}{Colors.ENDC} ♻️",
                 source=RuntimeLogSource.BUILD,
             )
+        else:
+            # Log executed command with all args (obfuscated)
+            obfuscated_cmd = obfuscate_env_in_command(nixpacks_plan_command_args)
+            cmd_string = multiline_command(obfuscated_cmd)
+            log_message = f"Running {Colors.YELLOW}{cmd_string}{Colors.ENDC}"
+            for index, msg in enumerate(log_message.splitlines()):
+                await deployment_log(
+                    deployment=deployment,
+                    message=(
+                        f"{Colors.YELLOW}{msg}{Colors.ENDC}" if index > 0 else msg
+                    ),
+                    source=RuntimeLogSource.BUILD,
+                )
 
-        # Execute process
-        with open(nixpacks_plan_path, "w") as file:
-            process = await asyncio.create_subprocess_shell(
-                shlex.join(nixpacks_plan_command_args),
-                stdout=file,
+            # Execute process
+            with open(nixpacks_plan_path, "w") as file:
+                process = await asyncio.create_subprocess_shell(
+                    shlex.join(nixpacks_plan_command_args),
+                    stdout=file,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+            stdout, stderr = await process.communicate()
+            error_lines = stderr.decode().splitlines()
+            if len(error_lines) > 0:
+                await deployment_log(
+                    deployment=details.deployment,
+                    message=error_lines,
+                    source=RuntimeLogSource.BUILD,
+                    error=True,
+                )
+            if process.returncode != 0:
+                await deployment_log(
+                    deployment=details.deployment,
+                    message="Error when generating files for the nixpacks builder...",
+                    source=RuntimeLogSource.BUILD,
+                    error=True,
+                )
+                return
+
+            # ====== BUILD PROCESS ======
+            # Build command args
+            nixpacks_build_command_args = [
+                NIXPACKS_BINARY_PATH,
+                "build",
+                "--config",
+                nixpacks_plan_path,
+                "--no-error-without-start",
+                "--out",
+                build_directory,
+                build_directory,
+            ]
+
+            # Log executed command with all args
+            cmd_string = multiline_command(shlex.join(nixpacks_build_command_args))
+            log_message = f"Running {Colors.YELLOW}{cmd_string}{Colors.ENDC}"
+            for index, msg in enumerate(log_message.splitlines()):
+                await deployment_log(
+                    deployment=deployment,
+                    message=(
+                        f"{Colors.YELLOW}{msg}{Colors.ENDC}" if index > 0 else msg
+                    ),
+                    source=RuntimeLogSource.BUILD,
+                )
+
+            process = await asyncio.create_subprocess_exec(
+                *nixpacks_build_command_args,
+                stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
             )
-        stdout, stderr = await process.communicate()
-        error_lines = stderr.decode().splitlines()
-        if len(error_lines) > 0:
-            await deployment_log(
-                deployment=details.deployment,
-                message=error_lines,
-                source=RuntimeLogSource.BUILD,
-                error=True,
-            )
-        if process.returncode != 0:
-            await deployment_log(
-                deployment=details.deployment,
-                message="Error when generating files for the nixpacks builder...",
-                source=RuntimeLogSource.BUILD,
-                error=True,
-            )
-            return
+            stdout, stderr = await process.communicate()
+            info_lines = stdout.decode().splitlines()
+            error_lines = stderr.decode().splitlines()
+            if len(info_lines) > 0:
+                await deployment_log(
+                    deployment=details.deployment,
+                    message=info_lines,
+                    source=RuntimeLogSource.BUILD,
+                )
+            if len(error_lines) > 0:
+                await deployment_log(
+                    deployment=details.deployment,
+                    message=error_lines,
+                    source=RuntimeLogSource.BUILD,
+                    error=True,
+                )
+            if process.returncode != 0:
+                await deployment_log(
+                    deployment=details.deployment,
+                    message="Error when generating files for the nixpacks builder...",
+                    source=RuntimeLogSource.BUILD,
+                    error=True,
+                )
+                return
+
+            if not deployment.ignore_build_cache:
+                await acache_build_plan(
+                    plan_cache_key, nixpacks_directory, build_directory
+                )
 
         env_variables: List[EnvVariableDto] = []
         with open(nixpacks_plan_path, "r") as file:
@@ -1135,59 +1197,6 @@ class GitActivities:
             for key, value in data["variables"].items():
                 env_variables.append(EnvVariableDto(key=key, value=value))
 
-        # ====== BUILD PROCESS ======
-        # Build command args
-        nixpacks_build_command_args = [
-            NIXPACKS_BINARY_PATH,
-            "build",
-            "--config",
-            nixpacks_plan_path,
-            "--no-error-without-start",
-            "--out",
-            build_directory,
-            build_directory,
-        ]
-
-        # Log executed command with all args
-        cmd_string = multiline_command(shlex.join(nixpacks_build_command_args))
-        log_message = f"Running {Colors.YELLOW}{cmd_string}{Colors.ENDC}"
-        for index, msg in enumerate(log_message.splitlines()):
-            await deployment_log(
-                deployment=deployment,
-                message=(f"{Colors.YELLOW}{msg}{Colors.ENDC}" if index > 0 else msg),
-                source=RuntimeLogSource.BUILD,
-            )
-
-        process = await asyncio.create_subprocess_exec(
-            *nixpacks_build_command_args,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await process.communicate()
-        info_lines = stdout.decode().splitlines()
-        error_lines = stderr.decode().splitlines()
-        if len(info_lines) > 0:
-            await deployment_log(
-                deployment=details.deployment,
-                message=info_lines,
-                source=RuntimeLogSource.BUILD,
-            )
-        if len(error_lines) > 0:
-            await deployment_log(
-                deployment=details.deployment,
-                message=error_lines,
-                source=RuntimeLogSource.BUILD,
-                error=True,
-            )
-        if process.returncode != 0:
-            await deployment_log(
-                deployment=details.deployment,
-                message="Error when generating files for the nixpacks builder...",
-                source=RuntimeLogSource.BUILD,
-                error=True,
-            )
-            return
-
         # The Dockerfile is generated inside of the `.nixpacks`
         dockerfile_path = os.path.join(build_directory, ".nixpacks", "Dockerfile")
         # Read the Dockerfile
@@ -1416,47 +1425,74 @@ class GitActivities:
         # Include build directory
         railpack_prepare_command_args.append(build_directory)
 
-        # Log executed command with all args (obfuscated)
-        obfuscated_cmd = obfuscate_env_in_command(railpack_prepare_command_args)
-        cmd_string = multiline_command(obfuscated_cmd)
-        log_message = f"Running {Colors.YELLOW}{cmd_string}{Colors.ENDC}"
-        for index, msg in enumerate(log_message.splitlines()):
-            await deployment_log(
-                deployment=deployment,
-                message=(f"{Colors.YELLOW}{msg}{Colors.ENDC}" if index > 0 else msg),
-                source=RuntimeLogSource.BUILD,
-            )
-
-        # Execute process
-        process = await asyncio.create_subprocess_shell(
-            shlex.join(railpack_prepare_command_args),
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+        railpack_directory = os.path.dirname(railpack_plan_path)
+        plan_cache_key = get_build_plan_cache_key(
+            "railpack",
+            RAILPACK_BINARY_PATH,
+            build_directory,
+            railpack_prepare_command_args,
+            extra_inputs=railpack_custom_config_contents,
         )
-        stdout, stderr = await process.communicate()
-        info_lines = stdout.decode().splitlines()
-        error_lines = stderr.decode().splitlines()
-        if len(info_lines) > 0:
-            await deployment_log(
-                deployment=details.deployment,
-                message=info_lines,
-                source=RuntimeLogSource.BUILD,
+        use_cached_plan = not deployment.ignore_build_cache and (
+            await aget_cached_build_plan(
+                plan_cache_key, railpack_directory, build_directory
             )
-        if len(error_lines) > 0:
+        )
+        if use_cached_plan:
             await deployment_log(
-                deployment=details.deployment,
-                message=error_lines,
+                deployment=deployment,
+                message=f"Manifests & build options unchanged, reusing the generated plan in {Colors.ORANGE}{railpack_directory}{Colors.ENDC} ♻️",
                 source=RuntimeLogSource.BUILD,
-                error=True,
             )
-        if process.returncode != 0:
-            await deployment_log(
-                deployment=details.deployment,
-                message="Error when generating files for the railpack builder...",
-                source=RuntimeLogSource.BUILD,
-                error=True,
+        else:
+            # Log executed command with all args (obfuscated)
+            obfuscated_cmd = obfuscate_env_in_command(railpack_prepare_command_args)
+            cmd_string = multiline_command(obfuscated_cmd)
+            log_message = f"Running {Colors.YELLOW}{cmd_string}{Colors.ENDC}"
+            for index, msg in enumerate(log_message.splitlines()):
+                await deployment_log(
+                    deployment=deployment,
+                    message=(
+                        f"{Colors.YELLOW}{msg}{Colors.ENDC}" if index > 0 else msg
+                    ),
+                    source=RuntimeLogSource.BUILD,
+                )
+
+            # Execute process
+            process = await asyncio.create_subprocess_shell(
+                shlex.join(railpack_prepare_command_args),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
             )
-            return
+            stdout, stderr = await process.communicate()
+            info_lines = stdout.decode().splitlines()
+            error_lines = stderr.decode().splitlines()
+            if len(info_lines) > 0:
+                await deployment_log(
+                    deployment=details.deployment,
+                    message=info_lines,
+                    source=RuntimeLogSource.BUILD,
+                )
+            if len(error_lines) > 0:
+                await deployment_log(
+                    deployment=details.deployment,
+                    message=error_lines,
+                    source=RuntimeLogSource.BUILD,
+                    error=True,
+                )
+            if process.returncode != 0:
+                await deployment_log(
+                    deployment=details.deployment,
+                    message="Error when generating files for the railpack builder...",
+                    source=RuntimeLogSource.BUILD,
+                    error=True,
+                )
+                return
+
+            if not deployment.ignore_build_cache:
+                await acache_build_plan(
+                    plan_cache_key, railpack_directory, build_directory
+                )
 
         with open(railpack_plan_path, "r") as file:
             data = json.loads(file.read())
@@ -1549,6 +1585,22 @@ class GitActivities:
                 is_default=True
             ).afirst()
 
+            builder_pool = BuildkitBuilderPool(self.docker_client)
+            builder_network = get_env_network_resource_name(
+                deployment.service.environment.id, deployment.service.project_id
+            )
+            builder_name = await builder_pool.acquire(
+                service_id=deployment.service.id,
+                holder=activity.info().workflow_id,
+                network=builder_network,
+                project_id=deployment.service.project_id,
+            )
+            await deployment_log(
+                deployment=deployment,
+                message=f"Building with the Buildkit builder {Colors.ORANGE}{builder_name}{Colors.ENDC}",
+                source=RuntimeLogSource.BUILD,
+            )
+
             try:
                 # Get build env variables
                 build_envs = get_build_environment_variables_for_deployment(deployment)
@@ -1586,11 +1638,6 @@ class GitActivities:
                     # We force the reevaluation of the cache by adding a random key in the build envs
                     build_envs["__ZANE_RANDOM_SEED"] = generate_random_chars(64)
 
-                # construct arguments
-                builder_name = get_buildkit_builder_resource_name(
-                    service.environment.id
-                )
-
                 # Construct each line of the build command as a separate string
                 docker_build_command = []
                 docker_build_command.extend([DOCKER_BINARY_PATH, "buildx", "build"])
@@ -1611,6 +1658,18 @@ class GitActivities:
                         ["--build-arg", f"cache-key={generate_random_chars(20)}"]
                     )
 
+                if build_registry is not None:
+                    docker_build_command.extend(
+                        get_buildkit_registry_cache_args(
+                            registry_domain=build_registry.registry_domain,
+                            project_id=service.project_id,
+                            service_slug=service.slug,
+                            env_name=service.environment.name,
+                            base_env_name=Environment.PRODUCTION_ENV_NAME,
+                            insecure_registry=not build_registry.is_secure,
+                        )
+                    )
+
                 # Use railway-frontend build frontend
                 docker_build_command.extend(
                     [
@@ -1642,7 +1701,13 @@ class GitActivities:
                     image_name = f"{build_registry.registry_domain}/{details.image_tag}"
 
                 docker_build_command.extend(
-                    ["--output", f"type=docker,name={image_name}"]
+                    get_buildkit_output_args(
+                        image_name,
+                        push_to_registry=build_registry is not None,
+                        insecure_registry=(
+                            build_registry is not None and not build_registry.is_secure
+                        ),
+                    )
                 )
 
                 # Add the tag and dockerfile
@@ -1713,6 +1778,7 @@ class GitActivities:
                     cancel_event=cancel_event,
                     operation_name="docker build",
                     output_handler=message_handler,
+                    progress_interval=PROGRESS_FRAMES_INTERVAL,
                 )
                 image_id = None
                 build_image_task = asyncio.create_task(docker_build_process.run())
@@ -1763,6 +1829,11 @@ class GitActivities:
                 await git_deployment.asave(
                     update_fields=["build_finished_at", "updated_at"]
                 )
+                await builder_pool.release(
+                    builder_name,
+                    holder=activity.info().workflow_id,
+                    network=builder_network,
+                )
         except asyncio.CancelledError:
             cancel_event.set()
             raise
@@ -1770,6 +1841,137 @@ class GitActivities:
             if heartbeat_task:
                 heartbeat_task.cancel()
 
+    @activity.defn
+    async def reuse_image_from_previous_build(
+        self, details: BuildRegistryDetails
+    ) -> bool:
+        """
+        Tag the image built by a previous deployment of the same commit with the same
+        build inputs as the image of this deployment, returns `True` if the image was reused.
+        Only the images built in the same project with the same git app are reused,
+        the lookup happens before the clone, so nothing else proves that the
+        service has access to the repository.
+        """
+        deployment = details.deployment
+        service = deployment.service
+        if deployment.ignore_build_cache:
+            return False
+        if deployment.commit_sha in [None, HEAD_COMMIT]:
+            return False
+
+        artifact = (
+            await BuildArtifact.objects.filter(
+                repository_url=service.repository_url,
+                commit_sha=deployment.commit_sha,
+                build_inputs_hash=get_build_inputs_hash(
+                    deployment, details.registry_url
+                ),
+                deployment__service__project_id=service.project_id,
+            )
+            .exclude(deployment__hash=deployment.hash)
+            .select_related("deployment")
+            .afirst()
+        )
+        if artifact is None:
+            return False
+
+        previous_deployment = artifact.deployment
+        await deployment_log(
+            deployment=deployment,
+            message=(
+                f"Commit {Colors.ORANGE}{cast(str, deployment.commit_sha)[:7]}{Colors.ENDC} was already built "
+                f"with the same builder options & build variables by the deployment {Colors.ORANGE}{previous_deployment.hash}{Colors.ENDC}, "
+                "reusing its image instead of building it again ♻️"
+            ),
+            source=RuntimeLogSource.BUILD,
+        )
+
+        image_name = f"{details.registry_url}/{deployment.image_tag}"
+        # the image is tagged by its digest, in case the tag of the previous deployment
+        # was overwritten by another build of the same commit
+        process = await asyncio.create_subprocess_exec(
+            DOCKER_BINARY_PATH,
+            "buildx",
+            "imagetools",
+            "create",
+            "--tag",
+            image_name,
+            f"{artifact.image}@{artifact.image_digest}",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+        stdout, _ = await process.communicate()
+        if process.returncode != 0:
+            output_lines = (stdout or b"").decode().splitlines()
+            if len(output_lines) > 0:
+                await deployment_log(
+                    deployment=deployment,
+                    message=output_lines,
+                    source=RuntimeLogSource.BUILD,
+                )
+            await deployment_log(
+                deployment=deployment,
+                message=f"The image {Colors.ORANGE}{artifact.image}@{artifact.image_digest}{Colors.ENDC} is no longer available, building the image again...",
+                source=RuntimeLogSource.BUILD,
+            )
+            await artifact.adelete()
+            return False
+
+        await Deployment.objects.filter(
+            hash=deployment.hash,
+            service_id=service.id,
+            commit_author_name__isnull=True,
+        ).aupdate(
+            commit_message=previous_deployment.commit_message,
+            commit_author_name=previous_deployment.commit_author_name,
+        )
+        await deployment_log(
+            deployment=deployment,
+            message=f"Image {Colors.BLUE}{image_name}{Colors.ENDC} tagged from the deployment {Colors.ORANGE}{previous_deployment.hash}{Colors.ENDC} ✅",
+            source=RuntimeLogSource.BUILD,
+        )
+        return True
+
+    @activity.defn
+    async def save_build_artifact(self, details: BuildRegistryDetails):
+        deployment = details.deployment
+        service = deployment.service
+        if deployment.commit_sha in [None, HEAD_COMMIT]:
+            return
+
+        git_deployment = await Deployment.objects.filter(
+            hash=deployment.hash, service_id=service.id
+        ).afirst()
+        if git_deployment is None:
+            return
+
+        image_name = f"{details.registry_url}/{deployment.image_tag}"
+        try:
+            registry_data = await run_in_docker_executor(
+                self.docker_client.images.get_registry_data,
+                image_name,
+                auth_config={
+                    "username": details.registry_username,
+                    "password": details.registry_password,
+                },
+            )
+        except docker.errors.APIError as e:
+            print(
+                f"Cannot get the digest of the image {Colors.ORANGE}{image_name}{Colors.ENDC}: {e}"
+            )
+            return
+
+        await BuildArtifact.objects.aupdate_or_create(
+            repository_url=service.repository_url,
+            commit_sha=deployment.commit_sha,
+            build_inputs_hash=get_build_inputs_hash(deployment, details.registry_url),
+            defaults=dict(
+                image=image_name,
+                image_digest=registry_data.id,
+                deployment=git_deployment,
+            ),
+        )
+
     @activity.defn
     async def push_image_to_remote_registry(self, deployment: DeploymentDetails):
         build_registry = await BuildRegistry.objects.filter(is_default=True).afirst()
@@ -1794,6 +1996,19 @@ class GitActivities:
             )
             return 0
 
+        image_name = f"{build_registry.registry_domain}/{deployment.image_tag}"
+        try:
+            await run_in_docker_executor(self.docker_client.images.get, image_name)
+        except docker.errors.ImageNotFound:
+            # the builder pushes the image directly to the registry,
+            # the image is only in the local daemon if it was built by an older version
+            await deployment_log(
+                deployment=deployment,
+                message=f"Image {Colors.BLUE}{image_name}{Colors.ENDC} was pushed to the registry by the builder, skipping ✅",
+                source=RuntimeLogSource.BUILD,
+            )
+            return 0
+
         cancel_event = asyncio.Event()
         heartbeat_task = None
 
@@ -1820,9 +2035,6 @@ class GitActivities:
             heartbeat_task = asyncio.create_task(send_heartbeat())
             task_set.add(heartbeat_task)
 
-            image_name = deployment.image_tag
-
-            image_name = f"{build_registry.registry_domain}/{deployment.image_tag}"
             cmd_args = [DOCKER_BINARY_PATH, "image", "push", image_name]
 
             cmd_string = multiline_command(shlex.join(cmd_args))
@@ -14,10 +14,7 @@ import platform
 from ..client import TemporalClient
 
 with workflow.unsafe.imports_passed_through():
-    from ..schedules import (
-        MonitorDockerDeploymentWorkflow,
-        GetDockerDeploymentStatsWorkflow,
-    )
+    from ..schedules import MonitorDockerDeploymentWorkflow
     from search.loki_client import LokiSearchClient
     import docker
     import docker.errors
@@ -57,6 +54,9 @@ with workflow.unsafe.imports_passed_through():
         replace_placeholders,
     )
     from ..semaphore import AsyncSemaphore
+    from ..docker_client import AsyncDockerClient
+    from ..builder_pool import BuildkitBuilderPool
+    from ..image_pulls import pull_image
     from ..proxy import ZaneProxyClient
     from ..helpers import (
         deployment_log,
@@ -103,9 +103,10 @@ async def acquire_service_deploy_semaphore():
     semaphore = AsyncSemaphore(
         key=SERVICE_DEPLOY_SEMAPHORE_KEY,
         limit=settings.TEMPORALIO_MAX_CONCURRENT_DEPLOYS,
-        semaphore_timeout=settings.TEMPORALIO_WORKFLOW_EXECUTION_MAX_TIMEOUT,
+        semaphore_timeout=settings.TEMPORALIO_DEPLOY_SEMAPHORE_LEASE,
+        renew_for=settings.TEMPORALIO_WORKFLOW_EXECUTION_MAX_TIMEOUT,
     )
-    await semaphore.acquire()
+    await semaphore.acquire(holder=activity.info().workflow_id)
 
 
 @activity.defn
@@ -115,9 +116,10 @@ async def release_service_deploy_semaphore():
     semaphore = AsyncSemaphore(
         key=SERVICE_DEPLOY_SEMAPHORE_KEY,
         limit=settings.TEMPORALIO_MAX_CONCURRENT_DEPLOYS,
-        semaphore_timeout=settings.TEMPORALIO_WORKFLOW_EXECUTION_MAX_TIMEOUT,
+        semaphore_timeout=settings.TEMPORALIO_DEPLOY_SEMAPHORE_LEASE,
+        renew_for=settings.TEMPORALIO_WORKFLOW_EXECUTION_MAX_TIMEOUT,
     )
-    await semaphore.release()
+    await semaphore.release(holder=activity.info().workflow_id)
 
 
 @activity.defn
@@ -129,7 +131,7 @@ async def lock_deploy_semaphore():
             minutes=5
         ),  # this is to prevent the system cleanup from blocking for too long
     )
-    await semaphore.acquire_all()
+    await semaphore.acquire_all(holder=activity.info().workflow_id)
 
 
 @activity.defn
@@ -146,11 +148,11 @@ async def reset_deploy_semaphore():
 
 class SystemCleanupActivities:
     def __init__(self):
-        self.docker_client = get_docker_client()
+        self.docker = AsyncDockerClient(get_docker_client())
 
     @activity.defn
     async def cleanup_images(self) -> dict:
-        return self.docker_client.images.prune(
+        return await self.docker.images.prune(
             filters={
                 "dangling": True,
                 "label!": ["zane-managed"],
@@ -159,7 +161,7 @@ class SystemCleanupActivities:
 
     @activity.defn
     async def cleanup_volumes(self) -> dict:
-        return self.docker_client.volumes.prune(
+        return await self.docker.volumes.prune(
             filters={
                 "all": True,
                 "label!": ["zane-managed"],
@@ -168,20 +170,26 @@ class SystemCleanupActivities:
 
     @activity.defn
     async def cleanup_containers(self) -> dict:
-        return self.docker_client.containers.prune()
+        return await self.docker.containers.prune()
 
     @activity.defn
     async def cleanup_networks(self) -> dict:
-        return self.docker_client.networks.prune(
+        return await self.docker.networks.prune(
             filters={
                 "label!": ["zane-managed"],
             }
         )
 
+    @activity.defn
+    async def stop_idle_buildkit_builders(self) -> List[str]:
+        if settings.TESTING:
+            return []
+        return await BuildkitBuilderPool(self.docker.client).stop_idle_builders()
+
 
 class DockerSwarmActivities:
     def __init__(self):
-        self.docker_client = get_docker_client()
+        self.docker = AsyncDockerClient(get_docker_client())
 
     @activity.defn
     async def create_project_network(self, payload: ProjectDetails) -> str:
@@ -193,7 +201,7 @@ class DockerSwarmActivities:
             )
 
         production_env = await project.aproduction_env
-        network = self.docker_client.networks.create(
+        network = await self.docker.networks.create(
             name=get_env_network_resource_name(
                 production_env.id, project_id=project.id
             ),
@@ -206,7 +214,7 @@ class DockerSwarmActivities:
 
     @activity.defn
     async def create_environment_network(self, payload: EnvironmentDetails) -> str:
-        network = self.docker_client.networks.create(
+        network = await self.docker.networks.create(
             name=get_env_network_resource_name(
                 payload.id, project_id=payload.project_id
             ),
@@ -220,13 +228,13 @@ class DockerSwarmActivities:
     @activity.defn
     async def delete_environment_network(self, payload: EnvironmentDetails):
         try:
-            network = self.docker_client.networks.get(
+            network = await self.docker.networks.get(
                 get_env_network_resource_name(payload.id, project_id=payload.project_id)
             )
         except docker.errors.NotFound:
             pass  # network has probably been already deleted
         else:
-            network.remove()
+            await self.docker.run(network.remove)
 
     @activity.defn
     async def get_archived_project_services(
@@ -396,19 +404,19 @@ class DockerSwarmActivities:
                 project_id=deployment.project_id,
             )
             try:
-                swarm_service = self.docker_client.services.get(service_name)
+                swarm_service = await self.docker.services.get(service_name)
             except docker.errors.NotFound:
                 print(f"service `{service_name}` not found")
                 # we will assume the service has already been deleted
                 pass
             else:
-                swarm_service.remove()
+                await self.docker.run(swarm_service.remove)
 
             async def wait_for_service_containers_to_be_removed():
                 print(
                     f"waiting for containers for service {service_name=} to be removed..."
                 )
-                container_list = self.docker_client.containers.list(
+                container_list = await self.docker.containers.list(
                     filters={"name": service_name}
                 )
                 while len(container_list) > 0:
@@ -417,7 +425,7 @@ class DockerSwarmActivities:
                         + f"retrying in {settings.DEFAULT_HEALTHCHECK_WAIT_INTERVAL} seconds..."
                     )
                     await asyncio.sleep(settings.DEFAULT_HEALTHCHECK_WAIT_INTERVAL)
-                    container_list = self.docker_client.containers.list(
+                    container_list = await self.docker.containers.list(
                         filters={"name": service_name}
                     )
                     continue
@@ -434,7 +442,7 @@ class DockerSwarmActivities:
             except RPCError:
                 pass
         print("deleting volume list...")
-        docker_volume_list = self.docker_client.volumes.list(
+        docker_volume_list = await self.docker.volumes.list(
             filters={
                 "label": [
                     f"{key}={value}"
@@ -447,11 +455,11 @@ class DockerSwarmActivities:
         )
 
         for volume in docker_volume_list:
-            volume.remove(force=True)
+            await self.docker.run(volume.remove, force=True)
         print(f"Deleted {len(docker_volume_list)} volume(s), YAY !! 🎉")
 
         print("deleting config list...")
-        docker_config_list = self.docker_client.configs.list(
+        docker_config_list = await self.docker.configs.list(
             filters={
                 "label": [
                     f"{key}={value}"
@@ -464,7 +472,7 @@ class DockerSwarmActivities:
         )
 
         for config in docker_config_list:
-            config.remove()
+            await self.docker.run(config.remove)
         print(f"Deleted {len(docker_config_list)} config(s), YAY !! 🎉")
         search_client = LokiSearchClient(
             host=settings.LOKI_HOST,
@@ -478,7 +486,7 @@ class DockerSwarmActivities:
         # So this condition is always false.
         # It doesn't cause any problem because if it's a docker service, the image list will return an empty list
         print("deleting image list...")
-        docker_image_list = self.docker_client.images.list(
+        docker_image_list = await self.docker.images.list(
             filters={
                 "label": [
                     f"{key}={value}"
@@ -490,14 +498,14 @@ class DockerSwarmActivities:
             }
         )
         for image in docker_image_list:
-            image.remove(force=True)
+            await self.docker.run(image.remove, force=True)
         print(f"Deleted {len(docker_image_list)} images(s), YAY !! 🎉")
 
     @activity.defn
     async def remove_project_networks(
         self, project_details: ArchivedProjectDetails
     ) -> List[str]:
-        networks_associated_to_project = self.docker_client.networks.list(
+        networks_associated_to_project = await self.docker.networks.list(
             filters={
                 "label": [
                     f"{key}={value}"
@@ -512,7 +520,7 @@ class DockerSwarmActivities:
             net.name for net in networks_associated_to_project
         ]  # type: ignore
         for network in networks_associated_to_project:
-            network.remove()
+            await self.docker.run(network.remove)
         return deleted_networks
 
     @activity.defn
@@ -795,7 +803,7 @@ class DockerSwarmActivities:
             )
 
             try:
-                self.docker_client.services.get(swarm_service_name)
+                await self.docker.services.get(swarm_service_name)
             except docker.errors.NotFound:
                 # if the service hasn't been cleanup correctly
                 deployments.append(docker_deployment)
@@ -845,10 +853,12 @@ class DockerSwarmActivities:
         created_volumes: List[VolumeDto] = []
         for volume in service.docker_volumes:
             try:
-                self.docker_client.volumes.get(get_volume_resource_name(volume.id))  # type: ignore
+                await self.docker.volumes.get(
+                    get_volume_resource_name(volume.id)  # type: ignore
+                )
             except docker.errors.NotFound:
                 created_volumes.append(volume)
-                self.docker_client.volumes.create(
+                await self.docker.volumes.create(
                     name=get_volume_resource_name(volume.id),  # type: ignore
                     driver="local",
                     labels=get_resource_labels(service.project_id, parent=service.id),
@@ -873,11 +883,11 @@ class DockerSwarmActivities:
         created_configs: List[ConfigDto] = []
         for config in service.configs:
             try:
-                self.docker_client.configs.get(
+                await self.docker.configs.get(
                     get_config_resource_name(config.id, config.version)  # type: ignore
                 )
             except docker.errors.NotFound:
-                self.docker_client.configs.create(
+                await self.docker.configs.create(
                     name=get_config_resource_name(config.id, config.version),  # type: ignore
                     labels=get_resource_labels(service.project_id, parent=service.id),
                     data=config.contents.encode("utf-8"),
@@ -899,13 +909,13 @@ class DockerSwarmActivities:
         )
         for volume in deployment.created_volumes:
             try:
-                docker_volume = self.docker_client.volumes.get(
+                docker_volume = await self.docker.volumes.get(
                     get_volume_resource_name(volume.id)  # type: ignore
                 )
             except docker.errors.NotFound:
                 pass
             else:
-                docker_volume.remove(force=True)
+                await self.docker.run(docker_volume.remove, force=True)
 
         await deployment_log(
             deployment,
@@ -920,13 +930,13 @@ class DockerSwarmActivities:
         )
         for config in deployment.created_configs:
             try:
-                docker_config = self.docker_client.configs.get(
+                docker_config = await self.docker.configs.get(
                     get_config_resource_name(config.id, config.version)  # type: ignore
                 )
             except docker.errors.NotFound:
                 pass
             else:
-                docker_config.remove()
+                await self.docker.run(docker_config.remove)
 
         await deployment_log(
             deployment,
@@ -936,7 +946,7 @@ class DockerSwarmActivities:
     @activity.defn
     async def scale_down_service_deployment(self, deployment: ScaleDownServiceDetails):
         try:
-            swarm_service: Service = self.docker_client.services.get(
+            swarm_service: Service = await self.docker.services.get(
                 get_swarm_service_name_for_deployment(
                     deployment_hash=deployment.hash,
                     project_id=deployment.project_id,
@@ -962,19 +972,21 @@ class DockerSwarmActivities:
             if deployment.service_snapshot is not None:
                 update_attributes.update(endpoint_spec=EndpointSpec())
 
-            swarm_service.update(**update_attributes)
+            await self.docker.run(swarm_service.update, **update_attributes)
 
             async def wait_for_service_to_be_down():
                 print(f"waiting for service `{swarm_service.name=}` to be down...")
-                task_list = swarm_service.tasks(filters={"desired-state": "running"})
+                task_list = await self.docker.run(
+                    swarm_service.tasks, filters={"desired-state": "running"}
+                )
                 while len(task_list) > 0:
                     print(
                         f"service `{swarm_service.name=}` is not down yet, "
                         + f"retrying in `{settings.DEFAULT_HEALTHCHECK_WAIT_INTERVAL}` seconds..."
                     )
                     await asyncio.sleep(settings.DEFAULT_HEALTHCHECK_WAIT_INTERVAL)
-                    task_list = swarm_service.tasks(
-                        filters={"desired-state": "running"}
+                    task_list = await self.docker.run(
+                        swarm_service.tasks, filters={"desired-state": "running"}
                     )
                 print(f"service `{swarm_service.name=}` is down, YAY !! 🎉")
 
@@ -1027,7 +1039,7 @@ class DockerSwarmActivities:
             return
 
         try:
-            swarm_service = self.docker_client.services.get(
+            swarm_service = await self.docker.services.get(
                 get_swarm_service_name_for_deployment(
                     deployment_hash=deployment.hash,
                     project_id=deployment.project_id,
@@ -1057,7 +1069,7 @@ class DockerSwarmActivities:
                     new_endpoint_spec = EndpointSpec(ports=exposed_ports)  # type: ignore
                 update_attributes.update(endpoint_spec=new_endpoint_spec)
 
-            swarm_service.update(**update_attributes)
+            await self.docker.run(swarm_service.update, **update_attributes)
 
             # Change back the status to be accurate
             deployment_query = Deployment.objects.filter(
@@ -1092,11 +1104,23 @@ class DockerSwarmActivities:
         try:
             credentials = service.container_registry_credentials or service.credentials
 
-            self.docker_client.images.pull(
-                repository=cast(str, service.image),
+            async def log_progress(line: str):
+                await deployment_log(deployment, f"{Colors.GREY}{line}{Colors.ENDC}")
+
+            async def log_wait():
+                await deployment_log(
+                    deployment,
+                    f"Waiting for the pull of image {Colors.ORANGE}{service.image}{Colors.ENDC} already in progress...",
+                )
+
+            pulled = await pull_image(
+                self.docker,
+                image=cast(str, service.image),
                 auth_config=(
                     credentials.to_dict() if credentials is not None else None
                 ),
+                on_progress=log_progress,
+                on_wait=log_wait,
             )
         except docker.errors.ImageNotFound:
             await deployment_log(
@@ -1111,10 +1135,16 @@ class DockerSwarmActivities:
             )
             return False
         else:
-            await deployment_log(
-                deployment,
-                f"Finished pulling image {Colors.ORANGE}{service.image}{Colors.ENDC} ✅",
-            )
+            if pulled:
+                await deployment_log(
+                    deployment,
+                    f"Finished pulling image {Colors.ORANGE}{service.image}{Colors.ENDC} ✅",
+                )
+            else:
+                await deployment_log(
+                    deployment,
+                    f"Image {Colors.ORANGE}{service.image}{Colors.ENDC} is already up to date, skipping the pull ✅",
+                )
             return True
 
     @activity.defn
@@ -1124,7 +1154,7 @@ class DockerSwarmActivities:
         service = deployment.service
 
         try:
-            self.docker_client.services.get(
+            await self.docker.services.get(
                 get_swarm_service_name_for_deployment(
                     deployment_hash=deployment.hash,
                     project_id=deployment.service.project_id,
@@ -1161,7 +1191,7 @@ class DockerSwarmActivities:
 
             # Volumes
             mounts: list[str] = []
-            docker_volume_list = self.docker_client.volumes.list(
+            docker_volume_list = await self.docker.volumes.list(
                 filters={
                     "label": [
                         f"{key}={value}"
@@ -1197,7 +1227,7 @@ class DockerSwarmActivities:
 
             # configs
             configs: list[ConfigReference] = []
-            docker_config_list = self.docker_client.configs.list(
+            docker_config_list = await self.docker.configs.list(
                 filters={
                     "label": [
                         f"{key}={value}"
@@ -1267,7 +1297,7 @@ class DockerSwarmActivities:
                 deployment,
                 f"Creating service for the deployment {Colors.ORANGE}{deployment.hash}{Colors.ENDC}...",
             )
-            self.docker_client.services.create(
+            await self.docker.services.create(
                 image=image_name,
                 command=service.command,
                 name=get_swarm_service_name_for_deployment(
@@ -1353,7 +1383,7 @@ class DockerSwarmActivities:
                 non_retryable=True,
             )
 
-        swarm_service = self.docker_client.services.get(
+        swarm_service = await self.docker.services.get(
             get_swarm_service_name_for_deployment(
                 deployment_hash=service_deployment.hash,
                 project_id=service_deployment.service.project.id,
@@ -1389,11 +1419,12 @@ class DockerSwarmActivities:
                 f" | healthcheck_time_left={Colors.ORANGE}{format_duration(healthcheck_time_left)}{Colors.ENDC} 💓",
             )
 
-            task_list = swarm_service.tasks(
+            task_list = await self.docker.run(
+                swarm_service.tasks,
                 filters={
                     "label": f"deployment_hash={service_deployment.hash}",
                     "desired-state": "running",
-                }
+                },
             )
             if len(task_list) > 0:
                 most_recent_swarm_task = DockerSwarmTask.from_dict(
@@ -1428,10 +1459,11 @@ class DockerSwarmActivities:
                 exited_without_error = 0
                 deployment_status = state_matrix[most_recent_swarm_task.state]
 
-                all_tasks = swarm_service.tasks(
+                all_tasks = await self.docker.run(
+                    swarm_service.tasks,
                     filters={
                         "label": f"deployment_hash={service_deployment.hash}",
-                    }
+                    },
                 )
                 if deployment_status == Deployment.DeploymentStatus.STARTING:
                     # We set the status to restarting, because we get more than one task for this service when we restart it
@@ -1465,7 +1497,7 @@ class DockerSwarmActivities:
                             print(
                                 f"Running custom healthcheck {healthcheck.type=} - {healthcheck.value=}"
                             )
-                            container = self.docker_client.containers.get(
+                            container = await self.docker.containers.get(
                                 most_recent_swarm_task.container_id
                             )
                             if healthcheck.type == HealthCheck.HealthCheckType.COMMAND:
@@ -1473,7 +1505,8 @@ class DockerSwarmActivities:
                                     deployment=deployment,
                                     message=f"Running command {Colors.GREY}{healthcheck.value}{Colors.ENDC}",
                                 )
-                                exit_code, output = container.exec_run(
+                                exit_code, output = await self.docker.run(
+                                    container.exec_run,
                                     cmd=healthcheck.value,
                                     stdout=True,
                                     stderr=True,
@@ -1621,12 +1654,11 @@ class DockerSwarmActivities:
                 .afirst()
             )
 
-            for url in service.urls:
-                ZaneProxyClient.upsert_service_url(
-                    url=url,
-                    current_deployment=deployment,
-                    previous_deployment=previous_deployment,
-                )
+            ZaneProxyClient.upsert_service_urls(
+                service.urls,
+                current_deployment=deployment,
+                previous_deployment=previous_deployment,
+            )
 
             await deployment_log(
                 deployment,
@@ -1643,29 +1675,31 @@ class DockerSwarmActivities:
             service_id=deployment.service_id,
         )
         try:
-            swarm_service = self.docker_client.services.get(service_name)
+            swarm_service = await self.docker.services.get(service_name)
         except docker.errors.NotFound:
             # Do nothing, The service has already been deleted
             pass
         else:
-            swarm_service.scale(0)
+            await self.docker.run(swarm_service.scale, 0)
 
             async def wait_for_service_to_be_down():
                 print(f"waiting for service {swarm_service.name=} to be down...")
-                task_list = swarm_service.tasks(filters={"desired-state": "running"})
+                task_list = await self.docker.run(
+                    swarm_service.tasks, filters={"desired-state": "running"}
+                )
                 while len(task_list) > 0:
                     print(
                         f"service {swarm_service.name=} is not down yet, "
                         + f"retrying in {settings.DEFAULT_HEALTHCHECK_WAIT_INTERVAL} seconds..."
                     )
                     await asyncio.sleep(settings.DEFAULT_HEALTHCHECK_WAIT_INTERVAL)
-                    task_list = swarm_service.tasks(
-                        filters={"desired-state": "running"}
+                    task_list = await self.docker.run(
+                        swarm_service.tasks, filters={"desired-state": "running"}
                     )
                 print(f"service {swarm_service.name=} is down, YAY !! 🎉")
 
             await wait_for_service_to_be_down()
-            swarm_service.remove()
+            await self.docker.run(swarm_service.remove)
         finally:
             return service_name
 
@@ -1677,7 +1711,7 @@ class DockerSwarmActivities:
             for volume in service.docker_volumes
         ]
 
-        docker_volume_list = self.docker_client.volumes.list(
+        docker_volume_list = await self.docker.volumes.list(
             filters={
                 "label": [
                     f"{key}={value}"
@@ -1691,7 +1725,7 @@ class DockerSwarmActivities:
 
         for volume in docker_volume_list:
             if volume.name not in docker_volume_names:
-                volume.remove(force=True)
+                await self.docker.run(volume.remove, force=True)
 
     @activity.defn
     async def remove_old_docker_configs(self, deployment: DeploymentDetails):
@@ -1701,7 +1735,7 @@ class DockerSwarmActivities:
             for config in service.configs
         ]
 
-        docker_config_list = self.docker_client.configs.list(
+        docker_config_list = await self.docker.configs.list(
             filters={
                 "label": [
                     f"{key}={value}"
@@ -1715,7 +1749,7 @@ class DockerSwarmActivities:
 
         for config in docker_config_list:
             if config.name not in docker_config_names:
-                config.remove()
+                await self.docker.run(config.remove)
 
     @activity.defn
     async def remove_old_urls(self, deployment: DeploymentDetails):
@@ -1725,8 +1759,9 @@ class DockerSwarmActivities:
     async def unexpose_docker_service_from_http(
         self, service_details: ArchivedDockerServiceDetails | ArchivedGitServiceDetails
     ):
-        for url in service_details.urls:
-            ZaneProxyClient.remove_service_url(service_details.original_id, url)
+        ZaneProxyClient.remove_service_urls(
+            service_details.original_id, service_details.urls
+        )
 
         for deployment in service_details.deployments:
             for domain in deployment.urls:
@@ -1746,9 +1781,7 @@ class DockerSwarmActivities:
             if change.type == DeploymentChange.ChangeType.UPDATE
             and change.field == DeploymentChange.ChangeField.URLS
         ]
-        for url in new_urls:
-            ZaneProxyClient.remove_service_url(deployment.service.id, url)
-
+        removed_urls = list(new_urls)
         for url_change in updated_url_changes:
             old_url = URLDto.from_dict(url_change.old_value)
             new_url = URLDto.from_dict(url_change.new_value)
@@ -1759,7 +1792,7 @@ class DockerSwarmActivities:
                 new_url.domain != old_url.domain
                 or new_url.base_path != old_url.base_path
             ):
-                ZaneProxyClient.remove_service_url(deployment.service.id, new_url)
+                removed_urls.append(new_url)
 
         previous_deployment = await (
             Deployment.objects.filter(
@@ -1776,55 +1809,20 @@ class DockerSwarmActivities:
             .order_by("-queued_at")
             .afirst()
         )
-        # Reset old urls
+        # Reset old urls, in the same proxy update as the removal of the new urls
         if (
             previous_deployment is not None
             and previous_deployment.service_snapshot is not None
         ):
             service = ServiceSnapshot.from_dict(previous_deployment.service_snapshot)
-            for url in service.urls:
-                ZaneProxyClient.upsert_service_url(
-                    url=url,
-                    current_deployment=previous_deployment,
-                    previous_deployment=deployment,
-                )
-
-    @activity.defn
-    async def create_deployment_stats_schedule(self, deployment: DeploymentDetails):
-        try:
-            docker_deployment = (
-                await Deployment.objects.filter(hash=deployment.hash)
-                .select_related("service")
-                .afirst()
-            )
-
-            if docker_deployment is None:
-                raise Deployment.DoesNotExist(
-                    f"Docker deployment with hash='{deployment.hash}' does not exist."
-                )
-        except Deployment.DoesNotExist:
-            raise ApplicationError(
-                "Cannot create a stats schedule for a non existent deployment.",
-                non_retryable=True,
+            ZaneProxyClient.upsert_service_urls(
+                service.urls,
+                current_deployment=previous_deployment,
+                previous_deployment=deployment,
+                removed_urls=removed_urls,
             )
         else:
-            details = SimpleDeploymentDetails(
-                hash=deployment.hash,
-                service_id=deployment.service.id,
-                project_id=deployment.service.project_id,
-            )
-            try:
-                await TemporalClient.acreate_schedule(
-                    workflow=GetDockerDeploymentStatsWorkflow.run,
-                    args=details,
-                    id=docker_deployment.metrics_schedule_id,
-                    interval=timedelta(seconds=30),
-                    task_queue=settings.TEMPORALIO_SCHEDULE_TASK_QUEUE,
-                )
-            except ScheduleAlreadyRunningError:
-                # the schedule already exists, ignore
-                pass
-            return docker_deployment.metrics_schedule_id
+            ZaneProxyClient.remove_service_urls(deployment.service.id, removed_urls)
 
     @activity.defn
     async def create_deployment_healthcheck_schedule(
@@ -1870,11 +1868,14 @@ class DockerSwarmActivities:
                 ),
             )
 
-            interval_seconds = (
-                healthcheck_details.healthcheck.interval_seconds
-                if healthcheck_details.healthcheck is not None
-                else settings.DEFAULT_HEALTHCHECK_INTERVAL
-            )
+            if healthcheck_details.healthcheck is not None:
+                interval_seconds = healthcheck_details.healthcheck.interval_seconds
+            elif settings.DEPLOYMENT_EVENTS_WATCHER_ENABLED:
+                # the status changes are already caught by `DeploymentEventsWatcher`,
+                # the schedule is only here to reconcile the missed events
+                interval_seconds = settings.DEPLOYMENT_MONITOR_RECONCILIATION_INTERVAL
+            else:
+                interval_seconds = settings.DEFAULT_HEALTHCHECK_INTERVAL
             try:
                 await TemporalClient.acreate_schedule(
                     workflow=MonitorDockerDeploymentWorkflow.run,
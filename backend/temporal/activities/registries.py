@@ -86,7 +86,7 @@ async def acquire_registry_deploy_semaphore(registry_id: str):
         limit=1,
         semaphore_timeout=timedelta(minutes=20),
     )
-    await semaphore.acquire()
+    await semaphore.acquire(holder=activity.info().workflow_id)
 
 
 @activity.defn
@@ -98,7 +98,7 @@ async def release_registry_deploy_semaphore(registry_id: str):
         limit=1,
         semaphore_timeout=timedelta(minutes=20),
     )
-    await semaphore.release()
+    await semaphore.release(holder=activity.info().workflow_id)
 
 
 @activity.defn
@@ -18,7 +18,9 @@ docker_client: docker.DockerClient | None = None
 def get_docker_client():
     global docker_client
     if docker_client is None:
-        docker_client = docker.from_env()
+        docker_client = docker.from_env(
+            max_pool_size=settings.DOCKER_CLIENT_MAX_CONCURRENCY
+        )
     return docker_client
 
 
@@ -28,6 +28,7 @@ with workflow.unsafe.imports_passed_through():
         send_regular_heartbeat,
     )
     from ..proxy import ZaneProxyClient
+    from ..docker_client import AsyncDockerClient
     from search.dtos import RuntimeLogSource
     from zane_api.utils import (
         Colors,
@@ -38,10 +39,7 @@ with workflow.unsafe.imports_passed_through():
     from django.db.models import Case, F, Value, When
     from docker.models.services import Service as DockerService
     from django.conf import settings
-    from ..schedules import (
-        MonitorComposeStackWorkflow,
-        CollectComposeStacksMetricsWorkflow,
-    )
+    from ..schedules import MonitorComposeStackWorkflow
     from ..semaphore import AsyncSemaphore
     from search.loki_client import LokiSearchClient
 
@@ -61,7 +59,7 @@ from ..shared import (
 
 class ComposeStackActivities:
     def __init__(self):
-        self.docker_client = get_docker_client()
+        self.docker = AsyncDockerClient(get_docker_client())
 
     @activity.defn
     async def prepare_stack_deployment(self, deployment: ComposeStackDeploymentDetails):
@@ -248,17 +246,11 @@ class ComposeStackActivities:
         self, deployment: ComposeStackDeploymentDetails
     ) -> dict[str, ComposeStackUrlRouteDto]:
         stack = deployment.stack
-        routes_added: dict[str, ComposeStackUrlRouteDto] = {}
-        for service_name, service_urls in stack.urls.items():
-            for url in service_urls:
-                route_id = ZaneProxyClient.upsert_compose_stack_service_url(
-                    stack_id=deployment.stack.id,
-                    service_name=service_name,
-                    stack_hash_prefix=stack.hash_prefix,
-                    url=url,
-                )
-                routes_added[route_id] = url
-        return routes_added
+        return ZaneProxyClient.upsert_compose_stack_service_urls(
+            stack_id=stack.id,
+            stack_hash_prefix=stack.hash_prefix,
+            urls=stack.urls,
+        )
 
     @activity.defn
     async def cleanup_old_stack_urls(
@@ -306,13 +298,13 @@ class ComposeStackActivities:
                     f" | time_left={Colors.ORANGE}{format_duration(time_left)}{Colors.ENDC} 💓",
                 )
 
-                services: List[DockerService] = self.docker_client.services.list(
+                services: List[DockerService] = await self.docker.services.list(
                     filters={
                         "label": [f"com.docker.stack.namespace={deployment.stack.name}"]
                     },
                     status=True,
                 )
-                configs = self.docker_client.configs.list(
+                configs = await self.docker.configs.list(
                     filters={
                         "label": [f"com.docker.stack.namespace={deployment.stack.name}"]
                     },
@@ -416,22 +408,6 @@ class ComposeStackActivities:
             # because the schedule already exists and is running, we can ignore it
             pass
 
-    @activity.defn
-    async def create_stack_metrics_schedule(
-        self, deployment: ComposeStackDeploymentDetails
-    ):
-        try:
-            await TemporalClient.acreate_schedule(
-                workflow=CollectComposeStacksMetricsWorkflow.run,
-                args=deployment.stack,
-                id=deployment.stack.metrics_schedule_id,
-                interval=timedelta(seconds=30),
-                task_queue=settings.TEMPORALIO_SCHEDULE_TASK_QUEUE,
-            )
-        except ScheduleAlreadyRunningError:
-            # because the schedule already exists and is running, we can ignore it
-            pass
-
     @activity.defn
     async def finalize_stack_deployment(self, result: ComposeStackMonitorPayload):
         deployment = result.deployment
@@ -512,7 +488,7 @@ class ComposeStackActivities:
         self, details: ComposeStackArchiveDetails
     ) -> List[str]:
         stack = details.stack
-        services: List[DockerService] = self.docker_client.services.list(
+        services: List[DockerService] = await self.docker.services.list(
             filters={"label": [f"com.docker.stack.namespace={stack.name}"]},
         )
 
@@ -540,14 +516,14 @@ class ComposeStackActivities:
     @activity.defn
     async def wait_for_stack_service_containers_to_be_deleted(self, service: str):
         print(f"waiting for containers for service {service=} to be removed...")
-        container_list = self.docker_client.containers.list(filters={"name": service})
+        container_list = await self.docker.containers.list(filters={"name": service})
         while len(container_list) > 0:
             print(
                 f"service {service=} is not removed yet, "
                 + f"retrying in {settings.DEFAULT_HEALTHCHECK_WAIT_INTERVAL} seconds..."
             )
             await asyncio.sleep(settings.DEFAULT_HEALTHCHECK_WAIT_INTERVAL)
-            container_list = self.docker_client.containers.list(
+            container_list = await self.docker.containers.list(
                 filters={"name": service}
             )
             continue
@@ -559,22 +535,22 @@ class ComposeStackActivities:
     ) -> Dict[str, Any]:
         # Delete configs
         stack = details.stack
-        configs = self.docker_client.configs.list(
+        configs = await self.docker.configs.list(
             filters={"label": [f"com.docker.stack.namespace={stack.name}"]},
         )
 
         for config in configs:
-            config.remove()
+            await self.docker.run(config.remove)
         print(f"Deleted {len(configs)} config(s), YAY !! 🎉")
         deleted_configs = [config.name for config in configs]
 
-        volumes = self.docker_client.volumes.list(
+        volumes = await self.docker.volumes.list(
             filters={"label": [f"com.docker.stack.namespace={stack.name}"]},
         )
 
         # Delete volumes
         for volume in volumes:
-            volume.remove(force=True)
+            await self.docker.run(volume.remove, force=True)
         print(f"Deleted {len(volumes)} volume(s), YAY !! 🎉")
         deleted_volumes = [volume.name for volume in volumes]
 
@@ -663,7 +639,7 @@ class ComposeStackActivities:
                     minutes=25
                 ),  # this is to prevent the system cleanup from blocking for too long
             )
-            await semaphore.acquire_all()
+            await semaphore.acquire_all(holder=activity.info().workflow_id)
         print(f"Semaphore for stack {Colors.ORANGE}{stack_id}{Colors.ENDC} locked ✅")
 
     @activity.defn
@@ -729,7 +705,7 @@ class ComposeStackActivities:
 
         services_scaled_down = {}
 
-        services: List[DockerService] = self.docker_client.services.list(
+        services: List[DockerService] = await self.docker.services.list(
             filters={"label": [f"com.docker.stack.namespace={stack.name}"]},
             status=True,
         )
@@ -759,7 +735,11 @@ class ComposeStackActivities:
             service_labels: dict[str, str] = service.attrs["Spec"].get("Labels", {})
             service_labels["status"] = "sleeping"
             service_labels["desired_replicas"] = str(desired_replicas)
-            service.update(mode={"Replicated": {"Replicas": 0}}, labels=service_labels)
+            await self.docker.run(
+                service.update,
+                mode={"Replicated": {"Replicas": 0}},
+                labels=service_labels,
+            )
             services_scaled_down[service.name] = 0
             print(
                 f"Scaled down service {Colors.YELLOW}{service.name}{Colors.ENDC} to 0 replicas"
@@ -778,7 +758,7 @@ class ComposeStackActivities:
         )
 
         services_scaled_up = {}
-        services: List[DockerService] = self.docker_client.services.list(
+        services: List[DockerService] = await self.docker.services.list(
             filters={"label": [f"com.docker.stack.namespace={stack.name}"]},
             status=True,
         )
@@ -814,7 +794,8 @@ class ComposeStackActivities:
             except ValueError:
                 desired_replicas = 1
 
-            service.update(
+            await self.docker.run(
+                service.update,
                 mode={"Replicated": {"Replicas": desired_replicas}},
                 labels=service_labels,
             )
@@ -0,0 +1,188 @@
+"""
+Cache of the files generated by the Nixpacks & Railpack planners.
+
+Generating the build plan & Dockerfile runs the planner on the whole repository, which takes
+tens of seconds, even though the result only depends on a few files of the repository
+(package manifests, lockfiles, runtime version files, ...), on the options of the builder
+and on the build env variables. These inputs are hashed and the generated files are stored
+in the cache under this hash, so that a deployment with the same inputs reuses them
+instead of running the planner again.
+"""
+
+import hashlib
+import os
+from typing import Dict, List, Optional
+
+from django.core.cache import cache
+
+from zane_api.utils import dict_sha256sum
+
+BUILD_PLAN_CACHE_KEY_PREFIX = "[zaneops::internal::build-plan]"
+BUILD_PLAN_CACHE_TIMEOUT = 7 * 24 * 60 * 60  # seconds
+
+# placeholder of the build directory in the cached files,
+# the repository is cloned in a different temporary directory for each deployment
+BUILD_DIRECTORY_PLACEHOLDER = "{{zaneops::build_directory}}"
+
+# files read by the planners to detect the language, the package manager,
+# the versions & the commands of the application
+PLANNER_INPUT_FILES = {
+    # javascript
+    "package.json",
+    "package-lock.json",
+    "yarn.lock",
+    ".yarnrc.yml",
+    "pnpm-lock.yaml",
+    "pnpm-workspace.yaml",
+    "bun.lock",
+    "bun.lockb",
+    "deno.json",
+    "deno.jsonc",
+    ".nvmrc",
+    ".node-version",
+    "turbo.json",
+    "nx.json",
+    # python
+    "requirements.txt",
+    "pyproject.toml",
+    "poetry.lock",
+    "uv.lock",
+    "Pipfile",
+    "Pipfile.lock",
+    "setup.py",
+    ".python-version",
+    "runtime.txt",
+    # go, rust, java, php, ruby, elixir, ...
+    "go.mod",
+    "go.sum",
+    "Cargo.toml",
+    "Cargo.lock",
+    "rust-toolchain",
+    "rust-toolchain.toml",
+    "pom.xml",
+    "build.gradle",
+    "build.gradle.kts",
+    "composer.json",
+    "composer.lock",
+    "Gemfile",
+    "Gemfile.lock",
+    ".ruby-version",
+    "mix.exs",
+    "mix.lock",
+    # generic
+    ".tool-versions",
+    "mise.toml",
+    "Procfile",
+    "Staticfile",
+    "nixpacks.toml",
+    "nixpacks.json",
+}
+
+# directories that are never read by the planners, and that can be huge if they are committed
+IGNORED_DIRECTORIES = {".git", "node_modules", ".venv", "venv", "vendor", "target"}
+
+
+def get_build_plan_cache_key(
+    planner: str,
+    binary_path: str,
+    build_directory: str,
+    command_args: List[str],
+    extra_inputs: Optional[dict] = None,
+) -> str:
+    """
+    Hash of the inputs of the planner:
+    - the version of the planner binary
+    - the arguments of the planner command (options of the builder & build env variables)
+    - the list of files at the root of the build directory, as some providers are detected
+      by the presence of a file (ex: `main.go`, `index.html`)
+    - the contents of the manifests & lockfiles of the build directory
+    """
+    try:
+        binary_stat = os.stat(binary_path)
+        binary_version = f"{binary_stat.st_size}-{binary_stat.st_mtime_ns}"
+    except OSError:
+        binary_version = None
+
+    inputs_hash = hashlib.sha256()
+    inputs_hash.update(
+        dict_sha256sum(
+            {
+                "binary_version": binary_version,
+                "command_args": [
+                    arg.replace(build_directory, BUILD_DIRECTORY_PLACEHOLDER)
+                    for arg in command_args
+                ],
+                "root_files": sorted(os.listdir(build_directory)),
+                "extra_inputs": extra_inputs or {},
+            }
+        ).encode()
+    )
+
+    for root, dirs, files in os.walk(build_directory):
+        dirs[:] = sorted(
+            directory
+            for directory in dirs
+            if directory not in IGNORED_DIRECTORIES
+            and directory not in (".nixpacks", ".railpack")
+        )
+        for name in sorted(files):
+            if name not in PLANNER_INPUT_FILES:
+                continue
+            path = os.path.join(root, name)
+            inputs_hash.update(os.path.relpath(path, build_directory).encode())
+            with open(path, "rb") as file:
+                inputs_hash.update(hashlib.file_digest(file, "sha256").digest())
+
+    return f"{BUILD_PLAN_CACHE_KEY_PREFIX}:{planner}:{inputs_hash.hexdigest()}"
+
+
+def read_generated_files(
+    directory: str, build_directory: str
+) -> Optional[Dict[str, str]]:
+    """
+    Contents of all the files generated in `directory`, relative to `directory`.
+    Returns `None` if one of the files is not a text file.
+    """
+    generated_files: Dict[str, str] = {}
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                with open(path, "r") as file:
+                    contents = file.read()
+            except UnicodeDecodeError:
+                return None
+            generated_files[os.path.relpath(path, directory)] = contents.replace(
+                build_directory, BUILD_DIRECTORY_PLACEHOLDER
+            )
+    return generated_files
+
+
+def write_generated_files(
+    directory: str, build_directory: str, generated_files: Dict[str, str]
+):
+    for relative_path, contents in generated_files.items():
+        path = os.path.join(directory, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            file.write(contents.replace(BUILD_DIRECTORY_PLACEHOLDER, build_directory))
+
+
+async def aget_cached_build_plan(
+    cache_key: str, directory: str, build_directory: str
+) -> bool:
+    """
+    Write the files cached under `cache_key` into `directory`,
+    returns `False` if they are not in the cache.
+    """
+    generated_files: Optional[Dict[str, str]] = await cache.aget(cache_key)
+    if generated_files is None:
+        return False
+    write_generated_files(directory, build_directory, generated_files)
+    return True
+
+
+async def acache_build_plan(cache_key: str, directory: str, build_directory: str):
+    generated_files = read_generated_files(directory, build_directory)
+    if generated_files is not None:
+        await cache.aset(cache_key, generated_files, BUILD_PLAN_CACHE_TIMEOUT)
@@ -0,0 +1,330 @@
+"""
+Pool of long-lived buildkit builders shared by all the environments of the node.
+
+- the pool has `BUILDKIT_BUILDER_POOL_SIZE` builders, created on their first build
+- a service is always built on the same builder when it is free (service affinity),
+  so that its local cache stays warm, and on another builder of the pool when it is busy
+- each builder runs at most `BUILDKIT_BUILDER_MAX_CONCURRENT_BUILDS` builds at once,
+  all for the same environment : builds use the network of the builder (`--network=host`),
+  so a builder is only ever connected to the network of one environment at a time
+- when a builder switches to another project, its cache mounts (`RUN --mount=type=cache`)
+  are pruned so that they are never shared between projects
+- builders unused for `BUILDKIT_BUILDER_IDLE_TIMEOUT` seconds are stopped by the system cleanup,
+  the next build starts them again with the cache stored in the build registry
+"""
+
+import asyncio
+import hashlib
+import time
+from datetime import timedelta
+from typing import List, Optional, cast
+
+import docker
+import docker.errors
+import redis.asyncio as redis
+from django.conf import settings
+
+from .constants import BUILDKIT_BUILDER_SEMAPHORE_KEY, DOCKER_BINARY_PATH
+from .docker_client import AsyncDockerClient
+from .semaphore import AsyncSemaphore
+
+BUILDKIT_BUILDER_POOL_PREFIX = "builder-zane-pool"
+BUILDKIT_BUILDERS_LAST_USED_KEY = "[zaneops::internal::buildkit-builders-last-used]"
+BUILDKIT_BUILDER_NETWORKS_KEY_PREFIX = "[zaneops::internal::buildkit-builder-networks]"
+BUILDKIT_BUILDER_PROJECTS_KEY = "[zaneops::internal::buildkit-builder-projects]"
+# how often to look for a free builder, when all of them are busy or used by other environments
+BUILDKIT_BUILDER_WAIT_INTERVAL = timedelta(seconds=2)
+
+# Assign the builder to the network of the holder, unless a build of another network holds it.
+# The assignments of holders without a lease on the builder (released or expired) are ignored.
+# KEYS: holders of the builder semaphore, networks of the builder (holder -> network)
+# ARGV: holder, network
+CLAIM_NETWORK_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local networks = redis.call('HGETALL', KEYS[2])
+for i = 1, #networks, 2 do
+    local holder, network = networks[i], networks[i + 1]
+    local expires_at = redis.call('ZSCORE', KEYS[1], holder)
+    if not expires_at or tonumber(expires_at) <= now then
+        redis.call('HDEL', KEYS[2], holder)
+    elseif holder ~= ARGV[1] and network ~= ARGV[2] then
+        return 0
+    end
+end
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+return 1
+"""
+
+# Remove the assignment of the holder,
+# returns the number of the other holders still using the same network.
+# KEYS: networks of the builder (holder -> network)
+# ARGV: holder, network
+UNCLAIM_NETWORK_SCRIPT = """
+redis.call('HDEL', KEYS[1], ARGV[1])
+local remaining = 0
+for _, network in ipairs(redis.call('HVALS', KEYS[1])) do
+    if network == ARGV[2] then
+        remaining = remaining + 1
+    end
+end
+return remaining
+"""
+
+
+def get_pool_builder_names() -> List[str]:
+    return [
+        f"{BUILDKIT_BUILDER_POOL_PREFIX}-{index}"
+        for index in range(max(settings.BUILDKIT_BUILDER_POOL_SIZE, 1))
+    ]
+
+
+def get_builder_container_name(builder_name: str) -> str:
+    # name of the container created by buildx for the `docker-container` driver
+    return f"buildx_buildkit_{builder_name}0"
+
+
+def get_builders_by_affinity(service_id: str) -> List[str]:
+    """
+    The builders of the pool, starting with the one the service is assigned to.
+    The assignment uses a stable hash, so it is the same for all the workers.
+    """
+    builders = get_pool_builder_names()
+    digest = hashlib.sha256(service_id.encode()).hexdigest()
+    start = int(digest, 16) % len(builders)
+    return builders[start:] + builders[:start]
+
+
+class BuildkitBuilderPool:
+    def __init__(self, docker_client: docker.DockerClient):
+        self.docker = AsyncDockerClient(docker_client)
+
+    def _get_semaphore(self, builder_name: str) -> AsyncSemaphore:
+        return AsyncSemaphore(
+            key=f"{BUILDKIT_BUILDER_SEMAPHORE_KEY}-{builder_name}",
+            limit=settings.BUILDKIT_BUILDER_MAX_CONCURRENT_BUILDS,
+            semaphore_timeout=settings.TEMPORALIO_WORKFLOW_EXECUTION_MAX_TIMEOUT,
+        )
+
+    def _get_client(self):
+        return redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+    async def _run_buildx(self, *args: str) -> tuple[int, str]:
+        process = await asyncio.create_subprocess_exec(
+            DOCKER_BINARY_PATH,
+            "buildx",
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+        stdout, _ = await process.communicate()
+        return cast(int, process.returncode), (stdout or b"").decode()
+
+    async def ensure_builder(self, builder_name: str):
+        """
+        Create the builder if it doesn't exist yet, and start its container if it was stopped.
+        """
+        returncode, _ = await self._run_buildx("inspect", "--bootstrap", builder_name)
+        if returncode == 0:
+            return
+
+        returncode, output = await self._run_buildx(
+            "create",
+            "--name",
+            builder_name,
+            "--driver",
+            "docker-container",
+            # garbage collect the local cache of the builder past this size,
+            # the cache is also stored in the build registry
+            "--buildkitd-flags",
+            f"--oci-worker-gc-keepstorage={settings.BUILDKIT_CACHE_MAX_STORAGE_MB}",
+            "--bootstrap",
+        )
+        if returncode != 0:
+            # another worker may have created the builder at the same time
+            returncode, _ = await self._run_buildx(
+                "inspect", "--bootstrap", builder_name
+            )
+        if returncode != 0:
+            raise Exception(f"Error when creating the builder {builder_name}: {output}")
+
+    async def remove_builder(self, builder_name: str) -> bool:
+        """
+        Remove the builder if it exists, returns `True` if it was removed.
+        """
+        returncode, _ = await self._run_buildx("inspect", builder_name)
+        if returncode != 0:
+            return False
+
+        returncode, output = await self._run_buildx("rm", "--force", builder_name)
+        if returncode != 0:
+            raise Exception(f"Error when deleting the builder {builder_name}: {output}")
+        return True
+
+    def _get_networks_key(self, builder_name: str) -> str:
+        return f"{BUILDKIT_BUILDER_NETWORKS_KEY_PREFIX}:{builder_name}"
+
+    async def _claim_network(
+        self, builder_name: str, holder: str, network: str
+    ) -> bool:
+        async with self._get_client() as client:
+            script = client.register_script(CLAIM_NETWORK_SCRIPT)
+            claimed = await script(
+                keys=[
+                    self._get_semaphore(builder_name).holders_key,
+                    self._get_networks_key(builder_name),
+                ],
+                args=[holder, network],
+            )
+        return claimed == 1
+
+    async def _unclaim_network(
+        self, builder_name: str, holder: str, network: str
+    ) -> int:
+        async with self._get_client() as client:
+            script = client.register_script(UNCLAIM_NETWORK_SCRIPT)
+            return await script(
+                keys=[self._get_networks_key(builder_name)], args=[holder, network]
+            )
+
+    async def _try_acquire(self, builder_name: str, holder: str, network: str) -> bool:
+        semaphore = self._get_semaphore(builder_name)
+        if not await semaphore.acquire(holder=holder, timeout=timedelta(0)):
+            return False
+        if not await self._claim_network(builder_name, holder, network):
+            # the builder is used by the builds of another environment
+            await semaphore.release(holder=holder)
+            return False
+        return True
+
+    async def _prune_cache_mounts_for_project(self, builder_name: str, project_id: str):
+        async with self._get_client() as client:
+            previous_project_id = await client.hget(
+                BUILDKIT_BUILDER_PROJECTS_KEY, builder_name
+            )
+            if previous_project_id is not None and previous_project_id != project_id:
+                returncode, output = await self._run_buildx(
+                    "prune",
+                    "--builder",
+                    builder_name,
+                    "--force",
+                    "--filter",
+                    "type=exec.cachemount",
+                )
+                if returncode != 0:
+                    raise Exception(
+                        f"Error when pruning the cache mounts of the builder {builder_name}: {output}"
+                    )
+            await client.hset(BUILDKIT_BUILDER_PROJECTS_KEY, builder_name, project_id)
+
+    async def _disconnect_other_networks(self, builder_name: str, network: str):
+        # networks left connected by a worker that died mid-build
+        container = await self.docker.api.inspect_container(
+            get_builder_container_name(builder_name)
+        )
+        for connected_network in container["NetworkSettings"]["Networks"]:
+            if connected_network.startswith("net-") and connected_network != network:
+                await self._disconnect_container(builder_name, connected_network)
+
+    async def _connect_network(self, builder_name: str, network: str):
+        await self._disconnect_other_networks(builder_name, network)
+        try:
+            await self.docker.api.connect_container_to_network(
+                get_builder_container_name(builder_name), network
+            )
+        except docker.errors.APIError as e:
+            # the network is already connected for another build of the environment
+            if "already exists" not in str(e):
+                raise
+
+    async def _disconnect_container(self, builder_name: str, network: str):
+        try:
+            await self.docker.api.disconnect_container_from_network(
+                get_builder_container_name(builder_name), network, force=True
+            )
+        except docker.errors.APIError:
+            pass  # the network or the builder have already been removed
+
+    async def acquire(
+        self, service_id: str, holder: str, network: str, project_id: str
+    ) -> str:
+        """
+        Reserve a builder for the build of the service & connect it to `network`,
+        returns the name of the builder to pass to `docker buildx build --builder`.
+        Waits until a builder is free, or only used by other builds of the same `network`.
+        """
+        builders = get_builders_by_affinity(service_id)
+        if settings.TESTING:
+            return builders[0]  # semaphores are causing issues in testing
+
+        builder_name: Optional[str] = None
+        while builder_name is None:
+            for name in builders:
+                if await self._try_acquire(name, holder, network):
+                    builder_name = name
+                    break
+            else:
+                await asyncio.sleep(BUILDKIT_BUILDER_WAIT_INTERVAL.total_seconds())
+
+        try:
+            await self.ensure_builder(builder_name)
+            await self._prune_cache_mounts_for_project(builder_name, project_id)
+            await self._connect_network(builder_name, network)
+        except BaseException:
+            await self._unclaim_network(builder_name, holder, network)
+            await self._get_semaphore(builder_name).release(holder=holder)
+            raise
+        return builder_name
+
+    async def release(self, builder_name: str, holder: str, network: str):
+        if settings.TESTING:
+            return
+        try:
+            remaining_builds = await self._unclaim_network(
+                builder_name, holder, network
+            )
+            if remaining_builds == 0:
+                await self._disconnect_container(builder_name, network)
+        finally:
+            async with self._get_client() as client:
+                await client.hset(
+                    BUILDKIT_BUILDERS_LAST_USED_KEY, builder_name, time.time()
+                )
+            await self._get_semaphore(builder_name).release(holder=holder)
+
+    async def disconnect_network(self, network: str):
+        """
+        Disconnect a deleted environment from all the builders of the pool.
+        """
+        if settings.TESTING:
+            return
+        for builder_name in get_pool_builder_names():
+            await self._disconnect_container(builder_name, network)
+
+    async def stop_idle_builders(self) -> List[str]:
+        """
+        Stop the builders that haven't been used for `BUILDKIT_BUILDER_IDLE_TIMEOUT` seconds,
+        returns the names of the stopped builders.
+        """
+        stopped_builders: List[str] = []
+        now = time.time()
+        async with self._get_client() as client:
+            last_used = await client.hgetall(BUILDKIT_BUILDERS_LAST_USED_KEY)
+            for builder_name in get_pool_builder_names():
+                if builder_name not in last_used:
+                    # unknown builder, or stopped previously
+                    continue
+                if now - float(last_used[builder_name]) < (
+                    settings.BUILDKIT_BUILDER_IDLE_TIMEOUT
+                ):
+                    continue
+                if len(await self._get_semaphore(builder_name).holders()) > 0:
+                    continue
+
+                returncode, output = await self._run_buildx("stop", builder_name)
+                if returncode != 0:
+                    print(f"Error when stopping the builder {builder_name}: {output}")
+                    continue
+                await client.hdel(BUILDKIT_BUILDERS_LAST_USED_KEY, builder_name)
+                stopped_builders.append(builder_name)
+        return stopped_builders
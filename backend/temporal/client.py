@@ -1,3 +1,4 @@
+import asyncio
 from datetime import timedelta
 import traceback
 from typing import Any, Awaitable, Callable, List, Optional, Union
@@ -51,6 +52,34 @@ class SignalWorkflowArg:
     workflow_id: str
 
 
+@dataclass
+class StartWorkflowResult:
+    workflow_id: str
+    error: Optional[BaseException] = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+class StartWorkflowsError(Exception):
+    """
+    Raised by `start_workflows` when some of the workflows failed to start,
+    after all the other workflows have been started.
+    """
+
+    def __init__(self, results: List[StartWorkflowResult]):
+        self.results = results
+        self.failures = [result for result in results if not result.success]
+        super().__init__(
+            f"Failed to start {len(self.failures)} of {len(results)} workflows: "
+            + ", ".join(
+                f"{failure.workflow_id} ({failure.error!r})"
+                for failure in self.failures
+            )
+        )
+
+
 class TemporalClient:
     _client: Optional[Client] = None
 
@@ -108,6 +137,94 @@ class TemporalClient:
             traceback.print_exc()
         return client.get_workflow_handle(id)
 
+    @classmethod
+    def start_workflows(
+        cls,
+        workflows: List[StartWorkflowArg],
+        max_concurrency=settings.TEMPORALIO_MAX_CONCURRENT_WORKFLOW_STARTS,
+        raise_on_error=True,
+    ) -> List[StartWorkflowResult]:
+        return async_to_sync(cls.astart_workflows)(
+            workflows, max_concurrency, raise_on_error
+        )
+
+    @classmethod
+    async def astart_workflows(
+        cls,
+        workflows: List[StartWorkflowArg],
+        max_concurrency=settings.TEMPORALIO_MAX_CONCURRENT_WORKFLOW_STARTS,
+        raise_on_error=True,
+    ) -> List[StartWorkflowResult]:
+        """
+        Start all the workflows concurrently on the shared client, with at most `max_concurrency`
+        requests in flight, instead of one round trip after another.
+        A workflow failing to start doesn't prevent the others from starting,
+        the results are returned in the same order as `workflows`.
+        If `raise_on_error` is True, a `StartWorkflowsError` is raised once all the workflows
+        have been tried if any of them failed to start, instead of returning the results.
+        """
+        await cls._ensure_client()
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def start(wf: StartWorkflowArg) -> StartWorkflowResult:
+            async with semaphore:
+                try:
+                    await cls.astart_workflow(
+                        wf.workflow,
+                        wf.payload,
+                        wf.workflow_id,
+                        start_delay=wf.start_delay,
+                    )
+                except Exception as e:
+                    print(f"Failed to start workflow {repr(e)} id={wf.workflow_id}")
+                    traceback.print_exc()
+                    return StartWorkflowResult(workflow_id=wf.workflow_id, error=e)
+            return StartWorkflowResult(workflow_id=wf.workflow_id)
+
+        results = await asyncio.gather(*(start(wf) for wf in workflows))
+        if raise_on_error and any(not result.success for result in results):
+            raise StartWorkflowsError(results)
+        return results
+
+    @classmethod
+    def signal_workflows(
+        cls,
+        signals: List[SignalWorkflowArg],
+        max_concurrency=settings.TEMPORALIO_MAX_CONCURRENT_WORKFLOW_STARTS,
+    ):
+        return async_to_sync(cls.asignal_workflows)(signals, max_concurrency)
+
+    @classmethod
+    async def asignal_workflows(
+        cls,
+        signals: List[SignalWorkflowArg],
+        max_concurrency=settings.TEMPORALIO_MAX_CONCURRENT_WORKFLOW_STARTS,
+    ):
+        """
+        Send all the signals concurrently, with at most `max_concurrency` requests in flight.
+        Like `aworkflow_signal`, a signal that cannot be delivered because of an `RPCError`
+        (ex: the workflow has already completed) is silently ignored.
+        Any other error is raised once all the signals have been sent.
+        """
+        await cls._ensure_client()
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def send(signal: SignalWorkflowArg):
+            async with semaphore:
+                await cls.aworkflow_signal(
+                    workflow=signal.workflow,  # type: ignore
+                    workflow_id=signal.workflow_id,
+                    signal=signal.signal,
+                    arg=signal.input,
+                )
+
+        results = await asyncio.gather(
+            *(send(signal) for signal in signals), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
     @classmethod
     def workflow_signal(
         cls,
@@ -140,6 +257,10 @@ class TemporalClient:
         arg: Any = temporalio.common._arg_unset,
         timeout: timedelta = timedelta(seconds=5),
     ):
+        """
+        Send a signal to a running workflow, errors returned by the temporal server
+        (`RPCError`, ex: the workflow doesn't exist or has already completed) are ignored.
+        """
         client = await cls._ensure_client()
         workflow_handle = client.get_workflow_handle_for(
             workflow=workflow, workflow_id=workflow_id
@@ -0,0 +1,183 @@
+"""
+Read the resource usage of local containers directly from cgroup v2 and `/proc`.
+
+The docker stats endpoint in non-streaming mode takes two samples one second apart
+before answering, so it takes 1-2s per container. Here the counters are read
+from the files of the container's cgroup, which takes a few microseconds, and the
+CPU percentage is computed against the previous sample of the same container.
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from django.conf import settings
+
+from .shared import ContainerMetrics
+
+
+@dataclass
+class CgroupSample:
+    cpu_usage_usec: int
+    timestamp: float
+
+
+class CgroupStatsReader:
+    # containers not sampled for longer than this are forgotten
+    SAMPLE_TTL = 10 * 60  # seconds
+    # delay between the two samples taken the first time a container is read
+    FIRST_SAMPLE_INTERVAL = 0.25  # seconds
+
+    def __init__(self, cgroup_root: str, proc_root: str):
+        self.cgroup_root = cgroup_root
+        self.proc_root = proc_root
+        self._samples: Dict[str, CgroupSample] = {}
+        self._cgroup_paths: Dict[str, str] = {}
+        self._pids: Dict[str, int] = {}
+
+    def get_cgroup_path(self, container_id: str) -> Optional[str]:
+        """
+        Find the cgroup of the container, with the `systemd` cgroup driver it is
+        `system.slice/docker-<id>.scope` and with the `cgroupfs` driver it is `docker/<id>`.
+        """
+        path = self._cgroup_paths.get(container_id)
+        if path is not None and os.path.isdir(path):
+            return path
+
+        for candidate in [
+            os.path.join(
+                self.cgroup_root, "system.slice", f"docker-{container_id}.scope"
+            ),
+            os.path.join(self.cgroup_root, "docker", container_id),
+        ]:
+            # `cgroup.controllers` only exists in cgroup v2 hierarchies
+            if os.path.isfile(os.path.join(candidate, "cgroup.controllers")):
+                self._cgroup_paths[container_id] = candidate
+                return candidate
+        self._cgroup_paths.pop(container_id, None)
+        return None
+
+    def has_previous_sample(self, container_id: str) -> bool:
+        return container_id in self._samples
+
+    def read(
+        self, container_id: str, pid: Optional[int] = None
+    ) -> Optional[ContainerMetrics]:
+        """
+        Read the metrics of the container, returns `None` if the container
+        is not running on this host or if its cgroup cannot be read.
+        `pid` is the pid of the main process of the container on the host
+        (`State.Pid` in `docker inspect`), it only needs to be passed on the first read.
+        The CPU percentage is `0` for the first sample of a container.
+        """
+        cgroup_path = self.get_cgroup_path(container_id)
+        if cgroup_path is None:
+            return None
+
+        if pid is not None:
+            self._pids[container_id] = pid
+        pid = self._pids.get(container_id)
+        if not pid:
+            return None
+
+        try:
+            now = time.monotonic()
+            cpu_usage_usec = int(
+                self._read_key_values(os.path.join(cgroup_path, "cpu.stat"))[
+                    "usage_usec"
+                ]
+            )
+            with open(os.path.join(cgroup_path, "memory.current")) as file:
+                memory_bytes = int(file.read().strip())
+            read_bytes, write_bytes = self._read_io_stat(
+                os.path.join(cgroup_path, "io.stat")
+            )
+            rx_bytes, tx_bytes = self._read_net_dev(pid)
+        except (OSError, KeyError, ValueError):
+            # the container may have been stopped while we were reading its cgroup
+            return None
+
+        cpu_percent = 0.0
+        previous = self._samples.get(container_id)
+        if previous is not None and now > previous.timestamp:
+            # `usage_usec` is the CPU time used on all CPUs,
+            # so 100% means one full CPU like with `docker stats`
+            cpu_percent = (
+                (cpu_usage_usec - previous.cpu_usage_usec)
+                / ((now - previous.timestamp) * 1_000_000)
+                * 100
+            )
+        self._samples[container_id] = CgroupSample(
+            cpu_usage_usec=cpu_usage_usec, timestamp=now
+        )
+        self._forget_old_samples(now)
+
+        return ContainerMetrics(
+            cpu_percent=max(cpu_percent, 0.0),
+            memory_bytes=memory_bytes,
+            disk_read_bytes=read_bytes,
+            disk_writes_bytes=write_bytes,
+            net_rx_bytes=rx_bytes,
+            net_tx_bytes=tx_bytes,
+        )
+
+    def _forget_old_samples(self, now: float):
+        expired = [
+            container_id
+            for container_id, sample in self._samples.items()
+            if now - sample.timestamp > self.SAMPLE_TTL
+        ]
+        for container_id in expired:
+            self._samples.pop(container_id, None)
+            self._cgroup_paths.pop(container_id, None)
+            self._pids.pop(container_id, None)
+
+    @staticmethod
+    def _read_key_values(path: str) -> Dict[str, str]:
+        with open(path) as file:
+            return dict(line.split(maxsplit=1) for line in file if line.strip())
+
+    @staticmethod
+    def _read_io_stat(path: str) -> tuple[int, int]:
+        """
+        Each line of `io.stat` is a device followed by its counters, ex:
+        `8:0 rbytes=1459200 wbytes=314773504 rios=192 wios=353 dbytes=0 dios=0`
+        """
+        read_bytes = 0
+        write_bytes = 0
+        with open(path) as file:
+            for line in file:
+                for field in line.split()[1:]:
+                    key, _, value = field.partition("=")
+                    if key == "rbytes":
+                        read_bytes += int(value)
+                    elif key == "wbytes":
+                        write_bytes += int(value)
+        return read_bytes, write_bytes
+
+    def _read_net_dev(self, pid: int) -> tuple[int, int]:
+        """
+        The network counters are per network namespace, they are read from
+        `/proc/<pid>/net/dev` of the main process of the container.
+        The pids in `cgroup.procs` cannot be used for this, as they are
+        relative to the pid namespace of the reader.
+        """
+        rx_bytes = 0
+        tx_bytes = 0
+        with open(os.path.join(self.proc_root, str(pid), "net", "dev")) as file:
+            # the first two lines are headers
+            for line in file.readlines()[2:]:
+                interface, _, counters = line.partition(":")
+                if interface.strip() == "lo":
+                    continue
+                values = counters.split()
+                rx_bytes += int(values[0])
+                tx_bytes += int(values[8])
+        return rx_bytes, tx_bytes
+
+
+cgroup_stats_reader = CgroupStatsReader(
+    cgroup_root=settings.HOST_CGROUP_ROOT,
+    proc_root=settings.HOST_PROC_ROOT,
+)
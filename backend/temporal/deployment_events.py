@@ -0,0 +1,234 @@
+"""
+Update the status of the deployments from the stream of docker events.
+
+The monitor schedule of each deployment polls the tasks of its swarm service on an
+interval, so a crashed container is only noticed at the next run of the schedule, and
+most runs find nothing new. `DeploymentEventsWatcher` subscribes to the docker events
+instead, and recomputes the status of a deployment as soon as one of its containers
+or its swarm service changes, the row is only written when the status has changed.
+The monitor schedules are kept as a slower reconciliation in case an event is missed.
+"""
+
+import asyncio
+import threading
+from typing import Any, Dict, Optional, Set
+
+import docker
+import docker.errors
+from asgiref.sync import sync_to_async
+from django import db
+from django.utils import timezone
+
+from zane_api.dtos import HealthCheckDto
+from zane_api.models import Deployment
+from zane_api.utils import Colors
+
+from .docker_client import AsyncDockerClient
+from .schedules.activities import deployment_log, get_deployment_swarm_status
+from .shared import SimpleDeploymentDetails
+
+# prefix of the swarm services of deployments, see `get_swarm_service_name_for_deployment`
+DEPLOYMENT_SERVICE_PREFIX = "srv-"
+
+
+class DeploymentEventsWatcher:
+    # the events received in this window are processed together, so that the burst of events
+    # sent for a single change (ex: `die` then `start` when a container restarts) is processed once
+    DEBOUNCE_INTERVAL = 0.5  # seconds
+    # delay before reconnecting when the stream of events has been cut
+    RECONNECT_INTERVAL = 5  # seconds
+    EVENT_FILTERS = {
+        "type": ["container", "service"],
+        "event": ["start", "die", "oom", "health_status", "update", "remove"],
+    }
+
+    def __init__(self, docker_client: docker.DockerClient):
+        self.docker = AsyncDockerClient(docker_client)
+        self._pending: Set[str] = set()
+        self._wakeup = asyncio.Event()
+        # time of the last event received, to replay the missed events after a reconnection
+        self._since: Optional[int] = None
+
+    async def run(self):
+        print("Watching docker events to update the status of deployments...🔄")
+        await asyncio.gather(self._listen(), self._process())
+
+    def handle_event(self, event: Dict[str, Any]):
+        self._since = event.get("time", self._since)
+        attributes = event.get("Actor", {}).get("Attributes", {})
+        if event.get("Type") == "service":
+            service_name = attributes.get("name")
+        else:
+            service_name = attributes.get("com.docker.swarm.service.name")
+
+        if service_name is not None and service_name.startswith(
+            DEPLOYMENT_SERVICE_PREFIX
+        ):
+            self._pending.add(service_name)
+            self._wakeup.set()
+
+    async def process_pending(self):
+        service_names = list(self._pending)
+        self._pending.clear()
+        results = await asyncio.gather(
+            *[self.refresh_deployment_status(name) for name in service_names],
+            return_exceptions=True,
+        )
+        for service_name, result in zip(service_names, results):
+            if isinstance(result, Exception):
+                print(
+                    f"{Colors.RED}Failed to update the status of the deployment of service `{service_name}`: {result}{Colors.ENDC}"
+                )
+        await sync_to_async(db.close_old_connections)()
+
+    async def refresh_deployment_status(
+        self, service_name: str
+    ) -> Optional[Deployment.DeploymentStatus]:
+        """
+        Recompute the status of the deployment of the swarm service, returns the new status
+        if it has changed, or `None` if it hasn't changed or if it cannot be monitored.
+        """
+        try:
+            swarm_service = await self.docker.services.get(service_name)
+        except docker.errors.NotFound:
+            # the service has been removed along with its deployment
+            return None
+
+        labels: dict = swarm_service.attrs["Spec"].get("Labels", {})
+        deployment_hash = labels.get("deployment_hash")
+        # sleeping services have been scaled down on purpose
+        if deployment_hash is None or labels.get("status") == "sleeping":
+            return None
+
+        deployment = (
+            await Deployment.objects.filter(
+                hash=deployment_hash,
+                is_current_production=True,
+            )
+            .exclude(
+                status__in=[
+                    Deployment.DeploymentStatus.SLEEPING,
+                    Deployment.DeploymentStatus.REMOVED,
+                ]
+            )
+            .select_related("service", "service__healthcheck")
+            .afirst()
+        )
+        if deployment is None:
+            return None
+
+        healthcheck = deployment.service.healthcheck
+        deployment_status, deployment_status_reason = await get_deployment_swarm_status(
+            self.docker,
+            swarm_service,
+            deployment_hash=deployment.hash,
+            healthcheck=(
+                HealthCheckDto.from_dict(
+                    dict(
+                        type=healthcheck.type,
+                        value=healthcheck.value,
+                        timeout_seconds=healthcheck.timeout_seconds,
+                        interval_seconds=healthcheck.interval_seconds,
+                        id=healthcheck.id,
+                        associated_port=healthcheck.associated_port,
+                    )
+                )
+                if healthcheck is not None
+                else None
+            ),
+        )
+        if (
+            deployment_status == deployment.status
+            and deployment_status_reason == deployment.status_reason
+        ):
+            return None
+
+        # the status may have been changed by a workflow in the meantime
+        updated = await Deployment.objects.filter(
+            pk=deployment.pk, status=deployment.status
+        ).aupdate(
+            status=deployment_status,
+            status_reason=deployment_status_reason,
+            updated_at=timezone.now(),
+        )
+        if updated == 0:
+            return None
+
+        status_color = (
+            Colors.GREEN
+            if deployment_status == Deployment.DeploymentStatus.HEALTHY
+            else Colors.RED
+        )
+        await deployment_log(
+            deployment=SimpleDeploymentDetails(
+                hash=deployment.hash,
+                service_id=deployment.service.id,
+                project_id=deployment.service.project_id,
+            ),
+            message=f"Deployment {Colors.ORANGE}{deployment.hash}{Colors.ENDC} "
+            f"is now {status_color}{deployment_status}{Colors.ENDC} "
+            f"| reason : {Colors.GREY}{deployment_status_reason}{Colors.ENDC}",
+            error=deployment_status != Deployment.DeploymentStatus.HEALTHY,
+        )
+        return deployment_status
+
+    async def _process(self):
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.DEBOUNCE_INTERVAL)
+            self._wakeup.clear()
+            await self.process_pending()
+
+    async def _listen(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            stream = None
+            try:
+                stream = await self.docker.run(
+                    self.docker.client.events,
+                    since=self._since,
+                    filters=self.EVENT_FILTERS,
+                    decode=True,
+                )
+                disconnected = loop.create_future()
+                # the stream is blocking and never ends, it is read in its own thread
+                threading.Thread(
+                    target=self._consume,
+                    args=(stream, loop, disconnected),
+                    name="docker-events",
+                    daemon=True,
+                ).start()
+                print("Connected to the docker events stream ✅")
+                await disconnected
+            except asyncio.CancelledError:
+                if stream is not None:
+                    stream.close()
+                raise
+            except Exception as e:
+                print(f"{Colors.RED}Lost the docker events stream: {e}{Colors.ENDC}")
+            await asyncio.sleep(self.RECONNECT_INTERVAL)
+
+    def _consume(
+        self,
+        stream,
+        loop: asyncio.AbstractEventLoop,
+        disconnected: asyncio.Future,
+    ):
+        error: Optional[Exception] = None
+        try:
+            for event in stream:
+                loop.call_soon_threadsafe(self.handle_event, event)
+        except Exception as e:
+            error = e
+        finally:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(
+                    self._set_disconnected,
+                    disconnected,
+                    error or ConnectionError("the stream has been closed"),
+                )
+
+    @staticmethod
+    def _set_disconnected(disconnected: asyncio.Future, error: Exception):
+        if not disconnected.done():
+            disconnected.set_exception(error)
@@ -0,0 +1,90 @@
+"""
+Non-blocking wrapper around the docker client for Temporal activities.
+
+docker-py only has a blocking API, calling it directly inside an `async def` activity
+stalls the whole event loop of the worker : the other activities running concurrently,
+their heartbeats, and the polling of new tasks all wait for the docker daemon to answer.
+`AsyncDockerClient` runs each call in a thread pool shared by all the activities,
+the pool is bounded so that a burst of activities cannot open an unlimited
+number of connections to the docker socket.
+
+Usage:
+
+    docker = AsyncDockerClient(get_docker_client())
+    service = await docker.services.get(name)
+    tasks = await docker.run(service.tasks, filters={"desired-state": "running"})
+"""
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+import docker
+from django.conf import settings
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_docker_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.DOCKER_CLIENT_MAX_CONCURRENCY,
+            thread_name_prefix="docker-client",
+        )
+    return _executor
+
+
+async def run_in_docker_executor(
+    func: Callable[..., T], /, *args: Any, **kwargs: Any
+) -> T:
+    """
+    Run a blocking function in the thread pool of the docker client,
+    the context variables are propagated like with `asyncio.to_thread`.
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_docker_executor(),
+        functools.partial(ctx.run, func, *args, **kwargs),
+    )
+
+
+class AsyncDockerCollection:
+    """
+    Async version of a docker-py collection (`client.services`, `client.containers`, ...),
+    every method of the collection returns an awaitable instead of blocking.
+    """
+
+    def __init__(self, collection: Any):
+        self._collection = collection
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        method = getattr(self._collection, name)
+
+        async def call(*args: Any, **kwargs: Any):
+            return await run_in_docker_executor(method, *args, **kwargs)
+
+        return call
+
+
+class AsyncDockerClient:
+    def __init__(self, client: docker.DockerClient):
+        self.client = client
+        self.services = AsyncDockerCollection(client.services)
+        self.containers = AsyncDockerCollection(client.containers)
+        self.images = AsyncDockerCollection(client.images)
+        self.volumes = AsyncDockerCollection(client.volumes)
+        self.configs = AsyncDockerCollection(client.configs)
+        self.networks = AsyncDockerCollection(client.networks)
+        self.api = AsyncDockerCollection(client.api)
+
+    async def run(self, func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking call on a docker object (ex: `service.update`, `container.stats`)
+        """
+        return await run_in_docker_executor(func, *args, **kwargs)
@@ -1,8 +1,10 @@
 import asyncio
 import base64
+import hashlib
 import os
 import shlex
 import shutil
+from dataclasses import asdict
 
 from typing import Any, Dict, List, Literal, Optional, TypedDict, cast
 from docker.models.services import Service as DockerService
@@ -13,10 +15,10 @@ from .shared import DeploymentDetails, ContainerMetrics
 
 from zane_api.utils import (
     cache_result,
+    dict_sha256sum,
     excerpt,
     escape_ansi,
 )
-from search.loki_client import LokiSearchClient
 from search.dtos import RuntimeLogDto, RuntimeLogLevel, RuntimeLogSource
 from django.conf import settings
 from django.utils import timezone
@@ -43,6 +45,9 @@ from compose.dtos import (
     ComposeStackSnapshot,
 )
 from temporalio import activity
+from .log_sink import get_deployment_log_sink
+from .container_stats import cgroup_stats_reader
+from .docker_client import run_in_docker_executor
 
 docker_client: docker.DockerClient | None = None
 
@@ -50,7 +55,9 @@ docker_client: docker.DockerClient | None = None
 def get_docker_client():
     global docker_client
     if docker_client is None:
-        docker_client = docker.from_env()
+        docker_client = docker.from_env(
+            max_pool_size=settings.DOCKER_CLIENT_MAX_CONCURRENCY
+        )
     return docker_client
 
 
@@ -154,6 +161,76 @@ def get_buildkit_builder_resource_name(env_id: str):
     return f"builder-zane-{env_id.lower().replace('_', '-')}"
 
 
+# Docker image tags are limited to 128 characters
+MAX_IMAGE_TAG_LENGTH = 128
+
+
+def get_buildkit_cache_ref(
+    registry_domain: str, project_id: str, service_slug: str, env_name: str
+):
+    tag = env_name.lower()
+    if len(tag) > MAX_IMAGE_TAG_LENGTH:
+        # environment names can be longer than a tag, the hash keeps truncated names distinct
+        digest = hashlib.sha256(tag.encode()).hexdigest()[:12]
+        tag = f"{tag[: MAX_IMAGE_TAG_LENGTH - len(digest) - 1]}-{digest}"
+    return (
+        f"{registry_domain}/zane-build-cache/{project_id.lower()}/{service_slug}:{tag}"
+    )
+
+
+def get_buildkit_output_args(
+    image_name: str, push_to_registry: bool, insecure_registry: bool = False
+) -> List[str]:
+    """
+    With a build registry, buildkit pushes the image directly to the registry
+    from which it will be pulled by swarm, instead of exporting it as a tarball to load
+    into the local docker daemon and then pushing it from there.
+    """
+    if not push_to_registry:
+        return ["--output", f"type=docker,name={image_name}"]
+
+    output = f"type=image,name={image_name},push=true"
+    if insecure_registry:
+        output += ",registry.insecure=true"
+    return ["--output", output]
+
+
+def get_buildkit_registry_cache_args(
+    registry_domain: str,
+    project_id: str,
+    service_slug: str,
+    env_name: str,
+    base_env_name: Optional[str] = None,
+    insecure_registry: bool = False,
+) -> List[str]:
+    """
+    Arguments for `docker buildx build` to import & export the build cache of the service in the build registry,
+    so that the cache survives the builder being recreated and is shared between environments.
+    Each environment exports to its own cache ref, but also imports the cache of `base_env_name`
+    (the production environment), so that a new preview environment doesn't start from a cold cache.
+    """
+    # like for the image push, buildkit needs to be told to use plain http for a non secure registry
+    insecure = ",registry.insecure=true" if insecure_registry else ""
+    cache_ref = get_buildkit_cache_ref(
+        registry_domain, project_id, service_slug, env_name
+    )
+    args = ["--cache-from", f"type=registry,ref={cache_ref}{insecure}"]
+    if base_env_name is not None and base_env_name != env_name:
+        base_cache_ref = get_buildkit_cache_ref(
+            registry_domain, project_id, service_slug, base_env_name
+        )
+        args.extend(["--cache-from", f"type=registry,ref={base_cache_ref}{insecure}"])
+
+    # a failure to export the cache shouldn't fail the build
+    args.extend(
+        [
+            "--cache-to",
+            f"type=registry,ref={cache_ref},mode={settings.BUILDKIT_CACHE_MODE},ignore-error=true{insecure}",
+        ]
+    )
+    return args
+
+
 def get_swarm_service_name_for_deployment(
     deployment_hash: str,
     project_id: str,
@@ -253,8 +330,6 @@ async def deployment_log(
             raise TypeError(
                 f"type {type(deployment)} doesn't match one of {[DeploymentLike, DeploymentResultLike, StackDeploymentLike, StackServiceLike]}"
             )
-    search_client = LokiSearchClient(host=settings.LOKI_HOST)
-
     MAX_COLORED_CHARS = 1000
     messages = []
     if isinstance(message, list):
@@ -280,9 +355,7 @@ async def deployment_log(
             )
         )
 
-    search_client.bulk_insert(
-        docs=logs,
-    )
+    await get_deployment_log_sink().put(logs)
 
 
 class GitDeploymentStep(Enum):
@@ -411,6 +484,45 @@ def get_build_environment_variables_for_deployment(
     return build_envs
 
 
+def get_build_inputs_hash(deployment: DeploymentDetails, registry_domain: str) -> str:
+    """
+    Hash of everything besides the commit that affects the image built for a git deployment:
+    the builder & its options, the build env variables & the registry the image is pushed to.
+    The system env variables are left out, as they change with each deployment.
+    The project & the git app are part of the hash too, so that the image of a private
+    repository is never reused by a project that may not have access to it.
+    """
+    service = deployment.service
+    builder_options = {
+        "DOCKERFILE": service.dockerfile_builder_options,
+        "STATIC_DIR": service.static_dir_builder_options,
+        "NIXPACKS": service.nixpacks_builder_options,
+        "RAILPACK": service.railpack_builder_options,
+    }.get(cast(str, service.builder))
+
+    system_env_keys = {env.key for env in service.system_env_variables}
+    build_envs = {
+        key: value
+        for key, value in get_build_environment_variables_for_deployment(
+            deployment
+        ).items()
+        if key not in system_env_keys
+    }
+    return dict_sha256sum(
+        {
+            "zaneops_version": settings.COMMIT_SHA,
+            "builder": service.builder,
+            "builder_options": (
+                asdict(builder_options) if builder_options is not None else None
+            ),
+            "build_envs": build_envs,
+            "registry_domain": registry_domain,
+            "project_id": service.project_id,
+            "git_app_id": service.git_app.id if service.git_app is not None else None,
+        }
+    )
+
+
 def get_swarm_service_aliases_ips_on_network(
     services: List[str], network_name: str
 ) -> Dict[str, str]:
@@ -593,7 +705,10 @@ async def get_compose_stack_swarm_service_status(
     completed_replicas = service_status.get("CompletedTasks", 0)
 
     # Get all tasks for the tasks list
-    tasks = [DockerSwarmTask.from_dict(task) for task in service.tasks()]
+    tasks = [
+        DockerSwarmTask.from_dict(task)
+        for task in await run_in_docker_executor(service.tasks)
+    ]
 
     if is_job:
         # For jobs, healthy means completed >= desired
@@ -773,9 +888,13 @@ async def collect_swarm_service_metrics(
     if mode_type.endswith("job"):
         return None
 
+    # the docker client is blocking, its calls are run in the docker thread pool
+    # so that the metrics of many services can be collected concurrently
     task_list = [
         DockerSwarmTask.from_dict(task)
-        for task in service.tasks(filters={"desired-state": "running"})
+        for task in await run_in_docker_executor(
+            service.tasks, filters={"desired-state": "running"}
+        )
     ]
     if len(task_list) == 0:
         return None
@@ -826,15 +945,35 @@ async def collect_swarm_service_metrics(
 async def collect_container_metrics(
     container_id: str, docker_client: docker.DockerClient
 ):
+    # read the cgroup of the container if it runs on this host,
+    # it is much faster than asking docker
+    if cgroup_stats_reader.get_cgroup_path(container_id) is not None:
+        if not cgroup_stats_reader.has_previous_sample(container_id):
+            # the pid of the container is needed to read its network counters,
+            # and the CPU usage is computed between two samples
+            try:
+                container = await run_in_docker_executor(
+                    docker_client.containers.get, container_id
+                )
+            except docker.errors.NotFound:
+                return None  # this container may have been deleted already
+            cgroup_stats_reader.read(container_id, pid=container.attrs["State"]["Pid"])
+            await asyncio.sleep(cgroup_stats_reader.FIRST_SAMPLE_INTERVAL)
+        metrics = cgroup_stats_reader.read(container_id)
+        if metrics is not None:
+            return metrics
+
     try:
-        container = docker_client.containers.get(container_id)
+        container = await run_in_docker_executor(
+            docker_client.containers.get, container_id
+        )
     except docker.errors.NotFound:
         return None  # this container may have been deleted already
     else:
         if container.status != "running":
             return  # we cannot get the stats of a dead container
 
-        stats = container.stats(stream=False)  # type: Any
+        stats = await run_in_docker_executor(container.stats, stream=False)  # type: Any
 
         # Calculate CPU usage percentage
         cpu_delta = (
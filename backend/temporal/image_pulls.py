@@ -0,0 +1,146 @@
+"""
+Coordinator of the image pulls of deployments.
+
+- concurrent deployments of the same image (ex: preview environments) share a single pull
+  instead of each pulling the same image in parallel
+- before pulling, the digest of the image in the registry is compared to the one of the local image,
+  so redeploying an image that did not change does not pull it again
+- the progress of the pull is streamed to the deployment logs as it is received
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, cast
+
+import docker
+import docker.errors
+
+from zane_api.utils import dict_sha256sum
+
+from .docker_client import AsyncDockerClient, run_in_docker_executor
+
+ProgressListener = Callable[[str], Awaitable[Any]]
+
+# statuses of the pull progress that are reported continuously while a layer is being
+# downloaded/extracted, they would flood the logs
+NOISY_PULL_STATUSES = {"Downloading", "Extracting", "Waiting", "Verifying Checksum"}
+
+
+@dataclass
+class ImagePull:
+    listeners: List[ProgressListener] = field(default_factory=list)
+    task: Optional["asyncio.Task[bool]"] = None
+
+    async def notify(self, line: str):
+        for listener in list(self.listeners):
+            await listener(line)
+
+
+_in_flight_pulls: Dict[Tuple[str, str], ImagePull] = {}
+
+
+def format_pull_progress(chunk: Dict[str, Any]) -> Optional[str]:
+    status = chunk.get("status")
+    if status is None or status in NOISY_PULL_STATUSES:
+        return None
+    if chunk.get("id"):
+        return f"{chunk['id']}: {status}"
+    return status
+
+
+async def is_image_up_to_date(
+    docker_client: AsyncDockerClient, image: str, auth_config: Optional[dict]
+) -> bool:
+    """
+    Compare the digest of the image in the registry (the daemon only sends a HEAD request
+    for the manifest) to the digests of the local image.
+    """
+    try:
+        registry_data = await docker_client.images.get_registry_data(
+            image, auth_config=auth_config
+        )
+        local_image = await docker_client.images.get(image)
+    except docker.errors.DockerException:
+        # the image doesn't exist locally, or the registry cannot be reached,
+        # in both cases let the pull decide
+        return False
+
+    repo_digests: List[str] = local_image.attrs.get("RepoDigests") or []
+    return any(digest.endswith(f"@{registry_data.id}") for digest in repo_digests)
+
+
+async def _pull_image(
+    docker_client: AsyncDockerClient,
+    pull: ImagePull,
+    image: str,
+    auth_config: Optional[dict],
+) -> bool:
+    """
+    Returns `True` if the image was pulled, `False` if the local image was already up to date.
+    """
+    if await is_image_up_to_date(docker_client, image, auth_config):
+        return False
+
+    loop = asyncio.get_running_loop()
+    progress: asyncio.Queue[Optional[str]] = asyncio.Queue()
+
+    def stream_pull():
+        try:
+            for chunk in docker_client.client.api.pull(
+                image, stream=True, decode=True, auth_config=auth_config
+            ):
+                if "error" in chunk:
+                    raise docker.errors.APIError(
+                        chunk["error"], explanation=chunk["error"]
+                    )
+                line = format_pull_progress(chunk)
+                if line is not None:
+                    loop.call_soon_threadsafe(progress.put_nowait, line)
+        finally:
+            loop.call_soon_threadsafe(progress.put_nowait, None)
+
+    stream = asyncio.ensure_future(run_in_docker_executor(stream_pull))
+    while (line := await progress.get()) is not None:
+        await pull.notify(line)
+    await stream
+    return True
+
+
+async def pull_image(
+    docker_client: AsyncDockerClient,
+    image: str,
+    auth_config: Optional[dict] = None,
+    on_progress: Optional[ProgressListener] = None,
+    on_wait: Optional[Callable[[], Awaitable[Any]]] = None,
+) -> bool:
+    """
+    Pull `image`, or wait for the pull already in progress for the same image & credentials.
+    Returns `True` if the image was pulled, `False` if the local image was already up to date.
+
+    `on_progress` is called with each line of progress of the pull,
+    `on_wait` is called if the pull is shared with another deployment.
+    """
+    # the whole credentials are part of the key, a deployment with a wrong password
+    # should not succeed by waiting for the pull of a deployment with the right one
+    key = (image, dict_sha256sum(auth_config or {}))
+    pull = _in_flight_pulls.get(key)
+    if pull is None:
+        pull = ImagePull()
+        pull.task = asyncio.create_task(
+            _pull_image(docker_client, pull, image, auth_config)
+        )
+        pull.task.add_done_callback(lambda _: _in_flight_pulls.pop(key, None))
+        _in_flight_pulls[key] = pull
+    elif on_wait is not None:
+        await on_wait()
+
+    task = cast("asyncio.Task[bool]", pull.task)
+    if on_progress is not None:
+        pull.listeners.append(on_progress)
+    try:
+        # the pull is shielded so that a cancelled deployment
+        # does not cancel the pull of the other deployments waiting for it
+        return await asyncio.shield(task)
+    finally:
+        if on_progress is not None:
+            pull.listeners.remove(on_progress)
@@ -0,0 +1,160 @@
+"""
+Write-behind sink for deployment logs.
+
+Activities emit a lot of log lines (every step of a deployment, every attempt of a
+healthcheck, every line of build output), pushing each of them to Loki with its own
+HTTP request blocks the worker's event loop on one round trip per line.
+Instead, `deployment_log` enqueues the lines in a per event loop sink, which flushes
+them to Loki in batches, either when the batch is full or when the flush interval
+has elapsed, whichever comes first.
+The push itself runs in a thread so that the event loop is never blocked,
+and the queue is bounded so that producers wait when Loki cannot keep up.
+A batch that fails to be pushed is retried once, then dropped and counted in `dropped_lines`.
+"""
+
+import asyncio
+import weakref
+from typing import Optional, Sequence
+
+from temporalio.worker import (
+    ActivityInboundInterceptor,
+    ExecuteActivityInput,
+    Interceptor,
+)
+
+from django.conf import settings
+from search.dtos import RuntimeLogDto
+from search.loki_client import LokiSearchClient
+from zane_api.utils import Colors
+
+
+class DeploymentLogSink:
+    def __init__(
+        self,
+        max_batch_size: int = settings.LOKI_LOG_SINK_MAX_BATCH_SIZE,
+        flush_interval: float = settings.LOKI_LOG_SINK_FLUSH_INTERVAL,
+        max_pending: int = settings.LOKI_LOG_SINK_MAX_PENDING,
+    ):
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.search_client = LokiSearchClient(host=settings.LOKI_HOST)
+        self._queue: asyncio.Queue[RuntimeLogDto] = asyncio.Queue(maxsize=max_pending)
+        self._wakeup = asyncio.Event()
+        self._flushing = 0
+        self._task: Optional[asyncio.Task] = None
+        self.dropped_lines = 0
+
+    async def put(self, docs: Sequence[RuntimeLogDto]):
+        """
+        Enqueue log lines to be sent to Loki, waits if too many lines are pending.
+        """
+        for doc in docs:
+            await self._queue.put(doc)
+            if self._queue.qsize() >= self.max_batch_size:
+                self._wakeup.set()
+            self._ensure_running()
+
+    async def flush(self):
+        """
+        Send all the pending log lines right away and wait for them to be pushed.
+        """
+        if self._queue.empty() and (self._task is None or self._task.done()):
+            return
+        self._flushing += 1
+        self._wakeup.set()
+        try:
+            self._ensure_running()
+            await self._queue.join()
+        finally:
+            self._flushing -= 1
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        # The task stops when there is nothing left to send,
+        # it is restarted by the next call to `put` or `flush`
+        while not self._queue.empty():
+            if self._flushing == 0 and self._queue.qsize() < self.max_batch_size:
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), timeout=self.flush_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+            self._wakeup.clear()
+
+            batch: list[RuntimeLogDto] = []
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                await self._push(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _push(self, batch: list[RuntimeLogDto]):
+        try:
+            await asyncio.to_thread(self.search_client.bulk_insert, docs=batch)
+            return
+        except Exception as e:
+            print(
+                f"{Colors.ORANGE}Failed to send {len(batch)} log lines to loki, retrying: {e}{Colors.ENDC}"
+            )
+
+        await asyncio.sleep(self.flush_interval)
+        try:
+            await asyncio.to_thread(self.search_client.bulk_insert, docs=batch)
+        except Exception as e:
+            self.dropped_lines += len(batch)
+            print(
+                f"{Colors.RED}Failed to send {len(batch)} log lines to loki after retrying, dropping them "
+                f"({self.dropped_lines} lines dropped in total): {e}{Colors.ENDC}"
+            )
+
+
+_sinks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, DeploymentLogSink]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_deployment_log_sink() -> DeploymentLogSink:
+    """
+    Return the log sink of the current event loop, asyncio primitives
+    are bound to the loop they are used in, so each loop get its own sink.
+    """
+    loop = asyncio.get_running_loop()
+    sink = _sinks.get(loop)
+    if sink is None:
+        sink = DeploymentLogSink()
+        _sinks[loop] = sink
+    return sink
+
+
+async def flush_deployment_logs():
+    loop = asyncio.get_running_loop()
+    sink = _sinks.get(loop)
+    if sink is not None:
+        await sink.flush()
+
+
+class DeploymentLogSinkActivityInterceptor(ActivityInboundInterceptor):
+    async def execute_activity(self, input: ExecuteActivityInput):
+        try:
+            return await super().execute_activity(input)
+        finally:
+            # flush even if the activity has been cancelled or has failed,
+            # so that the last log lines are visible as soon as the activity ends
+            await asyncio.shield(flush_deployment_logs())
+
+
+class DeploymentLogSinkInterceptor(Interceptor):
+    def intercept_activity(
+        self, next: ActivityInboundInterceptor
+    ) -> ActivityInboundInterceptor:
+        return DeploymentLogSinkActivityInterceptor(next)
+
+    def workflow_interceptor_class(self, input):
+        return None
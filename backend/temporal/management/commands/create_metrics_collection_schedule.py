@@ -0,0 +1,101 @@
+import asyncio
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.conf import settings
+
+from ...client import get_temporalio_client
+from ...workflows import CollectFleetMetricsWorkflow
+from temporalio.client import (
+    Client,
+    Schedule,
+    ScheduleActionStartWorkflow,
+    ScheduleIntervalSpec,
+    ScheduleSpec,
+    ScheduleUpdateInput,
+    ScheduleUpdate,
+    ScheduleAlreadyRunningError,
+)
+from temporalio.service import RPCError
+
+METRICS_COLLECTION_INTERVAL = timedelta(seconds=30)
+
+# prefix of the schedules created per deployment & per compose stack by older versions
+LEGACY_METRICS_SCHEDULE_PREFIX = "schedule-metrics-"
+
+
+async def update_schedule_simple(input: ScheduleUpdateInput):
+    schedule = input.description.schedule
+
+    # Update the schedule
+    new_schedule = Schedule(
+        action=schedule.action,
+        spec=ScheduleSpec(
+            intervals=[ScheduleIntervalSpec(every=METRICS_COLLECTION_INTERVAL)]
+        ),
+        # Keep other properties the same
+        policy=schedule.policy,
+        state=schedule.state,
+    )
+
+    return ScheduleUpdate(schedule=new_schedule)
+
+
+async def delete_legacy_metrics_schedules(client: Client):
+    legacy_schedule_ids = [
+        schedule.id
+        async for schedule in await client.list_schedules()
+        if schedule.id.startswith(LEGACY_METRICS_SCHEDULE_PREFIX)
+    ]
+    await asyncio.gather(
+        *[
+            client.get_schedule_handle(schedule_id).delete()
+            for schedule_id in legacy_schedule_ids
+        ],
+        return_exceptions=True,
+    )
+    print(f"Deleted {len(legacy_schedule_ids)} legacy metrics schedules")
+
+
+async def create_metrics_collection_schedule():
+    client = await get_temporalio_client()
+
+    schedule_id = "fleet-metrics-collection"
+    schedule = Schedule(
+        action=ScheduleActionStartWorkflow(
+            CollectFleetMetricsWorkflow.run,
+            id="collect-fleet-metrics",
+            task_queue=settings.TEMPORALIO_SCHEDULE_TASK_QUEUE,
+        ),
+        spec=ScheduleSpec(
+            intervals=[ScheduleIntervalSpec(every=METRICS_COLLECTION_INTERVAL)]
+        ),
+    )
+
+    handle = client.get_schedule_handle(schedule_id)
+
+    try:
+        await handle.update(update_schedule_simple, rpc_timeout=timedelta(seconds=5))
+    except RPCError:
+        # probably because the schedule doesn't exist
+        try:
+            await client.create_schedule(
+                schedule_id,
+                schedule,
+                rpc_timeout=timedelta(seconds=5),
+            )
+        except ScheduleAlreadyRunningError:
+            # because the schedule already exists and is running, we can ignore it
+            pass
+    except ScheduleAlreadyRunningError:
+        # because the schedule already exists  and is running, we can ignore it
+        pass
+
+    await delete_legacy_metrics_schedules(client)
+
+
+class Command(BaseCommand):
+    help = "Create the schedule collecting the metrics of all services & compose stacks"
+
+    def handle(self, *args, **options):
+        asyncio.run(create_metrics_collection_schedule())
@@ -1,6 +1,6 @@
 import asyncio
 
-from typing import Dict, List, TypedDict
+from typing import Callable, Dict, List, Optional, Sequence, TypedDict
 
 from .shared import DeploymentDetails, ProxyURLRoute
 from zane_api.models import Deployment, URL
@@ -300,34 +300,48 @@ class ZaneProxyClient:
         }
 
     @classmethod
-    def upsert_service_url(
+    def _apply_routes_changes(
         cls,
-        url: URLDto,
-        current_deployment: DeploymentDetails | Deployment,
-        previous_deployment: Deployment | DeploymentDetails | None,
-    ) -> bool:
+        upserted_routes: Sequence[dict] = (),
+        should_remove: Optional[Callable[[dict], bool]] = None,
+    ) -> List[dict]:
+        """
+        Apply all the changes to the routes of the proxy in a single transaction :
+        the routes are fetched once, modified in memory and sent back with one `PATCH`
+        guarded by `If-Match`, so caddy only reloads its config once for the whole batch.
+        The transaction is retried as a whole if the routes have been modified in the meantime.
+        Returns the routes that have been removed.
+        """
         attempts = 0
 
         while attempts < cls.MAX_ETAG_ATTEMPTS:
             attempts += 1
-            # now we create or modify the config for the URL
             response = requests.get(
                 f"{settings.CADDY_PROXY_ADMIN_HOST}/id/zane-url-root/routes", timeout=5
             )
             etag = response.headers.get("etag")
+            current_routes: list[dict] = response.json()
 
-            routes: list[dict[str, dict]] = [
+            upserted_ids = {route["@id"] for route in upserted_routes}
+            removed_routes = [
                 route
-                for route in response.json()
-                if route["@id"]
-                != cls._get_id_for_service_url(current_deployment.service.id, url)
+                for route in current_routes
+                if should_remove is not None
+                and should_remove(route)
+                and route["@id"] not in upserted_ids
             ]
-            new_url = cls._get_request_for_service_url(
-                url=url,
-                current_deployment=current_deployment,
-                previous_deployment=previous_deployment,
-            )
-            routes.append(new_url)
+            removed_ids = {route["@id"] for route in removed_routes}
+
+            if len(upserted_routes) == 0 and len(removed_routes) == 0:
+                # nothing to change, do not reload the proxy
+                return []
+
+            routes = [
+                route
+                for route in current_routes
+                if route["@id"] not in upserted_ids and route["@id"] not in removed_ids
+            ]
+            routes.extend(upserted_routes)
             routes = cls._sort_routes(routes)  # type: ignore
 
             response = requests.patch(
@@ -338,63 +352,82 @@ class ZaneProxyClient:
             )
             if response.status_code == status.HTTP_412_PRECONDITION_FAILED:
                 continue
-            return True
+            return removed_routes
 
         raise ZaneProxyEtagError(
-            f"Failed inserting the url {url} in the proxy because `Etag` precondition failed"
+            "Failed updating the routes of the proxy because `Etag` precondition failed"
         )
 
     @classmethod
-    def get_uri_for_service_url(cls, service_id: str, url: URLDto | URL):
-        return f"{settings.CADDY_PROXY_ADMIN_HOST}/id/{cls._get_id_for_service_url(service_id, url)}"
+    def upsert_service_urls(
+        cls,
+        urls: Sequence[URLDto],
+        current_deployment: DeploymentDetails | Deployment,
+        previous_deployment: Deployment | DeploymentDetails | None,
+        removed_urls: Sequence[URLDto] = (),
+    ) -> bool:
+        """
+        Create or update all the `urls` of the service, and remove the `removed_urls`
+        in the same transaction.
+        """
+        service_id = current_deployment.service.id
+        removed_ids = {
+            cls._get_id_for_service_url(service_id, url) for url in removed_urls
+        }
+        cls._apply_routes_changes(
+            upserted_routes=[
+                cls._get_request_for_service_url(
+                    url=url,
+                    current_deployment=current_deployment,
+                    previous_deployment=previous_deployment,
+                )
+                for url in urls
+            ],
+            should_remove=lambda route: route["@id"] in removed_ids,
+        )
+        return True
 
     @classmethod
-    def remove_service_url(cls, service_id: str, url: URLDto):
-        attempts = 0
-
-        while attempts < cls.MAX_ETAG_ATTEMPTS:
-            attempts += 1
-            response = requests.get(
-                cls.get_uri_for_service_url(service_id, url),
-                timeout=5,
-            )
-            etag = response.headers.get("etag")
+    def upsert_service_url(
+        cls,
+        url: URLDto,
+        current_deployment: DeploymentDetails | Deployment,
+        previous_deployment: Deployment | DeploymentDetails | None,
+    ) -> bool:
+        return cls.upsert_service_urls(
+            [url],
+            current_deployment=current_deployment,
+            previous_deployment=previous_deployment,
+        )
 
-            if response.status_code != status.HTTP_404_NOT_FOUND:
-                response = requests.delete(
-                    cls.get_uri_for_service_url(service_id, url),
-                    headers={"If-Match": etag},
-                    timeout=5,
-                )
-                if response.status_code == status.HTTP_412_PRECONDITION_FAILED:
-                    continue
-            return
+    @classmethod
+    def get_uri_for_service_url(cls, service_id: str, url: URLDto | URL):
+        return f"{settings.CADDY_PROXY_ADMIN_HOST}/id/{cls._get_id_for_service_url(service_id, url)}"
 
-        raise ZaneProxyEtagError(
-            f"Failed deleting the url {url} in the proxy because `Etag` precondtion failed"
+    @classmethod
+    def remove_service_urls(cls, service_id: str, urls: Sequence[URLDto]):
+        removed_ids = {cls._get_id_for_service_url(service_id, url) for url in urls}
+        cls._apply_routes_changes(
+            should_remove=lambda route: route["@id"] in removed_ids,
         )
 
+    @classmethod
+    def remove_service_url(cls, service_id: str, url: URLDto):
+        cls.remove_service_urls(service_id, [url])
+
     @classmethod
     def cleanup_old_service_urls(cls, deployment: DeploymentDetails):
         """
         Remove old URLs that are not attached to the service anymore
         """
         service = deployment.service
-        response = requests.get(
-            f"{settings.CADDY_PROXY_ADMIN_HOST}/id/zane-url-root/routes", timeout=5
-        )
-        service_url_ids = [
+        service_url_ids = {
             cls._get_id_for_service_url(service.id, url) for url in service.urls
-        ]
-        for route in response.json():
-            if (
-                route["@id"].startswith(service.id)
-                and route["@id"] not in service_url_ids
-            ):
-                requests.delete(
-                    f"{settings.CADDY_PROXY_ADMIN_HOST}/id/{route['@id']}",
-                    timeout=5,
-                )
+        }
+        cls._apply_routes_changes(
+            should_remove=lambda route: route["@id"].startswith(service.id)
+            and route["@id"] not in service_url_ids,
+        )
 
     @classmethod
     def remove_deployment_url(cls, deployment_hash: str, domain: str):
@@ -556,35 +589,21 @@ class ZaneProxyClient:
     ):
         return f"{settings.CADDY_PROXY_ADMIN_HOST}/id/{cls._get_id_for_compose_stack_service_url(stack_id, service_name, url)}"
 
-    @staticmethod
-    async def _delete_route(route_id: str):
-        requests.delete(
-            f"{settings.CADDY_PROXY_ADMIN_HOST}/id/{route_id}",
-            timeout=5,
-        )
-
     @classmethod
     async def delete_all_stack_urls(
         cls,
         stack_id: str,
     ) -> List[ProxyURLRoute]:
-        response = requests.get(
-            f"{settings.CADDY_PROXY_ADMIN_HOST}/id/zane-url-root/routes", timeout=5
-        )
-        await asyncio.gather(
-            *[
-                cls._delete_route(route["@id"])
-                for route in response.json()
-                if route["@id"].startswith(stack_id)
-            ]
+        removed_routes = await asyncio.to_thread(
+            cls._apply_routes_changes,
+            should_remove=lambda route: route["@id"].startswith(stack_id),
         )
         return [
             ProxyURLRoute(
                 domain=route["match"][0]["host"][0],
                 base_path=route["match"][0]["path"][0],
             )
-            for route in response.json()
-            if route["@id"].startswith(stack_id)
+            for route in removed_routes
         ]
 
     @staticmethod
@@ -599,11 +618,7 @@ class ZaneProxyClient:
         stack_id: str,
         all_urls: Dict[str, List[ComposeStackUrlRouteDto]],
     ) -> List[tuple[str, str, str]]:
-        response = requests.get(
-            f"{settings.CADDY_PROXY_ADMIN_HOST}/id/zane-url-root/routes", timeout=5
-        )
-
-        service_url_routes = [
+        service_url_routes = {
             cls._get_id_for_compose_stack_service_url(
                 stack_id=stack_id,
                 url=url,
@@ -611,24 +626,20 @@ class ZaneProxyClient:
             )
             for service, urls in all_urls.items()
             for url in urls
-        ]
-        delete_url_routes: List[tuple[str, str, str]] = []
-
-        for route in response.json():
-            if route["@id"].startswith(stack_id):
-                host = route["match"][0]["host"][0]
-                path = route["match"][0]["path"][0]
-
-                if route["@id"] not in service_url_routes:
-                    delete_url_routes.append((route["@id"], host, path))
-
-        await asyncio.gather(
-            *[
-                cls._delete_route(route_id)
-                for route_id, _host, _path in delete_url_routes
-            ]
+        }
+        removed_routes = await asyncio.to_thread(
+            cls._apply_routes_changes,
+            should_remove=lambda route: route["@id"].startswith(stack_id)
+            and route["@id"] not in service_url_routes,
         )
-        return delete_url_routes
+        return [
+            (
+                route["@id"],
+                route["match"][0]["host"][0],
+                route["match"][0]["path"][0],
+            )
+            for route in removed_routes
+        ]
 
     @classmethod
     def _get_request_for_compose_stack_service_url(
@@ -728,56 +739,43 @@ class ZaneProxyClient:
         }
 
     @classmethod
-    def upsert_compose_stack_service_url(
+    def upsert_compose_stack_service_urls(
         cls,
         stack_id: str,
         stack_hash_prefix: str,
-        service_name: str,
-        url: ComposeStackUrlRouteDto,
-    ) -> str:
-        attempts = 0
-
-        while attempts < cls.MAX_ETAG_ATTEMPTS:
-            attempts += 1
-            # now we create or modify the config for the URL
-            response = requests.get(
-                f"{settings.CADDY_PROXY_ADMIN_HOST}/id/zane-url-root/routes", timeout=5
-            )
-            etag = response.headers.get("etag")
-
-            routes: list[dict[str, dict]] = [
-                route
-                for route in response.json()
-                if route["@id"]
-                != cls._get_id_for_compose_stack_service_url(
+        urls: Dict[str, List[ComposeStackUrlRouteDto]],
+    ) -> Dict[str, ComposeStackUrlRouteDto]:
+        """
+        Create or update the urls of all the services of the stack in a single transaction,
+        returns the urls by route id.
+        """
+        routes_added: Dict[str, ComposeStackUrlRouteDto] = {}
+        new_routes = []
+        for service_name, service_urls in urls.items():
+            for url in service_urls:
+                route = cls._get_request_for_compose_stack_service_url(
                     stack_id=stack_id,
                     service_name=service_name,
+                    stack_hash_prefix=stack_hash_prefix,
                     url=url,
                 )
-            ]
-            new_url = cls._get_request_for_compose_stack_service_url(
-                stack_id=stack_id,
-                service_name=service_name,
-                stack_hash_prefix=stack_hash_prefix,
-                url=url,
-            )
-            routes.append(new_url)
-            routes = cls._sort_routes(routes)  # type: ignore
+                new_routes.append(route)
+                routes_added[route["@id"]] = url
 
-            response = requests.patch(
-                f"{settings.CADDY_PROXY_ADMIN_HOST}/id/zane-url-root/routes",
-                headers={"content-type": "application/json", "If-Match": etag},
-                json=routes,
-                timeout=5,
-            )
-            if response.status_code == status.HTTP_412_PRECONDITION_FAILED:
-                continue
-            return cls._get_id_for_compose_stack_service_url(
-                stack_id=stack_id,
-                service_name=service_name,
-                url=url,
-            )
+        cls._apply_routes_changes(upserted_routes=new_routes)
+        return routes_added
 
-        raise ZaneProxyEtagError(
-            f"Failed inserting the url {url} in the proxy because `Etag` precondition failed"
+    @classmethod
+    def upsert_compose_stack_service_url(
+        cls,
+        stack_id: str,
+        stack_hash_prefix: str,
+        service_name: str,
+        url: ComposeStackUrlRouteDto,
+    ) -> str:
+        routes_added = cls.upsert_compose_stack_service_urls(
+            stack_id=stack_id,
+            stack_hash_prefix=stack_hash_prefix,
+            urls={service_name: [url]},
         )
+        return next(iter(routes_added))
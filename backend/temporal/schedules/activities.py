@@ -1,7 +1,6 @@
 import asyncio
-import dataclasses
 from datetime import timedelta
-from typing import Dict, List, cast
+from typing import Dict, List, Optional, cast
 from rest_framework import status
 from temporalio import workflow, activity
 from temporalio.exceptions import ApplicationError
@@ -10,14 +9,12 @@ from temporalio.exceptions import ApplicationError
 from ..shared import (
     HealthcheckDeploymentDetails,
     DeploymentResult,
-    ServiceMetricsResult,
     SimpleDeploymentDetails,
     RegistrySnaphot,
     ComposeStackSnapshot,
     RegistryHealthCheckResult,
     ComposeStackHealthcheckResult,
-    ComposeStackMetricsResult,
-    ContainerMetrics,
+    FleetMetricsResult,
 )
 
 with workflow.unsafe.imports_passed_through():
@@ -27,8 +24,17 @@ with workflow.unsafe.imports_passed_through():
     import docker
     import docker.errors
     from django import db
+    from django.db import transaction
     from django.db.models import Q
-    from zane_api.models import Deployment, HealthCheck, ServiceMetrics
+    from asgiref.sync import sync_to_async
+    from zane_api.models import Deployment, HealthCheck, ServiceMetrics, HttpLog
+    from zane_api.dtos import HealthCheckDto
+    from zane_api.partitioning import (
+        is_table_partitioned,
+        create_daily_partitions,
+        drop_daily_partitions_before,
+        delete_from_default_partition_before,
+    )
     from zane_api.utils import (
         DockerSwarmTaskState,
         DockerSwarmTask,
@@ -36,12 +42,13 @@ with workflow.unsafe.imports_passed_through():
         escape_ansi,
         excerpt,
     )
-    from search.loki_client import LokiSearchClient
     from search.dtos import RuntimeLogDto, RuntimeLogLevel, RuntimeLogSource
     from container_registry.models import BuildRegistry
     from compose.models import ComposeStack, ComposeStackMetrics
     from compose.dtos import ComposeStackServiceStatusDto
     from docker.models.services import Service as DockerService
+    from ..log_sink import get_deployment_log_sink
+    from ..docker_client import AsyncDockerClient
     from ..helpers import (
         get_compose_stack_swarm_service_status,
         collect_swarm_service_metrics,
@@ -53,7 +60,9 @@ docker_client: docker.DockerClient | None = None
 def get_docker_client():
     global docker_client
     if docker_client is None:
-        docker_client = docker.from_env()
+        docker_client = docker.from_env(
+            max_pool_size=settings.DOCKER_CLIENT_MAX_CONCURRENCY
+        )
     return docker_client
 
 
@@ -69,20 +78,21 @@ async def deployment_log(deployment: SimpleDeploymentDetails, message: str, erro
     current_time = timezone.now()
     print(f"[{current_time.isoformat()}]: {message}")
 
-    search_client = LokiSearchClient(host=settings.LOKI_HOST)
     # This is the max number of characters that we show in color on the frontend
     MAX_COLORED_CHARS = 1000
-    search_client.insert(
-        document=RuntimeLogDto(
-            source=RuntimeLogSource.SYSTEM,
-            level=RuntimeLogLevel.ERROR if error else RuntimeLogLevel.INFO,
-            content=excerpt(message, MAX_COLORED_CHARS),
-            content_text=excerpt(escape_ansi(message), MAX_COLORED_CHARS),
-            time=current_time,
-            created_at=current_time,
-            deployment_id=deployment.hash,
-            service_id=deployment.service_id,
-        ),
+    await get_deployment_log_sink().put(
+        [
+            RuntimeLogDto(
+                source=RuntimeLogSource.SYSTEM,
+                level=RuntimeLogLevel.ERROR if error else RuntimeLogLevel.INFO,
+                content=excerpt(message, MAX_COLORED_CHARS),
+                content_text=excerpt(escape_ansi(message), MAX_COLORED_CHARS),
+                time=current_time,
+                created_at=current_time,
+                deployment_id=deployment.hash,
+                service_id=deployment.service_id,
+            )
+        ]
     )
 
 
@@ -98,9 +108,147 @@ async def close_faulty_db_connections():
         conn.close_if_unusable_or_obsolete()
 
 
+async def get_deployment_swarm_status(
+    client: AsyncDockerClient,
+    swarm_service: DockerService,
+    deployment_hash: str,
+    healthcheck: Optional[HealthCheckDto],
+) -> tuple[Deployment.DeploymentStatus, str]:
+    """
+    Compute the status of a deployment from the state of the tasks of its swarm service,
+    and from its healthcheck if the deployment is running and has one.
+    """
+    healthcheck_timeout = (
+        healthcheck.timeout_seconds
+        if healthcheck is not None
+        else settings.DEFAULT_HEALTHCHECK_TIMEOUT
+    )
+
+    task_list = await client.run(
+        swarm_service.tasks,
+        filters={
+            "label": f"deployment_hash={deployment_hash}",
+            "desired-state": "running",
+        },
+    )
+    if len(task_list) == 0:
+        deployment_status = Deployment.DeploymentStatus.UNHEALTHY
+        deployment_status_reason = (
+            "Error: The service is down, did you manually scale down the service ?"
+        )
+    else:
+        most_recent_swarm_task = DockerSwarmTask.from_dict(
+            max(
+                task_list,
+                key=lambda task: task["Version"]["Index"],
+            )
+        )
+
+        state_matrix = {
+            DockerSwarmTaskState.NEW: Deployment.DeploymentStatus.STARTING,
+            DockerSwarmTaskState.PENDING: Deployment.DeploymentStatus.STARTING,
+            DockerSwarmTaskState.ASSIGNED: Deployment.DeploymentStatus.STARTING,
+            DockerSwarmTaskState.ACCEPTED: Deployment.DeploymentStatus.STARTING,
+            DockerSwarmTaskState.READY: Deployment.DeploymentStatus.STARTING,
+            DockerSwarmTaskState.PREPARING: Deployment.DeploymentStatus.STARTING,
+            DockerSwarmTaskState.STARTING: Deployment.DeploymentStatus.STARTING,
+            DockerSwarmTaskState.RUNNING: Deployment.DeploymentStatus.HEALTHY,
+            DockerSwarmTaskState.COMPLETE: Deployment.DeploymentStatus.UNHEALTHY,
+            DockerSwarmTaskState.FAILED: Deployment.DeploymentStatus.UNHEALTHY,
+            DockerSwarmTaskState.SHUTDOWN: Deployment.DeploymentStatus.UNHEALTHY,
+            DockerSwarmTaskState.REJECTED: Deployment.DeploymentStatus.UNHEALTHY,
+            DockerSwarmTaskState.ORPHANED: Deployment.DeploymentStatus.UNHEALTHY,
+            DockerSwarmTaskState.REMOVE: Deployment.DeploymentStatus.UNHEALTHY,
+        }
+
+        exited_without_error = 0
+        deployment_status = state_matrix[most_recent_swarm_task.state]
+
+        all_tasks = await client.run(
+            swarm_service.tasks,
+            filters={
+                "label": f"deployment_hash={deployment_hash}",
+            },
+        )
+        # We set the status to restarting, because we get more than one task for this service when we restart it
+        if (
+            deployment_status == Deployment.DeploymentStatus.STARTING
+            and len(all_tasks) > 1
+        ):
+            deployment_status = Deployment.DeploymentStatus.RESTARTING
+        deployment_status_reason = (
+            most_recent_swarm_task.Status.Err
+            if most_recent_swarm_task.Status.Err is not None
+            else most_recent_swarm_task.Status.Message
+        )
+
+        if most_recent_swarm_task.state == DockerSwarmTaskState.SHUTDOWN:
+            status_code = most_recent_swarm_task.Status.ContainerStatus.ExitCode  # type: ignore
+            if (
+                status_code is not None and status_code != exited_without_error
+            ) or most_recent_swarm_task.Status.Err is not None:
+                deployment_status = Deployment.DeploymentStatus.UNHEALTHY
+
+        if (
+            most_recent_swarm_task.state == DockerSwarmTaskState.RUNNING
+            and most_recent_swarm_task.container_id is not None
+        ):
+            if healthcheck is not None:
+                try:
+                    print(
+                        f"Running custom healthcheck {healthcheck.type=} - {healthcheck.value=}"
+                    )
+                    container = await client.containers.get(
+                        most_recent_swarm_task.container_id
+                    )
+                    if healthcheck.type == HealthCheck.HealthCheckType.COMMAND:
+                        exit_code, output = await client.run(
+                            container.exec_run,
+                            cmd=healthcheck.value,
+                            stdout=True,
+                            stderr=True,
+                            stdin=False,
+                        )
+
+                        if exit_code == 0:
+                            deployment_status = Deployment.DeploymentStatus.HEALTHY
+                        else:
+                            deployment_status = Deployment.DeploymentStatus.UNHEALTHY
+                        deployment_status_reason = output.decode("utf-8")
+                    else:
+                        container_networks = container.attrs["NetworkSettings"][
+                            "Networks"
+                        ]
+                        dns_names = container_networks["zane"]["DNSNames"]
+                        container_hostname_in_network: str = next(
+                            host
+                            for host in dns_names
+                            if container.id.startswith(host)  # type: ignore
+                        )
+                        full_url = f"http://{container_hostname_in_network}:{healthcheck.associated_port}{healthcheck.value}"
+                        # run in a thread, as it would block the event loop of the worker
+                        # (and the heartbeats of the other activities) until the timeout
+                        response = await asyncio.to_thread(
+                            requests.get,
+                            full_url,
+                            timeout=healthcheck_timeout,
+                        )
+                        if response.status_code == status.HTTP_200_OK:
+                            deployment_status = Deployment.DeploymentStatus.HEALTHY
+                        else:
+                            deployment_status = Deployment.DeploymentStatus.UNHEALTHY
+                        deployment_status_reason = response.content.decode("utf-8")
+
+                except TimeoutError as e:
+                    deployment_status = Deployment.DeploymentStatus.UNHEALTHY
+                    deployment_status_reason = str(e)
+
+    return deployment_status, deployment_status_reason
+
+
 class MonitorDockerDeploymentActivities:
     def __init__(self):
-        self.docker_client = get_docker_client()
+        self.docker = AsyncDockerClient(get_docker_client())
 
     @activity.defn
     async def run_deployment_monitor_healthcheck(
@@ -116,7 +264,7 @@ class MonitorDockerDeploymentActivities:
                 .aget()
             )
 
-            swarm_service = self.docker_client.services.get(
+            swarm_service = await self.docker.services.get(
                 get_swarm_service_name_for_deployment(
                     deployment_hash=details.deployment.hash,
                     project_id=details.deployment.project_id,
@@ -135,135 +283,16 @@ class MonitorDockerDeploymentActivities:
                     "Deployment is sleeping, skipping monitoring health check ",
                 )
 
-            healthcheck = details.healthcheck
-
-            healthcheck_timeout = (
-                healthcheck.timeout_seconds
-                if healthcheck is not None
-                else settings.DEFAULT_HEALTHCHECK_TIMEOUT
+            (
+                deployment_status,
+                deployment_status_reason,
+            ) = await get_deployment_swarm_status(
+                self.docker,
+                swarm_service,
+                deployment_hash=details.deployment.hash,
+                healthcheck=details.healthcheck,
             )
 
-            task_list = swarm_service.tasks(
-                filters={
-                    "label": f"deployment_hash={details.deployment.hash}",
-                    "desired-state": "running",
-                }
-            )
-            if len(task_list) == 0:
-                deployment_status = Deployment.DeploymentStatus.UNHEALTHY
-                deployment_status_reason = "Error: The service is down, did you manually scale down the service ?"
-            else:
-                most_recent_swarm_task = DockerSwarmTask.from_dict(
-                    max(
-                        task_list,
-                        key=lambda task: task["Version"]["Index"],
-                    )
-                )
-
-                state_matrix = {
-                    DockerSwarmTaskState.NEW: Deployment.DeploymentStatus.STARTING,
-                    DockerSwarmTaskState.PENDING: Deployment.DeploymentStatus.STARTING,
-                    DockerSwarmTaskState.ASSIGNED: Deployment.DeploymentStatus.STARTING,
-                    DockerSwarmTaskState.ACCEPTED: Deployment.DeploymentStatus.STARTING,
-                    DockerSwarmTaskState.READY: Deployment.DeploymentStatus.STARTING,
-                    DockerSwarmTaskState.PREPARING: Deployment.DeploymentStatus.STARTING,
-                    DockerSwarmTaskState.STARTING: Deployment.DeploymentStatus.STARTING,
-                    DockerSwarmTaskState.RUNNING: Deployment.DeploymentStatus.HEALTHY,
-                    DockerSwarmTaskState.COMPLETE: Deployment.DeploymentStatus.UNHEALTHY,
-                    DockerSwarmTaskState.FAILED: Deployment.DeploymentStatus.UNHEALTHY,
-                    DockerSwarmTaskState.SHUTDOWN: Deployment.DeploymentStatus.UNHEALTHY,
-                    DockerSwarmTaskState.REJECTED: Deployment.DeploymentStatus.UNHEALTHY,
-                    DockerSwarmTaskState.ORPHANED: Deployment.DeploymentStatus.UNHEALTHY,
-                    DockerSwarmTaskState.REMOVE: Deployment.DeploymentStatus.UNHEALTHY,
-                }
-
-                exited_without_error = 0
-                deployment_status = state_matrix[most_recent_swarm_task.state]
-
-                all_tasks = swarm_service.tasks(
-                    filters={
-                        "label": f"deployment_hash={details.deployment.hash}",
-                    }
-                )
-                # We set the status to restarting, because we get more than one task for this service when we restart it
-                if (
-                    deployment_status == Deployment.DeploymentStatus.STARTING
-                    and len(all_tasks) > 1
-                ):
-                    deployment_status = Deployment.DeploymentStatus.RESTARTING
-                deployment_status_reason = (
-                    most_recent_swarm_task.Status.Err
-                    if most_recent_swarm_task.Status.Err is not None
-                    else most_recent_swarm_task.Status.Message
-                )
-
-                if most_recent_swarm_task.state == DockerSwarmTaskState.SHUTDOWN:
-                    status_code = most_recent_swarm_task.Status.ContainerStatus.ExitCode  # type: ignore
-                    if (
-                        status_code is not None and status_code != exited_without_error
-                    ) or most_recent_swarm_task.Status.Err is not None:
-                        deployment_status = Deployment.DeploymentStatus.UNHEALTHY
-
-                if (
-                    most_recent_swarm_task.state == DockerSwarmTaskState.RUNNING
-                    and most_recent_swarm_task.container_id is not None
-                ):
-                    if healthcheck is not None:
-                        try:
-                            print(
-                                f"Running custom healthcheck {healthcheck.type=} - {healthcheck.value=}"
-                            )
-                            container = self.docker_client.containers.get(
-                                most_recent_swarm_task.container_id
-                            )
-                            if healthcheck.type == HealthCheck.HealthCheckType.COMMAND:
-                                exit_code, output = container.exec_run(
-                                    cmd=healthcheck.value,
-                                    stdout=True,
-                                    stderr=True,
-                                    stdin=False,
-                                )
-
-                                if exit_code == 0:
-                                    deployment_status = (
-                                        Deployment.DeploymentStatus.HEALTHY
-                                    )
-                                else:
-                                    deployment_status = (
-                                        Deployment.DeploymentStatus.UNHEALTHY
-                                    )
-                                deployment_status_reason = output.decode("utf-8")
-                            else:
-                                container_networks = container.attrs["NetworkSettings"][
-                                    "Networks"
-                                ]
-                                dns_names = container_networks["zane"]["DNSNames"]
-                                container_hostname_in_network: str = next(
-                                    host
-                                    for host in dns_names
-                                    if container.id.startswith(host)  # type: ignore
-                                )
-                                full_url = f"http://{container_hostname_in_network}:{healthcheck.associated_port}{healthcheck.value}"
-                                response = requests.get(
-                                    full_url,
-                                    timeout=healthcheck_timeout,
-                                )
-                                if response.status_code == status.HTTP_200_OK:
-                                    deployment_status = (
-                                        Deployment.DeploymentStatus.HEALTHY
-                                    )
-                                else:
-                                    deployment_status = (
-                                        Deployment.DeploymentStatus.UNHEALTHY
-                                    )
-                                deployment_status_reason = response.content.decode(
-                                    "utf-8"
-                                )
-
-                        except TimeoutError as e:
-                            deployment_status = Deployment.DeploymentStatus.UNHEALTHY
-                            deployment_status_reason = str(e)
-
             status_color = (
                 Colors.GREEN
                 if deployment_status == Deployment.DeploymentStatus.HEALTHY
@@ -305,6 +334,11 @@ class MonitorDockerDeploymentActivities:
                     Deployment.DeploymentStatus.REMOVED,
                 ]
             )
+            # only write the row when the status has changed
+            & ~Q(
+                status=healthcheck_result.status,
+                status_reason=healthcheck_result.reason,
+            )
         ).aupdate(
             status_reason=healthcheck_result.reason,
             status=healthcheck_result.status,
@@ -312,148 +346,109 @@ class MonitorDockerDeploymentActivities:
         )
 
 
-class DockerComposeStackMetricsActivities:
+class FleetMetricsActivities:
+    """
+    Collect the metrics of all the services and compose stacks of the node at once,
+    instead of running one workflow per deployment and per stack.
+    """
+
     def __init__(self):
-        self.docker = get_docker_client()
+        self.docker = AsyncDockerClient(get_docker_client())
 
     @activity.defn
-    async def collect_compose_stack_metrics(
-        self, stack: ComposeStackSnapshot
-    ) -> ComposeStackMetricsResult:
-        try:
-            await ComposeStack.objects.aget(id=stack.id)
-        except ComposeStack.DoesNotExist:
-            raise ApplicationError(
-                "Cannot collect metrics of non existing stack",
-                non_retryable=True,
-            )
-
-        services: List[DockerService] = self.docker.services.list(
-            filters={"label": [f"com.docker.stack.namespace={stack.name}"]},
-            status=True,
-        )
+    async def collect_fleet_metrics(self) -> FleetMetricsResult:
+        services: List[DockerService] = await self.docker.services.list(status=True)
+
+        deployment_services: List[tuple[str, DockerService]] = []
+        stack_services: List[tuple[str, str, DockerService]] = []
+        for service in services:
+            labels: Dict[str, str] = service.attrs["Spec"].get("Labels") or {}
+            deployment_hash = labels.get("deployment_hash")
+            stack_name = labels.get("com.docker.stack.namespace")
+            if deployment_hash is not None:
+                deployment_services.append((deployment_hash, service))
+            elif stack_name is not None and stack_name.startswith("zn-"):
+                stack_id = stack_name.removeprefix("zn-")
+                hash_prefix = stack_id.replace(ComposeStack.ID_PREFIX, "").lower()
+                service_name = (
+                    cast(str, service.name)
+                    .removeprefix(f"{stack_name}_")
+                    .removeprefix(f"{hash_prefix}_")
+                )
+                stack_services.append((stack_id, service_name, service))
 
         all_metrics = await asyncio.gather(
             *[
                 collect_swarm_service_metrics(
-                    service,
-                    self.docker,
+                    service, self.docker.client, single_replica=True
                 )
-                for service in services
-            ]
+                for _, service in deployment_services
+            ],
+            *[
+                collect_swarm_service_metrics(service, self.docker.client)
+                for _, _, service in stack_services
+            ],
+            return_exceptions=True,
         )
 
-        metrics_per_service: Dict[str, ContainerMetrics] = {}
-
+        result = FleetMetricsResult()
         for i, metrics in enumerate(all_metrics):
+            if isinstance(metrics, BaseException):
+                print(f"{Colors.RED}Failed to collect metrics: {metrics}{Colors.ENDC}")
+                continue
             if metrics is None:
                 continue
+            if i < len(deployment_services):
+                deployment_hash, _ = deployment_services[i]
+                result.deployments[deployment_hash] = metrics
+            else:
+                stack_id, service_name, _ = stack_services[i - len(deployment_services)]
+                result.stacks.setdefault(stack_id, {})[service_name] = metrics
 
-            service = services[i]
-
-            name = (
-                cast(str, service.name)
-                .removeprefix(f"{stack.name}_")
-                .removeprefix(f"{stack.hash_prefix}_")
-            )
-            metrics_per_service[name] = metrics
-
-        return ComposeStackMetricsResult(services=metrics_per_service, stack=stack)
+        print(
+            f"Collected the metrics of {Colors.ORANGE}{len(result.deployments)}{Colors.ENDC} deployments "
+            f"and {Colors.ORANGE}{len(result.stacks)}{Colors.ENDC} compose stacks"
+        )
+        return result
 
     @activity.defn
-    async def save_compose_stack_metrics(self, metrics: ComposeStackMetricsResult):
-        try:
-            stack = await ComposeStack.objects.aget(id=metrics.stack.id)
-        except ComposeStack.DoesNotExist:
-            raise ApplicationError(
-                "Cannot save metrics of non existing stack",
-                non_retryable=True,
-            )
-
-        metrics_to_add: List[ComposeStackMetrics] = []
-        for service_name, metric in metrics.services.items():
-            metrics_to_add.append(
-                ComposeStackMetrics(
-                    service_name=service_name,
+    async def save_fleet_metrics(self, metrics: FleetMetricsResult):
+        service_metrics: List[ServiceMetrics] = []
+        async for deployment in Deployment.objects.filter(
+            hash__in=metrics.deployments.keys()
+        ).exclude(status=Deployment.DeploymentStatus.SLEEPING):
+            metric = metrics.deployments[deployment.hash]
+            service_metrics.append(
+                ServiceMetrics(
                     cpu_percent=metric.cpu_percent,
                     memory_bytes=metric.memory_bytes,
-                    net_tx_bytes=metric.net_tx_bytes,
-                    net_rx_bytes=metric.net_rx_bytes,
                     disk_read_bytes=metric.disk_read_bytes,
                     disk_writes_bytes=metric.disk_writes_bytes,
-                    stack=stack,
-                )
-            )
-
-        await ComposeStackMetrics.objects.abulk_create(metrics_to_add)
-
-
-class DockerDeploymentMetricsActivities:
-    def __init__(self):
-        self.docker_client = get_docker_client()
-
-    @activity.defn
-    async def collect_deployment_metrics(
-        self, details: SimpleDeploymentDetails
-    ) -> ServiceMetricsResult | None:
-        try:
-            docker_deployment = await Deployment.objects.aget(
-                hash=details.hash,
-            )
-            swarm_service = self.docker_client.services.get(
-                get_swarm_service_name_for_deployment(
-                    deployment_hash=details.hash,
-                    project_id=details.project_id,
-                    service_id=details.service_id,
+                    net_rx_bytes=metric.net_rx_bytes,
+                    net_tx_bytes=metric.net_tx_bytes,
+                    deployment=deployment,
+                    service_id=deployment.service_id,
                 )
             )
-        except (docker.errors.NotFound, Deployment.DoesNotExist):
-            raise ApplicationError(
-                "Cannot run a healthcheck on an nonexistent deployment.",
-                non_retryable=True,
-            )
-        else:
-            if docker_deployment.status == Deployment.DeploymentStatus.SLEEPING:
-                return None
-
-            metrics = await collect_swarm_service_metrics(
-                swarm_service,
-                self.docker_client,
-                single_replica=True,
-            )
-            if metrics is None:
-                return None
 
-            return ServiceMetricsResult(
-                **dataclasses.asdict(metrics), deployment=details
-            )
-
-    @activity.defn
-    async def save_deployment_metrics(self, metrics: ServiceMetricsResult):
-        try:
-            deployment = (
-                await Deployment.objects.filter(
-                    hash=metrics.deployment.hash,
+        stack_metrics: List[ComposeStackMetrics] = []
+        async for stack in ComposeStack.objects.filter(id__in=metrics.stacks.keys()):
+            for service_name, metric in metrics.stacks[stack.id].items():
+                stack_metrics.append(
+                    ComposeStackMetrics(
+                        service_name=service_name,
+                        cpu_percent=metric.cpu_percent,
+                        memory_bytes=metric.memory_bytes,
+                        net_tx_bytes=metric.net_tx_bytes,
+                        net_rx_bytes=metric.net_rx_bytes,
+                        disk_read_bytes=metric.disk_read_bytes,
+                        disk_writes_bytes=metric.disk_writes_bytes,
+                        stack=stack,
+                    )
                 )
-                .select_related("service")
-                .aget()
-            )
-        except Deployment.DoesNotExist:
-            raise ApplicationError(
-                "Cannot save metrics for a non existent deployment.",
-                non_retryable=True,
-            )
 
-        await ServiceMetrics.objects.acreate(
-            cpu_percent=metrics.cpu_percent,
-            memory_bytes=metrics.memory_bytes,
-            disk_read_bytes=metrics.disk_read_bytes,
-            disk_writes_bytes=metrics.disk_writes_bytes,
-            net_rx_bytes=metrics.net_rx_bytes,
-            net_tx_bytes=metrics.net_tx_bytes,
-            deployment=deployment,
-            service=deployment.service,
-        )
+        await ServiceMetrics.objects.abulk_create(service_metrics)
+        await ComposeStackMetrics.objects.abulk_create(stack_metrics)
 
 
 class CleanupActivities:
@@ -473,22 +468,61 @@ class CleanupActivities:
         ).adelete()
         return deleted[0]
 
+    @activity.defn
+    async def cleanup_http_logs(self) -> int:
+        """
+        Drop the daily partitions of http logs older than the retention period,
+        and create the partitions of the next days in advance.
+        """
+
+        def manage_http_logs_partitions() -> int:
+            today = timezone.now().date()
+            table = HttpLog._meta.db_table
+            with transaction.atomic(), db.connection.cursor() as cursor:
+                if not is_table_partitioned(cursor, table):
+                    # the table is only partitioned by the `0341_partition_httplog_by_day` migration,
+                    # it is not when the tables are created from the models (ex: `settings_test` disables migrations)
+                    return 0
+
+                created = create_daily_partitions(
+                    cursor,
+                    table=table,
+                    partition_key="time",
+                    start=today,
+                    end=today
+                    + timedelta(days=settings.HTTP_LOGS_PARTITIONS_PREMAKE_DAYS),
+                )
+                cutoff = today - timedelta(days=settings.HTTP_LOGS_RETENTION_DAYS)
+                dropped = drop_daily_partitions_before(cursor, table, before=cutoff)
+                deleted_rows = delete_from_default_partition_before(
+                    cursor, table, partition_key="time", before=cutoff
+                )
+            print(
+                f"HTTP logs partitions: created={Colors.GREEN}{created}{Colors.ENDC}, "
+                f"dropped={Colors.ORANGE}{dropped}{Colors.ENDC}, "
+                f"rows deleted from default partition={Colors.ORANGE}{deleted_rows}{Colors.ENDC}"
+            )
+            return len(dropped)
+
+        return await sync_to_async(manage_http_logs_partitions)()
+
 
 class MonitorRegistryDeploymentActivites:
     def __init__(self):
-        self.docker = get_docker_client()
+        self.docker = AsyncDockerClient(get_docker_client())
 
     @activity.defn
     async def run_registry_swarm_healthcheck(self, registry: RegistrySnaphot):
         try:
-            swarm_service = self.docker.services.get(registry.swarm_service_name)
+            swarm_service = await self.docker.services.get(registry.swarm_service_name)
         except docker.errors.NotFound:
             raise ApplicationError("This registry has not been deployed yet")
         else:
-            task_list = swarm_service.tasks(
+            task_list = await self.docker.run(
+                swarm_service.tasks,
                 filters={
                     "desired-state": "running",
-                }
+                },
             )
             if len(task_list) == 0:
                 deployment_status = BuildRegistry.RegistryHealthStatus.UNHEALTHY
@@ -521,7 +555,7 @@ class MonitorRegistryDeploymentActivites:
 
                 all_tasks = [
                     task
-                    for task in swarm_service.tasks()
+                    for task in await self.docker.run(swarm_service.tasks)
                     if DockerSwarmTask.from_dict(task).state
                     == DockerSwarmTaskState.RUNNING
                 ]
@@ -556,17 +590,17 @@ class MonitorRegistryDeploymentActivites:
 
 class MonitorComposeStackActivites:
     def __init__(self):
-        self.docker = get_docker_client()
+        self.docker = AsyncDockerClient(get_docker_client())
 
     @activity.defn
     async def run_stack_healthcheck(
         self, stack: ComposeStackSnapshot
     ) -> ComposeStackHealthcheckResult:
-        services: List[DockerService] = self.docker.services.list(
+        services: List[DockerService] = await self.docker.services.list(
             filters={"label": [f"com.docker.stack.namespace={stack.name}"]},
             status=True,
         )
-        configs = self.docker.configs.list(
+        configs = await self.docker.configs.list(
             filters={"label": [f"com.docker.stack.namespace={stack.name}"]},
         )
         statuses = await asyncio.gather(
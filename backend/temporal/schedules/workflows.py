@@ -4,19 +4,17 @@ from temporalio import workflow
 from temporalio.common import RetryPolicy
 
 from .activities import (
-    DockerDeploymentMetricsActivities,
     MonitorDockerDeploymentActivities,
     CleanupActivities,
     close_faulty_db_connections,
     MonitorRegistryDeploymentActivites,
     MonitorComposeStackActivites,
-    DockerComposeStackMetricsActivities,
+    FleetMetricsActivities,
 )
 from ..shared import (
     HealthcheckDeploymentDetails,
     DeploymentResult,
     CleanupMetricsResult,
-    SimpleDeploymentDetails,
     RegistrySnaphot,
     ComposeStackSnapshot,
     ComposeStackHealthcheckResult,
@@ -141,11 +139,11 @@ class MonitorComposeStackWorkflow:
         return healthcheck
 
 
-@workflow.defn(name="get-docker-deployment-stats")
-class GetDockerDeploymentStatsWorkflow:
+@workflow.defn(name="collect-fleet-metrics")
+class CollectFleetMetricsWorkflow:
     @workflow.run
-    async def run(self, payload: SimpleDeploymentDetails):
-        print(f"\nRunning workflow GetDockerDeploymentStatsWorkflow with {payload=}")
+    async def run(self):
+        print("\nRunning workflow CollectFleetMetricsWorkflow")
         retry_policy = RetryPolicy(
             maximum_attempts=5, maximum_interval=timedelta(seconds=30)
         )
@@ -156,58 +154,21 @@ class GetDockerDeploymentStatsWorkflow:
             start_to_close_timeout=timedelta(seconds=10),
         )
 
-        print("Running activity `collect_deployment_metrics()`")
+        print("Running activity `collect_fleet_metrics()`")
         metrics_result = await workflow.execute_activity_method(
-            DockerDeploymentMetricsActivities.collect_deployment_metrics,
-            payload,
-            retry_policy=retry_policy,
-            start_to_close_timeout=timedelta(seconds=30),
+            FleetMetricsActivities.collect_fleet_metrics,
+            retry_policy=RetryPolicy(maximum_attempts=1),
+            start_to_close_timeout=timedelta(seconds=60),
         )
 
-        if metrics_result:
-            print(f"Running activity `save_deployment_metrics({metrics_result=})`")
-            await workflow.execute_activity_method(
-                DockerDeploymentMetricsActivities.save_deployment_metrics,
-                metrics_result,
-                retry_policy=retry_policy,
-                start_to_close_timeout=timedelta(seconds=30),
-            )
-
-        return metrics_result
-
-
-@workflow.defn(name="collect-compose-stack-metrics")
-class CollectComposeStacksMetricsWorkflow:
-    @workflow.run
-    async def run(self, payload: ComposeStackSnapshot):
-        print(f"\nRunning workflow CollectComposeStacksMetricsWorkflow with {payload=}")
-        retry_policy = RetryPolicy(
-            maximum_attempts=5, maximum_interval=timedelta(seconds=30)
-        )
-        print("Running activity `monitor_close_faulty_db_connections()`")
-        await workflow.execute_activity(
-            close_faulty_db_connections,
-            retry_policy=retry_policy,
-            start_to_close_timeout=timedelta(seconds=10),
-        )
-
-        print("Running activity `collect_compose_stack_metrics()`")
-        metrics_result = await workflow.execute_activity_method(
-            DockerComposeStackMetricsActivities.collect_compose_stack_metrics,
-            payload,
+        print("Running activity `save_fleet_metrics()`")
+        await workflow.execute_activity_method(
+            FleetMetricsActivities.save_fleet_metrics,
+            metrics_result,
             retry_policy=retry_policy,
             start_to_close_timeout=timedelta(seconds=30),
         )
 
-        if metrics_result:
-            print(f"Running activity `save_compose_stack_metrics({metrics_result=})`")
-            await workflow.execute_activity_method(
-                DockerComposeStackMetricsActivities.save_compose_stack_metrics,
-                metrics_result,
-                retry_policy=retry_policy,
-                start_to_close_timeout=timedelta(seconds=30),
-            )
-
         return metrics_result
 
 
@@ -229,7 +190,14 @@ class CleanupAppLogsWorkflow:
             retry_policy=retry_policy,
         )
 
+        http_logs_partitions_dropped_count = await workflow.execute_activity_method(
+            CleanupActivities.cleanup_http_logs,
+            start_to_close_timeout=timedelta(minutes=5),
+            retry_policy=retry_policy,
+        )
+
         return CleanupMetricsResult(
             service_metrics_deleted_count=service_metrics_deleted_count,
             stack_metrics_deleted_count=stack_metrics_deleted_count,
+            http_logs_partitions_dropped_count=http_logs_partitions_dropped_count,
         )
@@ -1,92 +1,324 @@
 import asyncio
-from django.core.cache import cache
-from asgiref.sync import sync_to_async
+import time
+import uuid
+import weakref
 from datetime import timedelta
+from typing import Dict, List, Optional
+
+import redis.asyncio as redis
+from django.conf import settings
+
+# All the scripts use the clock of the redis server, so that leases
+# are not affected by clock drift between workers.
+_NOW = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+"""
+
+# Remove holders whose lease expired (ex: the worker died mid-deploy)
+# & waiters that stopped polling (ex: the activity was cancelled)
+_EXPIRE = """
+for _, holder in ipairs(redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now)) do
+    redis.call('ZREM', KEYS[1], holder)
+    redis.call('HDEL', KEYS[2], holder)
+end
+for _, waiter in ipairs(redis.call('ZRANGEBYSCORE', KEYS[4], '-inf', now)) do
+    redis.call('ZREM', KEYS[3], waiter)
+    redis.call('ZREM', KEYS[4], waiter)
+end
+"""
+
+# KEYS: holders, permits, queue, waiters, counter
+# ARGV: holder, limit, requested permits, lease (ms), waiter timeout (ms), channel
+ACQUIRE_SCRIPT = (
+    _NOW
+    + _EXPIRE
+    + """
+local holder = ARGV[1]
+local limit = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local lease = tonumber(ARGV[4])
+local waiter_timeout = tonumber(ARGV[5])
+
+if redis.call('ZSCORE', KEYS[1], holder) then
+    -- the holder already has a lease (ex: the activity was retried), just extend it
+    redis.call('ZADD', KEYS[1], now + lease, holder)
+    return 1
+end
+
+if not redis.call('ZSCORE', KEYS[3], holder) then
+    redis.call('ZADD', KEYS[3], redis.call('INCR', KEYS[5]), holder)
+end
+redis.call('ZADD', KEYS[4], now + waiter_timeout, holder)
+
+local used = 0
+for _, permits in ipairs(redis.call('HVALS', KEYS[2])) do
+    used = used + tonumber(permits)
+end
+
+local acquired = 0
+-- only the first waiter in the queue can acquire, to serve waiters in FIFO order
+if redis.call('ZRANK', KEYS[3], holder) == 0 and used + requested <= limit then
+    redis.call('ZREM', KEYS[3], holder)
+    redis.call('ZREM', KEYS[4], holder)
+    redis.call('ZADD', KEYS[1], now + lease, holder)
+    redis.call('HSET', KEYS[2], holder, requested)
+    acquired = 1
+    if redis.call('ZCARD', KEYS[3]) > 0 then
+        -- wake up the next waiter, there might still be permits left for it
+        redis.call('PUBLISH', ARGV[6], holder)
+    end
+end
+
+local ttl = math.max(lease, waiter_timeout)
+for _, key in ipairs(KEYS) do
+    redis.call('PEXPIRE', key, ttl)
+end
+return acquired
+"""
+)
+
+# KEYS: holders, permits, queue, waiters
+# ARGV: holder, channel
+RELEASE_SCRIPT = """
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('ZREM', KEYS[3], ARGV[1])
+redis.call('ZREM', KEYS[4], ARGV[1])
+redis.call('PUBLISH', ARGV[2], ARGV[1])
+"""
+
+# KEYS: holders, permits, queue, waiters
+# ARGV: holder, lease (ms)
+RENEW_SCRIPT = (
+    _NOW
+    + _EXPIRE
+    + """
+if not redis.call('ZSCORE', KEYS[1], ARGV[1]) then
+    -- the lease has expired or the slot has been released
+    return 0
+end
+local lease = tonumber(ARGV[2])
+redis.call('ZADD', KEYS[1], now + lease, ARGV[1])
+redis.call('PEXPIRE', KEYS[1], lease)
+redis.call('PEXPIRE', KEYS[2], lease)
+return 1
+"""
+)
+
+# KEYS: holders, permits, queue, waiters
+HOLDERS_SCRIPT = (
+    _NOW
+    + _EXPIRE
+    + """
+return redis.call('ZRANGE', KEYS[1], 0, -1, 'WITHSCORES')
+"""
+)
+
+
+# Tasks renewing the leases acquired in this process, per event loop & per (semaphore, holder)
+_renewals: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[tuple[str, str], asyncio.Task]]" = (weakref.WeakKeyDictionary())
 
 
 class AsyncSemaphore:
+    """
+    Distributed semaphore shared by all the workers, stored in redis.
+
+    Each holder gets a lease that expires after `semaphore_timeout` if it is not released,
+    so that a worker dying mid-deploy does not keep its slot forever.
+    Waiters are served in FIFO order and block on a pub/sub channel notified
+    on each release, instead of polling redis.
+
+    If `renew_for` is passed, the process that acquired a slot renews its lease
+    in the background until the slot is released, for at most `renew_for`.
+    This allows a short lease for slots held for a long time : if the worker dies,
+    the slot is freed after one lease, and if the holder never releases it
+    (ex: its workflow has been terminated), after at most `renew_for`.
+    The service deploy semaphore uses a lease of `TEMPORALIO_DEPLOY_SEMAPHORE_LEASE`,
+    renewed for up to `TEMPORALIO_WORKFLOW_EXECUTION_MAX_TIMEOUT`.
+    """
+
     def __init__(
         self,
         key: str,
         limit=1,
         semaphore_timeout=timedelta(seconds=10),
-        lock_timeout=timedelta(seconds=5),
+        wait_interval=timedelta(seconds=5),
+        renew_for: Optional[timedelta] = None,
     ):
         self.key = f"[zaneops::internal::semaphore_{key}]"
-        self.lock_key = f"{self.key}:lock"
+        self.holders_key = f"{self.key}:holders"
+        self.permits_key = f"{self.key}:permits"
+        self.queue_key = f"{self.key}:queue"
+        self.waiters_key = f"{self.key}:waiters"
+        self.counter_key = f"{self.key}:counter"
+        self.channel = f"{self.key}:released"
         self.limit = limit
-        self.semaphore_timeout = semaphore_timeout.seconds
-        self.lock_timeout = lock_timeout.seconds
+        self.lease_ms = int(semaphore_timeout.total_seconds() * 1000)
+        # waiters wake up at least once per interval to keep their place in the queue,
+        # and are considered gone if they miss 3 intervals
+        self.wait_interval = wait_interval.total_seconds()
+        self.waiter_timeout_ms = int(self.wait_interval * 3 * 1000)
+        self.renew_for = renew_for.total_seconds() if renew_for is not None else None
+        self.holder: Optional[str] = None
+
+    @property
+    def _keys(self):
+        return [self.holders_key, self.permits_key, self.queue_key, self.waiters_key]
 
-    async def _acquire_lock(self):
-        return await sync_to_async(cache.add)(self.lock_key, "1", self.lock_timeout)
+    def _get_client(self):
+        return redis.from_url(settings.REDIS_URL, decode_responses=True)
 
-    async def _release_lock(self):
-        await sync_to_async(cache.delete)(self.lock_key)
+    async def _try_acquire(self, client: redis.Redis, holder: str, permits: int):
+        script = client.register_script(ACQUIRE_SCRIPT)
+        acquired = await script(
+            keys=[*self._keys, self.counter_key],
+            args=[
+                holder,
+                self.limit,
+                permits,
+                self.lease_ms,
+                self.waiter_timeout_ms,
+                self.channel,
+            ],
+        )
+        return acquired == 1
 
-    async def acquire(self, retry_delay=0.1, max_retries: int | None = None):
-        retries = 0
-        while max_retries is None or retries < max_retries:
-            if await self._acquire_lock():
+    async def _acquire(
+        self,
+        holder: Optional[str],
+        permits: int,
+        timeout: Optional[timedelta],
+    ) -> bool:
+        holder = holder or uuid.uuid4().hex
+        deadline = (
+            time.monotonic() + timeout.total_seconds() if timeout is not None else None
+        )
+        async with self._get_client() as client:
+            async with client.pubsub() as pubsub:
+                # subscribe before trying, so that a release between the
+                # try and the wait is not missed
+                await pubsub.subscribe(self.channel)
                 try:
-                    count = await sync_to_async(cache.get)(self.key, 0)
-                    if count < self.limit:
-                        await sync_to_async(cache.set)(
-                            self.key, count + 1, self.semaphore_timeout
+                    while True:
+                        if await self._try_acquire(client, holder, permits):
+                            self.holder = holder
+                            self._start_renewal(holder)
+                            return True
+
+                        wait_for = self.wait_interval
+                        if deadline is not None:
+                            wait_for = min(wait_for, deadline - time.monotonic())
+                            if wait_for <= 0:
+                                break
+                        await pubsub.get_message(
+                            ignore_subscribe_messages=True, timeout=wait_for
                         )
-                        return True
-                finally:
-                    await self._release_lock()
-            retries += 1
-            await asyncio.sleep(retry_delay)
+                except BaseException:
+                    await self._release(client, holder)
+                    raise
+            # give up our place in the queue
+            await self._release(client, holder)
         return False
 
-    async def release(self):
-        if await self._acquire_lock():
-            try:
-                count = await sync_to_async(cache.get)(self.key, 0)
-                if count > 0:
-                    await sync_to_async(cache.set)(
-                        self.key, count - 1, self.semaphore_timeout
-                    )
-            finally:
-                await self._release_lock()
-
-    async def reset(self, retry_delay=0.1):
+    async def _release(self, client: redis.Redis, holder: str):
+        script = client.register_script(RELEASE_SCRIPT)
+        await script(keys=self._keys, args=[holder, self.channel])
+
+    def _start_renewal(self, holder: str):
+        if self.renew_for is None:
+            return
+        renewals = _renewals.setdefault(asyncio.get_running_loop(), {})
+        previous = renewals.pop((self.key, holder), None)
+        if previous is not None:
+            previous.cancel()
+        renewals[(self.key, holder)] = asyncio.create_task(self._renew(holder))
+
+    def _stop_renewal(self, holder: str):
+        renewals = _renewals.get(asyncio.get_running_loop(), {})
+        task = renewals.pop((self.key, holder), None)
+        if task is not None:
+            task.cancel()
+
+    async def _renew(self, holder: str):
+        assert self.renew_for is not None
+        deadline = time.monotonic() + self.renew_for
+        interval = self.lease_ms / 1000 / 3
+        try:
+            async with self._get_client() as client:
+                script = client.register_script(RENEW_SCRIPT)
+                while time.monotonic() + interval < deadline:
+                    await asyncio.sleep(interval)
+                    try:
+                        renewed = await script(
+                            keys=self._keys, args=[holder, self.lease_ms]
+                        )
+                    except redis.RedisError:
+                        continue  # try again at the next interval, before the lease expires
+                    if renewed != 1:
+                        # released by another process, or expired
+                        break
+        finally:
+            renewals = _renewals.get(asyncio.get_running_loop(), {})
+            if renewals.get((self.key, holder)) is asyncio.current_task():
+                del renewals[(self.key, holder)]
+
+    async def acquire(
+        self, holder: Optional[str] = None, timeout: Optional[timedelta] = None
+    ) -> bool:
         """
-        Reset the semaphore by setting its counter to 0, effectively releasing all acquired slots.
-        This method uses the same lock mechanism to ensure an atomic update.
+        Wait for a slot of the semaphore, for at most `timeout` if provided.
+        Acquiring again with the same `holder` extends its lease.
         """
-        while True:
-            if await self._acquire_lock():
-                try:
-                    await sync_to_async(cache.set)(self.key, 0, self.semaphore_timeout)
-                    return
-                finally:
-                    await self._release_lock()
-            await asyncio.sleep(retry_delay)
+        return await self._acquire(holder, permits=1, timeout=timeout)
 
-    async def acquire_all(self, retry_delay=0.1, max_retries: int | None = None):
+    async def acquire_all(
+        self, holder: Optional[str] = None, timeout: Optional[timedelta] = None
+    ) -> bool:
         """
-        Wait until the semaphore is completely free and then acquire all available slots.
-        This method sets the counter to the full limit, effectively blocking any other acquirer.
+        Wait until the semaphore is completely free and then acquire all available slots,
+        effectively blocking any other acquirer.
         """
-        retries = 0
-        while max_retries is None or retries < max_retries:
-            if await self._acquire_lock():
-                try:
-                    count: int = await sync_to_async(cache.get)(self.key, 0)
-                    if count == 0:
-                        # Acquire all tokens at once.
-                        await sync_to_async(cache.set)(
-                            self.key, self.limit, self.semaphore_timeout
-                        )
-                        return True
-                finally:
-                    await self._release_lock()
-            retries += 1
-            await asyncio.sleep(retry_delay)
-        return False
+        return await self._acquire(holder, permits=self.limit, timeout=timeout)
+
+    async def release(self, holder: Optional[str] = None):
+        holder = holder or self.holder
+        if holder is None:
+            return
+        self._stop_renewal(holder)
+        async with self._get_client() as client:
+            await self._release(client, holder)
+        self.holder = None
+
+    async def reset(self):
+        """
+        Release all the acquired slots, the waiters keep their place in the queue.
+        """
+        for key, holder in list(_renewals.get(asyncio.get_running_loop(), {})):
+            if key == self.key:
+                self._stop_renewal(holder)
+        async with self._get_client() as client:
+            await client.delete(self.holders_key, self.permits_key)
+            await client.publish(self.channel, "")
+
+    async def holders(self) -> Dict[str, float]:
+        """
+        Current holders of the semaphore, with the timestamp at which their lease expires.
+        """
+        async with self._get_client() as client:
+            script = client.register_script(HOLDERS_SCRIPT)
+            holders = await script(keys=self._keys)
+        return {
+            holder: float(expires_at) / 1000
+            for holder, expires_at in zip(holders[::2], holders[1::2])
+        }
+
+    async def waiters(self) -> List[str]:
+        """
+        Holders waiting for the semaphore, in the order they will be served.
+        """
+        async with self._get_client() as client:
+            return await client.zrange(self.queue_key, 0, -1)
 
     async def __aenter__(self):
         acquired = await self.acquire()
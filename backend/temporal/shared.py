@@ -399,14 +399,11 @@ class ContainerMetrics:
 
 
 @dataclass
-class ServiceMetricsResult(ContainerMetrics):
-    deployment: SimpleDeploymentDetails
-
-
-@dataclass
-class ComposeStackMetricsResult:
-    stack: ComposeStackSnapshot
-    services: Dict[str, ContainerMetrics]
+class FleetMetricsResult:
+    # metrics per deployment hash
+    deployments: Dict[str, ContainerMetrics] = field(default_factory=dict)
+    # metrics per compose stack id, then per service name
+    stacks: Dict[str, Dict[str, ContainerMetrics]] = field(default_factory=dict)
 
 
 @dataclass
@@ -431,6 +428,7 @@ class CleanupResult:
 class CleanupMetricsResult:
     service_metrics_deleted_count: int
     stack_metrics_deleted_count: int
+    http_logs_partitions_dropped_count: int = 0
 
 
 @dataclass
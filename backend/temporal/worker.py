@@ -1,3 +1,5 @@
+import asyncio
+
 from django.conf import settings
 from temporalio.client import Client
 from temporalio.service import KeepAliveConfig
@@ -10,11 +12,14 @@ from temporalio.worker import (
 from temporalio import workflow
 
 from .workflows import get_workflows_and_activities
+from .log_sink import DeploymentLogSinkInterceptor
 
 
 with workflow.unsafe.imports_passed_through():
     from django import db
     from asgiref.sync import sync_to_async
+    from .deployment_events import DeploymentEventsWatcher
+    from .helpers import get_docker_client
 
 
 async def close_old_db_connections():
@@ -67,9 +72,18 @@ async def run_worker():
         task_queue=settings.TEMPORALIO_WORKER_TASK_QUEUE,
         debug_mode=True,
         **get_workflows_and_activities(),  # type: ignore
-        interceptors=[MainInterceptor()],
+        interceptors=[MainInterceptor(), DeploymentLogSinkInterceptor()],
     )
     print(
         f"running worker on task queue `{settings.TEMPORALIO_WORKER_TASK_QUEUE}`...🔄"
     )
-    await worker.run()
+    if (
+        settings.DEPLOYMENT_EVENTS_WATCHER_ENABLED
+        and settings.TEMPORALIO_WORKER_TASK_QUEUE
+        == settings.TEMPORALIO_SCHEDULE_TASK_QUEUE
+    ):
+        # the deployments statuses are updated by the schedule worker, alongside the monitor schedules
+        watcher = DeploymentEventsWatcher(get_docker_client())
+        await asyncio.gather(worker.run(), watcher.run())
+    else:
+        await worker.run()
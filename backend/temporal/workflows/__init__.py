@@ -65,12 +65,10 @@ with workflow.unsafe.imports_passed_through():
         MonitorDockerDeploymentActivities,
         CleanupActivities,
         CleanupAppLogsWorkflow,
-        DockerComposeStackMetricsActivities,
-        CollectComposeStacksMetricsWorkflow,
         MonitorRegistryDeploymentActivites,
         MonitorRegistrySwarmServiceWorkflow,
-        DockerDeploymentMetricsActivities,
-        GetDockerDeploymentStatsWorkflow,
+        FleetMetricsActivities,
+        CollectFleetMetricsWorkflow,
         close_faulty_db_connections,
         MonitorComposeStackActivites,
         MonitorComposeStackWorkflow,
@@ -82,12 +80,11 @@ def get_workflows_and_activities():
     monitor_activities = MonitorDockerDeploymentActivities()
     cleanup_activites = CleanupActivities()
     system_cleanup_activities = SystemCleanupActivities()
-    metrics_activities = DockerDeploymentMetricsActivities()
+    metrics_activities = FleetMetricsActivities()
     git_activities = GitActivities()
     monitor_registry_activites = MonitorRegistryDeploymentActivites()
     monitor_stack_activites = MonitorComposeStackActivites()
     stack_activites = ComposeStackActivities()
-    stack_metrics_activites = DockerComposeStackMetricsActivities()
 
     return dict(
         workflows=[
@@ -100,7 +97,7 @@ def get_workflows_and_activities():
             ToggleDockerServiceWorkflow,
             CleanupAppLogsWorkflow,
             SystemCleanupWorkflow,
-            GetDockerDeploymentStatsWorkflow,
+            CollectFleetMetricsWorkflow,
             AutoUpdateDockerServiceWorkflow,
             CreateEnvNetworkWorkflow,
             ArchiveEnvWorkflow,
@@ -115,7 +112,6 @@ def get_workflows_and_activities():
             MonitorComposeStackWorkflow,
             ArchiveComposeStackWorkflow,
             ToggleComposeStackWorkflow,
-            CollectComposeStacksMetricsWorkflow,
         ],
         activities=[
             *get_extra_activities(),
@@ -125,6 +121,8 @@ def get_workflows_and_activities():
             git_activities.create_temporary_directory_for_build,
             git_activities.upsert_github_pull_request_comment,
             git_activities.upsert_gitlab_pull_request_comment,
+            git_activities.reuse_image_from_previous_build,
+            git_activities.save_build_artifact,
             git_activities.create_buildkit_builder_for_env,
             git_activities.delete_buildkit_builder_for_env,
             git_activities.cleanup_temporary_directory_for_build,
@@ -136,14 +134,13 @@ def get_workflows_and_activities():
             git_activities.generate_default_files_for_nixpacks_builder,
             git_activities.generate_default_files_for_railpack_builder,
             git_activities.build_service_with_railpack_dockerfile,
-            metrics_activities.collect_deployment_metrics,
-            metrics_activities.save_deployment_metrics,
+            metrics_activities.collect_fleet_metrics,
+            metrics_activities.save_fleet_metrics,
             swarm_activities.set_cancelling_status,
             swarm_activities.create_environment_network,
             swarm_activities.get_archived_env_services,
             swarm_activities.delete_environment_network,
             swarm_activities.save_cancelled_deployment,
-            swarm_activities.create_deployment_stats_schedule,
             swarm_activities.remove_changed_urls_in_deployment,
             swarm_activities.create_project_network,
             swarm_activities.unexpose_docker_service_from_http,
@@ -176,10 +173,12 @@ def get_workflows_and_activities():
             monitor_activities.run_deployment_monitor_healthcheck,
             cleanup_activites.cleanup_service_metrics,
             cleanup_activites.cleanup_compose_stack_metrics,
+            cleanup_activites.cleanup_http_logs,
             system_cleanup_activities.cleanup_images,
             system_cleanup_activities.cleanup_containers,
             system_cleanup_activities.cleanup_volumes,
             system_cleanup_activities.cleanup_networks,
+            system_cleanup_activities.stop_idle_buildkit_builders,
             monitor_registry_activites.run_registry_swarm_healthcheck,
             monitor_registry_activites.save_registry_health_check_status,
             stack_activites.prepare_stack_deployment,
@@ -203,11 +202,8 @@ def get_workflows_and_activities():
             stack_activites.scale_down_stack_services,
             stack_activites.scale_up_stack_services,
             stack_activites.delete_stack_resources,
-            stack_activites.create_stack_metrics_schedule,
             monitor_stack_activites.save_stack_health_check_status,
             monitor_stack_activites.run_stack_healthcheck,
-            stack_metrics_activites.collect_compose_stack_metrics,
-            stack_metrics_activites.save_compose_stack_metrics,
             acquire_service_deploy_semaphore,
             lock_deploy_semaphore,
             release_service_deploy_semaphore,
@@ -325,13 +325,6 @@ class DeployDockerServiceWorkflow(BaseDeploymentWorklow):
                     start_to_close_timeout=timedelta(seconds=5),
                     retry_policy=self.retry_policy,
                 )
-
-                await workflow.execute_activity_method(
-                    DockerSwarmActivities.create_deployment_stats_schedule,
-                    deployment,
-                    start_to_close_timeout=timedelta(seconds=5),
-                    retry_policy=self.retry_policy,
-                )
             else:
                 current_deployment = SimpleDeploymentDetails(
                     hash=deployment.hash,
@@ -617,6 +610,7 @@ class DeployGitServiceWorkflow(BaseDeploymentWorklow):
                 retry_policy=self.retry_policy,
             )
 
+            image_reused = False
             if build_registry is not None:
                 await workflow.execute_activity_method(
                     GitActivities.login_to_global_build_registry,
@@ -624,320 +618,336 @@ class DeployGitServiceWorkflow(BaseDeploymentWorklow):
                     start_to_close_timeout=timedelta(seconds=30),
                     retry_policy=self.retry_policy,
                 )
+                # skip the build if this commit was already built with the same inputs
+                image_reused = await workflow.execute_activity_method(
+                    GitActivities.reuse_image_from_previous_build,
+                    build_registry,
+                    start_to_close_timeout=timedelta(minutes=2),
+                    retry_policy=self.retry_policy,
+                )
 
-            self.tmp_dir = await workflow.execute_activity_method(
-                GitActivities.create_temporary_directory_for_build,
-                deployment,
-                start_to_close_timeout=timedelta(seconds=30),
-                retry_policy=self.retry_policy,
-            )
-            clone_repository_activity_handle = workflow.start_activity_method(
-                GitActivities.clone_repository_and_checkout_to_commit,
-                GitCloneDetails(
-                    deployment=deployment,
-                    tmp_dir=self.tmp_dir,
-                ),
-                start_to_close_timeout=timedelta(minutes=2, seconds=30),
-                retry_policy=self.retry_policy,
-                heartbeat_timeout=timedelta(seconds=3),
-            )
+            if not image_reused:
+                self.tmp_dir = await workflow.execute_activity_method(
+                    GitActivities.create_temporary_directory_for_build,
+                    deployment,
+                    start_to_close_timeout=timedelta(seconds=30),
+                    retry_policy=self.retry_policy,
+                )
+                clone_repository_activity_handle = workflow.start_activity_method(
+                    GitActivities.clone_repository_and_checkout_to_commit,
+                    GitCloneDetails(
+                        deployment=deployment,
+                        tmp_dir=self.tmp_dir,
+                    ),
+                    start_to_close_timeout=timedelta(minutes=2, seconds=30),
+                    retry_policy=self.retry_policy,
+                    heartbeat_timeout=timedelta(seconds=3),
+                )
 
-            monitor_task = asyncio.create_task(
-                self.monitor_cancellation(
-                    clone_repository_activity_handle,
-                    deployment=deployment,
-                    pause_at_step=pause_at_step,
-                    step_to_pause=GitDeploymentStep.CLONING_REPOSITORY,
-                    timeout=timedelta(minutes=2, seconds=30),
+                monitor_task = asyncio.create_task(
+                    self.monitor_cancellation(
+                        clone_repository_activity_handle,
+                        deployment=deployment,
+                        pause_at_step=pause_at_step,
+                        step_to_pause=GitDeploymentStep.CLONING_REPOSITORY,
+                        timeout=timedelta(minutes=2, seconds=30),
+                    )
                 )
-            )
 
-            try:
-                commit = await clone_repository_activity_handle
-                monitor_task.cancel()
-            except ActivityError as e:
-                if (
-                    is_cancelled_exception(e)
-                    and deployment.hash in self.cancellation_requested
+                try:
+                    commit = await clone_repository_activity_handle
+                    monitor_task.cancel()
+                except ActivityError as e:
+                    if (
+                        is_cancelled_exception(e)
+                        and deployment.hash in self.cancellation_requested
+                    ):
+                        return await self.handle_cancellation(
+                            deployment,
+                            last_completed_step=GitDeploymentStep.CLONING_REPOSITORY,
+                        )
+                    raise  # reraise the same exception
+
+                if await self.check_for_cancellation(
+                    GitDeploymentStep.REPOSITORY_CLONED,
+                    pause_at_step=pause_at_step,
+                    deployment=deployment,
                 ):
                     return await self.handle_cancellation(
                         deployment,
-                        last_completed_step=GitDeploymentStep.CLONING_REPOSITORY,
+                        GitDeploymentStep.REPOSITORY_CLONED,
                     )
-                raise  # reraise the same exception
-
-            if await self.check_for_cancellation(
-                GitDeploymentStep.REPOSITORY_CLONED,
-                pause_at_step=pause_at_step,
-                deployment=deployment,
-            ):
-                return await self.handle_cancellation(
-                    deployment,
-                    GitDeploymentStep.REPOSITORY_CLONED,
-                )
-
-            # We update after checkout, because this means the deployment has started building
-            await self.update_pull_request_comment(deployment)
 
-            if commit is None:
-                return await self.finish_deployment(
-                    deployment=deployment,
-                    status=Deployment.DeploymentStatus.FAILED,
-                    reason="Failed to clone and checkout repository",
-                    previous_production_deployment=previous_production_deployment,
-                )
+                # We update after checkout, because this means the deployment has started building
+                await self.update_pull_request_comment(deployment)
 
-            await workflow.execute_activity_method(
-                GitActivities.update_deployment_commit_message_and_author,
-                GitDeploymentDetailsWithCommitMessage(
-                    commit=commit,
-                    deployment=deployment,
-                ),
-                start_to_close_timeout=timedelta(seconds=30),
-                retry_policy=self.retry_policy,
-            )
-            build_stage_target = None
-            dockerfile_path = None
-            build_context_dir = None
-            env_variables: List[EnvVariableDto] | None = None
-            match deployment.service.builder:
-                case Service.Builder.DOCKERFILE:
-                    builder_options = cast(
-                        DockerfileBuilderOptions,
-                        deployment.service.dockerfile_builder_options,
+                if commit is None:
+                    return await self.finish_deployment(
+                        deployment=deployment,
+                        status=Deployment.DeploymentStatus.FAILED,
+                        reason="Failed to clone and checkout repository",
+                        previous_production_deployment=previous_production_deployment,
                     )
 
-                    result = await workflow.execute_activity_method(
-                        GitActivities.generate_default_files_for_dockerfile_builder,
-                        DockerfileBuilderDetails(
-                            deployment=deployment,
-                            temp_build_dir=self.tmp_dir,
-                            builder_options=builder_options,
-                        ),
-                        start_to_close_timeout=timedelta(seconds=15),
-                        retry_policy=self.retry_policy,
-                    )
-                    build_stage_target = builder_options.build_stage_target
-                    dockerfile_path = result.dockerfile_path
-                    build_context_dir = result.build_context_dir
-                case Service.Builder.STATIC_DIR:
-                    builder_options = cast(
-                        StaticDirectoryBuilderOptions,
-                        deployment.service.static_dir_builder_options,
+                await workflow.execute_activity_method(
+                    GitActivities.update_deployment_commit_message_and_author,
+                    GitDeploymentDetailsWithCommitMessage(
+                        commit=commit,
+                        deployment=deployment,
+                    ),
+                    start_to_close_timeout=timedelta(seconds=30),
+                    retry_policy=self.retry_policy,
+                )
+                build_stage_target = None
+                dockerfile_path = None
+                build_context_dir = None
+                env_variables: List[EnvVariableDto] | None = None
+                match deployment.service.builder:
+                    case Service.Builder.DOCKERFILE:
+                        builder_options = cast(
+                            DockerfileBuilderOptions,
+                            deployment.service.dockerfile_builder_options,
+                        )
+
+                        result = await workflow.execute_activity_method(
+                            GitActivities.generate_default_files_for_dockerfile_builder,
+                            DockerfileBuilderDetails(
+                                deployment=deployment,
+                                temp_build_dir=self.tmp_dir,
+                                builder_options=builder_options,
+                            ),
+                            start_to_close_timeout=timedelta(seconds=15),
+                            retry_policy=self.retry_policy,
+                        )
+                        build_stage_target = builder_options.build_stage_target
+                        dockerfile_path = result.dockerfile_path
+                        build_context_dir = result.build_context_dir
+                    case Service.Builder.STATIC_DIR:
+                        builder_options = cast(
+                            StaticDirectoryBuilderOptions,
+                            deployment.service.static_dir_builder_options,
+                        )
+
+                        result = await workflow.execute_activity_method(
+                            GitActivities.generate_default_files_for_static_builder,
+                            StaticBuilderDetails(
+                                deployment=deployment,
+                                temp_build_dir=self.tmp_dir,
+                                builder_options=builder_options,
+                            ),
+                            start_to_close_timeout=timedelta(seconds=15),
+                            retry_policy=self.retry_policy,
+                        )
+                        dockerfile_path = result.dockerfile_path
+                        build_context_dir = result.build_context_dir
+                    case Service.Builder.NIXPACKS:
+                        builder_options = cast(
+                            NixpacksBuilderOptions,
+                            deployment.service.nixpacks_builder_options,
+                        )
+
+                        result = await workflow.execute_activity_method(
+                            GitActivities.generate_default_files_for_nixpacks_builder,
+                            NixpacksBuilderDetails(
+                                deployment=deployment,
+                                temp_build_dir=self.tmp_dir,
+                                builder_options=builder_options,
+                            ),
+                            start_to_close_timeout=timedelta(seconds=15),
+                            retry_policy=self.retry_policy,
+                        )
+                        if result is not None:
+                            dockerfile_path = result.dockerfile_path
+                            build_context_dir = result.build_context_dir
+                            env_variables = result.variables
+                    case Service.Builder.RAILPACK:
+                        builder_options = cast(
+                            NixpacksBuilderOptions,
+                            deployment.service.railpack_builder_options,
+                        )
+                        result = await workflow.execute_activity_method(
+                            GitActivities.generate_default_files_for_railpack_builder,
+                            RailpackBuilderDetails(
+                                deployment=deployment,
+                                temp_build_dir=self.tmp_dir,
+                                builder_options=builder_options,
+                            ),
+                            start_to_close_timeout=timedelta(seconds=30),
+                            retry_policy=self.retry_policy,
+                        )
+                        if result is not None:
+                            dockerfile_path = result.railpack_plan_path
+                            build_context_dir = result.build_context_dir
+                    case _:
+                        raise Exception(
+                            f"Unsupported builder `{deployment.service.builder}`"
+                        )
+
+                if build_context_dir is None or dockerfile_path is None:
+                    return await self.finish_deployment(
+                        deployment=deployment,
+                        reason="Deployment failed",
+                        status=Deployment.DeploymentStatus.FAILED,
+                        previous_production_deployment=previous_production_deployment,
                     )
 
-                    result = await workflow.execute_activity_method(
-                        GitActivities.generate_default_files_for_static_builder,
-                        StaticBuilderDetails(
-                            deployment=deployment,
-                            temp_build_dir=self.tmp_dir,
-                            builder_options=builder_options,
-                        ),
-                        start_to_close_timeout=timedelta(seconds=15),
-                        retry_policy=self.retry_policy,
-                    )
-                    dockerfile_path = result.dockerfile_path
-                    build_context_dir = result.build_context_dir
-                case Service.Builder.NIXPACKS:
-                    builder_options = cast(
-                        NixpacksBuilderOptions,
-                        deployment.service.nixpacks_builder_options,
-                    )
+                await workflow.execute_activity_method(
+                    GitActivities.create_buildkit_builder_for_env,
+                    deployment,
+                    start_to_close_timeout=timedelta(seconds=30),
+                    retry_policy=self.retry_policy,
+                )
 
-                    result = await workflow.execute_activity_method(
-                        GitActivities.generate_default_files_for_nixpacks_builder,
-                        NixpacksBuilderDetails(
+                if deployment.service.builder != Service.Builder.RAILPACK:
+                    build_image_activity_task = workflow.start_activity_method(
+                        GitActivities.build_service_with_dockerfile,
+                        GitBuildDetails(
                             deployment=deployment,
                             temp_build_dir=self.tmp_dir,
-                            builder_options=builder_options,
+                            build_context_dir=build_context_dir,
+                            dockerfile_path=dockerfile_path,
+                            build_stage_target=build_stage_target,
+                            image_tag=cast(str, deployment.image_tag),
+                            default_env_variables=env_variables,
                         ),
-                        start_to_close_timeout=timedelta(seconds=15),
-                        retry_policy=self.retry_policy,
-                    )
-                    if result is not None:
-                        dockerfile_path = result.dockerfile_path
-                        build_context_dir = result.build_context_dir
-                        env_variables = result.variables
-                case Service.Builder.RAILPACK:
-                    builder_options = cast(
-                        NixpacksBuilderOptions,
-                        deployment.service.railpack_builder_options,
+                        start_to_close_timeout=timedelta(minutes=20),
+                        heartbeat_timeout=timedelta(seconds=5),
+                        retry_policy=RetryPolicy(
+                            maximum_attempts=1
+                        ),  # We do not want to retry the build multiple times
                     )
-                    result = await workflow.execute_activity_method(
-                        GitActivities.generate_default_files_for_railpack_builder,
-                        RailpackBuilderDetails(
+                else:
+                    build_image_activity_task = workflow.start_activity_method(
+                        GitActivities.build_service_with_railpack_dockerfile,
+                        GitBuildDetails(
                             deployment=deployment,
                             temp_build_dir=self.tmp_dir,
-                            builder_options=builder_options,
+                            build_context_dir=build_context_dir,
+                            dockerfile_path=dockerfile_path,
+                            build_stage_target=build_stage_target,
+                            image_tag=cast(str, deployment.image_tag),
+                            default_env_variables=env_variables,
                         ),
-                        start_to_close_timeout=timedelta(seconds=30),
-                        retry_policy=self.retry_policy,
-                    )
-                    if result is not None:
-                        dockerfile_path = result.railpack_plan_path
-                        build_context_dir = result.build_context_dir
-                case _:
-                    raise Exception(
-                        f"Unsupported builder `{deployment.service.builder}`"
+                        start_to_close_timeout=timedelta(minutes=20),
+                        heartbeat_timeout=timedelta(seconds=5),
+                        retry_policy=RetryPolicy(
+                            maximum_attempts=1
+                        ),  # We do not want to retry the build multiple times
                     )
 
-            if build_context_dir is None or dockerfile_path is None:
-                return await self.finish_deployment(
-                    deployment=deployment,
-                    reason="Deployment failed",
-                    status=Deployment.DeploymentStatus.FAILED,
-                    previous_production_deployment=previous_production_deployment,
-                )
-
-            await workflow.execute_activity_method(
-                GitActivities.create_buildkit_builder_for_env,
-                deployment,
-                start_to_close_timeout=timedelta(seconds=30),
-                retry_policy=self.retry_policy,
-            )
-
-            if deployment.service.builder != Service.Builder.RAILPACK:
-                build_image_activity_task = workflow.start_activity_method(
-                    GitActivities.build_service_with_dockerfile,
-                    GitBuildDetails(
-                        deployment=deployment,
-                        temp_build_dir=self.tmp_dir,
-                        build_context_dir=build_context_dir,
-                        dockerfile_path=dockerfile_path,
-                        build_stage_target=build_stage_target,
-                        image_tag=cast(str, deployment.image_tag),
-                        default_env_variables=env_variables,
-                    ),
-                    start_to_close_timeout=timedelta(minutes=20),
-                    heartbeat_timeout=timedelta(seconds=5),
-                    retry_policy=RetryPolicy(
-                        maximum_attempts=1
-                    ),  # We do not want to retry the build multiple times
-                )
-            else:
-                build_image_activity_task = workflow.start_activity_method(
-                    GitActivities.build_service_with_railpack_dockerfile,
-                    GitBuildDetails(
+                monitor_task = asyncio.create_task(
+                    self.monitor_cancellation(
+                        build_image_activity_task,
                         deployment=deployment,
-                        temp_build_dir=self.tmp_dir,
-                        build_context_dir=build_context_dir,
-                        dockerfile_path=dockerfile_path,
-                        build_stage_target=build_stage_target,
-                        image_tag=cast(str, deployment.image_tag),
-                        default_env_variables=env_variables,
-                    ),
-                    start_to_close_timeout=timedelta(minutes=20),
-                    heartbeat_timeout=timedelta(seconds=5),
-                    retry_policy=RetryPolicy(
-                        maximum_attempts=1
-                    ),  # We do not want to retry the build multiple times
-                )
-
-            monitor_task = asyncio.create_task(
-                self.monitor_cancellation(
-                    build_image_activity_task,
-                    deployment=deployment,
-                    pause_at_step=pause_at_step,
-                    step_to_pause=GitDeploymentStep.BUILDING_IMAGE,
-                    timeout=timedelta(minutes=20),
+                        pause_at_step=pause_at_step,
+                        step_to_pause=GitDeploymentStep.BUILDING_IMAGE,
+                        timeout=timedelta(minutes=20),
+                    )
                 )
-            )
 
-            try:
-                self.image_built = await build_image_activity_task
-                monitor_task.cancel()
-            except ActivityError as e:
-                print(f"ActivityError {e=}")
-
-                # Cancel both tasks
-                build_image_activity_task.cancel()
-                monitor_task.cancel()
+                try:
+                    self.image_built = await build_image_activity_task
+                    monitor_task.cancel()
+                except ActivityError as e:
+                    print(f"ActivityError {e=}")
+
+                    # Cancel both tasks
+                    build_image_activity_task.cancel()
+                    monitor_task.cancel()
+
+                    if (
+                        is_cancelled_exception(e)
+                        and deployment.hash in self.cancellation_requested
+                    ):
+                        return await self.handle_cancellation(
+                            deployment,
+                            last_completed_step=GitDeploymentStep.BUILDING_IMAGE,
+                        )
+                    raise  # reraise the same exception
 
-                if (
-                    is_cancelled_exception(e)
-                    and deployment.hash in self.cancellation_requested
+                if await self.check_for_cancellation(
+                    GitDeploymentStep.IMAGE_BUILT,
+                    pause_at_step=pause_at_step,
+                    deployment=deployment,
                 ):
                     return await self.handle_cancellation(
                         deployment,
-                        last_completed_step=GitDeploymentStep.BUILDING_IMAGE,
+                        GitDeploymentStep.IMAGE_BUILT,
                     )
-                raise  # reraise the same exception
 
-            if await self.check_for_cancellation(
-                GitDeploymentStep.IMAGE_BUILT,
-                pause_at_step=pause_at_step,
-                deployment=deployment,
-            ):
-                return await self.handle_cancellation(
-                    deployment,
-                    GitDeploymentStep.IMAGE_BUILT,
-                )
+                if self.image_built is None:
+                    return await self.finish_deployment(
+                        deployment=deployment,
+                        reason="Failed to build the image",
+                        status=Deployment.DeploymentStatus.FAILED,
+                        previous_production_deployment=previous_production_deployment,
+                    )
 
-            if self.image_built is None:
-                return await self.finish_deployment(
-                    deployment=deployment,
-                    reason="Failed to build the image",
-                    status=Deployment.DeploymentStatus.FAILED,
-                    previous_production_deployment=previous_production_deployment,
+                push_image_activity_task = workflow.start_activity_method(
+                    GitActivities.push_image_to_remote_registry,
+                    deployment,
+                    start_to_close_timeout=timedelta(minutes=5),
+                    heartbeat_timeout=timedelta(seconds=3),
+                    retry_policy=RetryPolicy(
+                        maximum_attempts=1
+                    ),  # We do not want to retry the push
                 )
-
-            push_image_activity_task = workflow.start_activity_method(
-                GitActivities.push_image_to_remote_registry,
-                deployment,
-                start_to_close_timeout=timedelta(minutes=5),
-                heartbeat_timeout=timedelta(seconds=3),
-                retry_policy=RetryPolicy(
-                    maximum_attempts=1
-                ),  # We do not want to retry the push
-            )
-            monitor_task = asyncio.create_task(
-                self.monitor_cancellation(
-                    push_image_activity_task,
-                    deployment=deployment,
-                    pause_at_step=pause_at_step,
-                    step_to_pause=GitDeploymentStep.BUILDING_IMAGE,
-                    timeout=timedelta(minutes=2),
+                monitor_task = asyncio.create_task(
+                    self.monitor_cancellation(
+                        push_image_activity_task,
+                        deployment=deployment,
+                        pause_at_step=pause_at_step,
+                        step_to_pause=GitDeploymentStep.BUILDING_IMAGE,
+                        timeout=timedelta(minutes=2),
+                    )
                 )
-            )
 
-            try:
-                exit_code = await push_image_activity_task
-                monitor_task.cancel()
-            except ActivityError as e:
-                print(f"ActivityError {e=}")
+                try:
+                    exit_code = await push_image_activity_task
+                    monitor_task.cancel()
+                except ActivityError as e:
+                    print(f"ActivityError {e=}")
+
+                    # Cancel both tasks
+                    push_image_activity_task.cancel()
+                    monitor_task.cancel()
+
+                    if (
+                        is_cancelled_exception(e)
+                        and deployment.hash in self.cancellation_requested
+                    ):
+                        return await self.handle_cancellation(
+                            deployment,
+                            last_completed_step=GitDeploymentStep.PUSHING_IMAGE,
+                        )
+                    raise  # reraise the same exception
+                else:
+                    if exit_code != 0:
+                        return await self.finish_deployment(
+                            deployment=deployment,
+                            reason="Failed to push the image to the registry",
+                            status=Deployment.DeploymentStatus.FAILED,
+                            previous_production_deployment=previous_production_deployment,
+                        )
 
-                # Cancel both tasks
-                push_image_activity_task.cancel()
-                monitor_task.cancel()
+                if build_registry is not None:
+                    await workflow.execute_activity_method(
+                        GitActivities.save_build_artifact,
+                        build_registry,
+                        start_to_close_timeout=timedelta(seconds=30),
+                        retry_policy=self.retry_policy,
+                    )
 
-                if (
-                    is_cancelled_exception(e)
-                    and deployment.hash in self.cancellation_requested
+                if await self.check_for_cancellation(
+                    GitDeploymentStep.IMAGE_PUSHED,
+                    pause_at_step=pause_at_step,
+                    deployment=deployment,
                 ):
                     return await self.handle_cancellation(
                         deployment,
-                        last_completed_step=GitDeploymentStep.PUSHING_IMAGE,
-                    )
-                raise  # reraise the same exception
-            else:
-                if exit_code != 0:
-                    return await self.finish_deployment(
-                        deployment=deployment,
-                        reason="Failed to push the image to the registry",
-                        status=Deployment.DeploymentStatus.FAILED,
-                        previous_production_deployment=previous_production_deployment,
+                        GitDeploymentStep.IMAGE_PUSHED,
                     )
 
-            if await self.check_for_cancellation(
-                GitDeploymentStep.IMAGE_PUSHED,
-                pause_at_step=pause_at_step,
-                deployment=deployment,
-            ):
-                return await self.handle_cancellation(
-                    deployment,
-                    GitDeploymentStep.IMAGE_PUSHED,
-                )
-
             service = deployment.service
             if len(service.docker_volumes) > 0:
                 self.created_volumes = await workflow.execute_activity_method(
@@ -1160,13 +1170,6 @@ class DeployGitServiceWorkflow(BaseDeploymentWorklow):
                 start_to_close_timeout=timedelta(seconds=5),
                 retry_policy=self.retry_policy,
             )
-
-            await workflow.execute_activity_method(
-                DockerSwarmActivities.create_deployment_stats_schedule,
-                deployment,
-                start_to_close_timeout=timedelta(seconds=5),
-                retry_policy=self.retry_policy,
-            )
         else:
             current_deployment = SimpleDeploymentDetails(
                 hash=deployment.hash,
@@ -66,6 +66,12 @@ class SystemCleanupWorkflow:
                 retry_policy=self.retry_policy,
             )
 
+            await workflow.execute_activity_method(
+                SystemCleanupActivities.stop_idle_buildkit_builders,
+                start_to_close_timeout=timedelta(minutes=5),
+                retry_policy=self.retry_policy,
+            )
+
         finally:
             # release all deployment locks
             await workflow.execute_activity(
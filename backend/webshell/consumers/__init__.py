@@ -1,3 +1,4 @@
 from .deployment_terminal import *
 from .server_terminal import *
 from .compose_stack_terminal import *
+from .logs_tail import *
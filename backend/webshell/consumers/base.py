@@ -0,0 +1,32 @@
+from channels.generic.websocket import AsyncWebsocketConsumer
+from django.contrib.auth.models import AbstractUser
+
+from zane_api.constants import WORKSPACE_SESSION_KEY
+from zane_api.models import WorkspaceMembership
+from zane_api.utils import Colors
+
+
+class WorkspaceWebsocketConsumer(AsyncWebsocketConsumer):
+    async def send_error(self, message: str):
+        await self.send(f"{Colors.RED}{message}{Colors.ENDC}\n\r", close=True)
+
+    async def check_for_workspace_roles(self, role: int):
+        self.user: AbstractUser = self.scope["user"]  # type: ignore
+        self.session = self.scope["session"]  # type: ignore
+        workspace_id = self.session.get(WORKSPACE_SESSION_KEY)
+
+        qs = WorkspaceMembership.objects.filter(
+            user=self.user,
+            role__gte=role,
+        ).select_related("workspace")
+
+        if workspace_id:
+            qs = qs.filter(workspace_id=workspace_id)
+
+        membership = await qs.afirst()
+
+        if not membership:
+            await self.send_error("You do not have permission to access this resource")
+
+        # return membership is not None and membership.role >= WorkspaceRole.MEMBER
+        return membership
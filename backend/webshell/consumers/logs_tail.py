@@ -0,0 +1,191 @@
+import json
+import urllib.parse
+from typing import List, Optional, cast
+
+from django.conf import settings
+
+from compose.models import ComposeStack
+from search.dtos import RuntimeLogSource
+from search.loki_client import LokiSearchClient
+from search.loki_tail import LokiTail, subscribe, unsubscribe
+from zane_api.models import (
+    Deployment,
+    Environment,
+    Project,
+    Service,
+    WorkspaceMembership,
+    WorkspaceRole,
+)
+from zane_api.permissions import aget_accessible_projects
+
+from ..exceptions import log_consumer_exceptions
+from ..serializers import LogsTailQuerySerializer
+from .base import WorkspaceWebsocketConsumer
+
+
+class GenericLogsTailConsumer(WorkspaceWebsocketConsumer):
+    """
+    Send the new logs as they are received by Loki, each message is a JSON object
+    of the form `{"results": [...logs]}`, with the logs in the same format as the search endpoints.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tail: Optional[LokiTail] = None
+
+    async def send_error(self, message: str):
+        await self.send(json.dumps({"error": message}), close=True)
+
+    async def get_logs_query(self, membership: WorkspaceMembership) -> Optional[dict]:
+        """
+        Filters of the logs to tail, returns `None` (after sending the error)
+        if the resource doesn't exist.
+        """
+        raise NotImplementedError("This class needs to be subclassed")
+
+    async def connect(self):
+        await self.accept()
+
+        membership = await self.check_for_workspace_roles(WorkspaceRole.MEMBER)
+        if not membership:
+            return
+
+        logs_query = await self.get_logs_query(membership)
+        if logs_query is None:
+            return
+
+        query_string = urllib.parse.unquote_plus(self.scope["query_string"].decode())  # type: ignore
+        params = urllib.parse.parse_qs(query_string)
+        serializer = LogsTailQuerySerializer(
+            data={
+                key: values if key == "level" else values[0]
+                for key, values in params.items()
+            }
+        )
+        if not serializer.is_valid():
+            return await self.send_error(
+                f"Invalid query parameters: {serializer.errors}"
+            )
+
+        search_client = LokiSearchClient(host=settings.LOKI_HOST)
+        self.tail = subscribe(
+            search_client.get_tail_query(
+                dict(**cast(dict, serializer.validated_data), **logs_query)
+            ),
+            self._on_logs,
+        )
+
+    async def _on_logs(self, logs: Optional[List[dict]]):
+        if logs is None:
+            # the connection to Loki has been closed, the client can reconnect
+            self.tail = None
+            return await self.close()
+        await self.send(json.dumps({"results": logs}))
+
+    async def disconnect(self, code):
+        if self.tail is not None:
+            unsubscribe(self.tail, self._on_logs)
+            self.tail = None
+
+
+class GenericDeploymentLogsTailConsumer(GenericLogsTailConsumer):
+    sources: List[str] = []
+
+    async def get_logs_query(self, membership: WorkspaceMembership) -> Optional[dict]:
+        kwargs = self.scope["url_route"]["kwargs"]  # type: ignore
+        project_slug = kwargs["project_slug"]
+        service_slug = kwargs["service_slug"]
+        env_slug = kwargs.get("env_slug") or Environment.PRODUCTION_ENV_NAME
+        deployment_hash = kwargs["deployment_hash"]
+
+        try:
+            project = await Project.objects.aget(
+                slug=project_slug,
+                id__in=await aget_accessible_projects(
+                    self.user,
+                    membership.workspace,
+                ),
+            )
+            environment = await Environment.objects.aget(
+                name=env_slug.lower(), project=project
+            )
+            service = await Service.objects.aget(
+                slug=service_slug, project=project, environment=environment
+            )
+            deployment = await Deployment.objects.aget(
+                service=service, hash=deployment_hash
+            )
+        except Project.DoesNotExist:
+            await self.send_error(
+                f"A project with the slug `{project_slug}` does not exist."
+            )
+        except Environment.DoesNotExist:
+            await self.send_error(
+                f"An environment with the name `{env_slug}` does not exist in this project"
+            )
+        except Service.DoesNotExist:
+            await self.send_error(
+                f"A service with the slug `{service_slug}` does not exist within the environment `{env_slug}` of the project `{project_slug}`"
+            )
+        except Deployment.DoesNotExist:
+            await self.send_error(
+                f"A deployment with the hash `{deployment_hash}` does not exist for this service."
+            )
+        else:
+            return dict(
+                service_id=service.id,
+                deployment_id=deployment.hash,
+                source=self.sources,
+            )
+        return None
+
+
+@log_consumer_exceptions
+class DeploymentRuntimeLogsTailConsumer(GenericDeploymentLogsTailConsumer):
+    sources = [RuntimeLogSource.SERVICE]
+
+
+@log_consumer_exceptions
+class DeploymentBuildLogsTailConsumer(GenericDeploymentLogsTailConsumer):
+    sources = [RuntimeLogSource.BUILD, RuntimeLogSource.SYSTEM]
+
+
+@log_consumer_exceptions
+class ComposeStackLogsTailConsumer(GenericLogsTailConsumer):
+    async def get_logs_query(self, membership: WorkspaceMembership) -> Optional[dict]:
+        kwargs = self.scope["url_route"]["kwargs"]  # type: ignore
+        project_slug = kwargs["project_slug"]
+        env_slug = kwargs["env_slug"]
+        stack_slug = kwargs["stack_slug"]
+
+        try:
+            project = await Project.objects.aget(
+                slug=project_slug,
+                id__in=await aget_accessible_projects(
+                    self.user,
+                    membership.workspace,
+                ),
+            )
+            environment = await Environment.objects.aget(
+                name=env_slug.lower(), project=project
+            )
+            stack = await ComposeStack.objects.aget(
+                environment=environment,
+                project=project,
+                slug=stack_slug,
+            )
+        except Project.DoesNotExist:
+            await self.send_error(
+                f"A project with the slug `{project_slug}` does not exist"
+            )
+        except Environment.DoesNotExist:
+            await self.send_error(
+                f"An environment with the name `{env_slug}` does not exist in this project"
+            )
+        except ComposeStack.DoesNotExist:
+            await self.send_error(
+                f"A compose stack with the slug `{stack_slug}` does not exist in this environment"
+            )
+        else:
+            return dict(stack_id=stack.id, source=[RuntimeLogSource.SERVICE])
+        return None
@@ -15,6 +15,21 @@ websocket_urlpatterns = [
         r"/(?P<service_name>([^\s])+)/(?P<container_id>([\w])+)/?$",
         consumers.ComposeStackTerminalConsumer.as_asgi(),
     ),
+    re_path(
+        rf"ws/deployment-runtime-logs/(?P<project_slug>{DJANGO_SLUG_REGEX})/(?P<env_slug>{DJANGO_SLUG_REGEX})"
+        rf"/(?P<service_slug>{DJANGO_SLUG_REGEX})/(?P<deployment_hash>[a-zA-Z0-9-_]+)/?$",
+        consumers.DeploymentRuntimeLogsTailConsumer.as_asgi(),
+    ),
+    re_path(
+        rf"ws/deployment-build-logs/(?P<project_slug>{DJANGO_SLUG_REGEX})/(?P<env_slug>{DJANGO_SLUG_REGEX})"
+        rf"/(?P<service_slug>{DJANGO_SLUG_REGEX})/(?P<deployment_hash>[a-zA-Z0-9-_]+)/?$",
+        consumers.DeploymentBuildLogsTailConsumer.as_asgi(),
+    ),
+    re_path(
+        rf"ws/compose-stack-logs/(?P<project_slug>{DJANGO_SLUG_REGEX})/(?P<env_slug>{DJANGO_SLUG_REGEX})"
+        rf"/(?P<stack_slug>{DJANGO_SLUG_REGEX})/?$",
+        consumers.ComposeStackLogsTailConsumer.as_asgi(),
+    ),
     re_path(
         rf"ws/server-ssh/(?P<slug>{DJANGO_SLUG_REGEX})/?$",
         consumers.ServerTerminalConsumer.as_asgi(),
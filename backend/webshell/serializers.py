@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from . import models
 from .validators import validate_unix_username
+from search.dtos import RuntimeLogLevel
 
 
 class CreateSSHKeyRequestSerializer(serializers.Serializer):
@@ -49,3 +50,16 @@ class DeploymentTerminalResizeSerializer(serializers.Serializer):
     type = serializers.ChoiceField(choices=["resize"])
     rows = serializers.IntegerField(required=True)
     cols = serializers.IntegerField(required=True)
+
+
+class LogsTailQuerySerializer(serializers.Serializer):
+    query = serializers.CharField(
+        required=False, allow_blank=True, trim_whitespace=False
+    )
+    level = serializers.ListField(
+        child=serializers.ChoiceField(
+            choices=[RuntimeLogLevel.INFO, RuntimeLogLevel.ERROR]
+        ),
+        required=False,
+    )
+    stack_service_name = serializers.CharField(required=False)
@@ -7,6 +7,8 @@ class ZaneApiConfig(AppConfig):
     name = 'zane_api'
 
     def ready(self):
+        from . import signals  # noqa: F401
+
         # Only instrument the API process serving HTTP requests, never during
         # tests or in the temporal workers.
         if settings.BACKEND_COMPONENT == "API" and not settings.TESTING:
@@ -0,0 +1,113 @@
+"""
+Index of all the domains that ZaneOps can issue a TLS certificate for.
+
+Caddy asks `CheckCertificatesAPIView` before issuing a certificate on demand, for every
+TLS handshake with an unknown SNI, including the ones of bots scanning random hostnames.
+Instead of querying the URLs of services, build registries & compose stacks each time,
+the domains are indexed in a set of exact domains and a set of wildcard parents
+(`*.example.com` is stored as `example.com`), so that a check is two set lookups.
+
+The index is built once per version and shared through the cache, each process also keeps
+its own copy. The version is changed by signals whenever a domain is added, modified
+or removed (see `zane_api/signals.py`), which makes every process rebuild or reload the index.
+"""
+
+import uuid
+from dataclasses import dataclass, field
+from typing import Optional, Set, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+
+DOMAIN_INDEX_VERSION_CACHE_KEY = "[zaneops::internal::domain-index-version]"
+DOMAIN_INDEX_CACHE_KEY_PREFIX = "[zaneops::internal::domain-index]"
+DOMAIN_INDEX_CACHE_TIMEOUT = 24 * 60 * 60  # seconds
+
+
+@dataclass
+class DomainIndex:
+    exact_domains: Set[str] = field(default_factory=set)
+    # parents of wildcard domains, `*.example.com` is stored as `example.com`
+    wildcard_parents: Set[str] = field(default_factory=set)
+
+    def add(self, domain: str, allow_wildcard: bool = True):
+        domain = domain.lower()
+        if allow_wildcard and domain.startswith("*."):
+            self.wildcard_parents.add(domain.removeprefix("*."))
+        else:
+            self.exact_domains.add(domain)
+
+    def contains(self, domain: str) -> bool:
+        domain = domain.lower()
+        if domain in self.exact_domains:
+            return True
+        # `hello.zaneops.io` is covered by `*.zaneops.io`, but not `a.hello.zaneops.io`
+        _, _, parent = domain.partition(".")
+        return parent in self.wildcard_parents
+
+    @classmethod
+    def build(cls) -> "DomainIndex":
+        from .models import URL
+        from container_registry.models import BuildRegistry
+        from compose.models import ComposeStackURL
+
+        index = cls()
+        for domain in URL.objects.values_list("domain", flat=True).iterator():
+            index.add(domain)
+
+        # build registries are only matched on their exact domain
+        for domain in BuildRegistry.objects.values_list(
+            "registry_domain", flat=True
+        ).iterator():
+            if domain:
+                index.add(domain, allow_wildcard=False)
+
+        for domain in ComposeStackURL.objects.values_list(
+            "domain", flat=True
+        ).iterator():
+            index.add(domain)
+        return index
+
+
+_local_index: Optional[Tuple[str, DomainIndex]] = None
+
+
+def _get_version() -> str:
+    version = cache.get(DOMAIN_INDEX_VERSION_CACHE_KEY)
+    if version is None:
+        # the version has been evicted from the cache, only the first process sets it
+        cache.add(DOMAIN_INDEX_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+        version = cache.get(DOMAIN_INDEX_VERSION_CACHE_KEY)
+    return version
+
+
+def get_domain_index() -> DomainIndex:
+    global _local_index
+    version = _get_version()
+    if _local_index is not None and _local_index[0] == version:
+        return _local_index[1]
+
+    cache_key = f"{DOMAIN_INDEX_CACHE_KEY_PREFIX}:{version}"
+    index: Optional[DomainIndex] = cache.get(cache_key)
+    if index is None:
+        index = DomainIndex.build()
+        cache.set(cache_key, index, DOMAIN_INDEX_CACHE_TIMEOUT)
+
+    _local_index = (version, index)
+    return index
+
+
+def _set_new_version():
+    global _local_index
+    _local_index = None
+    cache.set(DOMAIN_INDEX_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+
+def invalidate_domain_index():
+    """
+    Change the version of the index right away and once again when the current
+    transaction is committed, in case another process rebuilt the index in between
+    from data that was not yet visible.
+    """
+    _set_new_version()
+    transaction.on_commit(_set_new_version)
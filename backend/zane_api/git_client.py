@@ -1,8 +1,20 @@
 from typing import Callable, List, Optional
 from git import Git, GitCommandError, RemoteProgress, Repo, Commit
 import asyncio
+import contextlib
+import fcntl
+import hashlib
+import os
+import shlex
+import shutil
+import weakref
+from django.conf import settings
 from .utils import Colors, obfuscate_git_token
-from .process import AyncSubProcessRunner, OutputHandlerFunction
+from .process import (
+    AyncSubProcessRunner,
+    OutputHandlerFunction,
+    PROGRESS_FRAMES_INTERVAL,
+)
 
 
 class GitCloneFailedError(GitCommandError):
@@ -79,35 +91,154 @@ class GitClient:
         except GitCommandError as e:
             raise GitCloneFailedError(e.command, e.status, e.stderr, e.stdout) from e
 
-    async def aclone_repository(
+    async def aclone_repository_from_mirror(
         self,
         url: str,
+        repository_url: str,
         dest_path: str,
         branch: str,
         message_handler: OutputHandlerFunction,
         cancel_event: asyncio.Event,
     ) -> Repo:
-        obfuscated_url = obfuscate_git_token(url)
-        git_clone_command_obfuscated = f"/usr/bin/git clone --progress --single-branch --branch {branch} {obfuscated_url} {dest_path}"
-        await message_handler(
-            f"Running {Colors.YELLOW}{git_clone_command_obfuscated}{Colors.ENDC}"
+        """
+        Clone the repository by first fetching it into a bare mirror stored on the node,
+        and then cloning the mirror locally into `dest_path`.
+        The mirror is kept between deployments, so only the new commits are downloaded,
+        and the local clone uses hardlinks, so it doesn't need to copy the objects.
+
+        The branch is always fetched with the credentials of the deployment, even when
+        another deployment has just fetched it, the mirror can be shared by services using
+        different credentials, and we don't want to clone code that a deployment has no access to.
+
+        - `url` is the url used to fetch the repository, it can include credentials
+        - `repository_url` is the public url of the repository, it is used as the key of the mirror
+        """
+        mirror_path = git_mirrors_cache.get_mirror_path(repository_url)
+        async with git_mirrors_cache.lock(repository_url):
+            try:
+                await self._aclone_through_mirror(
+                    url=url,
+                    mirror_path=mirror_path,
+                    dest_path=dest_path,
+                    branch=branch,
+                    message_handler=message_handler,
+                    cancel_event=cancel_event,
+                )
+            except GitCloneFailedError:
+                if cancel_event.is_set():
+                    raise
+                # The mirror can be corrupted, or a worker may have died mid-fetch
+                # and left ref `*.lock` files in it, retry once from a fresh mirror
+                await message_handler(
+                    f"{Colors.YELLOW}Cloning from the git mirror failed, retrying from a fresh mirror...{Colors.ENDC}"
+                )
+                await asyncio.to_thread(shutil.rmtree, mirror_path, ignore_errors=True)
+                await self._aclone_through_mirror(
+                    url=url,
+                    mirror_path=mirror_path,
+                    dest_path=dest_path,
+                    branch=branch,
+                    message_handler=message_handler,
+                    cancel_event=cancel_event,
+                )
+
+        await asyncio.to_thread(git_mirrors_cache.evict, keep=mirror_path)
+        return Repo(dest_path)
+
+    async def _aclone_through_mirror(
+        self,
+        url: str,
+        mirror_path: str,
+        dest_path: str,
+        branch: str,
+        message_handler: OutputHandlerFunction,
+        cancel_event: asyncio.Event,
+    ):
+        await self._afetch_into_mirror(
+            url=url,
+            mirror_path=mirror_path,
+            branch=branch,
+            message_handler=message_handler,
+            cancel_event=cancel_event,
         )
 
-        git_clone_command = f"/usr/bin/git clone --progress --single-branch --branch {branch} {url} {dest_path}"
+        git_clone_command = shlex.join(
+            [
+                "/usr/bin/git",
+                "clone",
+                "--progress",
+                "--single-branch",
+                "--branch",
+                branch,
+                mirror_path,
+                dest_path,
+            ]
+        )
+        await message_handler(
+            f"Running {Colors.YELLOW}{git_clone_command}{Colors.ENDC}"
+        )
         runner = AyncSubProcessRunner(
             command=git_clone_command,
             cancel_event=cancel_event,
             operation_name="git clone",
             output_handler=message_handler,
+            progress_interval=PROGRESS_FRAMES_INTERVAL,
         )
         exit_code, _ = await runner.run()
-        print(
-            f"Process finished with exit_code={Colors.ORANGE}{exit_code}{Colors.ENDC}"
-        )
         if exit_code != 0:
             raise GitCloneFailedError(git_clone_command, exit_code)
-        else:
-            return Repo(dest_path)
+
+    async def _afetch_into_mirror(
+        self,
+        url: str,
+        mirror_path: str,
+        branch: str,
+        message_handler: OutputHandlerFunction,
+        cancel_event: asyncio.Event,
+    ):
+        if not os.path.isfile(os.path.join(mirror_path, "HEAD")):
+            git_init_command = shlex.join(
+                ["/usr/bin/git", "init", "--bare", "--quiet", mirror_path]
+            )
+            runner = AyncSubProcessRunner(
+                command=git_init_command,
+                cancel_event=cancel_event,
+                operation_name="git init",
+                output_handler=message_handler,
+            )
+            exit_code, _ = await runner.run()
+            if exit_code != 0:
+                raise GitCloneFailedError(git_init_command, exit_code)
+
+        # The url is passed at each fetch instead of being saved as a remote,
+        # because it can contain short-lived credentials
+        refspec = f"+refs/heads/{branch}:refs/heads/{branch}"
+        git_fetch_args = [
+            "/usr/bin/git",
+            "-C",
+            mirror_path,
+            "fetch",
+            "--progress",
+            "--prune",
+            "--no-tags",
+        ]
+        git_fetch_command_obfuscated = shlex.join(
+            [*git_fetch_args, obfuscate_git_token(url), refspec]
+        )
+        await message_handler(
+            f"Running {Colors.YELLOW}{git_fetch_command_obfuscated}{Colors.ENDC}"
+        )
+        git_fetch_command = shlex.join([*git_fetch_args, url, refspec])
+        runner = AyncSubProcessRunner(
+            command=git_fetch_command,
+            cancel_event=cancel_event,
+            operation_name="git fetch",
+            output_handler=message_handler,
+            progress_interval=PROGRESS_FRAMES_INTERVAL,
+        )
+        exit_code, _ = await runner.run()
+        if exit_code != 0:
+            raise GitCloneFailedError(git_fetch_command_obfuscated, exit_code)
 
     def checkout_repository(self, repo: Repo, commit_sha: str) -> Commit:
         try:
@@ -194,3 +325,102 @@ class SimpleRichCloneProgressWithMessageHandler(RemoteProgress):
         width = 20
         filled = int(width * percent / 100)
         return f"[{'=' * filled}{' ' * (width - filled)}]"
+
+
+class GitMirrorsCache:
+    """
+    Cache of bare git mirrors stored on the node, keyed by repository url.
+
+    Each mirror has a lock file, the lock is held while the mirror is fetched
+    and cloned, so that concurrent deployments of the same repository don't fetch it at the same time
+    and so that a mirror in use is never evicted.
+    When the cache grows bigger than `max_size` bytes, the least recently used mirrors are deleted.
+    """
+
+    LOCK_POLL_INTERVAL = 0.5  # seconds
+
+    def __init__(self, cache_dir: str, max_size: int):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self._locks: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[str, asyncio.Lock]
+        ] = weakref.WeakKeyDictionary()
+
+    def get_mirror_path(self, repository_url: str) -> str:
+        key = repository_url.strip().rstrip("/").removesuffix(".git").lower()
+        return os.path.join(
+            self.cache_dir, f"{hashlib.sha256(key.encode()).hexdigest()[:32]}.git"
+        )
+
+    @contextlib.asynccontextmanager
+    async def lock(self, repository_url: str):
+        """
+        Lock the mirror of `repository_url`.
+        An asyncio lock serializes the deployments of this worker,
+        and a file lock serializes them with the other processes on the node.
+        """
+        mirror_path = self.get_mirror_path(repository_url)
+        locks = self._locks.setdefault(asyncio.get_running_loop(), {})
+        async with locks.setdefault(mirror_path, asyncio.Lock()):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(f"{mirror_path}.lock", "a") as lock_file:
+                while True:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        await asyncio.sleep(self.LOCK_POLL_INTERVAL)
+                try:
+                    if os.path.isdir(mirror_path):
+                        # the modification time of the mirror is used for LRU eviction
+                        os.utime(mirror_path)
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def evict(self, keep: Optional[str] = None):
+        """
+        Delete the least recently used mirrors until the cache is smaller than `max_size`,
+        mirrors locked by another deployment are skipped.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return
+
+        mirrors: list[tuple[float, int, str]] = []
+        for entry in os.scandir(self.cache_dir):
+            if not (entry.is_dir() and entry.name.endswith(".git")):
+                continue
+            size = 0
+            for root, _, files in os.walk(entry.path):
+                for file in files:
+                    try:
+                        size += os.lstat(os.path.join(root, file)).st_size
+                    except FileNotFoundError:
+                        pass
+            mirrors.append((entry.stat().st_mtime, size, entry.path))
+
+        total_size = sum(size for _, size, _ in mirrors)
+        for _, size, mirror_path in sorted(mirrors):
+            if total_size <= self.max_size:
+                break
+            if mirror_path == keep:
+                continue
+            with open(f"{mirror_path}.lock", "a") as lock_file:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # this mirror is in use
+                try:
+                    print(
+                        f"Evicting git mirror {Colors.ORANGE}{mirror_path}{Colors.ENDC} from the cache..."
+                    )
+                    shutil.rmtree(mirror_path, ignore_errors=True)
+                    total_size -= size
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+git_mirrors_cache = GitMirrorsCache(
+    cache_dir=settings.GIT_MIRRORS_CACHE_DIR,
+    max_size=settings.GIT_MIRRORS_CACHE_MAX_SIZE,
+)
@@ -0,0 +1,210 @@
+"""
+Benchmark the ingestion and the queries of http logs.
+
+To compare two index sets, run the benchmark once per migration state, ex:
+
+    python manage.py migrate zane_api 0341
+    python manage.py benchmark_http_logs --explain
+    python manage.py migrate zane_api
+    python manage.py benchmark_http_logs --explain
+
+The generated logs are deleted at the end of the benchmark.
+"""
+
+import random
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from ...models import HttpLog
+from ...utils import Colors
+
+BENCHMARK_ID_PREFIX = "bench_"
+
+USER_AGENTS = [
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_5) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.5 Safari/605.1.15",
+    "curl/8.7.1",
+    "Go-http-client/1.1",
+]
+PATHS = ["/", "/api/users", "/api/projects", "/static/app.js", "/login", "/health"]
+METHODS = [choice for choice, _ in HttpLog.RequestMethod.choices]
+STATUSES = [200, 200, 200, 201, 204, 301, 304, 400, 404, 500]
+
+
+class Command(BaseCommand):
+    help = "Benchmark the ingestion & the most common queries of http logs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, default=200_000, help="Number of logs to ingest"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of logs per `bulk_create`, like a batch sent to `LogIngestAPIView`",
+        )
+        parser.add_argument(
+            "--services", type=int, default=50, help="Number of distinct services"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=20, help="Number of runs of each query"
+        )
+        parser.add_argument(
+            "--days", type=int, default=7, help="Time span of the generated logs"
+        )
+        parser.add_argument(
+            "--explain",
+            action="store_true",
+            help="Print the execution plan of each query",
+        )
+
+    def handle(self, *args, **options):
+        rows: int = options["rows"]
+        batch_size: int = options["batch_size"]
+        repeat: int = options["repeat"]
+        services = [f"{BENCHMARK_ID_PREFIX}srv_{i}" for i in range(options["services"])]
+        now = timezone.now()
+        span = timedelta(days=options["days"]).total_seconds()
+
+        self.stdout.write(
+            f"Indexes on {Colors.BLUE}{HttpLog._meta.db_table}{Colors.ENDC}:"
+        )
+        for name, definition in self.get_indexes():
+            self.stdout.write(f"  - {Colors.GREY}{name}{Colors.ENDC}: {definition}")
+
+        try:
+            ingest_durations: list[float] = []
+            for offset in range(0, rows, batch_size):
+                batch = [
+                    self.build_log(
+                        random.choice(services),
+                        now - timedelta(seconds=random.random() * span),
+                    )
+                    for _ in range(min(batch_size, rows - offset))
+                ]
+                start = time.perf_counter()
+                HttpLog.objects.bulk_create(batch)
+                ingest_durations.append(time.perf_counter() - start)
+
+            total = sum(ingest_durations)
+            self.stdout.write(
+                f"\nIngested {Colors.ORANGE}{rows}{Colors.ENDC} logs in {total:.2f}s "
+                f"({Colors.GREEN}{rows / total:.0f} rows/s{Colors.ENDC}, "
+                f"p50={self.ms(statistics.median(ingest_durations))} per batch of {batch_size})"
+            )
+            self.stdout.write(f"Total indexes size: {self.get_indexes_size()}\n")
+
+            # refresh the statistics of the planner, like autovacuum would do after a bulk ingestion
+            with connection.cursor() as cursor:
+                cursor.execute(f'ANALYZE "{HttpLog._meta.db_table}"')
+
+            service_id = services[0]
+            deployment_id = f"{service_id}_dpl_0"
+            stack_id = f"{BENCHMARK_ID_PREFIX}stk"
+            last_hour = (now - timedelta(hours=1), now)
+            queries: dict[str, QuerySet] = {
+                "service logs (latest page)": HttpLog.objects.filter(
+                    service_id=service_id
+                ).order_by("-time")[:50],
+                "deployment logs (latest page)": HttpLog.objects.filter(
+                    deployment_id=deployment_id
+                ).order_by("-time")[:50],
+                "stack service logs (latest page)": HttpLog.objects.filter(
+                    stack_id=stack_id, stack_service_name="web"
+                ).order_by("-time")[:50],
+                "service logs, last hour, 5xx": HttpLog.objects.filter(
+                    service_id=service_id,
+                    time__range=last_hour,
+                    status__gte=500,
+                    status__lte=599,
+                ).order_by("-time")[:50],
+                "service logs, slowest first": HttpLog.objects.filter(
+                    service_id=service_id
+                ).order_by("-request_duration_ns")[:50],
+                "service path values (prefix search)": HttpLog.objects.filter(
+                    Q(service_id=service_id) & Q(request_path__startswith="/api")
+                )
+                .order_by("request_path")
+                .values_list("request_path", flat=True)
+                .distinct()[:7],
+            }
+
+            for label, queryset in queries.items():
+                list(queryset.all())  # warm up the cache
+                durations = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    # `.all()` returns a copy of the queryset, so that the results are not cached
+                    list(queryset.all())
+                    durations.append(time.perf_counter() - start)
+                self.stdout.write(
+                    f"{label.ljust(40)} p50={self.ms(statistics.median(durations))} "
+                    f"max={self.ms(max(durations))}"
+                )
+                if options["explain"]:
+                    plan = queryset.explain(analyze=True, buffers=True)
+                    for line in plan.splitlines():
+                        self.stdout.write(f"    {Colors.GREY}{line}{Colors.ENDC}")
+        finally:
+            deleted, _ = HttpLog.objects.filter(
+                Q(service_id__startswith=BENCHMARK_ID_PREFIX)
+                | Q(stack_id__startswith=BENCHMARK_ID_PREFIX)
+            ).delete()
+            self.stdout.write(
+                f"\nDeleted {Colors.GREY}{deleted}{Colors.ENDC} benchmark logs"
+            )
+
+    @staticmethod
+    def build_log(service_id: str, log_time) -> HttpLog:
+        is_stack = random.random() < 0.2
+        return HttpLog(
+            time=log_time,
+            service_id=None if is_stack else service_id,
+            deployment_id=(
+                None if is_stack else f"{service_id}_dpl_{random.randint(0, 4)}"
+            ),
+            stack_id=f"{BENCHMARK_ID_PREFIX}stk" if is_stack else None,
+            stack_service_name=random.choice(["web", "worker"]) if is_stack else None,
+            request_method=random.choice(METHODS),
+            status=random.choice(STATUSES),
+            request_duration_ns=random.randint(100_000, 2_000_000_000),
+            request_headers={"User-Agent": [random.choice(USER_AGENTS)]},
+            response_headers={"Content-Type": ["text/html"]},
+            request_host=f"{service_id}.example.com",
+            request_path=random.choice(PATHS),
+            request_query=f"page={random.randint(1, 100)}",
+            request_ip=f"10.0.{random.randint(0, 255)}.{random.randint(1, 254)}",
+            request_uuid=str(uuid.uuid4()),
+            request_user_agent=random.choice(USER_AGENTS),
+        )
+
+    @staticmethod
+    def get_indexes() -> list[tuple[str, str]]:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s ORDER BY indexname",
+                [HttpLog._meta.db_table],
+            )
+            return cursor.fetchall()
+
+    @staticmethod
+    def get_indexes_size() -> str:
+        # the partitioned table itself is empty, the indexes are stored by its partitions
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_size_pretty(sum(pg_indexes_size(relid))) FROM pg_partition_tree(%s)",
+                [HttpLog._meta.db_table],
+            )
+            return cursor.fetchone()[0]
+
+    @staticmethod
+    def ms(seconds: float) -> str:
+        return f"{seconds * 1000:.2f}ms"
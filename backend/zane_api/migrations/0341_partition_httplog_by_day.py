@@ -0,0 +1,137 @@
+# Generated by Django 5.2 on 2026-10-16 20:26
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+from zane_api.partitioning import create_daily_partitions
+
+HTTP_LOG_INDEXES = {
+    "zane_api_ht_service_7e2352_idx": "service_id",
+    "zane_api_ht_status_28ab6e_idx": "status",
+    "zane_api_ht_request_3f1f93_idx": "request_host",
+    "zane_api_ht_deploym_d671e6_idx": "deployment_id",
+    "zane_api_ht_time_b680fd_idx": "time",
+    "zane_api_ht_request_5fa6b3_idx": "request_method",
+    "zane_api_ht_request_d290e0_idx": "request_path",
+    "zane_api_ht_request_db6570_idx": "request_user_agent",
+    "zane_api_ht_request_294e3f_idx": "request_ip",
+    "zane_api_ht_request_6430c9_idx": "request_query",
+    "zane_api_ht_request_c84e20_idx": "request_uuid",
+    "zane_api_ht_registr_ac2455_idx": "registry_id",
+    "zane_api_ht_stack_i_9ca17d_idx": "stack_id",
+    "zane_api_ht_stack_s_4e36cb_idx": "stack_service_name",
+}
+
+
+def create_indexes(cursor):
+    for name, column in HTTP_LOG_INDEXES.items():
+        cursor.execute(f'CREATE INDEX "{name}" ON "zane_api_httplog" ("{column}")')
+
+
+def partition_http_logs_table(apps, schema_editor):
+    """
+    Replace the `zane_api_httplog` table by a table partitioned by day on `time`.
+    Only the logs within the retention period are copied, the older ones
+    would be deleted by the first logs cleanup anyway.
+    """
+    today = timezone.now().date()
+    cutoff = today - timedelta(days=settings.HTTP_LOGS_RETENTION_DAYS)
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            'ALTER TABLE "zane_api_httplog" RENAME TO "zane_api_httplog_unpartitioned"'
+        )
+        cursor.execute(
+            """
+            CREATE TABLE "zane_api_httplog" (
+                LIKE "zane_api_httplog_unpartitioned" INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+            ) PARTITION BY RANGE ("time")
+            """
+        )
+        cursor.execute(
+            'CREATE TABLE "zane_api_httplog_default" PARTITION OF "zane_api_httplog" DEFAULT'
+        )
+        create_daily_partitions(
+            cursor,
+            table="zane_api_httplog",
+            partition_key="time",
+            start=cutoff,
+            end=today + timedelta(days=settings.HTTP_LOGS_PARTITIONS_PREMAKE_DAYS),
+        )
+        cursor.execute(
+            """
+            INSERT INTO "zane_api_httplog"
+            SELECT * FROM "zane_api_httplog_unpartitioned" WHERE "time" >= %s
+            """,
+            [cutoff],
+        )
+        # the constraints & indexes are created after the old table is dropped, to reuse their names
+        cursor.execute('DROP TABLE "zane_api_httplog_unpartitioned"')
+        cursor.execute(
+            'ALTER TABLE "zane_api_httplog" ADD CONSTRAINT "zane_api_httplog_pkey" PRIMARY KEY ("id", "time")'
+        )
+        cursor.execute(
+            'ALTER TABLE "zane_api_httplog" ADD CONSTRAINT "unique_request_uuid_per_time" UNIQUE ("request_uuid", "time")'
+        )
+        create_indexes(cursor)
+
+
+def unpartition_http_logs_table(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            'ALTER TABLE "zane_api_httplog" RENAME TO "zane_api_httplog_partitioned"'
+        )
+        cursor.execute(
+            """
+            CREATE TABLE "zane_api_httplog" (
+                LIKE "zane_api_httplog_partitioned" INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+            )
+            """
+        )
+        cursor.execute(
+            'INSERT INTO "zane_api_httplog" SELECT * FROM "zane_api_httplog_partitioned"'
+        )
+        # dropping the partitioned table also drops all of its partitions
+        cursor.execute('DROP TABLE "zane_api_httplog_partitioned"')
+        cursor.execute(
+            'ALTER TABLE "zane_api_httplog" ADD CONSTRAINT "zane_api_httplog_pkey" PRIMARY KEY ("id")'
+        )
+        cursor.execute(
+            'ALTER TABLE "zane_api_httplog" ADD CONSTRAINT "zane_api_httplog_request_uuid_key" UNIQUE ("request_uuid")'
+        )
+        create_indexes(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("zane_api", "0340_workspaceinvitation_invited_by"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name="httplog",
+                    name="request_uuid",
+                    field=models.CharField(max_length=255, null=True),
+                ),
+                migrations.AddConstraint(
+                    model_name="httplog",
+                    constraint=models.UniqueConstraint(
+                        fields=("request_uuid", "time"),
+                        name="unique_request_uuid_per_time",
+                    ),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(
+                    partition_http_logs_table,
+                    reverse_code=unpartition_http_logs_table,
+                ),
+            ],
+        ),
+    ]
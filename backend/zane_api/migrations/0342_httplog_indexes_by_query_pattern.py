@@ -0,0 +1,95 @@
+# Generated by Django 5.2 on 2026-10-16 20:29
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("zane_api", "0341_partition_httplog_by_day"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="httplog",
+            name="zane_api_ht_service_7e2352_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="httplog",
+            name="zane_api_ht_status_28ab6e_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="httplog",
+            name="zane_api_ht_request_3f1f93_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="httplog",
+            name="zane_api_ht_deploym_d671e6_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="httplog",
+            name="zane_api_ht_time_b680fd_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="httplog",
+            name="zane_api_ht_request_5fa6b3_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="httplog",
+            name="zane_api_ht_request_d290e0_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="httplog",
+            name="zane_api_ht_request_db6570_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="httplog",
+            name="zane_api_ht_request_294e3f_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="httplog",
+            name="zane_api_ht_request_6430c9_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="httplog",
+            name="zane_api_ht_request_c84e20_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="httplog",
+            name="zane_api_ht_registr_ac2455_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="httplog",
+            name="zane_api_ht_stack_i_9ca17d_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="httplog",
+            name="zane_api_ht_stack_s_4e36cb_idx",
+        ),
+        migrations.AddIndex(
+            model_name="httplog",
+            index=models.Index(
+                fields=["service_id", "-time"], name="zane_api_ht_service_7dde0a_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="httplog",
+            index=models.Index(
+                fields=["deployment_id", "-time"], name="zane_api_ht_deploym_04adb5_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="httplog",
+            index=models.Index(
+                fields=["stack_id", "stack_service_name", "-time"],
+                name="zane_api_ht_stack_i_3809af_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="httplog",
+            index=django.contrib.postgres.indexes.BrinIndex(
+                fields=["time"], name="zane_api_ht_time_6f1195_brin"
+            ),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2 on 2026-10-16 20:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("zane_api", "0342_httplog_indexes_by_query_pattern"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BuildArtifact",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("repository_url", models.URLField(max_length=2048)),
+                ("commit_sha", models.CharField(max_length=45)),
+                ("build_inputs_hash", models.CharField(max_length=64)),
+                ("image", models.CharField(max_length=1024)),
+                ("image_digest", models.CharField(max_length=100)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "deployment",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="build_artifacts",
+                        to="zane_api.deployment",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("repository_url", "commit_sha", "build_inputs_hash"),
+                        name="unique_build_artifact_per_inputs",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -5,6 +5,7 @@ from typing import Optional
 
 from django.conf import settings
 from django.core.validators import MinLengthValidator, MinValueValidator
+from django.contrib.postgres.indexes import BrinIndex
 from django.db import models
 from django.db.models import (
     Q,
@@ -1863,6 +1864,39 @@ class Deployment(BaseDeployment):
         )
 
 
+class BuildArtifact(models.Model):
+    """
+    Image built for a git deployment and pushed to the build registry, indexed by the commit
+    and the inputs of the build, so that a deployment with the same commit & inputs
+    reuses the image instead of building it again.
+    The inputs include the project & the git app of the service, images are never shared between projects.
+    """
+
+    repository_url = models.URLField(max_length=2048)
+    commit_sha = models.CharField(max_length=45)
+    # hash of the builder, the builder options, the build env variables & the build registry
+    build_inputs_hash = models.CharField(max_length=64)
+    image = models.CharField(max_length=1024)
+    image_digest = models.CharField(max_length=100)
+    deployment = models.ForeignKey(
+        to=Deployment,
+        on_delete=models.CASCADE,
+        related_name="build_artifacts",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"BuildArtifact({self.image}@{self.image_digest})"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["repository_url", "commit_sha", "build_inputs_hash"],
+                name="unique_build_artifact_per_inputs",
+            )
+        ]
+
+
 class BaseDeploymentChange(TimestampedModel):
     class ChangeType(models.TextChoices):
         UPDATE = "UPDATE", _("update")
@@ -1933,6 +1967,11 @@ class DeploymentChange(BaseDeploymentChange):
 
 
 class HttpLog(models.Model):
+    """
+    On postgres, this table is partitioned by day on `time` (see `zane_api.partitioning`),
+    so its real primary key is `(id, time)`, and the expired days are removed by dropping partitions.
+    """
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     created_at = models.DateTimeField(default=timezone.now)
     service_id = models.CharField(null=True)
@@ -1977,26 +2016,27 @@ class HttpLog(models.Model):
     request_uuid = models.CharField(
         null=True,
         max_length=255,
-        unique=True,
     )
     request_user_agent = models.TextField(blank=True, null=True)
 
     class Meta:
+        constraints = [
+            # unique constraints on a partitioned table must include the partition key
+            models.UniqueConstraint(
+                fields=["request_uuid", "time"],
+                name="unique_request_uuid_per_time",
+            ),
+        ]
+        # Every index is updated for each ingested row, so only the indexes
+        # matching the way logs are queried are kept: logs are always scoped
+        # to a service, a deployment or a stack and sorted by time, the other
+        # filters are applied to the rows of that scope.
         indexes = [
-            models.Index(fields=["deployment_id"]),
-            models.Index(fields=["service_id"]),
-            models.Index(fields=["registry_id"]),
-            models.Index(fields=["stack_id"]),
-            models.Index(fields=["stack_service_name"]),
-            models.Index(fields=["request_method"]),
-            models.Index(fields=["status"]),
-            models.Index(fields=["request_host"]),
-            models.Index(fields=["request_path"]),
-            models.Index(fields=["time"]),
-            models.Index(fields=["request_user_agent"]),
-            models.Index(fields=["request_ip"]),
-            models.Index(fields=["request_uuid"]),
-            models.Index(fields=["request_query"]),
+            models.Index(fields=["service_id", "-time"]),
+            models.Index(fields=["deployment_id", "-time"]),
+            models.Index(fields=["stack_id", "stack_service_name", "-time"]),
+            # time-range scans over whole partitions (ex: logs cleanup)
+            BrinIndex(fields=["time"]),
         ]
         ordering = ("-time",)
 
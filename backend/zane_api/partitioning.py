@@ -0,0 +1,129 @@
+"""
+Helpers to manage tables partitioned by day with Postgres declarative partitioning.
+
+A partitioned table has one partition per day, named `<table>_p<YYYYMMDD>`,
+plus a `<table>_default` partition catching the rows outside of all the existing ranges.
+Expired data is removed by dropping whole partitions instead of deleting rows one by one.
+
+These functions only use raw SQL, so that they can also be used in migrations.
+"""
+
+import re
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List
+
+PARTITION_SUFFIX_PATTERN = re.compile(r"_p(\d{8})$")
+
+
+def get_partition_name(table: str, day: date) -> str:
+    return f"{table}_p{day.strftime('%Y%m%d')}"
+
+
+def get_default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def is_table_partitioned(cursor, table: str) -> bool:
+    cursor.execute(
+        """
+        SELECT EXISTS (
+            SELECT 1 FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            WHERE c.relname = %s
+        )
+        """,
+        [table],
+    )
+    return cursor.fetchone()[0]
+
+
+def list_daily_partitions(cursor, table: str) -> dict[date, str]:
+    cursor.execute(
+        """
+        SELECT child.relname FROM pg_inherits i
+        JOIN pg_class child ON child.oid = i.inhrelid
+        JOIN pg_class parent ON parent.oid = i.inhparent
+        WHERE parent.relname = %s
+        """,
+        [table],
+    )
+    partitions: dict[date, str] = {}
+    for (name,) in cursor.fetchall():
+        match = PARTITION_SUFFIX_PATTERN.search(name)
+        if match is not None:
+            partitions[datetime.strptime(match.group(1), "%Y%m%d").date()] = name
+    return partitions
+
+
+def create_daily_partitions(
+    cursor, table: str, partition_key: str, start: date, end: date
+) -> List[str]:
+    """
+    Create the missing daily partitions of `table` for all the days between `start` and `end` (inclusive).
+    Rows of the day that were stored in the default partition are moved into the new partition.
+    """
+    existing_partitions = list_daily_partitions(cursor, table)
+    default_partition = get_default_partition_name(table)
+    created: List[str] = []
+
+    day = start
+    while day <= end:
+        if day not in existing_partitions:
+            name = get_partition_name(table, day)
+            range_start, range_end = _day_start(day), _day_start(
+                day + timedelta(days=1)
+            )
+
+            # Postgres refuses to attach a partition if the default partition
+            # contains rows for its range, so we move them first
+            cursor.execute(
+                f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+            )
+            cursor.execute(
+                f"""
+                WITH moved AS (
+                    DELETE FROM "{default_partition}"
+                    WHERE "{partition_key}" >= %s AND "{partition_key}" < %s
+                    RETURNING *
+                )
+                INSERT INTO "{name}" SELECT * FROM moved
+                """,
+                [range_start, range_end],
+            )
+            cursor.execute(
+                f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" FOR VALUES FROM (%s) TO (%s)',
+                [range_start, range_end],
+            )
+            created.append(name)
+        day += timedelta(days=1)
+    return created
+
+
+def drop_daily_partitions_before(cursor, table: str, before: date) -> List[str]:
+    """
+    Drop all the daily partitions of `table` for the days strictly before `before`.
+    """
+    dropped: List[str] = []
+    for day, name in sorted(list_daily_partitions(cursor, table).items()):
+        if day < before:
+            cursor.execute(f'DROP TABLE "{name}"')
+            dropped.append(name)
+    return dropped
+
+
+def delete_from_default_partition_before(
+    cursor, table: str, partition_key: str, before: date
+) -> int:
+    """
+    Delete the expired rows that landed in the default partition
+    (rows with a date for which no daily partition existed).
+    """
+    cursor.execute(
+        f'DELETE FROM "{get_default_partition_name(table)}" WHERE "{partition_key}" < %s',
+        [_day_start(before)],
+    )
+    return cursor.rowcount
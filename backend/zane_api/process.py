@@ -1,33 +1,74 @@
 import asyncio
 import os
+import re
 import signal
+import time
 from typing import Any, Optional, Protocol, Tuple
 from asyncio.subprocess import Process
 
 from .utils import Colors
 
+# Minimum delay between two progress frames sent to the output handler
+# when a runner coalesces progress output
+PROGRESS_FRAMES_INTERVAL = 0.5  # seconds
+
 
 async def async_noop():
     """This function does nothing"""
     ...
 
 
-async def read_until(stream: asyncio.StreamReader, delimiters: list[bytes]):
+class BufferedLineReader:
     """
-    Custom replacement for `asyncio.StreamReader.readuntil`
-    accepting multiple delimiters instead of one.
-    Plus it doesn't throw an error if the end data doesn't have
-    the delimiter character.
+    Read a stream line by line, splitting on both `\\r` and `\\n`.
+    Each line is returned with its delimiter, so that callers can distinguish
+    progress frames (ending with `\\r`) from regular lines (ending with `\\n`).
+    Unlike `asyncio.StreamReader.readuntil`, it doesn't throw an error
+    if the end data doesn't have a delimiter character.
+
+    The stream is read in big chunks instead of byte per byte, because
+    verbose commands (`docker buildx build`, `git clone --progress`)
+    can output millions of bytes per run. Only the bytes received since the last
+    search are scanned for a delimiter, and lines longer than `MAX_LINE_LENGTH`
+    are split, so that an output without any delimiter is read in linear time & bounded memory.
     """
-    buffer = bytearray()
-    while True:
-        character = await stream.read(1)
-        if not character:
-            break
-        buffer.extend(character)
-        if character in delimiters:
-            break
-    return bytes(buffer)
+
+    CHUNK_SIZE = 64 * 1024
+    MAX_LINE_LENGTH = 1024 * 1024
+    DELIMITER_PATTERN = re.compile(rb"[\r\n]")
+
+    def __init__(self, stream: asyncio.StreamReader):
+        self.stream = stream
+        self._buffer = bytearray()
+        # position up to which the buffer is known not to contain a delimiter
+        self._scan_offset = 0
+        self._eof = False
+
+    def _pop_line(self, end: int) -> bytes:
+        line = bytes(self._buffer[:end])
+        del self._buffer[:end]
+        self._scan_offset = 0
+        return line
+
+    async def readline(self) -> bytes:
+        """Returns an empty bytes object when EOF is reached"""
+        while True:
+            match = self.DELIMITER_PATTERN.search(self._buffer, self._scan_offset)
+            if match is not None:
+                return self._pop_line(match.end())
+            self._scan_offset = len(self._buffer)
+
+            if len(self._buffer) >= self.MAX_LINE_LENGTH:
+                return self._pop_line(self.MAX_LINE_LENGTH)
+
+            if self._eof:
+                return self._pop_line(len(self._buffer))
+
+            chunk = await self.stream.read(self.CHUNK_SIZE)
+            if not chunk:
+                self._eof = True
+            else:
+                self._buffer.extend(chunk)
 
 
 class OutputHandlerFunction(Protocol):
@@ -41,7 +82,13 @@ class AyncSubProcessRunner:
         cancel_event: asyncio.Event,
         output_handler: OutputHandlerFunction,
         operation_name: str,
+        progress_interval: Optional[float] = None,
     ):
+        """
+        If `progress_interval` (in seconds) is passed, progress frames (lines ending with `\\r`)
+        are coalesced : only the last frame received in each interval is sent to `output_handler`,
+        at the latest when the interval ends, even if the process doesn't output anything else.
+        """
         self.command = command
         self.cancel_event = cancel_event
         self.output_handler = output_handler
@@ -50,6 +97,11 @@ class AyncSubProcessRunner:
         self.exit_code: Optional[int] = None
         self._terminate_task: Optional[asyncio.Task[int]] = None
         self._cancellation_requested = False
+        self.progress_interval = progress_interval
+        self._reader: Optional[BufferedLineReader] = None
+        self._readline_task: Optional[asyncio.Task[bytes]] = None
+        self._pending_progress_frame: Optional[bytes] = None
+        self._last_progress_frame_sent_at = 0.0
 
     async def run(self) -> Tuple[int | None, Optional[Any]]:
         print(
@@ -87,6 +139,8 @@ class AyncSubProcessRunner:
                 await cancel_monitor_task
             except asyncio.CancelledError:
                 pass
+            if self._readline_task is not None:
+                self._readline_task.cancel()
 
             if self.exit_code is None:
                 self.exit_code = await (
@@ -121,19 +175,38 @@ class AyncSubProcessRunner:
         if process.stdout is None:
             return True
 
+        if self._reader is None:
+            self._reader = BufferedLineReader(process.stdout)
+
         try:
-            stdout = await read_until(process.stdout, delimiters=[b"\r", b"\n"])
+            stdout = await self._readline(self._reader)
 
             if not stdout:
+                if self._pending_progress_frame is not None:
+                    await self._send_output(self._pending_progress_frame)
+                    self._pending_progress_frame = None
                 print(
                     f"[{Colors.YELLOW}{self.operation_name}{Colors.ENDC}] Reached {Colors.GREY}EOF{Colors.ENDC}"
                 )
                 return True
 
-            if stdout:
-                result = await self.output_handler(stdout.decode().rstrip())
-                if result is not None:
-                    self.result = result
+            if self.progress_interval is None:
+                await self._send_output(stdout)
+            elif stdout.endswith(b"\r"):
+                now = time.monotonic()
+                if now - self._last_progress_frame_sent_at >= self.progress_interval:
+                    self._last_progress_frame_sent_at = now
+                    self._pending_progress_frame = None
+                    await self._send_output(stdout)
+                else:
+                    self._pending_progress_frame = stdout
+            else:
+                if stdout.strip() == b"" and self._pending_progress_frame is not None:
+                    # the frame is just terminated (`\r\n`), so it is the final state of the line
+                    stdout = self._pending_progress_frame
+                # Otherwise the pending frame has been overwritten by this line
+                self._pending_progress_frame = None
+                await self._send_output(stdout)
 
             return False
         except asyncio.CancelledError:
@@ -142,6 +215,41 @@ class AyncSubProcessRunner:
                 return False
             raise
 
+    async def _readline(self, reader: BufferedLineReader) -> bytes:
+        """
+        Wait for the next line, sending the pending progress frame when the progress interval ends.
+        The read runs in its own task, so that it is not interrupted by the timer or by a cancellation.
+        """
+        if self._readline_task is None:
+            self._readline_task = asyncio.create_task(reader.readline())
+
+        while (
+            self._pending_progress_frame is not None
+            and self.progress_interval is not None
+            and not self._readline_task.done()
+        ):
+            delay = (
+                self._last_progress_frame_sent_at
+                + self.progress_interval
+                - time.monotonic()
+            )
+            await asyncio.wait({self._readline_task}, timeout=max(delay, 0))
+            if not self._readline_task.done():
+                frame = self._pending_progress_frame
+                self._pending_progress_frame = None
+                self._last_progress_frame_sent_at = time.monotonic()
+                await self._send_output(frame)
+
+        await asyncio.wait({self._readline_task})
+        task, self._readline_task = self._readline_task, None
+        return task.result()
+
+    async def _send_output(self, line: bytes):
+        # lines split at `MAX_LINE_LENGTH` may end in the middle of a character
+        result = await self.output_handler(line.decode(errors="replace").rstrip())
+        if result is not None:
+            self.result = result
+
     async def _terminate(self, process: Process) -> int:
         if process.returncode is not None:
             return process.returncode
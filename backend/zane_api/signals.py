@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .domain_index import invalidate_domain_index
+from .models import URL
+from container_registry.models import BuildRegistry
+from compose.models import ComposeStack
+
+
+@receiver(post_save, sender=URL)
+@receiver(post_delete, sender=URL)
+@receiver(post_save, sender=BuildRegistry)
+@receiver(post_delete, sender=BuildRegistry)
+@receiver(post_delete, sender=ComposeStack)
+def invalidate_domain_index_on_change(sender, **kwargs):
+    invalidate_domain_index()
+
+
+@receiver(post_save, sender=ComposeStack)
+def invalidate_domain_index_on_stack_urls_change(sender, update_fields=None, **kwargs):
+    if update_fields is None or "urls" in update_fields:
+        invalidate_domain_index()
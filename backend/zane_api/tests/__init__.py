@@ -28,3 +28,7 @@ from .shared_volumes import *
 from .workspace import *
 from .workspace_invitations import *
 from .workspace_permissions import *
+from .process import *
+from .partitioning import *
+from .semaphore import *
+from .git_client import *
@@ -41,6 +41,7 @@ from temporalio.testing import WorkflowEnvironment
 from temporalio.worker import Worker
 import yaml
 from temporal.shared import DeploymentDetails
+from temporal.log_sink import DeploymentLogSinkInterceptor
 
 from search.loki_client import LokiSearchClient
 from asgiref.sync import sync_to_async
@@ -484,6 +485,7 @@ class AuthAPITestCase(APITestCase):
             env.client,
             task_queue=task_queue,
             **get_workflows_and_activities(),  # type: ignore
+            interceptors=[DeploymentLogSinkInterceptor()],
         )
         await worker.__aenter__()
 
@@ -1964,6 +1966,7 @@ class FakeDockerClient:
         self.container_map: dict[str, List[FakeDockerClient.FakeContainer]] = {}
 
         self.api.build = self.image_build
+        self.api.pull = self.api_pull
 
         self.images.search = self.images_search
         self.images.pull = self.images_pull
@@ -2011,7 +2014,10 @@ class FakeDockerClient:
             pass
 
     def images_get(self, id: str):
-        return self.image_map.get(id)
+        image = self.image_map.get(id)
+        if image is None:
+            raise docker.errors.ImageNotFound("This image does not exist")
+        return image
 
     def image_build(
         self,
@@ -2285,6 +2291,19 @@ class FakeDockerClient:
         self.image_get_registry_data(image=repository, auth_config=auth_config)
         self.pulled_images.add(repository)
 
+    def api_pull(self, repository: str, auth_config: dict | None = None, **kwargs):
+        self.images_pull(repository=repository, auth_config=auth_config)
+        yield {"status": "Pulling from library/image", "id": "latest"}
+        yield {"status": "Pulling fs layer", "id": "abcdef12345"}
+        yield {
+            "status": "Downloading",
+            "progressDetail": {"current": 12, "total": 40},
+            "progress": "[====>         ] 12MB/40MB",
+            "id": "abcdef12345",
+        }
+        yield {"status": "Pull complete", "id": "abcdef12345"}
+        yield {"status": f"Status: Downloaded newer image for {repository}"}
+
     def image_get_registry_data(self, image: str, auth_config: dict | None):
         if image == self.PRIVATE_IMAGE:
             # require authentication for the private image
@@ -1,8 +1,13 @@
 # type: ignore
+import asyncio
+from unittest.mock import MagicMock, patch
+
 from .base import AuthAPITestCase
+from django.test import SimpleTestCase
 from django.urls import reverse
 from rest_framework import status
 from ..models import Deployment
+from temporal.client import StartWorkflowArg, StartWorkflowsError, TemporalClient
 
 
 class BulkDeployServiceViewTests(AuthAPITestCase):
@@ -36,3 +41,64 @@ class BulkDeployServiceViewTests(AuthAPITestCase):
             self.assertIsNotNone(
                 self.fake_docker_client.get_deployment_service(latest_deployment)
             )
+
+
+class TemporalClientStartWorkflowsTests(SimpleTestCase):
+    def test_start_workflows_concurrently_with_bounded_parallelism(self):
+        in_flight = 0
+        max_in_flight = 0
+
+        async def start_workflow(id: str, **kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if id == "wf-3":
+                raise RuntimeError("cannot start workflow")
+
+        client = MagicMock()
+        client.start_workflow = start_workflow
+        workflows = [
+            StartWorkflowArg(workflow="Workflow", payload=None, workflow_id=f"wf-{i}")
+            for i in range(10)
+        ]
+
+        with patch.object(TemporalClient, "_client", client):
+            results = asyncio.run(
+                TemporalClient.astart_workflows(
+                    workflows, max_concurrency=4, raise_on_error=False
+                )
+            )
+
+        self.assertEqual(4, max_in_flight)
+        self.assertEqual(
+            [f"wf-{i}" for i in range(10)], [r.workflow_id for r in results]
+        )
+        self.assertEqual(
+            ["wf-3"], [result.workflow_id for result in results if not result.success]
+        )
+
+    def test_start_workflows_raise_after_starting_the_other_workflows(self):
+        started: list[str] = []
+
+        async def start_workflow(id: str, **kwargs):
+            if id == "wf-1":
+                raise RuntimeError("temporal is down")
+            started.append(id)
+
+        client = MagicMock()
+        client.start_workflow = start_workflow
+        workflows = [
+            StartWorkflowArg(workflow="Workflow", payload=None, workflow_id=f"wf-{i}")
+            for i in range(3)
+        ]
+
+        with patch.object(TemporalClient, "_client", client):
+            with self.assertRaises(StartWorkflowsError) as context:
+                asyncio.run(TemporalClient.astart_workflows(workflows))
+
+        self.assertEqual(["wf-0", "wf-2"], sorted(started))
+        self.assertEqual(
+            ["wf-1"], [failure.workflow_id for failure in context.exception.failures]
+        )
@@ -1,7 +1,15 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import docker.errors
+
+from django.test import SimpleTestCase
 from django.urls import reverse
 from rest_framework import status
 
-from .base import AuthAPITestCase
+from .base import AuthAPITestCase, FakeDockerClient
+from temporal.docker_client import AsyncDockerClient
+from temporal.image_pulls import pull_image
 
 
 class DockerViewTests(AuthAPITestCase):
@@ -23,3 +31,65 @@ class DockerViewTests(AuthAPITestCase):
     def test_search_query_empty(self):
         response = self.client.get(reverse("zane_api:docker.image_search"))
         self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+
+class ImagePullCoordinatorTests(SimpleTestCase):
+    def setUp(self):
+        self.fake_docker_client = FakeDockerClient()
+        self.docker = AsyncDockerClient(self.fake_docker_client)  # type: ignore
+
+    def test_concurrent_pulls_of_the_same_image_are_shared(self):
+        pull_spy = MagicMock(wraps=self.fake_docker_client.api_pull)
+        self.fake_docker_client.api.pull = pull_spy
+
+        async def pull_twice():
+            return await asyncio.gather(
+                pull_image(self.docker, "nginx:alpine"),
+                pull_image(self.docker, "nginx:alpine"),
+            )
+
+        self.assertEqual([True, True], asyncio.run(pull_twice()))
+        self.assertEqual(1, pull_spy.call_count)
+        self.assertIn("nginx:alpine", self.fake_docker_client.pulled_images)
+
+    def test_pulls_with_different_credentials_are_not_shared(self):
+        image = FakeDockerClient.PRIVATE_IMAGE
+        credentials = FakeDockerClient.PRIVATE_IMAGE_CREDENTIALS
+
+        async def pull_with_both_passwords():
+            return await asyncio.gather(
+                pull_image(self.docker, image, auth_config=credentials),
+                pull_image(
+                    self.docker,
+                    image,
+                    auth_config={**credentials, "password": "expired"},
+                ),
+                return_exceptions=True,
+            )
+
+        valid_pull, invalid_pull = asyncio.run(pull_with_both_passwords())
+        self.assertTrue(valid_pull)
+        # the pull with the wrong password doesn't wait for the one with the valid password
+        self.assertIsInstance(invalid_pull, docker.errors.APIError)
+
+    def test_skip_pull_when_local_image_matches_registry_digest(self):
+        self.fake_docker_client.images.get_registry_data = MagicMock(
+            return_value=MagicMock(id="sha256:abc")
+        )
+        self.fake_docker_client.images.get = MagicMock(
+            return_value=MagicMock(attrs={"RepoDigests": ["nginx@sha256:abc"]})
+        )
+
+        pulled = asyncio.run(pull_image(self.docker, "nginx:alpine"))
+        self.assertFalse(pulled)
+        self.assertNotIn("nginx:alpine", self.fake_docker_client.pulled_images)
+
+    def test_pull_progress_is_streamed_without_noisy_statuses(self):
+        lines: list[str] = []
+
+        async def on_progress(line: str):
+            lines.append(line)
+
+        asyncio.run(pull_image(self.docker, "nginx:alpine", on_progress=on_progress))
+        self.assertIn("abcdef12345: Pull complete", lines)
+        self.assertFalse(any("Downloading" in line for line in lines))
@@ -0,0 +1,223 @@
+import asyncio
+import fcntl
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from ..git_client import GitClient, GitCloneFailedError, GitMirrorsCache
+
+
+class GitMirrorsCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+
+    def create_mirror(self, cache: GitMirrorsCache, repository_url: str, age: int):
+        """
+        Create a fake mirror of 100 bytes, last used `age` seconds ago.
+        """
+        mirror_path = cache.get_mirror_path(repository_url)
+        os.makedirs(os.path.join(mirror_path, "objects"))
+        with open(os.path.join(mirror_path, "objects", "pack"), "wb") as file:
+            file.write(b"0" * 100)
+        used_at = time.time() - age
+        os.utime(mirror_path, (used_at, used_at))
+        return mirror_path
+
+    def test_evict_least_recently_used_mirrors_until_under_max_size(self):
+        cache = GitMirrorsCache(cache_dir=self.cache_dir, max_size=200)
+        oldest = self.create_mirror(cache, "https://github.com/zane-ops/a", age=300)
+        older = self.create_mirror(cache, "https://github.com/zane-ops/b", age=200)
+        recent = self.create_mirror(cache, "https://github.com/zane-ops/c", age=100)
+        newest = self.create_mirror(cache, "https://github.com/zane-ops/d", age=0)
+
+        cache.evict()
+
+        self.assertFalse(os.path.exists(oldest))
+        self.assertFalse(os.path.exists(older))
+        self.assertTrue(os.path.isdir(recent))
+        self.assertTrue(os.path.isdir(newest))
+
+    def test_evict_nothing_when_under_max_size(self):
+        cache = GitMirrorsCache(cache_dir=self.cache_dir, max_size=200)
+        first = self.create_mirror(cache, "https://github.com/zane-ops/a", age=300)
+        second = self.create_mirror(cache, "https://github.com/zane-ops/b", age=0)
+
+        cache.evict()
+
+        self.assertTrue(os.path.isdir(first))
+        self.assertTrue(os.path.isdir(second))
+
+    def test_evict_does_not_delete_the_kept_mirror(self):
+        cache = GitMirrorsCache(cache_dir=self.cache_dir, max_size=100)
+        kept = self.create_mirror(cache, "https://github.com/zane-ops/a", age=300)
+        other = self.create_mirror(cache, "https://github.com/zane-ops/b", age=0)
+
+        cache.evict(keep=kept)
+
+        self.assertTrue(os.path.isdir(kept))
+        self.assertFalse(os.path.exists(other))
+
+    def test_evict_skips_locked_mirrors(self):
+        cache = GitMirrorsCache(cache_dir=self.cache_dir, max_size=100)
+        locked = self.create_mirror(cache, "https://github.com/zane-ops/a", age=300)
+        other = self.create_mirror(cache, "https://github.com/zane-ops/b", age=0)
+
+        # the lock is held by another deployment on the node
+        with open(f"{locked}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            try:
+                cache.evict()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+        self.assertTrue(os.path.isdir(locked))
+        self.assertFalse(os.path.exists(other))
+
+    async def test_lock_serializes_the_deployments_of_the_same_repository(self):
+        cache = GitMirrorsCache(cache_dir=self.cache_dir, max_size=100)
+        events: list[str] = []
+
+        async def deploy(name: str):
+            async with cache.lock("https://github.com/zane-ops/docs"):
+                events.append(f"{name} started")
+                await asyncio.sleep(0.05)
+                events.append(f"{name} finished")
+
+        await asyncio.gather(deploy("first"), deploy("second"))
+
+        self.assertEqual(
+            ["first started", "first finished", "second started", "second finished"],
+            events,
+        )
+
+    async def test_lock_waits_for_the_file_lock_held_by_another_process(self):
+        cache = GitMirrorsCache(cache_dir=self.cache_dir, max_size=100)
+        cache.LOCK_POLL_INTERVAL = 0.01
+        repository_url = "https://github.com/zane-ops/docs"
+        mirror_path = cache.get_mirror_path(repository_url)
+        acquired = asyncio.Event()
+
+        async def deploy():
+            async with cache.lock(repository_url):
+                acquired.set()
+
+        with open(f"{mirror_path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            task = asyncio.create_task(deploy())
+            await asyncio.sleep(0.1)
+            self.assertFalse(acquired.is_set())
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+        await asyncio.wait_for(task, timeout=1)
+        self.assertTrue(acquired.is_set())
+
+    async def test_lock_marks_the_mirror_as_recently_used(self):
+        cache = GitMirrorsCache(cache_dir=self.cache_dir, max_size=100)
+        repository_url = "https://github.com/zane-ops/docs"
+        mirror_path = self.create_mirror(cache, repository_url, age=300)
+
+        async with cache.lock(repository_url):
+            pass
+
+        self.assertGreater(os.stat(mirror_path).st_mtime, time.time() - 60)
+
+
+class GitClientCloneFromMirrorTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+
+        self.repository_path = os.path.join(self.tmp_dir, "repository")
+        self.git("init", "--quiet", "--initial-branch=main", self.repository_path)
+        self.commit("first commit")
+
+        self.cache = GitMirrorsCache(
+            cache_dir=os.path.join(self.tmp_dir, "mirrors"), max_size=10 * 1024**2
+        )
+        patch("zane_api.git_client.git_mirrors_cache", self.cache).start()
+        self.addCleanup(patch.stopall)
+
+        self.clones = 0
+
+    def git(self, *args: str):
+        subprocess.run(["/usr/bin/git", *args], check=True, capture_output=True)
+
+    def commit(self, message: str):
+        self.git(
+            "-C",
+            self.repository_path,
+            "-c",
+            "user.name=zane",
+            "-c",
+            "user.email=zane@example.com",
+            "commit",
+            "--quiet",
+            "--allow-empty",
+            "-m",
+            message,
+        )
+
+    async def aclone(self, cancel_event: asyncio.Event | None = None):
+        async def message_handler(message: str):
+            pass
+
+        self.clones += 1
+        return await GitClient().aclone_repository_from_mirror(
+            url=self.repository_path,
+            repository_url=self.repository_path,
+            dest_path=os.path.join(self.tmp_dir, f"clone-{self.clones}"),
+            branch="main",
+            message_handler=message_handler,
+            cancel_event=cancel_event or asyncio.Event(),
+        )
+
+    async def test_clone_repository_through_the_mirror(self):
+        repo = await self.aclone()
+        self.assertEqual("first commit", repo.head.commit.message.strip())
+
+        self.commit("second commit")
+        repo = await self.aclone()
+        self.assertEqual("second commit", repo.head.commit.message.strip())
+
+    async def test_retry_from_a_fresh_mirror_when_a_ref_lock_was_left_behind(self):
+        await self.aclone()
+        mirror_path = self.cache.get_mirror_path(self.repository_path)
+        # a worker died in the middle of a fetch
+        open(os.path.join(mirror_path, "refs", "heads", "main.lock"), "w").close()
+
+        self.commit("second commit")
+        repo = await self.aclone()
+
+        self.assertEqual("second commit", repo.head.commit.message.strip())
+        self.assertFalse(
+            os.path.exists(os.path.join(mirror_path, "refs", "heads", "main.lock"))
+        )
+
+    async def test_retry_from_a_fresh_mirror_when_the_mirror_is_corrupted(self):
+        await self.aclone()
+        mirror_path = self.cache.get_mirror_path(self.repository_path)
+        shutil.rmtree(os.path.join(mirror_path, "objects"))
+
+        repo = await self.aclone()
+
+        self.assertEqual("first commit", repo.head.commit.message.strip())
+
+    async def test_do_not_retry_when_the_clone_is_cancelled(self):
+        await self.aclone()
+        mirror_path = self.cache.get_mirror_path(self.repository_path)
+        open(os.path.join(mirror_path, "refs", "heads", "main.lock"), "w").close()
+        self.commit("second commit")
+
+        cancel_event = asyncio.Event()
+        cancel_event.set()
+        with self.assertRaises(GitCloneFailedError):
+            await self.aclone(cancel_event)
+        self.assertTrue(
+            os.path.exists(os.path.join(mirror_path, "refs", "heads", "main.lock"))
+        )
@@ -1,17 +1,48 @@
 # type: ignore
-from .base import AuthAPITestCase
+import asyncio
+import os
+import redis
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import docker.errors
+
+from .base import AuthAPITestCase, FakeProcess
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 
 from ..models import (
+    BuildArtifact,
     Project,
     Service,
     Deployment,
     DeploymentChange,
 )
+from container_registry.models import BuildRegistry
+from temporal.workflows import DeployGitServiceWorkflow
+from temporalio.common import RetryPolicy
 from ..utils import jprint, find_item_in_sequence
-from temporal.helpers import generate_caddyfile_for_static_website
-from ..dtos import StaticDirectoryBuilderOptions
+from temporal.helpers import (
+    generate_caddyfile_for_static_website,
+    get_buildkit_registry_cache_args,
+    get_buildkit_cache_ref,
+    get_buildkit_output_args,
+    get_build_inputs_hash,
+)
+from temporal.shared import BuildRegistryDetails, DeploymentDetails
+from temporal.activities.git_activities import GitActivities
+from temporal.builder_pool import (
+    BUILDKIT_BUILDER_NETWORKS_KEY_PREFIX,
+    BUILDKIT_BUILDER_PROJECTS_KEY,
+    BuildkitBuilderPool,
+    get_builders_by_affinity,
+)
+from temporal.build_plan_cache import get_build_plan_cache_key
+from ..dtos import EnvVariableDto, StaticDirectoryBuilderOptions
 
 
 class StaticGitBuilderViewTests(AuthAPITestCase):
@@ -848,3 +879,424 @@ class NixPacksBuilderViewTests(AuthAPITestCase):
 
         # Service is updated correctly
         self.assertEqual(Service.Builder.NIXPACKS, service.builder)
+
+
+@override_settings(BUILDKIT_CACHE_MODE="max")
+class BuildkitRegistryCacheTests(SimpleTestCase):
+    def test_preview_environment_imports_the_cache_of_production(self):
+        args = get_buildkit_registry_cache_args(
+            registry_domain="registry.zaneops.dev",
+            project_id="prj_ABC",
+            service_slug="web",
+            env_name="preview-pr-12",
+            base_env_name="production",
+        )
+        self.assertEqual(
+            [
+                "--cache-from",
+                "type=registry,ref=registry.zaneops.dev/zane-build-cache/prj_abc/web:preview-pr-12",
+                "--cache-from",
+                "type=registry,ref=registry.zaneops.dev/zane-build-cache/prj_abc/web:production",
+                "--cache-to",
+                "type=registry,ref=registry.zaneops.dev/zane-build-cache/prj_abc/web:preview-pr-12,mode=max,ignore-error=true",
+            ],
+            args,
+        )
+
+    def test_production_environment_only_uses_its_own_cache(self):
+        args = get_buildkit_registry_cache_args(
+            registry_domain="registry.zaneops.dev",
+            project_id="prj_ABC",
+            service_slug="web",
+            env_name="production",
+            base_env_name="production",
+        )
+        self.assertEqual(2, args.count("--cache-from") + args.count("--cache-to"))
+
+    def test_non_secure_registry_cache_uses_plain_http(self):
+        args = get_buildkit_registry_cache_args(
+            registry_domain="registry.zaneops.local",
+            project_id="prj_ABC",
+            service_slug="web",
+            env_name="preview-pr-12",
+            base_env_name="production",
+            insecure_registry=True,
+        )
+        self.assertEqual(
+            [
+                "--cache-from",
+                "type=registry,ref=registry.zaneops.local/zane-build-cache/prj_abc/web:preview-pr-12,registry.insecure=true",
+                "--cache-from",
+                "type=registry,ref=registry.zaneops.local/zane-build-cache/prj_abc/web:production,registry.insecure=true",
+                "--cache-to",
+                "type=registry,ref=registry.zaneops.local/zane-build-cache/prj_abc/web:preview-pr-12,mode=max,ignore-error=true,registry.insecure=true",
+            ],
+            args,
+        )
+
+    def test_long_environment_names_are_shortened_to_a_valid_tag(self):
+        long_env_name = "preview-" + "a" * 247
+        cache_ref = get_buildkit_cache_ref(
+            registry_domain="registry.zaneops.dev",
+            project_id="prj_ABC",
+            service_slug="web",
+            env_name=long_env_name,
+        )
+        tag = cache_ref.split(":")[-1]
+        self.assertEqual(128, len(tag))
+        self.assertTrue(tag.startswith("preview-aaa"))
+        self.assertNotEqual(
+            cache_ref,
+            get_buildkit_cache_ref(
+                registry_domain="registry.zaneops.dev",
+                project_id="prj_ABC",
+                service_slug="web",
+                env_name=long_env_name[:-1] + "b",
+            ),
+        )
+
+    def test_push_image_directly_to_the_build_registry(self):
+        self.assertEqual(
+            ["--output", "type=image,name=registry.zaneops.dev/app:abc,push=true"],
+            get_buildkit_output_args(
+                "registry.zaneops.dev/app:abc", push_to_registry=True
+            ),
+        )
+        self.assertEqual(
+            ["--output", "type=docker,name=app:abc"],
+            get_buildkit_output_args("app:abc", push_to_registry=False),
+        )
+
+
+class BuildkitBuilderPoolTests(SimpleTestCase):
+    @override_settings(BUILDKIT_BUILDER_POOL_SIZE=3)
+    def test_service_is_always_assigned_to_the_same_builder(self):
+        builders = get_builders_by_affinity("srv_dkr_abc")
+        self.assertEqual(builders, get_builders_by_affinity("srv_dkr_abc"))
+        self.assertEqual(
+            {
+                "builder-zane-pool-0",
+                "builder-zane-pool-1",
+                "builder-zane-pool-2",
+            },
+            set(builders),
+        )
+
+    @override_settings(BUILDKIT_BUILDER_POOL_SIZE=3)
+    def test_services_are_spread_across_the_builders(self):
+        preferred_builders = {
+            get_builders_by_affinity(f"srv_dkr_{index}")[0] for index in range(50)
+        }
+        self.assertEqual(3, len(preferred_builders))
+
+
+@override_settings(TESTING=False, BUILDKIT_BUILDER_POOL_SIZE=1)
+class BuildkitBuilderPoolNetworkTests(SimpleTestCase):
+    builder_name = "builder-zane-pool-0"
+
+    def setUp(self):
+        self.docker_client = MagicMock()
+        self.docker_client.api.inspect_container.return_value = {
+            "NetworkSettings": {"Networks": {"bridge": {}}}
+        }
+        self.pool = BuildkitBuilderPool(self.docker_client)
+        for patcher in [
+            patch.object(self.pool, "ensure_builder", AsyncMock()),
+            patch.object(self.pool, "_run_buildx", AsyncMock(return_value=(0, ""))),
+            patch(
+                "temporal.builder_pool.BUILDKIT_BUILDER_WAIT_INTERVAL",
+                timedelta(milliseconds=50),
+            ),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.delete_builder_keys)
+
+    def delete_builder_keys(self):
+        with redis.from_url(settings.REDIS_URL) as client:
+            keys = client.keys(f"*{self.builder_name}*")
+            if keys:
+                client.delete(*keys)
+            client.hdel(BUILDKIT_BUILDER_PROJECTS_KEY, self.builder_name)
+
+    async def test_builder_is_only_used_by_one_network_at_a_time(self):
+        builder_name = await self.pool.acquire(
+            service_id="srv_dkr_a",
+            holder="build-a",
+            network="net-prj_a-env_a",
+            project_id="prj_a",
+        )
+        self.assertEqual(self.builder_name, builder_name)
+        # another build of the same environment can share the builder
+        await self.pool.acquire(
+            service_id="srv_dkr_b",
+            holder="build-b",
+            network="net-prj_a-env_a",
+            project_id="prj_a",
+        )
+
+        other_env_build = asyncio.create_task(
+            self.pool.acquire(
+                service_id="srv_dkr_c",
+                holder="build-c",
+                network="net-prj_b-env_b",
+                project_id="prj_b",
+            )
+        )
+        await self.pool.release(
+            builder_name, holder="build-a", network="net-prj_a-env_a"
+        )
+        await asyncio.sleep(0.1)
+        self.assertFalse(other_env_build.done())
+        self.docker_client.api.disconnect_container_from_network.assert_not_called()
+
+        await self.pool.release(
+            builder_name, holder="build-b", network="net-prj_a-env_a"
+        )
+        await asyncio.wait_for(other_env_build, timeout=5)
+        self.docker_client.api.disconnect_container_from_network.assert_called_once_with(
+            "buildx_buildkit_builder-zane-pool-00", "net-prj_a-env_a", force=True
+        )
+        self.docker_client.api.connect_container_to_network.assert_called_with(
+            "buildx_buildkit_builder-zane-pool-00", "net-prj_b-env_b"
+        )
+        await self.pool.release(
+            builder_name, holder="build-c", network="net-prj_b-env_b"
+        )
+
+    async def test_cache_mounts_are_pruned_when_the_builder_changes_project(self):
+        for holder, project_id in [
+            ("build-a", "prj_a"),
+            ("build-b", "prj_a"),
+            ("build-c", "prj_b"),
+        ]:
+            network = f"net-{project_id}-env"
+            await self.pool.acquire(
+                service_id="srv_dkr_a",
+                holder=holder,
+                network=network,
+                project_id=project_id,
+            )
+            await self.pool.release(self.builder_name, holder, network)
+
+        self.pool._run_buildx.assert_called_once_with(
+            "prune",
+            "--builder",
+            self.builder_name,
+            "--force",
+            "--filter",
+            "type=exec.cachemount",
+        )
+
+    async def test_failed_network_connection_releases_the_builder(self):
+        self.docker_client.api.connect_container_to_network.side_effect = (
+            docker.errors.APIError("network not found")
+        )
+        with self.assertRaises(docker.errors.APIError):
+            await self.pool.acquire(
+                service_id="srv_dkr_a",
+                holder="build-a",
+                network="net-prj_a-env_a",
+                project_id="prj_a",
+            )
+
+        async with self.pool._get_client() as client:
+            self.assertEqual(
+                {},
+                await client.hgetall(
+                    f"{BUILDKIT_BUILDER_NETWORKS_KEY_PREFIX}:{self.builder_name}"
+                ),
+            )
+        self.assertEqual(
+            {}, await self.pool._get_semaphore(self.builder_name).holders()
+        )
+
+
+class BuildPlanCacheTests(SimpleTestCase):
+    def _create_repository(self, files: dict[str, str]) -> str:
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        for path, contents in files.items():
+            os.makedirs(os.path.dirname(os.path.join(directory, path)), exist_ok=True)
+            with open(os.path.join(directory, path), "w") as file:
+                file.write(contents)
+        return directory
+
+    def _get_cache_key(self, build_directory: str, *args: str):
+        return get_build_plan_cache_key(
+            "nixpacks",
+            "/usr/local/bin/nixpacks",
+            build_directory,
+            ["nixpacks", "plan", *args, build_directory],
+        )
+
+    def test_cache_key_only_depends_on_the_inputs_of_the_planner(self):
+        files = {
+            "package.json": '{"name": "app"}',
+            "pnpm-lock.yaml": "lockfileVersion: 9",
+            "src/index.ts": "console.log('hello')",
+        }
+        first_clone = self._create_repository(files)
+        second_clone = self._create_repository(
+            {**files, "src/index.ts": "console.log('world')"}
+        )
+        self.assertEqual(
+            self._get_cache_key(first_clone), self._get_cache_key(second_clone)
+        )
+
+    def test_cache_key_changes_with_manifests_and_build_options(self):
+        files = {"package.json": '{"name": "app"}', "apps/web/package.json": "{}"}
+        build_directory = self._create_repository(files)
+        updated_manifest = self._create_repository(
+            {**files, "apps/web/package.json": '{"dependencies": {"react": "19"}}'}
+        )
+        cache_key = self._get_cache_key(build_directory)
+        self.assertNotEqual(cache_key, self._get_cache_key(updated_manifest))
+        self.assertNotEqual(
+            cache_key,
+            self._get_cache_key(build_directory, "--env", "NODE_ENV=production"),
+        )
+
+
+class BuildArtifactInputsTests(AuthAPITestCase):
+    def test_build_inputs_hash_ignores_deployment_specific_variables(self):
+        _, service = self.create_and_deploy_git_service()
+        deployment = service.deployments.first()
+
+        first_details = DeploymentDetails.from_deployment(deployment)
+        second_details = DeploymentDetails.from_deployment(deployment)
+        second_details.hash = "dpl_dkr_redeploy"
+        second_details.slot = "GREEN"
+        self.assertEqual(
+            get_build_inputs_hash(first_details, "registry.zaneops.dev"),
+            get_build_inputs_hash(second_details, "registry.zaneops.dev"),
+        )
+
+        second_details.service.env_variables.append(
+            EnvVariableDto(key="VITE_API_URL", value="https://api.zaneops.dev")
+        )
+        self.assertNotEqual(
+            get_build_inputs_hash(first_details, "registry.zaneops.dev"),
+            get_build_inputs_hash(second_details, "registry.zaneops.dev"),
+        )
+
+        second_details.service.project_id = "prj_other"
+        self.assertNotEqual(
+            get_build_inputs_hash(first_details, "registry.zaneops.dev"),
+            get_build_inputs_hash(second_details, "registry.zaneops.dev"),
+        )
+
+
+class BuildArtifactReuseTests(AuthAPITestCase):
+    registry_domain = "registry.example.com"
+    commit_sha = "a" * 40
+
+    async def acreate_build_registry(self):
+        return await BuildRegistry.objects.acreate(
+            name="default",
+            registry_domain=self.registry_domain,
+            is_default=True,
+        )
+
+    async def aprepare_deployment_of_commit(self, service: Service):
+        payload = await self.prepare_new_deployment(service)
+        payload.commit_sha = self.commit_sha
+        await Deployment.objects.filter(hash=payload.hash).aupdate(
+            commit_sha=self.commit_sha
+        )
+        return payload
+
+    async def acreate_build_artifact(
+        self, payload: DeploymentDetails, built_by: Deployment
+    ):
+        return await BuildArtifact.objects.acreate(
+            repository_url=payload.service.repository_url,
+            commit_sha=self.commit_sha,
+            build_inputs_hash=get_build_inputs_hash(payload, self.registry_domain),
+            image=f"{self.registry_domain}/{payload.image_tag}",
+            image_digest="sha256:" + "b" * 64,
+            deployment=built_by,
+        )
+
+    async def test_reused_image_skips_the_clone_the_build_and_the_push(self):
+        await self.acreate_build_registry()
+        _, service = await self.acreate_git_service()
+        previous_deployment = await Deployment.objects.acreate(
+            service=service, commit_sha=self.commit_sha
+        )
+        payload = await self.aprepare_deployment_of_commit(service)
+        await self.acreate_build_artifact(payload, built_by=previous_deployment)
+
+        commands: list[str] = []
+
+        def create_fake_process(*args, **kwargs):
+            process = FakeProcess(*args, docker_client=self.fake_docker_client)
+            commands.append(process.command)
+            return process
+
+        with patch(
+            "temporal.activities.git_activities.asyncio.create_subprocess_exec",
+            side_effect=create_fake_process,
+        ), patch(
+            "temporal.activities.git_activities.asyncio.create_subprocess_shell",
+            side_effect=create_fake_process,
+        ), patch(
+            "zane_api.git_client.asyncio.create_subprocess_shell",
+            side_effect=create_fake_process,
+        ):
+            async with self.workflowEnvironment() as env:
+                await env.client.execute_workflow(
+                    workflow=DeployGitServiceWorkflow.run,
+                    arg=payload,
+                    id=payload.workflow_id,
+                    retry_policy=RetryPolicy(maximum_attempts=1),
+                    task_queue=settings.TEMPORALIO_MAIN_TASK_QUEUE,
+                    execution_timeout=settings.TEMPORALIO_WORKFLOW_EXECUTION_MAX_TIMEOUT,
+                )
+
+        jprint(commands)
+        self.assertTrue(any("imagetools create" in command for command in commands))
+        self.assertFalse(any("git clone" in command for command in commands))
+        self.assertFalse(any("buildx build" in command for command in commands))
+        self.assertFalse(any("image push" in command for command in commands))
+        deployment = await Deployment.objects.aget(hash=payload.hash)
+        self.assertEqual(Deployment.DeploymentStatus.HEALTHY, deployment.status)
+
+    async def test_image_built_in_another_project_is_not_reused(self):
+        registry = await self.acreate_build_registry()
+        _, service = await self.acreate_git_service()
+        payload = await self.aprepare_deployment_of_commit(service)
+
+        # same repository, commit & inputs, but built by a service of another project
+        response = await self.async_client.post(
+            reverse("zane_api:projects.list"),
+            data={"slug": "other", "env_slug": "production"},
+        )
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        response = await self.async_client.post(
+            reverse(
+                "zane_api:services.git.create",
+                kwargs={"project_slug": "other", "env_slug": "production"},
+            ),
+            data={
+                "slug": "docs",
+                "repository_url": service.repository_url,
+                "branch_name": "main",
+            },
+        )
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        other_service = await Service.objects.aget(slug="docs", project__slug="other")
+        other_deployment = await Deployment.objects.acreate(
+            service=other_service, commit_sha=self.commit_sha
+        )
+        await self.acreate_build_artifact(payload, built_by=other_deployment)
+
+        reused = await GitActivities().reuse_image_from_previous_build(
+            BuildRegistryDetails(
+                registry_url=registry.registry_domain,
+                registry_username="",
+                registry_password="",
+                deployment=payload,
+            )
+        )
+        self.assertFalse(reused)
@@ -2,16 +2,29 @@
 import datetime
 import json
 import uuid
+from unittest.mock import patch
 
+from django.test import SimpleTestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from datetime import timedelta
 from django.conf import settings
+from django.utils import timezone
+import asyncio
 import base64
 from ..utils import jprint
 from .base import AuthAPITestCase
 from ..models import Deployment, Service, HttpLog
-from search.dtos import RuntimeLogSource, RuntimeLogLevel
+from search.dtos import RuntimeLogDto, RuntimeLogSource, RuntimeLogLevel
+from search import loki_tail
+from search.loki_client import LokiSearchClient
+from ..views.logs import has_final_logs
+from search.query_cache import get_logs_query_cache_key, is_closed_time_window
+from temporal.log_sink import (
+    DeploymentLogSink,
+    DeploymentLogSinkActivityInterceptor,
+    get_deployment_log_sink,
+)
 
 import requests
 
@@ -266,6 +279,157 @@ class RuntimeLogViewTests(AuthAPITestCase):
             elements,
         )
 
+    def test_view_logs_histogram(self):
+        p, service = self.create_and_deploy_redis_docker_service()
+        deployment: Deployment = service.deployments.first()
+
+        # Insert logs
+        simple_logs = [
+            {
+                "log": content,
+                "container_id": "78dfe81bb4b3994eeb38f65f5a586084a2b4a649c0ab08b614d0f4c2cb499761",
+                "container_name": "/srv-prj_ssbvBaqpbD7-srv_dkr_LeeCqAUZJnJ-dpl_dkr_KRbXo2FJput.1.zm0uncmx8w4wvnokdl6qxt55e",
+                "time": time,
+                "tag": json.dumps(
+                    {
+                        "deployment_id": deployment.hash,
+                        "service_id": service.id,
+                    }
+                ),
+                "source": "stdout" if i % 2 == 0 else "stderr",
+            }
+            for i, (time, content) in enumerate(self.sample_log_contents)
+        ]
+        response = self.client.post(
+            reverse("zane_api:logs.ingest"),
+            data=simple_logs,
+            headers={
+                "Authorization": f"Basic {base64.b64encode(f'zaneops:{settings.SECRET_KEY}'.encode()).decode()}"
+            },
+        )
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+        self.assertEqual(
+            len(simple_logs),
+            self.search_client.count(query={"deployment_id": deployment.hash}),
+        )
+
+        response = self.client.get(
+            reverse(
+                "zane_api:services.deployment.runtime_logs.histogram",
+                kwargs={
+                    "project_slug": p.slug,
+                    "env_slug": "production",
+                    "service_slug": service.slug,
+                    "deployment_hash": deployment.hash,
+                },
+            ),
+            QUERY_STRING=urlencode(
+                {
+                    "time_after": (now - timedelta(minutes=1)).isoformat(),
+                    "buckets": 10,
+                }
+            ),
+        )
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        data = response.json()
+        self.assertEqual(10, len(data["results"]))
+        self.assertEqual(
+            len(simple_logs), sum(bucket["count"] for bucket in data["results"])
+        )
+
+    def test_logs_of_finished_deployment_are_cached(self):
+        p, service = self.create_and_deploy_redis_docker_service()
+        deployment: Deployment = service.deployments.first()
+
+        # Insert logs
+        simple_logs = [
+            {
+                "log": content,
+                "container_id": "78dfe81bb4b3994eeb38f65f5a586084a2b4a649c0ab08b614d0f4c2cb499761",
+                "container_name": "/srv-prj_ssbvBaqpbD7-srv_dkr_LeeCqAUZJnJ-dpl_dkr_KRbXo2FJput.1.zm0uncmx8w4wvnokdl6qxt55e",
+                "time": time,
+                "tag": json.dumps(
+                    {
+                        "deployment_id": deployment.hash,
+                        "service_id": service.id,
+                    }
+                ),
+                "source": "stdout" if i % 2 == 0 else "stderr",
+            }
+            for i, (time, content) in enumerate(self.sample_log_contents)
+        ]
+        response = self.client.post(
+            reverse("zane_api:logs.ingest"),
+            data=simple_logs,
+            headers={
+                "Authorization": f"Basic {base64.b64encode(f'zaneops:{settings.SECRET_KEY}'.encode()).decode()}"
+            },
+        )
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+        url = reverse(
+            "zane_api:services.deployment.runtime_logs",
+            kwargs={
+                "project_slug": p.slug,
+                "env_slug": "production",
+                "service_slug": service.slug,
+                "deployment_hash": deployment.hash,
+            },
+        )
+
+        # the deployment is still running, new logs can be added
+        response = self.client.get(url)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertIsNone(response.headers.get("X-Cache"))
+
+        # removed long enough ago for all its logs to have been ingested
+        removed_at = timezone.now() - timedelta(
+            seconds=settings.LOKI_QUERY_CACHE_MIN_AGE + 1
+        )
+        Deployment.objects.filter(hash=deployment.hash).update(
+            status=Deployment.DeploymentStatus.REMOVED,
+            finished_at=removed_at,
+            updated_at=removed_at,
+        )
+
+        response = self.client.get(url)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual("MISS", response.headers.get("X-Cache"))
+        first_page = response.json()
+
+        response = self.client.get(url)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual("HIT", response.headers.get("X-Cache"))
+        self.assertEqual(first_page, response.json())
+
+        response = self.client.get(url, headers={"Cache-Control": "no-cache"})
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual("BYPASS", response.headers.get("X-Cache"))
+        self.assertEqual(len(simple_logs), len(response.json()["results"]))
+
+    def test_logs_of_just_failed_deployment_are_not_cached(self):
+        p, service = self.create_and_deploy_redis_docker_service()
+        deployment: Deployment = service.deployments.first()
+
+        # the cleanup steps of the deployment are still logging
+        Deployment.objects.filter(hash=deployment.hash).update(
+            status=Deployment.DeploymentStatus.FAILED,
+            finished_at=timezone.now(),
+        )
+        url = reverse(
+            "zane_api:services.deployment.build_logs",
+            kwargs={
+                "project_slug": p.slug,
+                "env_slug": "production",
+                "service_slug": service.slug,
+                "deployment_hash": deployment.hash,
+            },
+        )
+        response = self.client.get(url)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertIsNone(response.headers.get("X-Cache"))
+
     def test_paginate(self):
         p, service = self.create_and_deploy_redis_docker_service()
         deployment: Deployment = service.deployments.first()
@@ -591,6 +755,74 @@ class RuntimeLogViewTests(AuthAPITestCase):
         self.assertEqual(status.HTTP_200_OK, response.status_code)
         self.assertEqual(1, len(response.json()["results"]))
 
+    def test_filter_by_deployment_and_container_sent_as_metadata(self):
+        p, service = self.create_and_deploy_redis_docker_service()
+        deployment: Deployment = service.deployments.first()
+
+        # `deployment_id` & `container_id` are sent as structured metadata,
+        # the logs of all the deployments of the service share the same stream
+        other_container_id = (
+            "12ab5e3c1d0f9b8a7e6d5c4b3a29180f7e6d5c4b3a29180f7e6d5c4b3a291800"
+        )
+        simple_logs = [
+            {
+                "log": content,
+                "container_id": (
+                    "78dfe81bb4b3994eeb38f65f5a586084a2b4a649c0ab08b614d0f4c2cb499761"
+                    if i < 4
+                    else other_container_id
+                ),
+                "container_name": "/srv-prj_ssbvBaqpbD7-srv_dkr_LeeCqAUZJnJ-dpl_dkr_KRbXo2FJput.1.zm0uncmx8w4wvnokdl6qxt55e",
+                "time": time,
+                "tag": json.dumps(
+                    {
+                        "deployment_id": (
+                            deployment.hash if i < 8 else "dpl_dkr_OtherDeployment"
+                        ),
+                        "service_id": service.id,
+                    }
+                ),
+                "source": "stdout" if i % 2 == 0 else "stderr",
+            }
+            for i, (time, content) in enumerate(self.sample_log_contents)
+        ]
+        response = self.client.post(
+            reverse("zane_api:logs.ingest"),
+            data=simple_logs,
+            headers={
+                "Authorization": f"Basic {base64.b64encode(f'zaneops:{settings.SECRET_KEY}'.encode()).decode()}"
+            },
+        )
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+        response = self.client.get(
+            reverse(
+                "zane_api:services.deployment.runtime_logs",
+                kwargs={
+                    "project_slug": p.slug,
+                    "env_slug": "production",
+                    "service_slug": service.slug,
+                    "deployment_hash": deployment.hash,
+                },
+            ),
+        )
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        results = response.json()["results"]
+        self.assertEqual(8, len(results))
+        self.assertTrue(all(log["deployment_id"] == deployment.hash for log in results))
+
+        results = self.search_client.search(
+            dict(
+                service_id=service.id,
+                deployment_id=deployment.hash,
+                container_id=other_container_id,
+            )
+        )["results"]
+        self.assertEqual(4, len(results))
+        self.assertTrue(
+            all(log["container_id"] == other_container_id for log in results)
+        )
+
     async def test_delete_logs_after_archiving_a_service(self):
         p, service = await self.acreate_and_deploy_redis_docker_service()
         deployment: Deployment = await service.deployments.afirst()
@@ -1423,3 +1655,283 @@ class DeploymentSystemLogViewTests(AuthAPITestCase):
             },
         )
         self.assertGreater(system_logs_total, 0)
+
+
+class FakeLokiTailWebsocket:
+    def __init__(self, messages: list[dict]):
+        self.messages = [json.dumps(message) for message in messages]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def recv(self):
+        if len(self.messages) == 0:
+            # keep the connection open without any new log
+            await asyncio.Event().wait()
+        return self.messages.pop(0)
+
+
+@override_settings(LOKI_TAIL_MAX_BATCH_SIZE=3, LOKI_TAIL_FLUSH_INTERVAL=0.05)
+class LokiTailTests(SimpleTestCase):
+    @staticmethod
+    def loki_stream(index: int) -> dict:
+        timestamp = int((now + timedelta(seconds=index)).timestamp() * 10**9)
+        return {
+            "stream": {
+                "id": str(uuid.uuid4()),
+                "time": str(timestamp),
+                "created_at": now.isoformat(),
+                "level": RuntimeLogLevel.INFO,
+                "source": RuntimeLogSource.SERVICE,
+                "service_id": "srv_dkr_1",
+                "deployment_id": "dpl_dkr_1",
+                "content": f"log {index}",
+                "content_text": f"log {index}",
+            },
+            "values": [[str(timestamp), "{}"]],
+        }
+
+    async def test_viewers_of_the_same_logs_share_the_same_tail(self):
+        messages = [{"streams": [self.loki_stream(i)]} for i in range(4)]
+        received: dict[str, list] = {"first": [], "second": []}
+
+        async def first_viewer(logs):
+            received["first"].append(logs)
+
+        async def second_viewer(logs):
+            received["second"].append(logs)
+
+        with patch(
+            "search.loki_tail.connect",
+            side_effect=lambda *args, **kwargs: FakeLokiTailWebsocket(messages),
+        ) as mock_connect:
+            tail = loki_tail.subscribe('{app="zaneops"} | json', first_viewer)
+            self.assertIs(
+                tail, loki_tail.subscribe('{app="zaneops"} | json', second_viewer)
+            )
+            await asyncio.sleep(0.2)
+            loki_tail.unsubscribe(tail, first_viewer)
+            loki_tail.unsubscribe(tail, second_viewer)
+            await asyncio.sleep(0)
+
+        self.assertEqual(1, mock_connect.call_count)
+        # the first batch is sent when it is full, the second one after the flush interval
+        self.assertEqual(received["first"], received["second"])
+        batches = received["first"]
+        self.assertEqual([3, 1], [len(batch) for batch in batches])
+        self.assertEqual(
+            ["log 0", "log 1", "log 2", "log 3"],
+            [log["content"] for batch in batches for log in batch],
+        )
+        # the tail is closed when the last viewer leaves
+        self.assertTrue(tail.task.done())
+        self.assertNotIn(tail.query_string, loki_tail._tails)
+
+
+@override_settings(LOKI_QUERY_CACHE_MIN_AGE=60)
+class LogsQueryCacheTests(SimpleTestCase):
+    @staticmethod
+    def filters(**kwargs) -> dict:
+        now_ns = int(datetime.datetime.now().timestamp() * 10**9)
+        return {
+            "query_string": '{app="zaneops"} | deployment_id="dpl_dkr_1" | json',
+            "page_size": 50,
+            "start": now_ns - int(timedelta(days=14).total_seconds() * 10**9),
+            "end": now_ns,
+            "order": "desc",
+            "cursor": None,
+            "cursor_data": None,
+            "time_after": None,
+            "time_before": None,
+            **kwargs,
+        }
+
+    def test_only_closed_time_windows_are_cacheable(self):
+        old_ns = int((datetime.datetime.now() - timedelta(hours=1)).timestamp() * 10**9)
+        recent_ns = int(datetime.datetime.now().timestamp() * 10**9)
+        cursor_data = {"sort": [str(old_ns)], "order": "desc"}
+
+        self.assertFalse(is_closed_time_window(self.filters()))
+        self.assertFalse(is_closed_time_window(self.filters(time_before=recent_ns)))
+        self.assertTrue(is_closed_time_window(self.filters(time_before=old_ns)))
+        # page of older logs
+        self.assertTrue(
+            is_closed_time_window(self.filters(cursor_data=cursor_data, end=old_ns + 1))
+        )
+        # page of more recent logs
+        self.assertFalse(
+            is_closed_time_window(
+                self.filters(
+                    cursor_data={**cursor_data, "order": "asc"},
+                    order="asc",
+                    start=old_ns,
+                )
+            )
+        )
+
+    def test_deployment_logs_are_final_some_time_after_it_finished(self):
+        deployment = Deployment(
+            status=Deployment.DeploymentStatus.FAILED,
+            finished_at=timezone.now(),
+            updated_at=timezone.now(),
+        )
+        self.assertFalse(has_final_logs(deployment))
+
+        deployment.finished_at = deployment.updated_at = timezone.now() - timedelta(
+            minutes=2
+        )
+        self.assertTrue(has_final_logs(deployment))
+
+        # a deployment removed just now still receives its last runtime logs
+        deployment.status = Deployment.DeploymentStatus.REMOVED
+        deployment.updated_at = timezone.now()
+        self.assertFalse(has_final_logs(deployment))
+
+        deployment.status = Deployment.DeploymentStatus.HEALTHY
+        deployment.updated_at = timezone.now() - timedelta(minutes=2)
+        self.assertFalse(has_final_logs(deployment))
+
+    def test_cache_key_ignores_the_current_time(self):
+        self.assertEqual(
+            get_logs_query_cache_key(self.filters()),
+            get_logs_query_cache_key(self.filters(end=0, start=0)),
+        )
+        self.assertNotEqual(
+            get_logs_query_cache_key(self.filters()),
+            get_logs_query_cache_key(self.filters(page_size=10)),
+        )
+
+
+class LokiQueryTests(SimpleTestCase):
+    def test_deployment_and_container_ids_are_not_stream_labels(self):
+        log = RuntimeLogDto(
+            time=datetime.datetime.now(),
+            level=RuntimeLogLevel.INFO,
+            source=RuntimeLogSource.SERVICE,
+            service_id="srv_dkr_1",
+            deployment_id="dpl_dkr_1",
+            container_id="abc123",
+        )
+        self.assertNotIn("deployment_id", log.loki_labels)
+        self.assertNotIn("container_id", log.loki_labels)
+        self.assertEqual("srv_dkr_1", log.loki_labels["service_id"])
+        self.assertEqual(
+            {"deployment_id": "dpl_dkr_1", "container_id": "abc123"},
+            log.loki_structured_metadata,
+        )
+
+    def test_deployment_filters_keep_the_service_in_the_stream_selector(self):
+        query_string = LokiSearchClient(host=settings.LOKI_HOST).get_tail_query(
+            dict(
+                service_id="srv_dkr_1",
+                deployment_id="dpl_dkr_1",
+                container_id="abc123",
+                source=[RuntimeLogSource.SERVICE],
+            )
+        )
+        self.assertEqual(
+            '{service_id="srv_dkr_1",source=~"(SERVICE)",'
+            f'app="{settings.LOKI_APP_NAME}"}}'
+            ' | deployment_id="dpl_dkr_1" | container_id="abc123" | json',
+            query_string.strip(),
+        )
+
+
+class FakeActivityInbound:
+    def __init__(self, logs_count: int):
+        self.logs_count = logs_count
+
+    async def execute_activity(self, input):
+        await get_deployment_log_sink().put(
+            [DeploymentLogSinkTests.log(i) for i in range(self.logs_count)]
+        )
+        raise RuntimeError("activity failed")
+
+
+class DeploymentLogSinkTests(SimpleTestCase):
+    @staticmethod
+    def log(index: int) -> RuntimeLogDto:
+        return RuntimeLogDto(
+            time=now,
+            level=RuntimeLogLevel.INFO,
+            source=RuntimeLogSource.SYSTEM,
+            deployment_id="dpl_dkr_1",
+            content=f"log {index}",
+        )
+
+    @staticmethod
+    def sent_batch_sizes(mock_bulk_insert) -> list[int]:
+        return [len(call.kwargs["docs"]) for call in mock_bulk_insert.call_args_list]
+
+    async def test_full_batches_are_sent_without_waiting_for_the_interval(self):
+        sink = DeploymentLogSink(max_batch_size=3, flush_interval=60, max_pending=100)
+        with patch.object(sink.search_client, "bulk_insert") as mock_bulk_insert:
+            await sink.put([self.log(i) for i in range(7)])
+            await asyncio.sleep(0.1)
+            self.assertEqual([3, 3], self.sent_batch_sizes(mock_bulk_insert))
+
+            await sink.flush()
+            self.assertEqual([3, 3, 1], self.sent_batch_sizes(mock_bulk_insert))
+
+    async def test_partial_batches_are_sent_after_the_flush_interval(self):
+        sink = DeploymentLogSink(
+            max_batch_size=100, flush_interval=0.05, max_pending=100
+        )
+        with patch.object(sink.search_client, "bulk_insert") as mock_bulk_insert:
+            await sink.put([self.log(i) for i in range(2)])
+            self.assertEqual([], self.sent_batch_sizes(mock_bulk_insert))
+
+            await asyncio.sleep(0.3)
+            self.assertEqual([2], self.sent_batch_sizes(mock_bulk_insert))
+
+    async def test_producers_wait_when_too_many_lines_are_pending(self):
+        sink = DeploymentLogSink(max_batch_size=100, flush_interval=60, max_pending=2)
+        with patch.object(sink.search_client, "bulk_insert") as mock_bulk_insert:
+            producer = asyncio.create_task(sink.put([self.log(i) for i in range(3)]))
+            await asyncio.sleep(0.1)
+            self.assertFalse(producer.done())
+            self.assertEqual(2, sink._queue.qsize())
+
+            await sink.flush()
+            await producer
+            self.assertEqual(3, sum(self.sent_batch_sizes(mock_bulk_insert)))
+
+    async def test_failed_batch_is_retried_once(self):
+        sink = DeploymentLogSink(
+            max_batch_size=100, flush_interval=0.01, max_pending=100
+        )
+        with patch.object(
+            sink.search_client,
+            "bulk_insert",
+            side_effect=[requests.ConnectionError("loki is down"), None],
+        ) as mock_bulk_insert:
+            await sink.put([self.log(i) for i in range(2)])
+            await sink.flush()
+            self.assertEqual([2, 2], self.sent_batch_sizes(mock_bulk_insert))
+            self.assertEqual(0, sink.dropped_lines)
+
+    async def test_batch_is_dropped_and_counted_when_the_retry_fails(self):
+        sink = DeploymentLogSink(
+            max_batch_size=100, flush_interval=0.01, max_pending=100
+        )
+        with patch.object(
+            sink.search_client,
+            "bulk_insert",
+            side_effect=requests.ConnectionError("loki is down"),
+        ) as mock_bulk_insert:
+            await sink.put([self.log(i) for i in range(2)])
+            await sink.flush()
+            self.assertEqual([2, 2], self.sent_batch_sizes(mock_bulk_insert))
+            self.assertEqual(2, sink.dropped_lines)
+
+    async def test_pending_logs_are_flushed_when_the_activity_exits(self):
+        sink = get_deployment_log_sink()
+        sink.flush_interval = 60
+        interceptor = DeploymentLogSinkActivityInterceptor(FakeActivityInbound(2))
+        with patch.object(sink.search_client, "bulk_insert") as mock_bulk_insert:
+            with self.assertRaises(RuntimeError):
+                await interceptor.execute_activity(None)
+            self.assertEqual([2], self.sent_batch_sizes(mock_bulk_insert))
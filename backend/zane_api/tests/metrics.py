@@ -1,28 +1,33 @@
+import os
+import tempfile
+from unittest.mock import patch
+
+from datetime import timedelta
+
 from django.conf import settings
+from django.test import TestCase
 
-from .base import AuthAPITestCase
+from .base import AuthAPITestCase, WorkflowScheduleHandle
 
 
 from ..models import Deployment, ServiceMetrics
 from django.urls import reverse
 from rest_framework import status
-from temporal.workflows import (
-    SimpleDeploymentDetails,
-)
 from temporal.schedules import (
-    GetDockerDeploymentStatsWorkflow,
+    CollectFleetMetricsWorkflow,
 )
+from temporal.container_stats import CgroupStatsReader
 from ..utils import jprint
 
 
 class DockerServiceMetricsScheduleTests(AuthAPITestCase):
-    async def test_create_metrics_schedule_when_deploying_a_service(self):
+    async def test_do_not_create_metrics_schedule_per_deployment(self):
         _, service = await self.acreate_and_deploy_redis_docker_service()
 
         initial_deployment: Deployment = await service.alatest_production_deployment  # type: ignore
 
         self.assertIsNotNone(initial_deployment)
-        self.assertIsNotNone(
+        self.assertIsNone(
             self.get_workflow_schedule_by_id(initial_deployment.metrics_schedule_id)
         )
 
@@ -30,6 +35,15 @@ class DockerServiceMetricsScheduleTests(AuthAPITestCase):
         project, service = await self.acreate_and_deploy_redis_docker_service()
         initial_deployment: Deployment = await service.alatest_production_deployment  # type: ignore
 
+        # per-deployment metrics schedule created by a previous version of zaneops
+        self.workflow_schedules.append(
+            WorkflowScheduleHandle(
+                initial_deployment.metrics_schedule_id,
+                workflow=None,
+                interval=timedelta(seconds=30),
+            )
+        )
+
         response = await self.async_client.put(
             reverse(
                 "zane_api:services.docker.deploy_service",
@@ -46,7 +60,7 @@ class DockerServiceMetricsScheduleTests(AuthAPITestCase):
             self.get_workflow_schedule_by_id(initial_deployment.metrics_schedule_id)
         )
 
-    async def test_run_service_metrics_schedule(self):
+    async def test_collect_fleet_metrics_save_metrics_of_deployments(self):
         async with self.workflowEnvironment() as env:
             p, service = await self.acreate_and_deploy_redis_docker_service()
             latest_deployment: Deployment = await service.alatest_production_deployment  # type: ignore
@@ -55,20 +69,121 @@ class DockerServiceMetricsScheduleTests(AuthAPITestCase):
                 latest_deployment.status,
             )
 
-            deployment = SimpleDeploymentDetails(
-                hash=latest_deployment.hash,
-                service_id=latest_deployment.service.id,
-                project_id=latest_deployment.service.project_id,
-            )
             result = await env.client.execute_workflow(
-                workflow=GetDockerDeploymentStatsWorkflow.run,
-                arg=deployment,
-                id=latest_deployment.monitor_schedule_id,
+                workflow=CollectFleetMetricsWorkflow.run,
+                id="collect-fleet-metrics",
                 task_queue=settings.TEMPORALIO_MAIN_TASK_QUEUE,
                 execution_timeout=settings.TEMPORALIO_WORKFLOW_EXECUTION_MAX_TIMEOUT,
             )
             jprint(result)
             metrics_count = await ServiceMetrics.objects.filter(
-                deployment__hash=deployment.hash, service=service
+                deployment__hash=latest_deployment.hash, service=service
             ).acount()
-            self.assertGreater(metrics_count, 0)
+            self.assertEqual(1, metrics_count)
+
+    async def test_collect_fleet_metrics_only_save_metrics_of_latest_deployment(self):
+        async with self.workflowEnvironment() as env:
+            project, service = await self.acreate_and_deploy_redis_docker_service()
+            initial_deployment: Deployment = await service.alatest_production_deployment  # type: ignore
+
+            response = await self.async_client.put(
+                reverse(
+                    "zane_api:services.docker.deploy_service",
+                    kwargs={
+                        "project_slug": project.slug,
+                        "env_slug": "production",
+                        "service_slug": service.slug,
+                    },
+                ),
+            )
+            self.assertEqual(status.HTTP_200_OK, response.status_code)
+            latest_deployment: Deployment = await service.alatest_production_deployment  # type: ignore
+
+            await env.client.execute_workflow(
+                workflow=CollectFleetMetricsWorkflow.run,
+                id="collect-fleet-metrics",
+                task_queue=settings.TEMPORALIO_MAIN_TASK_QUEUE,
+                execution_timeout=settings.TEMPORALIO_WORKFLOW_EXECUTION_MAX_TIMEOUT,
+            )
+            self.assertEqual(
+                0,
+                await ServiceMetrics.objects.filter(
+                    deployment__hash=initial_deployment.hash
+                ).acount(),
+            )
+            self.assertEqual(
+                1,
+                await ServiceMetrics.objects.filter(
+                    deployment__hash=latest_deployment.hash
+                ).acount(),
+            )
+
+
+class CgroupStatsReaderTests(TestCase):
+    CONTAINER_ID = "c1e672fd6962cda72fed881a8b68e8fd2b8a9ef2a479136586323ca05196cc85"
+
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        self.cgroup_path = os.path.join(
+            self.root.name,
+            "cgroup",
+            "system.slice",
+            f"docker-{self.CONTAINER_ID}.scope",
+        )
+        os.makedirs(self.cgroup_path)
+        os.makedirs(os.path.join(self.root.name, "proc", "42", "net"))
+        self.write_cgroup_file("cgroup.controllers", "cpu io memory pids")
+        self.write_cgroup_file("memory.current", "104857600")
+        self.write_cgroup_file(
+            "io.stat",
+            "8:0 rbytes=1000 wbytes=2000 rios=1 wios=2 dbytes=0 dios=0\n"
+            "8:16 rbytes=500 wbytes=500 rios=1 wios=1 dbytes=0 dios=0\n",
+        )
+        self.set_cpu_usage(1_000_000)
+        with open(os.path.join(self.root.name, "proc", "42", "net", "dev"), "w") as f:
+            f.write(
+                "Inter-|   Receive                                                |  Transmit\n"
+                " face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed\n"
+                "    lo:    9999      10    0    0    0     0          0         0     9999      10    0    0    0     0       0          0\n"
+                "  eth0:    3000      20    0    0    0     0          0         0     4000      30    0    0    0     0       0          0\n"
+                "  eth1:    1000      20    0    0    0     0          0         0     1000      30    0    0    0     0       0          0\n"
+            )
+        self.reader = CgroupStatsReader(
+            cgroup_root=os.path.join(self.root.name, "cgroup"),
+            proc_root=os.path.join(self.root.name, "proc"),
+        )
+
+    def write_cgroup_file(self, name: str, content: str):
+        with open(os.path.join(self.cgroup_path, name), "w") as f:
+            f.write(content)
+
+    def set_cpu_usage(self, usage_usec: int):
+        self.write_cgroup_file(
+            "cpu.stat",
+            f"usage_usec {usage_usec}\nuser_usec {usage_usec}\nsystem_usec 0\n",
+        )
+
+    def test_read_counters_from_cgroup(self):
+        metrics = self.reader.read(self.CONTAINER_ID, pid=42)
+        self.assertIsNotNone(metrics)
+        self.assertEqual(0, metrics.cpu_percent)
+        self.assertEqual(104857600, metrics.memory_bytes)
+        self.assertEqual(1500, metrics.disk_read_bytes)
+        self.assertEqual(2500, metrics.disk_writes_bytes)
+        self.assertEqual(4000, metrics.net_rx_bytes)
+        self.assertEqual(5000, metrics.net_tx_bytes)
+
+    def test_compute_cpu_percent_from_previous_sample(self):
+        with patch("temporal.container_stats.time.monotonic", return_value=100.0):
+            self.reader.read(self.CONTAINER_ID, pid=42)
+        # 1.5s of CPU time used in 1s means 1.5 CPUs are fully used
+        self.set_cpu_usage(2_500_000)
+        with patch("temporal.container_stats.time.monotonic", return_value=101.0):
+            metrics = self.reader.read(self.CONTAINER_ID)
+        self.assertIsNotNone(metrics)
+        self.assertAlmostEqual(150.0, metrics.cpu_percent)
+
+    def test_return_none_for_containers_not_on_this_host(self):
+        self.assertIsNone(self.reader.get_cgroup_path("unknown"))
+        self.assertIsNone(self.reader.read("unknown", pid=42))
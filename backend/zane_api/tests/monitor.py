@@ -1,4 +1,9 @@
+import asyncio
+import time
+from unittest.mock import MagicMock, patch
+
 from django.conf import settings
+from django.test import SimpleTestCase
 
 from .base import AuthAPITestCase
 from ..dtos import HealthCheckDto
@@ -11,6 +16,10 @@ from temporal.shared import (
     SimpleDeploymentDetails,
 )
 from temporal.schedules import MonitorDockerDeploymentWorkflow
+from temporal.schedules.activities import get_deployment_swarm_status
+from temporal.docker_client import AsyncDockerClient
+from temporal.deployment_events import DeploymentEventsWatcher
+from temporal.helpers import get_swarm_service_name_for_deployment
 
 
 class DockerServiceMonitorTests(AuthAPITestCase):
@@ -439,3 +448,141 @@ class DockerServiceMonitorTests(AuthAPITestCase):
                 Deployment.DeploymentStatus.UNHEALTHY,
                 latest_deployment.status,
             )
+
+
+class DeploymentEventsWatcherTests(AuthAPITestCase):
+    async def test_container_event_updates_deployment_status(self):
+        async with self.workflowEnvironment():
+            p, service = await self.acreate_and_deploy_redis_docker_service()
+            latest_deployment: Deployment = await service.alatest_production_deployment  # type: ignore
+            self.assertEqual(
+                Deployment.DeploymentStatus.HEALTHY,
+                latest_deployment.status,
+            )
+
+            service_name = get_swarm_service_name_for_deployment(
+                deployment_hash=latest_deployment.hash,
+                project_id=p.id,
+                service_id=service.id,
+            )
+            swarm_service = self.fake_docker_client.services.get(service_name)
+            # the container has crashed & has not been restarted
+            swarm_service.swarm_tasks = []
+
+            watcher = DeploymentEventsWatcher(self.fake_docker_client)
+            watcher.handle_event(
+                {
+                    "Type": "container",
+                    "Action": "die",
+                    "Actor": {
+                        "Attributes": {"com.docker.swarm.service.name": service_name}
+                    },
+                    "time": 1,
+                }
+            )
+            watcher.handle_event(
+                {
+                    "Type": "container",
+                    "Action": "die",
+                    "Actor": {"Attributes": {"com.docker.swarm.service.name": "other"}},
+                    "time": 2,
+                }
+            )
+            await watcher.process_pending()
+
+            latest_deployment = await service.alatest_production_deployment  # type: ignore
+            self.assertEqual(
+                Deployment.DeploymentStatus.UNHEALTHY,
+                latest_deployment.status,
+            )
+            # the status has not changed since, so nothing is updated
+            self.assertIsNone(await watcher.refresh_deployment_status(service_name))
+
+    async def test_sleeping_service_is_not_updated(self):
+        async with self.workflowEnvironment():
+            p, service = await self.acreate_and_deploy_redis_docker_service()
+            latest_deployment: Deployment = await service.alatest_production_deployment  # type: ignore
+
+            service_name = get_swarm_service_name_for_deployment(
+                deployment_hash=latest_deployment.hash,
+                project_id=p.id,
+                service_id=service.id,
+            )
+            swarm_service = self.fake_docker_client.services.get(service_name)
+            swarm_service.labels["status"] = "sleeping"
+            swarm_service.swarm_tasks = []
+
+            watcher = DeploymentEventsWatcher(self.fake_docker_client)
+            self.assertIsNone(await watcher.refresh_deployment_status(service_name))
+
+            latest_deployment = await service.alatest_production_deployment  # type: ignore
+            self.assertEqual(
+                Deployment.DeploymentStatus.HEALTHY,
+                latest_deployment.status,
+            )
+
+
+class DeploymentHealthcheckTests(SimpleTestCase):
+    async def test_http_healthcheck_does_not_block_the_event_loop(self):
+        container_id = "abc123def456"
+        docker_client = MagicMock()
+        docker_client.containers.get.return_value = MagicMock(
+            id=container_id,
+            attrs={
+                "NetworkSettings": {
+                    "Networks": {"zane": {"DNSNames": ["web", container_id[:12]]}}
+                }
+            },
+        )
+        swarm_service = MagicMock()
+        swarm_service.tasks.return_value = [
+            {
+                "ID": "8qx04v72iovlv7xzjvsj2ngdk",
+                "Version": {"Index": 15079},
+                "CreatedAt": "2024-04-25T20:11:32.736667861Z",
+                "UpdatedAt": "2024-04-25T20:11:43.065656097Z",
+                "Status": {
+                    "Timestamp": "2024-04-25T20:11:42.770670997Z",
+                    "State": "running",
+                    "Message": "started",
+                    "ContainerStatus": {"ExitCode": 0, "ContainerID": container_id},
+                },
+                "Spec": {"ContainerSpec": {"Image": "nginx:alpine"}},
+                "DesiredState": "running",
+            }
+        ]
+
+        def slow_healthcheck(url: str, timeout: int):
+            time.sleep(0.3)
+            return MagicMock(status_code=200, content=b"OK")
+
+        ticks = 0
+
+        async def count_ticks():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(count_ticks())
+        with patch(
+            "temporal.schedules.activities.requests.get",
+            side_effect=slow_healthcheck,
+        ):
+            deployment_status, _ = await get_deployment_swarm_status(
+                AsyncDockerClient(docker_client),
+                swarm_service,
+                deployment_hash="dpl_dkr_1",
+                healthcheck=HealthCheckDto(
+                    type=HealthCheck.HealthCheckType.PATH,
+                    value="/",
+                    timeout_seconds=5,
+                    interval_seconds=30,
+                    associated_port=80,
+                ),
+            )
+        ticker.cancel()
+
+        self.assertEqual(Deployment.DeploymentStatus.HEALTHY, deployment_status)
+        # the other tasks of the worker kept running during the healthcheck
+        self.assertGreater(ticks, 10)
@@ -0,0 +1,168 @@
+import importlib
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from temporal.schedules.activities import CleanupActivities
+from ..models import HttpLog
+from ..partitioning import (
+    create_daily_partitions,
+    delete_from_default_partition_before,
+    drop_daily_partitions_before,
+    get_default_partition_name,
+    get_partition_name,
+    is_table_partitioned,
+    list_daily_partitions,
+)
+
+partition_migration = importlib.import_module(
+    "zane_api.migrations.0341_partition_httplog_by_day"
+)
+
+TABLE = HttpLog._meta.db_table
+
+
+class HttpLogsPartitioningTests(TestCase):
+    def setUp(self):
+        self.today = timezone.now().date()
+
+    def partition_http_logs_table(self):
+        # the test database is created from the models, so the table is partitioned
+        # by running the migration, the DDL is rolled back at the end of each test
+        with connection.schema_editor() as schema_editor:
+            partition_migration.partition_http_logs_table(None, schema_editor)
+
+    @staticmethod
+    def create_http_log(day: date) -> HttpLog:
+        return HttpLog.objects.create(
+            time=datetime.combine(day, time(hour=12), tzinfo=dt_timezone.utc),
+            request_method=HttpLog.RequestMethod.GET,
+            status=200,
+            request_duration_ns=1_000,
+            request_headers={},
+            response_headers={},
+            request_host="zaneops.local",
+            request_path="/",
+            request_ip="127.0.0.1",
+        )
+
+    @staticmethod
+    def count_rows(table: str) -> int:
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM "{table}"')
+            return cursor.fetchone()[0]
+
+    def test_create_daily_partitions_moves_rows_out_of_the_default_partition(self):
+        self.partition_http_logs_table()
+        future_day = self.today + timedelta(days=20)
+        self.create_http_log(future_day)
+        self.assertEqual(1, self.count_rows(get_default_partition_name(TABLE)))
+
+        with connection.cursor() as cursor:
+            created = create_daily_partitions(
+                cursor,
+                table=TABLE,
+                partition_key="time",
+                start=future_day - timedelta(days=1),
+                end=future_day,
+            )
+            self.assertEqual(future_day, max(list_daily_partitions(cursor, TABLE)))
+
+        self.assertEqual(
+            [
+                get_partition_name(TABLE, future_day - timedelta(days=1)),
+                get_partition_name(TABLE, future_day),
+            ],
+            created,
+        )
+        self.assertEqual(0, self.count_rows(get_default_partition_name(TABLE)))
+        self.assertEqual(1, self.count_rows(get_partition_name(TABLE, future_day)))
+        self.assertEqual(1, HttpLog.objects.count())
+
+    def test_create_daily_partitions_skips_existing_partitions(self):
+        self.partition_http_logs_table()
+        with connection.cursor() as cursor:
+            created = create_daily_partitions(
+                cursor,
+                table=TABLE,
+                partition_key="time",
+                start=self.today,
+                end=self.today + timedelta(days=1),
+            )
+        self.assertEqual([], created)
+
+    def test_drop_daily_partitions_before(self):
+        self.partition_http_logs_table()
+        self.create_http_log(self.today - timedelta(days=2))
+        self.create_http_log(self.today)
+
+        with connection.cursor() as cursor:
+            dropped = drop_daily_partitions_before(
+                cursor, TABLE, before=self.today - timedelta(days=1)
+            )
+            remaining_days = list_daily_partitions(cursor, TABLE).keys()
+
+        self.assertIn(
+            get_partition_name(TABLE, self.today - timedelta(days=2)), dropped
+        )
+        self.assertNotIn(
+            get_partition_name(TABLE, self.today - timedelta(days=1)), dropped
+        )
+        self.assertEqual(self.today - timedelta(days=1), min(remaining_days))
+        self.assertEqual(1, HttpLog.objects.count())
+        self.assertEqual(1, HttpLog.objects.filter(time__date=self.today).count())
+
+    def test_delete_from_default_partition_before(self):
+        self.partition_http_logs_table()
+        with connection.cursor() as cursor:
+            drop_daily_partitions_before(cursor, TABLE, before=self.today)
+        # there is no partition for these days anymore, so they land in the default partition
+        self.create_http_log(self.today - timedelta(days=10))
+        self.create_http_log(self.today - timedelta(days=1))
+        self.create_http_log(self.today + timedelta(days=30))
+
+        with connection.cursor() as cursor:
+            deleted = delete_from_default_partition_before(
+                cursor,
+                TABLE,
+                partition_key="time",
+                before=self.today - timedelta(days=5),
+            )
+
+        self.assertEqual(1, deleted)
+        self.assertEqual(2, self.count_rows(get_default_partition_name(TABLE)))
+
+    async def test_cleanup_http_logs_drops_expired_partitions(self):
+        def prepare():
+            self.partition_http_logs_table()
+            self.create_http_log(self.today - timedelta(days=10))
+            self.create_http_log(self.today)
+
+        await sync_to_async(prepare)()
+        with override_settings(
+            HTTP_LOGS_RETENTION_DAYS=3, HTTP_LOGS_PARTITIONS_PREMAKE_DAYS=10
+        ):
+            dropped = await CleanupActivities().cleanup_http_logs()
+
+        def check():
+            with connection.cursor() as cursor:
+                days = list_daily_partitions(cursor, TABLE).keys()
+            self.assertEqual(self.today - timedelta(days=3), min(days))
+            self.assertEqual(self.today + timedelta(days=10), max(days))
+            self.assertEqual(1, HttpLog.objects.count())
+
+        # the migration has created the partitions of the whole retention period
+        self.assertEqual(settings.HTTP_LOGS_RETENTION_DAYS - 3, dropped)
+        await sync_to_async(check)()
+
+    async def test_cleanup_http_logs_ignores_unpartitioned_table(self):
+        def is_partitioned():
+            with connection.cursor() as cursor:
+                return is_table_partitioned(cursor, TABLE)
+
+        self.assertFalse(await sync_to_async(is_partitioned)())
+        self.assertEqual(0, await CleanupActivities().cleanup_http_logs())
@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+from django.test import SimpleTestCase
+
+from ..process import AyncSubProcessRunner, BufferedLineReader
+
+
+class BufferedLineReaderTests(SimpleTestCase):
+    @staticmethod
+    async def read_all_lines(reader: BufferedLineReader) -> list[bytes]:
+        lines = []
+        while line := await reader.readline():
+            lines.append(line)
+        return lines
+
+    @staticmethod
+    def stream_of(data: bytes) -> asyncio.StreamReader:
+        stream = asyncio.StreamReader()
+        stream.feed_data(data)
+        stream.feed_eof()
+        return stream
+
+    async def test_split_lines_on_carriage_returns_and_new_lines(self):
+        reader = BufferedLineReader(self.stream_of(b"10%\r50%\r100%\r\ndone\n"))
+        self.assertEqual(
+            [b"10%\r", b"50%\r", b"100%\r", b"\n", b"done\n"],
+            await self.read_all_lines(reader),
+        )
+
+    async def test_return_the_last_line_without_delimiter_at_eof(self):
+        reader = BufferedLineReader(self.stream_of(b"first\nlast line"))
+        self.assertEqual([b"first\n", b"last line"], await self.read_all_lines(reader))
+        self.assertEqual(b"", await reader.readline())
+
+    async def test_find_delimiters_across_chunks(self):
+        reader = BufferedLineReader(self.stream_of(b"abcdef\nghi\n"))
+        reader.CHUNK_SIZE = 2
+        self.assertEqual([b"abcdef\n", b"ghi\n"], await self.read_all_lines(reader))
+
+    async def test_split_lines_longer_than_the_max_line_length(self):
+        reader = BufferedLineReader(self.stream_of(b"abcdefghij\nk"))
+        reader.CHUNK_SIZE = 3
+        reader.MAX_LINE_LENGTH = 4
+        self.assertEqual(
+            [b"abcd", b"efgh", b"ij\n", b"k"], await self.read_all_lines(reader)
+        )
+
+
+class AsyncSubProcessRunnerProgressTests(SimpleTestCase):
+    async def run_command(
+        self, command: str, progress_interval: float
+    ) -> list[tuple[str, float]]:
+        messages: list[tuple[str, float]] = []
+
+        async def output_handler(message: str):
+            messages.append((message, time.monotonic()))
+
+        runner = AyncSubProcessRunner(
+            command=command,
+            cancel_event=asyncio.Event(),
+            output_handler=output_handler,
+            operation_name="test",
+            progress_interval=progress_interval,
+        )
+        exit_code, _ = await runner.run()
+        self.assertEqual(0, exit_code)
+        return messages
+
+    async def test_only_the_last_progress_frame_of_an_interval_is_sent(self):
+        messages = await self.run_command(
+            "printf '10%%\\r'; printf '50%%\\r'; printf '100%%\\r\\n'; printf 'done\\n'",
+            progress_interval=5,
+        )
+        self.assertEqual(["10%", "100%", "done"], [message for message, _ in messages])
+
+    async def test_pending_progress_frame_is_sent_when_the_interval_ends(self):
+        messages = await self.run_command(
+            "printf '10%%\\r'; printf '50%%\\r'; sleep 1.5; printf 'done\\n'",
+            progress_interval=0.3,
+        )
+        self.assertEqual(["10%", "50%", "done"], [message for message, _ in messages])
+        _, frame_sent_at = messages[1]
+        _, done_sent_at = messages[2]
+        # the frame is sent by the timer, without waiting for the next line
+        self.assertLess(frame_sent_at, done_sent_at - 0.5)
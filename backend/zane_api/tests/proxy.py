@@ -1,8 +1,18 @@
+import asyncio
+import json
 from typing import cast
-from .base import AuthAPITestCase
+
+import responses
+from django.conf import settings
+from django.test import SimpleTestCase
 from django.urls import reverse
 from rest_framework import status
+
+from .base import AuthAPITestCase
+from ..domain_index import DomainIndex
 from ..models import URL
+from compose.dtos import ComposeStackUrlRouteDto
+from temporal.proxy import ZaneProxyClient
 
 
 class ProxyViewTestCase(AuthAPITestCase):
@@ -22,3 +32,198 @@ class ProxyViewTestCase(AuthAPITestCase):
             QUERY_STRING="domain=hello.fkiss.me",
         )
         self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code)
+
+    def test_check_certificate_after_domain_is_removed(self):
+        _, service = self.create_and_deploy_caddy_docker_service()
+
+        url = cast(URL, service.urls.first())
+        response = self.client.get(
+            reverse("zane_api:proxy.check_certificates"),
+            QUERY_STRING=f"domain={url.domain}",
+        )
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+        url.delete()
+        response = self.client.get(
+            reverse("zane_api:proxy.check_certificates"),
+            QUERY_STRING=f"domain={url.domain}",
+        )
+        self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code)
+
+
+class DomainIndexTestCase(SimpleTestCase):
+    def test_contains_exact_domains(self):
+        index = DomainIndex()
+        index.add("Hello.zaneops.dev")
+        self.assertTrue(index.contains("hello.zaneops.dev"))
+        self.assertTrue(index.contains("HELLO.zaneops.dev"))
+        self.assertFalse(index.contains("world.zaneops.dev"))
+        self.assertFalse(index.contains("zaneops.dev"))
+
+    def test_contains_only_direct_subdomains_of_wildcard_domains(self):
+        index = DomainIndex()
+        index.add("*.zaneops.dev")
+        self.assertTrue(index.contains("hello.zaneops.dev"))
+        self.assertFalse(index.contains("a.hello.zaneops.dev"))
+        self.assertFalse(index.contains("zaneops.dev"))
+
+    def test_do_not_expand_wildcard_when_not_allowed(self):
+        index = DomainIndex()
+        index.add("*.registry.zaneops.dev", allow_wildcard=False)
+        self.assertFalse(index.contains("hello.registry.zaneops.dev"))
+
+
+class ZaneProxyClientRoutesTransactionTestCase(SimpleTestCase):
+    ROUTES_URL = f"{settings.CADDY_PROXY_ADMIN_HOST}/id/zane-url-root/routes"
+
+    def setUp(self):
+        self.routes = [
+            {"@id": "zane-catchall", "handle": []},
+            {
+                "@id": "stk_abc-web-web.127-0-0-1.sslip.io-*",
+                "match": [{"host": ["web.127-0-0-1.sslip.io"], "path": ["/*"]}],
+            },
+            {
+                "@id": "stk_abc-old-old.127-0-0-1.sslip.io-*",
+                "match": [{"host": ["old.127-0-0-1.sslip.io"], "path": ["/*"]}],
+            },
+            {
+                "@id": "srv_other-other.127-0-0-1.sslip.io-*",
+                "match": [{"host": ["other.127-0-0-1.sslip.io"], "path": ["/*"]}],
+            },
+        ]
+        self.urls = {
+            "web": [
+                ComposeStackUrlRouteDto(
+                    domain="web.127-0-0-1.sslip.io",
+                    base_path="/",
+                    strip_prefix=True,
+                    port=80,
+                ),
+                ComposeStackUrlRouteDto(
+                    domain="web.127-0-0-1.sslip.io",
+                    base_path="/api",
+                    strip_prefix=True,
+                    port=8000,
+                ),
+            ],
+            "admin": [
+                ComposeStackUrlRouteDto(
+                    domain="admin.127-0-0-1.sslip.io",
+                    base_path="/",
+                    strip_prefix=True,
+                    port=80,
+                ),
+            ],
+        }
+
+    def add_get_routes(self):
+        responses.add(
+            responses.GET,
+            self.ROUTES_URL,
+            json=self.routes,
+            headers={"etag": '"etag"'},
+        )
+
+    @responses.activate
+    def test_upsert_all_urls_of_the_stack_in_a_single_patch(self):
+        self.add_get_routes()
+        responses.add(responses.PATCH, self.ROUTES_URL, status=status.HTTP_200_OK)
+
+        routes_added = ZaneProxyClient.upsert_compose_stack_service_urls(
+            stack_id="stk_abc", stack_hash_prefix="abc", urls=self.urls
+        )
+
+        self.assertEqual(3, len(routes_added))
+        self.assertEqual(
+            1, len([call for call in responses.calls if call.request.method == "GET"])
+        )
+        patch_calls = [
+            call for call in responses.calls if call.request.method == "PATCH"
+        ]
+        self.assertEqual(1, len(patch_calls))
+        self.assertEqual('"etag"', patch_calls[0].request.headers["If-Match"])
+
+        patched_routes = json.loads(patch_calls[0].request.body)
+        patched_ids = [route["@id"] for route in patched_routes]
+        self.assertEqual(len(set(patched_ids)), len(patched_ids))
+        for route_id in routes_added:
+            self.assertIn(route_id, patched_ids)
+        # the other routes are kept
+        self.assertIn("srv_other-other.127-0-0-1.sslip.io-*", patched_ids)
+        self.assertIn("stk_abc-old-old.127-0-0-1.sslip.io-*", patched_ids)
+        self.assertEqual("zane-catchall", patched_ids[-1])
+
+    @responses.activate
+    def test_retry_the_whole_batch_when_etag_precondition_fails(self):
+        self.add_get_routes()
+        responses.add(
+            responses.PATCH,
+            self.ROUTES_URL,
+            status=status.HTTP_412_PRECONDITION_FAILED,
+        )
+        responses.add(responses.PATCH, self.ROUTES_URL, status=status.HTTP_200_OK)
+
+        ZaneProxyClient.upsert_compose_stack_service_urls(
+            stack_id="stk_abc", stack_hash_prefix="abc", urls=self.urls
+        )
+
+        self.assertEqual(
+            2, len([call for call in responses.calls if call.request.method == "GET"])
+        )
+        self.assertEqual(
+            2,
+            len([call for call in responses.calls if call.request.method == "PATCH"]),
+        )
+
+    @responses.activate
+    def test_cleanup_old_stack_urls_in_a_single_patch(self):
+        self.add_get_routes()
+        responses.add(responses.PATCH, self.ROUTES_URL, status=status.HTTP_200_OK)
+
+        deleted = asyncio.run(
+            ZaneProxyClient.cleanup_old_compose_stack_service_urls(
+                stack_id="stk_abc", all_urls=self.urls
+            )
+        )
+
+        self.assertEqual(
+            [
+                (
+                    "stk_abc-old-old.127-0-0-1.sslip.io-*",
+                    "old.127-0-0-1.sslip.io",
+                    "/*",
+                ),
+            ],
+            deleted,
+        )
+        patch_calls = [
+            call for call in responses.calls if call.request.method == "PATCH"
+        ]
+        self.assertEqual(1, len(patch_calls))
+        patched_ids = [
+            route["@id"] for route in json.loads(patch_calls[0].request.body)
+        ]
+        self.assertNotIn("stk_abc-old-old.127-0-0-1.sslip.io-*", patched_ids)
+        self.assertIn("srv_other-other.127-0-0-1.sslip.io-*", patched_ids)
+
+    @responses.activate
+    def test_do_not_reload_the_proxy_when_nothing_changes(self):
+        self.routes = [
+            route
+            for route in self.routes
+            if route["@id"] != "stk_abc-old-old.127-0-0-1.sslip.io-*"
+        ]
+        self.add_get_routes()
+
+        deleted = asyncio.run(
+            ZaneProxyClient.cleanup_old_compose_stack_service_urls(
+                stack_id="stk_abc", all_urls=self.urls
+            )
+        )
+
+        self.assertEqual([], deleted)
+        self.assertEqual(
+            0,
+            len([call for call in responses.calls if call.request.method == "PATCH"]),
+        )
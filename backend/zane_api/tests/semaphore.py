@@ -0,0 +1,153 @@
+import asyncio
+import time
+import uuid
+from datetime import timedelta
+
+import redis
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from temporal.semaphore import AsyncSemaphore
+
+
+class AsyncSemaphoreTests(SimpleTestCase):
+    def setUp(self):
+        self.key = f"test_{uuid.uuid4().hex}"
+        self.addCleanup(self.delete_semaphore_keys)
+
+    def delete_semaphore_keys(self):
+        with redis.from_url(settings.REDIS_URL) as client:
+            keys = client.keys(f"*semaphore_{self.key}*")
+            if keys:
+                client.delete(*keys)
+
+    def semaphore(self, **kwargs) -> AsyncSemaphore:
+        return AsyncSemaphore(
+            key=self.key,
+            **{"wait_interval": timedelta(milliseconds=100), **kwargs},
+        )
+
+    async def wait_for_waiters(self, semaphore: AsyncSemaphore, count: int):
+        for _ in range(50):
+            if len(await semaphore.waiters()) == count:
+                return
+            await asyncio.sleep(0.02)
+        self.fail(f"expected {count} waiters, got {await semaphore.waiters()}")
+
+    async def test_waiters_are_served_in_fifo_order(self):
+        semaphore = self.semaphore(limit=1)
+        acquired_order: list[str] = []
+
+        async def acquire(holder: str):
+            await semaphore.acquire(holder=holder, timeout=timedelta(seconds=5))
+            acquired_order.append(holder)
+
+        self.assertTrue(await semaphore.acquire(holder="first"))
+        second = asyncio.create_task(acquire("second"))
+        await self.wait_for_waiters(semaphore, 1)
+        third = asyncio.create_task(acquire("third"))
+        await self.wait_for_waiters(semaphore, 2)
+        self.assertEqual(["second", "third"], await semaphore.waiters())
+
+        await semaphore.release(holder="first")
+        await second
+        self.assertEqual(["second"], acquired_order)
+        self.assertFalse(third.done())
+
+        await semaphore.release(holder="second")
+        await third
+        self.assertEqual(["second", "third"], acquired_order)
+
+    async def test_expired_lease_frees_the_slot(self):
+        semaphore = self.semaphore(
+            limit=1, semaphore_timeout=timedelta(milliseconds=300)
+        )
+        self.assertTrue(await semaphore.acquire(holder="dead-worker"))
+
+        started_at = time.monotonic()
+        self.assertTrue(
+            await semaphore.acquire(holder="next", timeout=timedelta(seconds=3))
+        )
+        self.assertGreaterEqual(time.monotonic() - started_at, 0.2)
+        self.assertEqual(["next"], list(await semaphore.holders()))
+
+    async def test_acquire_all_waits_for_every_slot_and_reset_frees_them(self):
+        semaphore = self.semaphore(limit=3)
+        self.assertTrue(await semaphore.acquire(holder="deploy"))
+        self.assertFalse(
+            await semaphore.acquire_all(
+                holder="cleanup", timeout=timedelta(milliseconds=300)
+            )
+        )
+        # the holder that gave up doesn't keep its place in the queue
+        self.assertEqual([], await semaphore.waiters())
+
+        await semaphore.release(holder="deploy")
+        self.assertTrue(await semaphore.acquire_all(holder="cleanup"))
+        self.assertFalse(
+            await semaphore.acquire(
+                holder="deploy", timeout=timedelta(milliseconds=300)
+            )
+        )
+
+        await semaphore.reset()
+        self.assertEqual({}, await semaphore.holders())
+        self.assertTrue(
+            await semaphore.acquire(holder="deploy", timeout=timedelta(seconds=1))
+        )
+
+    async def test_waiters_that_stop_polling_lose_their_place(self):
+        semaphore = self.semaphore(limit=1)
+        self.assertTrue(await semaphore.acquire(holder="deploy"))
+        # a waiter whose activity has been cancelled without releasing its place
+        async with semaphore._get_client() as client:
+            self.assertFalse(await semaphore._try_acquire(client, "gone", 1))
+        await semaphore.release(holder="deploy")
+        self.assertEqual(["gone"], await semaphore.waiters())
+
+        # the waiter expires after 3 wait intervals
+        self.assertTrue(
+            await semaphore.acquire(holder="next", timeout=timedelta(seconds=3))
+        )
+        self.assertEqual([], await semaphore.waiters())
+
+    async def test_holders_and_waiters(self):
+        semaphore = self.semaphore(limit=1, semaphore_timeout=timedelta(minutes=1))
+        self.assertTrue(await semaphore.acquire(holder="deploy"))
+        waiter = asyncio.create_task(
+            semaphore.acquire(holder="waiting", timeout=timedelta(seconds=5))
+        )
+        await self.wait_for_waiters(semaphore, 1)
+
+        holders = await semaphore.holders()
+        self.assertEqual(["deploy"], list(holders))
+        self.assertAlmostEqual(time.time() + 60, holders["deploy"], delta=5)
+        self.assertEqual(["waiting"], await semaphore.waiters())
+
+        await semaphore.release(holder="deploy")
+        self.assertTrue(await waiter)
+        self.assertEqual(["waiting"], list(await semaphore.holders()))
+        self.assertEqual([], await semaphore.waiters())
+
+    async def test_lease_is_renewed_while_held(self):
+        semaphore = self.semaphore(
+            limit=1,
+            semaphore_timeout=timedelta(milliseconds=300),
+            renew_for=timedelta(seconds=5),
+        )
+        self.assertTrue(await semaphore.acquire(holder="deploy"))
+        await asyncio.sleep(1)
+        self.assertEqual(["deploy"], list(await semaphore.holders()))
+
+        await semaphore.release(holder="deploy")
+        self.assertEqual({}, await semaphore.holders())
+
+    async def test_lease_is_renewed_for_at_most_renew_for(self):
+        semaphore = self.semaphore(
+            limit=1,
+            semaphore_timeout=timedelta(milliseconds=300),
+            renew_for=timedelta(milliseconds=600),
+        )
+        self.assertTrue(await semaphore.acquire(holder="terminated-workflow"))
+        await asyncio.sleep(1.5)
+        self.assertEqual({}, await semaphore.holders())
@@ -334,6 +334,12 @@ urlpatterns = [
         views.ServiceDeploymentRuntimeLogsWithContextAPIView.as_view(),
         name="services.deployment.runtime_logs.with_context",
     ),
+    re_path(
+        rf"^projects/(?P<project_slug>{DJANGO_SLUG_REGEX})/(?P<env_slug>{DJANGO_SLUG_REGEX})/service-details"
+        rf"/(?P<service_slug>{DJANGO_SLUG_REGEX})/deployments/(?P<deployment_hash>[a-zA-Z0-9-_]+)/runtime-logs/histogram/?$",
+        views.ServiceDeploymentRuntimeLogsHistogramAPIView.as_view(),
+        name="services.deployment.runtime_logs.histogram",
+    ),
     re_path(
         rf"^projects/(?P<project_slug>{DJANGO_SLUG_REGEX})/(?P<env_slug>{DJANGO_SLUG_REGEX})/service-details"
         rf"/(?P<service_slug>{DJANGO_SLUG_REGEX})/deployments/(?P<deployment_hash>[a-zA-Z0-9-_]+)/build-logs/?$",
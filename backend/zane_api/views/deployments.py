@@ -1,5 +1,5 @@
 import secrets
-from typing import Any, Callable, List, Tuple, cast
+from typing import List, cast
 from rest_framework.views import APIView
 from drf_spectacular.utils import extend_schema
 from rest_framework import exceptions, permissions
@@ -55,7 +55,7 @@ from ..serializers import (
     ErrorResponse409Serializer,
     SimpleDeploymentSerializer,
 )
-from temporal.client import TemporalClient
+from temporal.client import TemporalClient, StartWorkflowArg
 from temporal.shared import (
     DeploymentDetails,
     CancelDeploymentSignalInput,
@@ -376,7 +376,7 @@ class BulkDeployServicesAPIView(APIView):
             )
         )
 
-        workflows_to_run: List[Tuple[Callable, Any, str]] = []
+        workflows_to_run: List[StartWorkflowArg] = []
 
         for service in services:
             if service.type == Service.ServiceType.DOCKER_REGISTRY:
@@ -389,7 +389,7 @@ class BulkDeployServicesAPIView(APIView):
             payload = DeploymentDetails.from_deployment(deployment=new_deployment)
 
             workflows_to_run.append(
-                (
+                StartWorkflowArg(
                     (
                         DeployDockerServiceWorkflow.run
                         if service.type == Service.ServiceType.DOCKER_REGISTRY
@@ -401,12 +401,7 @@ class BulkDeployServicesAPIView(APIView):
             )
 
         def commit_callback():
-            for workflow, payload, workflow_id in workflows_to_run:
-                TemporalClient.start_workflow(
-                    workflow,
-                    payload,
-                    workflow_id,
-                )
+            TemporalClient.start_workflows(workflows_to_run)
 
         transaction.on_commit(commit_callback)
 
@@ -78,7 +78,7 @@ from ..serializers import (
     SharedVolumeSerializer,
     VolumeWithServiceSerializer,
 )
-from temporal.client import TemporalClient
+from temporal.client import TemporalClient, StartWorkflowArg
 from temporal.shared import (
     CancelDeploymentSignalInput,
     DeploymentDetails,
@@ -1547,12 +1547,16 @@ class BulkToggleServicesAPIView(APIView):
         if len(payloads) > 0:
 
             def commit_callback():
-                for payload in payloads:
-                    TemporalClient.start_workflow(
-                        workflow=ToggleDockerServiceWorkflow.run,
-                        arg=payload,
-                        id=f"toggle-{payload.deployment.service_id}-{payload.deployment.project_id}",
-                    )
+                TemporalClient.start_workflows(
+                    [
+                        StartWorkflowArg(
+                            workflow=ToggleDockerServiceWorkflow.run,
+                            payload=payload,
+                            workflow_id=f"toggle-{payload.deployment.service_id}-{payload.deployment.project_id}",
+                        )
+                        for payload in payloads
+                    ]
+                )
 
             transaction.on_commit(commit_callback)
         return Response(None, status=status.HTTP_202_ACCEPTED)
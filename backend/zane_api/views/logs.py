@@ -17,7 +17,7 @@ from ..permissions import (
     get_accessible_projects,
 )
 from ..utils import Colors, escape_ansi
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from .helpers import ZaneServices
 from .serializers import (
@@ -39,6 +39,8 @@ from search.serializers import (
     RuntimeLogsSearchSerializer,
     RuntimeLogsContextSerializer,
     RuntimeLogsContextParamsSerializer,
+    RuntimeLogsHistogramSerializer,
+    RuntimeLogsHistogramParamsSerializer,
 )
 
 from .base import EMPTY_CURSOR_RESPONSE
@@ -426,6 +428,42 @@ class SingleHttpLogAPIView(RetrieveAPIView):
         return log
 
 
+# no log is added to the deployments in these states, their logs can be cached
+FINISHED_DEPLOYMENT_STATUSES = [
+    Deployment.DeploymentStatus.FAILED,
+    Deployment.DeploymentStatus.CANCELLED,
+    Deployment.DeploymentStatus.REMOVED,
+]
+
+
+def has_final_logs(deployment: Deployment) -> bool:
+    """
+    Whether no new log can be added to the deployment, so that its logs can be cached.
+    Logs are still written for a short time after the deployment is finished or removed
+    (cleanup steps, logs buffered by the log sink & by fluentd),
+    so the status has to be final for at least `LOKI_QUERY_CACHE_MIN_AGE` seconds.
+    """
+    if (
+        deployment.status not in FINISHED_DEPLOYMENT_STATUSES
+        or deployment.finished_at is None
+    ):
+        return False
+    # `updated_at` is when the deployment was removed, if it was after it finished
+    last_change = max(deployment.finished_at, deployment.updated_at)
+    return last_change < timezone.now() - timedelta(
+        seconds=settings.LOKI_QUERY_CACHE_MIN_AGE
+    )
+
+
+def should_bypass_logs_cache(request: Request) -> bool:
+    cache_control = request.headers.get("Cache-Control", "")
+    return "no-cache" in cache_control or "no-store" in cache_control
+
+
+def get_logs_cache_headers(cache_status: str | None) -> dict[str, str]:
+    return {"X-Cache": cache_status} if cache_status is not None else {}
+
+
 class ServiceDeploymentRuntimeLogsAPIView(APIView):
     serializer_class = RuntimeLogsSearchSerializer
     permission_classes = [HasWorkspace, IsWorkspaceMember]
@@ -477,13 +515,16 @@ class ServiceDeploymentRuntimeLogsAPIView(APIView):
             form = DeploymentRuntimeLogsQuerySerializer(data=request.query_params)
             if form.is_valid(raise_exception=True):
                 search_client = LokiSearchClient(host=settings.LOKI_HOST)
-                data = search_client.search(
+                data, cache_status = search_client.cached_search(
                     query=dict(
                         **form.validated_data,  # type: ignore
+                        service_id=service.id,
                         deployment_id=deployment.hash,
-                    )
+                    ),
+                    is_final=has_final_logs(deployment),
+                    bypass_cache=should_bypass_logs_cache(request),
                 )
-                return Response(data)
+                return Response(data, headers=get_logs_cache_headers(cache_status))
 
 
 class ServiceDeploymentRuntimeLogsWithContextAPIView(APIView):
@@ -546,11 +587,81 @@ class ServiceDeploymentRuntimeLogsWithContextAPIView(APIView):
         data = search_client.get_context(
             lines=math.ceil(lines / 2),
             timestamp_ns=time_ns,
+            service_id=service.id,
             deployment_id=deployment.hash,
         )
         return Response(data)
 
 
+class ServiceDeploymentRuntimeLogsHistogramAPIView(APIView):
+    serializer_class = RuntimeLogsHistogramSerializer
+    permission_classes = [HasWorkspace, IsWorkspaceMember]
+
+    @extend_schema(
+        summary="Get deployment logs volume",
+        parameters=[
+            DeploymentRuntimeLogsQuerySerializer,
+            RuntimeLogsHistogramParamsSerializer,
+        ],
+    )
+    def get(
+        self,
+        request: Request,
+        project_slug: str,
+        service_slug: str,
+        deployment_hash: str,
+        env_slug: str = Environment.PRODUCTION_ENV_NAME,
+    ):
+        try:
+            project = Project.objects.get(
+                slug=project_slug,
+                id__in=get_accessible_projects(
+                    self.request.user,  # type: ignore
+                    self.request.workspace,  # type: ignore
+                ),
+            )
+
+            environment = Environment.objects.get(
+                name=env_slug.lower(), project=project
+            )
+            service = Service.objects.get(
+                slug=service_slug, project=project, environment=environment
+            )
+            deployment = Deployment.objects.get(service=service, hash=deployment_hash)
+        except Project.DoesNotExist:
+            raise exceptions.NotFound(
+                detail=f"A project with the slug `{project_slug}` does not exist."
+            )
+        except Environment.DoesNotExist:
+            raise exceptions.NotFound(
+                detail=f"An environment with the name `{env_slug}` does not exist in this project"
+            )
+        except Service.DoesNotExist:
+            raise exceptions.NotFound(
+                detail=f"A service with the slug `{service_slug}` does not exist within the environment `{env_slug}` of the project `{project_slug}`"
+            )
+        except Deployment.DoesNotExist:
+            raise exceptions.NotFound(
+                detail=f"A deployment with the hash `{deployment_hash}` does not exist for this service."
+            )
+
+        form = DeploymentRuntimeLogsQuerySerializer(data=request.query_params)
+        form.is_valid(raise_exception=True)
+        params_form = RuntimeLogsHistogramParamsSerializer(data=request.query_params)
+        params_form.is_valid(raise_exception=True)
+
+        search_client = LokiSearchClient(host=settings.LOKI_HOST)
+        data = search_client.histogram(
+            query=dict(
+                **form.validated_data,  # type: ignore
+                service_id=service.id,
+                deployment_id=deployment.hash,
+            ),
+            buckets=cast(dict, params_form.validated_data).get("buckets", 60),
+        )
+        return Response(data)
+
+
 class ServiceDeploymentBuildLogsAPIView(APIView):
     serializer_class = RuntimeLogsSearchSerializer
     permission_classes = [HasWorkspace, IsWorkspaceMember]
@@ -603,11 +714,14 @@ class ServiceDeploymentBuildLogsAPIView(APIView):
             form = DeploymentBuildLogsQuerySerializer(data=request.query_params)
             if form.is_valid(raise_exception=True):
                 search_client = LokiSearchClient(host=settings.LOKI_HOST)
-                data = search_client.search(
+                data, cache_status = search_client.cached_search(
                     query=dict(
                         **form.validated_data,  # type: ignore
+                        service_id=service.id,
                         deployment_id=deployment.hash,
                         source=[RuntimeLogSource.BUILD, RuntimeLogSource.SYSTEM],
-                    )
+                    ),
+                    is_final=has_final_logs(deployment),
+                    bypass_cache=should_bypass_logs_cache(request),
                 )
-                return Response(data)
+                return Response(data, headers=get_logs_cache_headers(cache_status))
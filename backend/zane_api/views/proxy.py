@@ -5,15 +5,10 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.views import APIView
-from django.db.models import Q
 from rest_framework import serializers
-from ..models import URL
 from .serializers import URLDomainField
-from django.db import connection
-from zane_api.utils import domain_to_wildcard
-from container_registry.models import BuildRegistry
+from ..domain_index import get_domain_index
 from typing import cast
-from compose.models import ComposeStack
 
 
 class CertificateCheckSerializer(serializers.Serializer):
@@ -39,42 +34,8 @@ class CheckCertificatesAPIView(APIView):
             ):  # These are default certificates for zaneops and subdomains
                 return Response({"validated": True}, status=status.HTTP_200_OK)
 
-            # Check for service domains
-            domain_as_wildcard = domain_to_wildcard(domain)
-            existing_urls = URL.objects.filter(
-                Q(domain=domain) | Q(domain=domain_as_wildcard)
-            ).exists()
-
-            if existing_urls:
-                return Response({"validated": True}, status=status.HTTP_200_OK)
-
-            # Check for build registry urls
-            if BuildRegistry.objects.filter(registry_domain=domain).exists():
-                return Response({"validated": True}, status=status.HTTP_200_OK)
-
-            # Check compose stack URLs
-            # Use PostgreSQL's jsonb_each and jsonb_array_elements to search nested JSON
-            # The urls field structure is: {service_name: [{domain, base_path, ...}, ...]}
-            query = f"""
-                SELECT cs.id
-                FROM {ComposeStack._meta.db_table} cs,
-                    jsonb_each(cs.urls) AS services(service_name, routes),
-                    jsonb_array_elements(services.routes) AS route
-                WHERE cs.urls IS NOT NULL
-                AND (
-                  lower(route->>'domain') = %s OR lower(route->>'domain') = %s
-                )
-                LIMIT 1
-            """
-            params = [
-                domain,
-                domain_as_wildcard,
-            ]
-            with connection.cursor() as cursor:
-                cursor.execute(query, params)
-                result = cursor.fetchone()
-
-            if result:
+            # Check for the domains of services, build registries & compose stacks
+            if get_domain_index().contains(domain):
                 return Response({"validated": True}, status=status.HTTP_200_OK)
 
         raise exceptions.PermissionDenied(